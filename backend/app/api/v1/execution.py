@@ -1,25 +1,78 @@
 """
 Experiment Execution API endpoints
 """
-from typing import List
+import asyncio
+import random
+import threading
+from functools import partial
+from typing import Awaitable, Callable, List
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
+from app.config import settings
 from app.models.experiment import Experiment as ExperimentModel
 from app.models.participant import Participant as ParticipantModel
 from app.models.response import Response as ResponseModel
 from app.schemas.execution import (
+    ExecutionEstimate,
     ExecutionRequest,
     ExecutionResult,
     ParticipantExecutionResult,
 )
+from app.services.batch_executor import BatchExecutor
+from app.services.budget import BudgetGuard
+from app.services.bulk_writer import BulkWriter
+from app.services.cassette import RECORD, Cassette
+from app.services.checkpoint import RunCheckpoint, stored_participant_numbers
+from app.services.client_pool import get_client_pool, get_shared_loop
+from app.services.concurrency_controller import AdaptiveConcurrency
+from app.services.cost_estimator import CostEstimator
+from app.services.execution_engine import ExecutionEngine
+from app.services.hedging import HedgePolicy
+from app.services.job_queue import JobQueue, LeaseLostError, latest_job
 from app.services.llm_executor import LLMExecutor
+from app.services.llm_provider import get_provider
+from app.services.llm_router import LLMRouter
 from app.services.participant_generator import ParticipantGenerator
+from app.services.pipeline import ExecutionPipeline
+from app.services.prompt_template import PERSONA_FIRST
+from app.services.rate_limiter import get_rate_limiter
+from app.services.response_cache import get_response_cache
+from app.services.retry import RetryPolicy
+from app.services.strategy_engine import StrategyExecutor, get_strategy, summarize_stages
 
 router = APIRouter()
 
+# Number of participant prompts rendered and tokenized for an estimate
+ESTIMATE_SAMPLE_PROMPTS = 20
+
+# Participants stored per commit (and lost at most when a run crashes)
+DEFAULT_CHECKPOINT_EVERY = 100
+
+
+def build_participant_generator(sample_config: dict, seed: int | None = None) -> ParticipantGenerator:
+    """
+    Build a participant generator from an experiment's sample_config
+
+    Args:
+        sample_config: Experiment sample configuration
+        seed: Profile seed (default: unseeded)
+
+    Returns:
+        Configured ParticipantGenerator
+    """
+    return ParticipantGenerator(
+        age_min=sample_config.get("age_min", 18),
+        age_max=sample_config.get("age_max", 100),
+        genders=sample_config.get("genders"),
+        gender_weights=sample_config.get("gender_weights"),
+        countries=sample_config.get("countries"),
+        education_levels=sample_config.get("education_levels"),
+        seed=seed,
+    )
+
 
 def execute_experiment_task(
     experiment_id: int,
@@ -28,9 +81,18 @@ def execute_experiment_task(
     temperature: float,
     max_tokens: int,
     db: Session,
+    bypass_cache: bool = False,
+    additional_api_keys: list[str] | None = None,
+    lease_lost: threading.Event | None = None,
 ):
     """
-    Background task to execute experiment for all participants
+    Execute an experiment for all participants (run by app.worker for queued jobs)
+
+    LLM calls and database writes overlap through a bounded queue (see
+    ExecutionPipeline). Participants are committed every `checkpoint_every`
+    along with a checkpoint in meta_data. Participants already stored are
+    skipped, so a job reclaimed after a crash or a resumed run only redoes
+    unsaved work.
 
     Args:
         experiment_id: Experiment ID
@@ -39,6 +101,13 @@ def execute_experiment_task(
         temperature: Sampling temperature
         max_tokens: Maximum tokens
         db: Database session
+        bypass_cache: Skip cached LLM responses for this run
+        additional_api_keys: Further API keys to route requests through
+        lease_lost: Set by the worker when its job lease is lost; the run then
+            stops without committing anything further
+
+    Raises:
+        LeaseLostError: If lease_lost is set during the run
     """
     # Get experiment
     experiment = (
@@ -57,24 +126,83 @@ def execute_experiment_task(
 
         # Get questions from experiment config
         questions = experiment_config.get("questions", [])
+        question_ids = [q.get("question_id") for q in questions]
 
         if not questions:
             experiment.status = "failed"
             db.commit()
             return
 
-        # Generate participants using ParticipantGenerator
-        generator = ParticipantGenerator(
-            age_min=sample_config.get("age_min", 18),
-            age_max=sample_config.get("age_max", 100),
-            genders=sample_config.get("genders"),
-            gender_weights=sample_config.get("gender_weights"),
-            countries=sample_config.get("countries"),
-            education_levels=sample_config.get("education_levels"),
+        execution_settings = experiment.execution_settings or {}
+        # Record every call for offline benchmarks, or replay a recording
+        cassette = Cassette.from_settings(execution_settings, settings.llm_cassette_dir)
+
+        # Resume from the last checkpoint: participants already stored are kept
+        # and the rest are regenerated from the same profile seed
+        checkpoint = RunCheckpoint.load(experiment.meta_data)
+        if checkpoint is None:
+            if cassette is not None and cassette.profile_seed is not None:
+                # Recorded prompts only match the recorded personas
+                profile_seed = cassette.profile_seed
+            else:
+                profile_seed = sample_config.get("seed", random.randrange(2**31))
+            checkpoint = RunCheckpoint(profile_seed=profile_seed)
+        else:
+            checkpoint.resume()
+            if cassette is not None:
+                # Keep what was recorded before the interruption
+                cassette.resume()
+        if cassette is not None and cassette.mode == RECORD:
+            cassette.profile_seed = checkpoint.profile_seed
+        stored = stored_participant_numbers(db, experiment_id)
+
+        generator = build_participant_generator(sample_config, seed=checkpoint.profile_seed)
+        sample_size = sample_config.get("sample_size", 10)
+        profiles = generator.generate_numbers(
+            [n for n in range(1, sample_size + 1) if n not in stored]
         )
 
-        sample_size = sample_config.get("sample_size", 10)
-        profiles = generator.generate(count=sample_size)
+        provider = get_provider(
+            execution_settings.get("provider", settings.llm_provider),
+            execution_settings.get("base_url", settings.llm_base_url),
+        )
+        rpm_limit = execution_settings.get("rpm_limit", settings.llm_rpm_limit)
+        tpm_limit = execution_settings.get("tpm_limit", settings.llm_tpm_limit)
+        # Share one RPM/TPM limiter with every run using this model, key and server
+        rate_limiter = get_rate_limiter(
+            model=model,
+            api_key=api_key,
+            rpm=rpm_limit,
+            tpm=tpm_limit,
+            base_url=provider.base_url,
+        )
+        client_pool = get_client_pool()
+
+        # Several keys or equivalent deployments: balance calls between them
+        api_keys = [api_key, *(additional_api_keys or [])]
+        deployments = [model, *execution_settings.get("model_deployments", [])]
+        llm_router = None
+        if len(set(api_keys)) > 1 or len(set(deployments)) > 1:
+            llm_router = LLMRouter.build(
+                api_keys, deployments, provider, rpm_limit, tpm_limit, client_pool
+            )
+
+        hedge_policy = HedgePolicy.from_settings(execution_settings)
+        # Every call reserves its worst-case cost against the run budget
+        budget = (
+            BudgetGuard(execution_settings["budget"])
+            if execution_settings.get("budget") is not None
+            else None
+        )
+        if budget is not None:
+            # A resumed run continues from what earlier attempts spent
+            budget.charge(checkpoint.budget_spent)
+
+        # Optionally let throttling and latency steer the in-flight limit
+        concurrency_controller = AdaptiveConcurrency.from_settings(
+            execution_settings,
+            initial=execution_settings.get("concurrency", ExecutionEngine.DEFAULT_CONCURRENCY),
+        )
 
         # Initialize LLM executor
         executor = LLMExecutor(
@@ -82,84 +210,212 @@ def execute_experiment_task(
             model=model,
             temperature=temperature,
             max_tokens=max_tokens,
+            rate_limiter=rate_limiter,
+            retry_policy=RetryPolicy.from_settings(execution_settings),
+            seed=execution_settings.get("seed"),
+            # Cache hits would never reach the cassette
+            response_cache=(
+                get_response_cache()
+                if execution_settings.get("use_cache", True) and cassette is None
+                else None
+            ),
+            cache_bypass=bypass_cache,
+            prompt_layout=execution_settings.get("prompt_layout", PERSONA_FIRST),
+            streaming=execution_settings.get("streaming", False),
+            max_questions_per_chunk=execution_settings.get("max_questions_per_chunk"),
+            structured_output=execution_settings.get("structured_output", False),
+            repair_attempts=execution_settings.get("repair_attempts", 1),
+            provider=provider,
+            client_pool=client_pool,
+            router=llm_router,
+            hedge_policy=hedge_policy,
+            budget=budget,
+            concurrency_controller=concurrency_controller,
+            cassette=cassette,
+        )
+
+        # Strategies B-D run a small DAG of calls per participant
+        strategy = get_strategy(execution_settings.get("strategy", "simple"))
+
+        execution_mode = execution_settings.get("mode", "realtime")
+        if execution_mode == "batch" and (
+            not provider.supports_batch or strategy is not None or cassette is not None
+        ):
+            # Self-hosted servers have no Batch API, multi-stage strategies need
+            # each stage's output before the next, and cassettes only hold
+            # realtime calls; run in realtime instead
+            execution_mode = "realtime"
+        run_meta = {
+            "mode": execution_mode,
+            "provider": provider.name,
+            "strategy": strategy.name if strategy is not None else "simple",
+        }
+        # Participants are committed every `checkpoint_every` along with the
+        # checkpoint, so a crash only loses the uncommitted ones
+        checkpoint_every = max(
+            1, execution_settings.get("checkpoint_every", DEFAULT_CHECKPOINT_EVERY)
+        )
+        stage_results = []
+        writer = BulkWriter.from_settings(
+            db,
+            experiment_id,
+            question_ids,
+            {"model": model, "temperature": temperature},
+            execution_settings,
+        )
+        # LLM calls keep going while a single writer stores finished participants
+        pipeline = ExecutionPipeline.from_settings(
+            writer, get_shared_loop(), execution_settings, checkpoint_every
         )
 
-        # Track execution statistics
-        total_cost = 0.0
-        total_tokens = 0
-        succeeded = 0
-        failed = 0
-
-        # Execute each participant
-        for profile in profiles:
-            participant_number = profile["participant_number"]
-
-            try:
-                # Execute participant
-                result = executor.execute_participant(profile, questions)
-
-                # Create participant record
-                participant = ParticipantModel(
-                    experiment_id=experiment_id,
-                    participant_number=participant_number,
-                    profile=profile,
-                    validation_flags={},
+        def check_lease() -> None:
+            if lease_lost is not None and lease_lost.is_set():
+                raise LeaseLostError(f"Lost the job lease for experiment {experiment_id}")
+
+        if execution_mode == "batch":
+            # Submit everything to the offline Batch API and wait for it
+            batch_executor = BatchExecutor(
+                executor,
+                poll_interval=execution_settings.get("batch_poll_interval", 30.0),
+                timeout=execution_settings.get("batch_timeout"),
+            )
+            batch = None
+            if profiles:
+                if checkpoint.batch_id is None:
+                    # Commit the batch ID before waiting, so a resumed run picks
+                    # up the same batch instead of submitting (and paying for)
+                    # another
+                    checkpoint.batch_id = batch_executor.submit(profiles, questions)
+                    check_lease()
+                    checkpoint.save(experiment)
+                    db.commit()
+                batch = batch_executor.wait(checkpoint.batch_id)
+                if batch.status in BatchExecutor.UNFINISHED_STATUSES:
+                    # Never reattach to it again: a resume submits a new batch
+                    # for the participants still missing
+                    checkpoint.batch_id = None
+                    check_lease()
+                    checkpoint.save(experiment)
+                    db.commit()
+
+            async def dispatch(emit: Callable[[dict], Awaitable[None]]) -> None:
+                if batch is None:
+                    return
+                outcomes = await asyncio.to_thread(
+                    batch_executor.collect, batch, profiles, questions
                 )
-                db.add(participant)
-                db.flush()  # Get participant ID
-
-                # Store responses
-                for question_id, response_data in result["responses"].items():
-                    response = ResponseModel(
-                        experiment_id=experiment_id,
-                        participant_id=participant.id,
-                        question_id=question_id,
-                        raw_response=str(response_data),
-                        coded_response=response_data,
-                        meta_data={
-                            "model": model,
-                            "temperature": temperature,
-                        },
-                        quality_flags={},
-                    )
-                    db.add(response)
-
-                # Update statistics
-                total_cost += result["cost"]
-                total_tokens += result["total_tokens"]
-                succeeded += 1
-
-            except Exception as e:
-                # Create failed participant record
-                participant = ParticipantModel(
-                    experiment_id=experiment_id,
-                    participant_number=participant_number,
-                    profile=profile,
-                    validation_flags={"execution_failed": True, "error": str(e)},
+                for outcome in outcomes:
+                    await emit(outcome)
+        else:
+            # Run all participants concurrently
+            if strategy is None:
+                engine = ExecutionEngine.from_settings(executor, execution_settings)
+            else:
+                # Stage prompts are per participant, so strategies never pack
+                engine = ExecutionEngine.from_settings(
+                    StrategyExecutor(executor, strategy),
+                    {**execution_settings, "personas_per_request": 1},
                 )
-                db.add(participant)
-
-                failed += 1
+            dispatch = partial(engine.stream, profiles, questions)
+
+        # Participants stored so far; skipped ones are not stored
+        done = set(stored)
+
+        def on_outcome(outcome: dict) -> None:
+            check_lease()
+            checkpoint.record(outcome)
+            if not outcome.get("skipped"):
+                # Buffered now, committed by the next on_commit
+                done.add(outcome["profile"]["participant_number"])
+            if outcome["result"] is not None and "stages" in outcome["result"]:
+                stage_results.append({"stages": outcome["result"]["stages"]})
+
+        def on_commit() -> None:
+            check_lease()
+            if budget is not None:
+                checkpoint.budget_spent = budget.spent
+            checkpoint.advance_cursor(done)
+            checkpoint.save(experiment)
+            if concurrency_controller is not None:
+                # Runs execute in worker processes; the status endpoint reads
+                # the live window from here
+                experiment.meta_data = {
+                    **experiment.meta_data,
+                    AdaptiveConcurrency.META_KEY: concurrency_controller.snapshot(),
+                }
+            db.commit()
 
-        # Update experiment status
-        experiment.status = "completed"
+        try:
+            pipeline.run(dispatch, on_outcome, on_commit)
+        finally:
+            if cassette is not None:
+                cassette.save()
+            # Pooled clients stay open for other runs until they sit idle
+            executor.close()
+            if llm_router is not None:
+                llm_router.close()
+
+        if execution_mode == "batch":
+            run_meta["batch_id"] = batch.id if batch is not None else checkpoint.batch_id
+        else:
+            run_meta["concurrency"] = engine.concurrency
+            if concurrency_controller is not None:
+                run_meta["adaptive_concurrency"] = concurrency_controller.snapshot()
+            run_meta["personas_per_request"] = engine.personas_per_request
+            if hedge_policy is not None:
+                run_meta["hedging"] = hedge_policy.stats()
+            if strategy is not None:
+                run_meta["stages"] = summarize_stages(stage_results)
+        if llm_router is not None:
+            run_meta["routes"] = llm_router.stats()
+        if cassette is not None:
+            run_meta["cassette"] = cassette.stats()
+        if stored:
+            run_meta["resumed_participants"] = len(stored)
+        run_meta["writes"] = writer.stats()
+        run_meta["pipeline"] = pipeline.stats()
+
+        if budget is not None and execution_mode == "realtime":
+            # Includes calls whose answers were not usable and cancelled hedges
+            run_meta["budget"] = {
+                "limit": budget.limit,
+                "spent": budget.spent,
+                "skipped_participants": checkpoint.skipped,
+            }
+
+        check_lease()
+        # Update experiment status; a run stopped by its budget is partial
+        experiment.status = "partial" if checkpoint.skipped else "completed"
+        checkpoint.save(experiment)
         experiment.meta_data = {
-            **experiment.meta_data,
+            **{
+                key: value
+                for key, value in experiment.meta_data.items()
+                if key != AdaptiveConcurrency.META_KEY
+            },
             "execution": {
-                "total_participants": len(profiles),
-                "succeeded": succeeded,
-                "failed": failed,
-                "total_cost": total_cost,
-                "total_tokens": total_tokens,
+                "total_participants": sample_size,
+                "succeeded": checkpoint.succeeded,
+                "failed": checkpoint.failed,
+                "total_cost": checkpoint.total_cost,
+                "total_tokens": checkpoint.total_tokens,
                 "model": model,
                 "temperature": temperature,
+                **run_meta,
+                "cache_hits": checkpoint.cache_hits,
+                "cached_prompt_tokens": checkpoint.cached_prompt_tokens,
             },
         }
 
         db.commit()
 
+    except LeaseLostError:
+        # Another worker may be running the job now; leave the experiment to it
+        db.rollback()
+        raise
     except Exception as e:
-        # Update experiment status to failed
+        # Keep the committed participants and checkpoint; drop the rest
+        db.rollback()
         experiment.status = "failed"
         experiment.meta_data = {
             **experiment.meta_data,
@@ -168,11 +424,37 @@ def execute_experiment_task(
         db.commit()
 
 
+def queue_run(db: Session, experiment: ExperimentModel, execution_request: ExecutionRequest) -> None:
+    """
+    Mark an experiment active and queue its run for a worker process (python -m app.worker)
+
+    The job and the status change are committed together.
+
+    Args:
+        db: Database session
+        experiment: Experiment to run
+        execution_request: Execution configuration including API key
+    """
+    experiment.status = "active"
+    JobQueue.enqueue(
+        db,
+        experiment.id,
+        {
+            "api_key": execution_request.api_key,
+            "model": execution_request.model,
+            "temperature": execution_request.temperature,
+            "max_tokens": execution_request.max_tokens,
+            "bypass_cache": execution_request.bypass_cache,
+            "additional_api_keys": execution_request.additional_api_keys,
+        },
+    )
+    db.commit()
+
+
 @router.post("/execute", response_model=ExecutionResult, status_code=status.HTTP_202_ACCEPTED)
 def execute_experiment(
     execution_request: ExecutionRequest,
     experiment_id: int,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
 ) -> ExecutionResult:
     """
@@ -181,7 +463,6 @@ def execute_experiment(
     Args:
         execution_request: Execution configuration including API key
         experiment_id: Experiment ID to execute
-        background_tasks: FastAPI background tasks
         db: Database session
 
     Returns:
@@ -218,23 +499,14 @@ def execute_experiment(
             detail="Experiment must have questions to execute"
         )
 
-    # Update experiment status to active
-    experiment.status = "active"
-    db.commit()
-
-    # Add background task to execute experiment
-    background_tasks.add_task(
-        execute_experiment_task,
-        experiment_id=experiment_id,
-        api_key=execution_request.api_key,
-        model=execution_request.model,
-        temperature=execution_request.temperature,
-        max_tokens=execution_request.max_tokens,
-        db=db,
-    )
-
-    # Get sample size
-    sample_size = experiment.sample_config.get("sample_size", 10)
+    # Start over: drop what an earlier run stored (use /resume to continue it)
+    db.query(ParticipantModel).filter(ParticipantModel.experiment_id == experiment_id).delete()
+    experiment.meta_data = {
+        key: value
+        for key, value in experiment.meta_data.items()
+        if key not in (RunCheckpoint.META_KEY, AdaptiveConcurrency.META_KEY, "execution_error")
+    }
+    queue_run(db, experiment, execution_request)
 
     return ExecutionResult(
         experiment_id=experiment_id,
@@ -248,6 +520,150 @@ def execute_experiment(
     )
 
 
+@router.post("/resume", response_model=ExecutionResult, status_code=status.HTTP_202_ACCEPTED)
+def resume_experiment(
+    execution_request: ExecutionRequest,
+    experiment_id: int,
+    db: Session = Depends(get_db),
+) -> ExecutionResult:
+    """
+    Continue an interrupted or partial run from its checkpoint
+
+    Participants already stored are kept; the remaining ones are regenerated
+    from the run's profile seed and executed.
+
+    Args:
+        execution_request: Execution configuration including API key
+        experiment_id: Experiment ID to resume
+        db: Database session
+
+    Returns:
+        Execution result with status and the progress kept from earlier runs
+
+    Raises:
+        HTTPException: If experiment not found, completed or still running
+    """
+    experiment = (
+        db.query(ExperimentModel)
+        .filter(ExperimentModel.id == experiment_id)
+        .first()
+    )
+
+    if not experiment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Experiment with id {experiment_id} not found"
+        )
+
+    job = latest_job(db, experiment_id)
+    if experiment.status == "completed" or (job is not None and job.status in ("queued", "running")):
+        state = "completed" if experiment.status == "completed" else f"already {job.status}"
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Experiment with id {experiment_id} is {state} and cannot be resumed"
+        )
+
+    checkpoint = RunCheckpoint.load(experiment.meta_data) or RunCheckpoint(profile_seed=0)
+    queue_run(db, experiment, execution_request)
+
+    return ExecutionResult(
+        experiment_id=experiment_id,
+        status="active",
+        participants_executed=checkpoint.succeeded + checkpoint.failed,
+        participants_succeeded=checkpoint.succeeded,
+        participants_failed=checkpoint.failed,
+        total_cost=checkpoint.total_cost,
+        total_tokens=checkpoint.total_tokens,
+        results=[],
+    )
+
+
+@router.get("/{experiment_id}/estimate", response_model=ExecutionEstimate)
+def estimate_execution(
+    experiment_id: int,
+    model: str = "gpt-4o",
+    max_tokens: int = 2000,
+    db: Session = Depends(get_db),
+) -> ExecutionEstimate:
+    """
+    Estimate tokens, cost and wall-clock time of running an experiment
+
+    Renders and tokenizes a sample of participant prompts locally; no API
+    calls are made.
+
+    Args:
+        experiment_id: Experiment ID
+        model: Model to price the run for
+        max_tokens: Maximum tokens per response
+        db: Database session
+
+    Returns:
+        Pre-flight estimate
+
+    Raises:
+        HTTPException: If experiment not found or has no questions
+    """
+    experiment = (
+        db.query(ExperimentModel)
+        .filter(ExperimentModel.id == experiment_id)
+        .first()
+    )
+
+    if not experiment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Experiment with id {experiment_id} not found"
+        )
+
+    questions = experiment.experiment_config.get("questions", [])
+    if not questions:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Experiment must have questions to estimate"
+        )
+
+    execution_settings = experiment.execution_settings or {}
+    sample_size = experiment.sample_config.get("sample_size", 10)
+    mode = execution_settings.get("mode", "realtime")
+    try:
+        provider = get_provider(
+            execution_settings.get("provider", settings.llm_provider),
+            execution_settings.get("base_url", settings.llm_base_url),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if mode == "batch" and not provider.supports_batch:
+        mode = "realtime"
+
+    generator = build_participant_generator(experiment.sample_config)
+    sample_profiles = generator.generate(count=min(sample_size, ESTIMATE_SAMPLE_PROMPTS))
+
+    estimator = CostEstimator(
+        model=model,
+        max_tokens=max_tokens,
+        prompt_layout=execution_settings.get("prompt_layout", PERSONA_FIRST),
+        max_questions_per_chunk=execution_settings.get("max_questions_per_chunk"),
+        # Batch mode sends one participant per request
+        personas_per_request=(
+            1 if mode == "batch" else execution_settings.get("personas_per_request", 1)
+        ),
+    )
+    estimate = estimator.estimate(
+        sample_profiles=sample_profiles,
+        questions=questions,
+        sample_size=sample_size,
+        concurrency=execution_settings.get("concurrency", ExecutionEngine.DEFAULT_CONCURRENCY),
+        rpm_limit=execution_settings.get("rpm_limit", settings.llm_rpm_limit),
+        tpm_limit=execution_settings.get("tpm_limit", settings.llm_tpm_limit),
+        cost_multiplier=BatchExecutor.BATCH_DISCOUNT if mode == "batch" else 1.0,
+    )
+    if mode == "batch":
+        # Batches complete within the provider's window, not at our request rate
+        estimate["estimated_duration_seconds"] = None
+
+    return ExecutionEstimate(experiment_id=experiment_id, mode=mode, **estimate)
+
+
 @router.get("/{experiment_id}/status", response_model=dict)
 def get_execution_status(
     experiment_id: int, db: Session = Depends(get_db)
@@ -288,6 +704,20 @@ def get_execution_status(
     # Get execution metadata
     execution_meta = experiment.meta_data.get("execution", {})
 
+    # Window of a running adaptive run as of its last commit, else what the
+    # last run ended with
+    if experiment.status == "active" and AdaptiveConcurrency.META_KEY in experiment.meta_data:
+        concurrency = experiment.meta_data[AdaptiveConcurrency.META_KEY]
+    elif "adaptive_concurrency" in execution_meta:
+        concurrency = execution_meta["adaptive_concurrency"]
+    elif "concurrency" in execution_meta:
+        concurrency = {"limit": execution_meta["concurrency"]}
+    else:
+        concurrency = None
+
+    job = latest_job(db, experiment_id)
+    checkpoint = RunCheckpoint.load(experiment.meta_data)
+
     return {
         "experiment_id": experiment_id,
         "status": experiment.status,
@@ -297,6 +727,19 @@ def get_execution_status(
         "total_tokens": execution_meta.get("total_tokens", 0),
         "succeeded": execution_meta.get("succeeded", 0),
         "failed": execution_meta.get("failed", 0),
+        "concurrency": concurrency,
+        "checkpoint_cursor": checkpoint.cursor if checkpoint is not None else None,
+        "job": (
+            {
+                "id": job.id,
+                "status": job.status,
+                "attempts": job.attempts,
+                "worker_id": job.worker_id,
+                "error": job.error,
+            }
+            if job is not None
+            else None
+        ),
     }
 
 
@@ -20,6 +20,58 @@ class Settings(BaseSettings):
 
     # OpenAI Configuration
     openai_api_key: str = Field(default="", description="OpenAI API key")
+    llm_provider: str = Field(
+        default="openai",
+        description="Default LLM provider (openai, openai_compatible, vllm, ollama or stub)",
+    )
+    llm_base_url: str | None = Field(
+        default=None, description="Override for the LLM provider's API base URL"
+    )
+    llm_rpm_limit: int = Field(
+        default=500, description="Default provider requests-per-minute limit per model and key"
+    )
+    llm_tpm_limit: int = Field(
+        default=30000, description="Default provider tokens-per-minute limit per model and key"
+    )
+
+    # LLM HTTP Client Pool Configuration
+    llm_http_max_connections: int = Field(
+        default=200, description="Maximum open connections per pooled LLM client"
+    )
+    llm_http_max_keepalive_connections: int = Field(
+        default=50, description="Idle keep-alive connections kept per pooled LLM client"
+    )
+    llm_http_keepalive_expiry: float = Field(
+        default=30.0, description="Seconds an idle keep-alive connection stays open"
+    )
+    llm_client_idle_timeout: float = Field(
+        default=600.0, description="Seconds after which an unused pooled LLM client is closed"
+    )
+
+    # LLM Response Cache Configuration
+    llm_cache_memory_entries: int = Field(
+        default=1024, description="Maximum LLM responses kept in the in-process cache"
+    )
+    llm_cache_ttl_seconds: int = Field(
+        default=30 * 24 * 3600, description="Lifetime of cached LLM responses in seconds"
+    )
+    llm_cache_max_entries: int = Field(
+        default=100000, description="Maximum LLM responses kept in the database cache"
+    )
+
+    # LLM Record/Replay Configuration
+    llm_cassette_dir: str = Field(
+        default="cassettes", description="Directory of recorded LLM call cassettes"
+    )
+
+    # Execution Job Queue Configuration
+    job_secret_key: str = Field(
+        default="",
+        description=(
+            "Secret sealing API keys in queued jobs; set the same value for the API "
+            "and the workers (default: derived from the database credentials)"
+        ),
+    )
 
     # Application Configuration
     app_environment: Literal["development", "testing", "production"] = Field(
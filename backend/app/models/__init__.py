@@ -1,8 +1,10 @@
 """
 Database models
 """
+from app.models.execution_job import ExecutionJob
 from app.models.experiment import Experiment
+from app.models.llm_cache import LLMCacheEntry
 from app.models.participant import Participant
 from app.models.response import Response
 
-__all__ = ["Experiment", "Participant", "Response"]
+__all__ = ["ExecutionJob", "Experiment", "LLMCacheEntry", "Participant", "Response"]
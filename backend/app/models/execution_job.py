@@ -0,0 +1,49 @@
+"""
+Execution job model
+"""
+from datetime import datetime
+
+from sqlalchemy import JSON, DateTime, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class ExecutionJob(Base):
+    """
+    Queued experiment run, claimed and leased by a worker process
+    """
+
+    __tablename__ = "execution_jobs"
+    __table_args__ = (
+        # Workers scan for the oldest claimable job
+        Index("ix_execution_jobs_status_id", "status", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    experiment_id: Mapped[int] = mapped_column(
+        ForeignKey("experiments.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    status: Mapped[str] = mapped_column(
+        String(50), nullable=False, default="queued"
+    )  # queued, running, completed, failed
+
+    # Arguments for execute_experiment_task; API keys are removed once the job ends
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+
+    # Lease held by the worker running the job, extended by its heartbeats
+    worker_id: Mapped[str] = mapped_column(String(255), nullable=True)
+    lease_expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=3)
+    error: Mapped[str] = mapped_column(Text, nullable=True)
+
+    # Timestamps
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=datetime.utcnow
+    )
+    started_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<ExecutionJob(id={self.id}, experiment_id={self.experiment_id}, status='{self.status}')>"
@@ -25,7 +25,7 @@ class Experiment(Base):
     description: Mapped[str] = mapped_column(Text, nullable=True)
     status: Mapped[str] = mapped_column(
         String(50), nullable=False, default="draft"
-    )  # draft, active, completed, archived
+    )  # draft, active, completed, partial, archived
 
     # Configuration stored as JSON
     sample_config: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
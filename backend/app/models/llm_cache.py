@@ -0,0 +1,36 @@
+"""
+LLM response cache model
+"""
+from datetime import datetime
+
+from sqlalchemy import JSON, DateTime, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class LLMCacheEntry(Base):
+    """
+    Cached LLM completion keyed by a hash of model, sampling parameters and prompt
+    """
+
+    __tablename__ = "llm_response_cache"
+
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    model: Mapped[str] = mapped_column(String(255), nullable=False)
+
+    # Completion content and token usage
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    usage: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+
+    # Access tracking for TTL and size-based eviction
+    hit_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=datetime.utcnow, index=True
+    )
+    last_accessed_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=datetime.utcnow, index=True
+    )
+
+    def __repr__(self) -> str:
+        return f"<LLMCacheEntry(cache_key='{self.cache_key}', model='{self.model}')>"
@@ -4,7 +4,7 @@ Participant model
 from datetime import datetime
 from typing import TYPE_CHECKING, List
 
-from sqlalchemy import DateTime, ForeignKey, Integer, JSON, String
+from sqlalchemy import DateTime, ForeignKey, Integer, JSON, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -20,6 +20,13 @@ class Participant(Base):
     """
 
     __tablename__ = "participants"
+    __table_args__ = (
+        # Bulk writes link responses by participant number, and a run taken
+        # over by another worker must not store the same participant twice
+        UniqueConstraint(
+            "experiment_id", "participant_number", name="uq_participants_experiment_number"
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     experiment_id: Mapped[int] = mapped_column(
@@ -9,12 +9,24 @@ from pydantic import BaseModel, ConfigDict, Field
 class ExecutionBase(BaseModel):
     """Base execution request schema"""
 
-    api_key: str = Field(..., description="OpenAI API key (not stored)")
+    api_key: str = Field(
+        ..., description="OpenAI API key (kept encrypted in the run's job until it ends)"
+    )
+    additional_api_keys: list[str] = Field(
+        default_factory=list,
+        description=(
+            "Further API keys to spread requests across by remaining rate-limit headroom "
+            "(kept encrypted in the run's job until it ends)"
+        ),
+    )
     model: str = Field(default="gpt-4o", description="OpenAI model to use")
     temperature: float = Field(default=0.8, ge=0, le=2, description="Sampling temperature")
     max_tokens: int = Field(
         default=2000, ge=1, le=128000, description="Maximum tokens per response"
     )
+    bypass_cache: bool = Field(
+        default=False, description="Skip cached LLM responses for this run (fresh results are still cached)"
+    )
 
 
 class ExecutionRequest(ExecutionBase):
@@ -64,3 +76,37 @@ class ExecutionStatus(BaseModel):
     completed_participants: int = Field(..., description="Completed participants")
     total_cost: float = Field(..., description="Total cost so far")
     total_tokens: int = Field(..., description="Total tokens used")
+    concurrency: dict[str, Any] | None = Field(
+        None, description="Concurrency window (live while an adaptive run is in progress)"
+    )
+    checkpoint_cursor: int | None = Field(
+        None, description="Every participant up to this number is committed"
+    )
+    job: dict[str, Any] | None = Field(
+        None, description="Latest execution job: status, attempts, worker and error"
+    )
+
+
+class ExecutionEstimate(BaseModel):
+    """Schema for a pre-flight cost and duration estimate"""
+
+    experiment_id: int = Field(..., description="Experiment ID")
+    model: str = Field(..., description="Model the estimate is priced for")
+    mode: str = Field(..., description="Execution mode (realtime or batch)")
+    sample_size: int = Field(..., description="Number of participants")
+    requests_per_participant: float = Field(
+        ..., description="API requests per participant after chunking and persona packing"
+    )
+    input_tokens_per_participant: int = Field(..., description="Estimated prompt tokens per participant")
+    output_tokens_per_participant: int = Field(..., description="Estimated completion tokens per participant")
+    cached_tokens_per_participant: int = Field(
+        ..., description="Estimated prompt tokens served from the provider prompt cache"
+    )
+    total_input_tokens: int = Field(..., description="Estimated prompt tokens for the run")
+    total_output_tokens: int = Field(..., description="Estimated completion tokens for the run")
+    estimated_cost: float = Field(..., description="Estimated cost in USD")
+    estimated_latency_seconds: float = Field(..., description="Estimated latency per request")
+    estimated_requests_per_second: float = Field(..., description="Estimated sustained API requests per second")
+    estimated_duration_seconds: float | None = Field(
+        None, description="Estimated wall-clock time (None for batch mode)"
+    )
@@ -0,0 +1,270 @@
+"""
+Offline Batch API Executor for Participant Simulation
+"""
+import json
+import time
+from typing import Any, Callable
+
+from openai.types.chat import ChatCompletion
+
+from app.services.llm_executor import LLMExecutor
+from app.services.prompt_template import CompiledPrompt
+
+
+class BatchExecutor:
+    """
+    Run participant simulations through the provider's asynchronous Batch API
+
+    Every participant request is serialized into one JSONL file, submitted as a
+    batch, polled until it reaches a terminal state, and the output file is
+    ingested in bulk. Batch requests are billed at a discount and do not count
+    against the synchronous rate limits.
+    """
+
+    ENDPOINT = "/v1/chat/completions"
+    COMPLETION_WINDOW = "24h"
+    TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+    # Terminal statuses of batches that did not answer every request
+    UNFINISHED_STATUSES = {"failed", "expired", "cancelled"}
+
+    # Batch API price as a fraction of the synchronous price
+    BATCH_DISCOUNT = 0.5
+
+    def __init__(
+        self,
+        executor: LLMExecutor,
+        poll_interval: float = 30.0,
+        timeout: float | None = None,
+        client: Any = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Initialize Batch Executor
+
+        Args:
+            executor: LLM executor providing prompts, request parameters and parsing
+            poll_interval: Seconds between batch status checks (default: 30.0)
+            timeout: Give up polling after this many seconds (default: wait for the
+                provider's completion window)
+            client: OpenAI-compatible client (default: the executor's sync client)
+            sleep: Sleep function used between polls (injectable for tests)
+        """
+        self.executor = executor
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.client = client or executor.client
+        self.sleep = sleep
+        self.batch_id: str | None = None
+
+    @staticmethod
+    def _custom_id(profile: dict[str, Any], chunk: int | None = None) -> str:
+        """Build the batch request ID for a participant, or one block of a chunked questionnaire"""
+        custom_id = f"participant-{profile['participant_number']}"
+        return custom_id if chunk is None else f"{custom_id}-chunk-{chunk}"
+
+    def _chunk_ids(self, compiled_chunks: list[CompiledPrompt]) -> list[int | None]:
+        """Block numbers used in request IDs (None when the questionnaire is not chunked)"""
+        if len(compiled_chunks) == 1:
+            return [None]
+        return list(range(len(compiled_chunks)))
+
+    def build_batch_file(
+        self, profiles: list[dict[str, Any]], questions: list[dict[str, Any]]
+    ) -> bytes:
+        """
+        Serialize one chat completion request per participant (and per block of a
+        chunked questionnaire) as JSONL
+
+        Args:
+            profiles: Participant profile dicts
+            questions: List of question dicts
+
+        Returns:
+            JSONL file content
+        """
+        compiled_chunks = self.executor.compile_chunks(questions)
+        chunk_ids = self._chunk_ids(compiled_chunks)
+
+        lines = []
+        for profile in profiles:
+            for chunk, compiled in zip(chunk_ids, compiled_chunks):
+                prompt = compiled.render(profile)
+                body = self.executor._completion_kwargs(
+                    self.executor._build_messages(prompt), self.executor._response_format(compiled)
+                )
+                lines.append(
+                    json.dumps(
+                        {
+                            "custom_id": self._custom_id(profile, chunk),
+                            "method": "POST",
+                            "url": self.ENDPOINT,
+                            "body": body,
+                        },
+                        ensure_ascii=False,
+                    )
+                )
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+    def submit(self, profiles: list[dict[str, Any]], questions: list[dict[str, Any]]) -> str:
+        """
+        Upload the batch file and create the batch
+
+        Args:
+            profiles: Participant profile dicts
+            questions: List of question dicts
+
+        Returns:
+            Batch ID
+        """
+        batch_file = self.client.files.create(
+            file=("participants.jsonl", self.build_batch_file(profiles, questions)),
+            purpose="batch",
+        )
+        batch = self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint=self.ENDPOINT,
+            completion_window=self.COMPLETION_WINDOW,
+        )
+        self.batch_id = batch.id
+        return batch.id
+
+    def wait(self, batch_id: str) -> Any:
+        """
+        Poll a batch until it reaches a terminal status
+
+        Args:
+            batch_id: Batch ID
+
+        Returns:
+            Final batch object
+
+        Raises:
+            TimeoutError: If the batch is still running after `timeout` seconds
+        """
+        started = time.monotonic()
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            if batch.status in self.TERMINAL_STATUSES:
+                return batch
+            if self.timeout is not None and time.monotonic() - started > self.timeout:
+                raise TimeoutError(f"Batch {batch_id} still {batch.status} after {self.timeout}s")
+            self.sleep(self.poll_interval)
+
+    def _read_lines(self, file_id: str | None) -> list[dict[str, Any]]:
+        """Download a batch output or error file and decode its JSONL lines"""
+        if not file_id:
+            return []
+        content = self.client.files.content(file_id).text
+        return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+    def _result_from_body(self, body: dict[str, Any], compiled: CompiledPrompt) -> dict[str, Any]:
+        """
+        Build a participant result from a batch output body
+
+        Args:
+            body: Chat completion JSON from the output file
+            compiled: Compiled prompt of the block the request answered
+
+        Returns:
+            Participant result dict, priced at the batch discount
+        """
+        completion = ChatCompletion.model_validate(body)
+        usage = self.executor._usage_from_response(completion)
+        result = self.executor._build_result(
+            completion.choices[0].message.content,
+            usage,
+            compiled.question_ids,
+            validator=self.executor._validator(compiled),
+        )
+        result["cost"] *= self.BATCH_DISCOUNT
+        return result
+
+    def _outcome_from_line(
+        self, line: dict[str, Any] | None, compiled: CompiledPrompt, batch_status: str
+    ) -> dict[str, Any] | Exception:
+        """
+        Turn one output or error file line into a result
+
+        Args:
+            line: Decoded JSONL line, or None if the request is missing
+            compiled: Compiled prompt of the block the request answered
+            batch_status: Final batch status, for the missing-request error
+
+        Returns:
+            Participant result dict, or the exception describing the failure
+        """
+        if line is None:
+            return Exception(f"Missing from batch ({batch_status})")
+
+        response = line.get("response") or {}
+        if line.get("error") or response.get("status_code") != 200:
+            error = line.get("error") or response.get("body", {}).get("error")
+            return Exception(f"LLM execution failed: {error}")
+
+        try:
+            return self._result_from_body(response["body"], compiled)
+        except Exception as e:
+            return e
+
+    def collect(
+        self,
+        batch: Any,
+        profiles: list[dict[str, Any]],
+        questions: list[dict[str, Any]],
+    ) -> list[dict[str, Any]]:
+        """
+        Ingest a finished batch's output and error files
+
+        Args:
+            batch: Final batch object
+            profiles: Participant profile dicts submitted in the batch
+            questions: List of question dicts
+
+        Returns:
+            One outcome dict per profile, in the same order as profiles
+
+        Raises:
+            Exception: If the batch itself failed validation
+        """
+        if batch.status == "failed":
+            raise Exception(f"Batch {batch.id} failed: {batch.errors}")
+
+        compiled_chunks = self.executor.compile_chunks(questions)
+        chunk_ids = self._chunk_ids(compiled_chunks)
+        lines = {
+            line["custom_id"]: line
+            for line in self._read_lines(batch.error_file_id) + self._read_lines(batch.output_file_id)
+        }
+
+        outcomes = []
+        for profile in profiles:
+            chunk_outcomes = [
+                self._outcome_from_line(
+                    lines.get(self._custom_id(profile, chunk)), compiled, batch.status
+                )
+                for chunk, compiled in zip(chunk_ids, compiled_chunks)
+            ]
+            try:
+                result = self.executor._merge_chunk_outcomes(chunk_outcomes)
+                outcomes.append({"profile": profile, "result": result, "error": None})
+            except Exception as e:
+                outcomes.append({"profile": profile, "result": None, "error": str(e)})
+
+        return outcomes
+
+    def run(
+        self, profiles: list[dict[str, Any]], questions: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """
+        Submit, wait for and collect a batch for all participants
+
+        Args:
+            profiles: Participant profile dicts
+            questions: List of question dicts
+
+        Returns:
+            One outcome dict per profile, in the same order as profiles
+        """
+        batch_id = self.submit(profiles, questions)
+        batch = self.wait(batch_id)
+        return self.collect(batch, profiles, questions)
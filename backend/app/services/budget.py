@@ -0,0 +1,169 @@
+"""
+Per-Run Spending Limit for LLM API Calls
+"""
+import asyncio
+import threading
+from dataclasses import dataclass
+
+
+class BudgetExceededError(Exception):
+    """Raised when a call is refused because it could exceed the run's budget"""
+
+    def __init__(self, limit: float, committed: float, amount: float):
+        super().__init__(
+            f"Budget of ${limit:.4f} exhausted: ${committed:.4f} committed, "
+            f"next call may cost ${amount:.4f}"
+        )
+        self.limit = limit
+        self.committed = committed
+        self.amount = amount
+
+
+@dataclass
+class BudgetReservation:
+    """Cost reserved ahead of an API call, settled once usage is known"""
+
+    amount: float
+
+
+class BudgetGuard:
+    """
+    Keep a run's spend under a limit
+
+    Each call reserves its worst-case cost before it is sent and settles the
+    reservation against the cost of the usage it reports. A call whose
+    estimate would take settled spend over the limit is refused, and from
+    then on the guard stays exhausted so no new participants are started. A
+    call that only fails to fit next to outstanding reservations waits for
+    them to settle: worst-case estimates are far above what calls usually
+    cost, so they must not end a run by themselves. Safe to share between
+    threads and event loops.
+    """
+
+    def __init__(self, limit: float):
+        """
+        Initialize Budget Guard
+
+        Args:
+            limit: Maximum spend for the run in USD
+
+        Raises:
+            ValueError: If the limit is negative
+        """
+        if limit < 0:
+            raise ValueError(f"Budget must not be negative, got {limit}")
+        self.limit = limit
+        self.spent = 0.0
+        self.reserved = 0.0
+        self.exhausted = False
+        self._lock = threading.Lock()
+        self._settled = threading.Condition(self._lock)
+        # Async reservations waiting for a settlement, with their event loops
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def _try_reserve(self, amount: float) -> BudgetReservation | None:
+        """
+        Reserve if the call fits next to outstanding reservations (lock held)
+
+        Args:
+            amount: Worst-case cost of the call in USD
+
+        Returns:
+            Reservation, or None if the call has to wait for a settlement
+
+        Raises:
+            BudgetExceededError: If the call could take settled spend over the limit
+        """
+        if self.spent + amount > self.limit:
+            self.exhausted = True
+            raise BudgetExceededError(self.limit, self.spent + self.reserved, amount)
+        if self.reserved > 0 and self.spent + self.reserved + amount > self.limit:
+            return None
+        self.reserved += amount
+        return BudgetReservation(amount=amount)
+
+    def _notify(self) -> None:
+        """Wake every reservation waiting for a settlement (lock held)"""
+        self._settled.notify_all()
+        for loop, future in self._waiters:
+            loop.call_soon_threadsafe(_wake, future)
+        self._waiters.clear()
+
+    def reserve(self, amount: float) -> BudgetReservation:
+        """
+        Reserve the estimated cost of a call, waiting for in-flight calls if needed
+
+        Args:
+            amount: Worst-case cost of the call in USD
+
+        Returns:
+            Reservation to pass to settle()
+
+        Raises:
+            BudgetExceededError: If the call could take spend over the limit
+        """
+        with self._lock:
+            while True:
+                reservation = self._try_reserve(amount)
+                if reservation is not None:
+                    return reservation
+                self._settled.wait()
+
+    async def reserve_async(self, amount: float) -> BudgetReservation:
+        """
+        Async counterpart of reserve that waits without blocking the event loop
+
+        Args:
+            amount: Worst-case cost of the call in USD
+
+        Returns:
+            Reservation to pass to settle()
+
+        Raises:
+            BudgetExceededError: If the call could take spend over the limit
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                reservation = self._try_reserve(amount)
+                if reservation is not None:
+                    return reservation
+                settled = loop.create_future()
+                self._waiters.append((loop, settled))
+            await settled
+
+    def settle(self, reservation: BudgetReservation, actual_cost: float) -> None:
+        """
+        Replace a reservation with the call's actual cost
+
+        Args:
+            reservation: Reservation returned by reserve()
+            actual_cost: Cost of the usage the call reported (0 if it was not billed)
+        """
+        with self._lock:
+            self.reserved -= reservation.amount
+            self.spent += actual_cost
+            self._notify()
+
+    def charge(self, amount: float) -> None:
+        """
+        Record spend that had no reservation of its own, or correct an earlier settlement
+
+        Args:
+            amount: Cost in USD (may be negative for a correction)
+        """
+        with self._lock:
+            self.spent += amount
+            self._notify()
+
+    @property
+    def remaining(self) -> float:
+        """Budget not yet spent or reserved"""
+        with self._lock:
+            return max(0.0, self.limit - self.spent - self.reserved)
+
+
+def _wake(future: asyncio.Future) -> None:
+    """Resolve a waiter's future unless its task was cancelled meanwhile"""
+    if not future.done():
+        future.set_result(None)
@@ -0,0 +1,234 @@
+"""
+Batched Database Writes of Participant Outcomes
+"""
+import time
+from typing import Any, Callable
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.participant import Participant as ParticipantModel
+from app.models.response import Response as ResponseModel
+
+
+def participant_rows(
+    experiment_id: int,
+    outcome: dict[str, Any],
+    question_ids: list[str],
+    response_meta: dict[str, Any],
+) -> tuple[dict[str, Any], list[dict[str, Any]]] | None:
+    """
+    Turn a participant outcome into table rows
+
+    Args:
+        experiment_id: Experiment ID
+        outcome: Outcome dict from the execution engine or batch executor
+        question_ids: IDs of the experiment's questions
+        response_meta: meta_data stored on every response (model, temperature)
+
+    Returns:
+        Tuple of (participant row, response rows without participant_id), or
+        None for a participant skipped by the budget, which is not stored
+    """
+    if outcome.get("skipped"):
+        return None
+
+    profile = outcome["profile"]
+    result = outcome["result"]
+    participant = {
+        "experiment_id": experiment_id,
+        "participant_number": profile["participant_number"],
+        "profile": profile,
+    }
+    if result is None:
+        participant["validation_flags"] = {"execution_failed": True, "error": outcome["error"]}
+        return participant, []
+
+    # Streamed results that broke midway keep the answers received and are
+    # flagged partial
+    validation_flags = {}
+    if result.get("partial"):
+        validation_flags = {"partial": True, "error": result["error"]}
+    if result.get("invalid"):
+        # Answers that failed schema validation were dropped
+        validation_flags["invalid_answers"] = result["invalid"]
+    if result.get("repaired"):
+        validation_flags["repaired_questions"] = result["repaired"]
+    if result.get("inconsistent"):
+        # Validation strategy: answers that changed when re-asked
+        validation_flags["inconsistent_answers"] = result["inconsistent"]
+    if result.get("low_confidence"):
+        validation_flags["low_confidence"] = result["low_confidence"]
+    missing = [qid for qid in question_ids if qid not in result["responses"]]
+    if missing:
+        validation_flags["missing_questions"] = missing
+    participant["validation_flags"] = validation_flags
+
+    responses = [
+        {
+            "experiment_id": experiment_id,
+            "question_id": question_id,
+            "raw_response": str(response_data),
+            "coded_response": response_data,
+            "meta_data": response_meta,
+            "quality_flags": {},
+        }
+        for question_id, response_data in result["responses"].items()
+    ]
+    return participant, responses
+
+
+class BulkWriter:
+    """
+    Buffer participant outcomes and insert them in batches
+
+    A flush inserts all buffered participants in one multi-row INSERT ...
+    RETURNING id, then links and inserts all their responses in another, so
+    a batch costs two statements instead of a flush per participant and an
+    INSERT per response. Buffered outcomes are flushed once batch_size
+    participants are waiting or flush_interval seconds have passed since the
+    last flush. Flushing does not commit; the caller commits.
+    """
+
+    DEFAULT_BATCH_SIZE = 200
+    DEFAULT_FLUSH_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        db: Session,
+        experiment_id: int,
+        question_ids: list[str],
+        response_meta: dict[str, Any] | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize Bulk Writer
+
+        Args:
+            db: Database session
+            experiment_id: Experiment the outcomes belong to
+            question_ids: IDs of the experiment's questions
+            response_meta: meta_data stored on every response (default: empty)
+            batch_size: Participants per flush (default: 200)
+            flush_interval: Seconds after which a partial batch is flushed (default: 1.0)
+            clock: Monotonic clock function (injectable for tests)
+        """
+        self.db = db
+        self.experiment_id = experiment_id
+        self.question_ids = question_ids
+        self.response_meta = response_meta or {}
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.flushes = 0
+        self.rows_written = 0
+        self.write_seconds = 0.0
+        self._participants: list[dict[str, Any]] = []
+        self._responses: list[list[dict[str, Any]]] = []
+        self._last_flush = clock()
+
+    @classmethod
+    def from_settings(
+        cls,
+        db: Session,
+        experiment_id: int,
+        question_ids: list[str],
+        response_meta: dict[str, Any],
+        execution_settings: dict[str, Any] | None,
+    ) -> "BulkWriter":
+        """
+        Build a writer from an experiment's execution_settings
+
+        Args:
+            db: Database session
+            experiment_id: Experiment the outcomes belong to
+            question_ids: IDs of the experiment's questions
+            response_meta: meta_data stored on every response
+            execution_settings: Experiment execution settings dict
+
+        Returns:
+            Configured BulkWriter
+        """
+        execution_settings = execution_settings or {}
+        return cls(
+            db,
+            experiment_id,
+            question_ids,
+            response_meta,
+            batch_size=execution_settings.get("write_batch_size", cls.DEFAULT_BATCH_SIZE),
+            flush_interval=execution_settings.get(
+                "write_flush_interval", cls.DEFAULT_FLUSH_INTERVAL
+            ),
+        )
+
+    @property
+    def pending(self) -> int:
+        """Participants buffered but not yet written"""
+        return len(self._participants)
+
+    def add(self, outcome: dict[str, Any]) -> None:
+        """
+        Buffer a participant outcome, flushing if the batch is due
+
+        Args:
+            outcome: Outcome dict from the execution engine or batch executor
+        """
+        rows = participant_rows(self.experiment_id, outcome, self.question_ids, self.response_meta)
+        if rows is not None:
+            self._participants.append(rows[0])
+            self._responses.append(rows[1])
+        if self.pending >= self.batch_size or self.clock() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Insert all buffered participants and their responses
+
+        Returns:
+            Number of participants written
+        """
+        self._last_flush = self.clock()
+        if not self._participants:
+            return 0
+
+        started = time.monotonic()
+        # RETURNING order is not guaranteed for multi-row inserts; match on the
+        # participant number, which is unique within the experiment
+        participant_ids = dict(
+            self.db.execute(
+                insert(ParticipantModel).returning(
+                    ParticipantModel.participant_number, ParticipantModel.id
+                ),
+                self._participants,
+            ).all()
+        )
+        responses = [
+            {**row, "participant_id": participant_ids[participant["participant_number"]]}
+            for participant, rows in zip(self._participants, self._responses)
+            for row in rows
+        ]
+        if responses:
+            self.db.execute(insert(ResponseModel), responses)
+
+        written = len(self._participants)
+        self.flushes += 1
+        self.rows_written += written + len(responses)
+        self.write_seconds += time.monotonic() - started
+        self._participants = []
+        self._responses = []
+        return written
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Summarize database writes for run metadata
+
+        Returns:
+            Dict with flush count, rows written and seconds spent writing
+        """
+        return {
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "write_seconds": self.write_seconds,
+        }
@@ -0,0 +1,431 @@
+"""
+Record/Replay Cassettes of LLM API Calls
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+
+RECORD = "record"
+REPLAY = "replay"
+CASSETTE_MODES = (RECORD, REPLAY)
+
+# Cassette names become file names inside the configured cassette directory
+CASSETTE_NAME_PATTERN = re.compile(r"[A-Za-z0-9_-][A-Za-z0-9_.-]*")
+
+# Request arguments that only change how a completion is delivered
+DELIVERY_KWARGS = ("model", "stream", "stream_options")
+
+
+class CassetteMissError(Exception):
+    """Raised in replay mode for a request that was never recorded"""
+
+
+def _usage_dict(usage: Any) -> dict[str, int]:
+    """Token usage of a completion or final stream chunk as a plain dict"""
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", None)
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "total_tokens": usage.total_tokens,
+        "cached_tokens": cached_tokens if isinstance(cached_tokens, int) else 0,
+    }
+
+
+def _usage_payload(usage: dict[str, int]) -> dict[str, Any]:
+    """Recorded usage in the shape of the API's usage object"""
+    return {
+        "prompt_tokens": usage["prompt_tokens"],
+        "completion_tokens": usage["completion_tokens"],
+        "total_tokens": usage["total_tokens"],
+        "prompt_tokens_details": {"cached_tokens": usage.get("cached_tokens", 0)},
+    }
+
+
+class _RecordingStream:
+    """Pass a completion stream through, recording it once it ends"""
+
+    def __init__(self, stream: Any, on_complete: Callable[[str, dict[str, int] | None], None]):
+        self._stream = stream
+        self._on_complete = on_complete
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[Any]:
+        content = []
+        usage = None
+        async for chunk in self._stream:
+            if chunk.usage:
+                usage = _usage_dict(chunk.usage)
+            if chunk.choices and chunk.choices[0].delta.content:
+                content.append(chunk.choices[0].delta.content)
+            yield chunk
+        self._on_complete("".join(content), usage)
+
+    async def close(self) -> None:
+        # An abandoned stream is not recorded
+        await self._stream.close()
+
+
+class _ReplayStream:
+    """Stream a recorded completion in pieces, optionally at the recorded pace"""
+
+    def __init__(self, chunks: list[Any], interval: float, sleep: Callable[[float], Awaitable[None]]):
+        self._chunks = chunks
+        self._interval = interval
+        self._sleep = sleep
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[Any]:
+        for index, chunk in enumerate(self._chunks):
+            if index and self._interval:
+                await self._sleep(self._interval)
+            yield chunk
+
+    async def close(self) -> None:
+        self._chunks = []
+
+
+class Cassette:
+    """
+    On-disk recording of chat completion calls
+
+    In record mode every call goes to the provider and its request, response
+    content, usage and latency are kept; save() writes them as gzip-compressed
+    JSON lines. In replay mode calls are answered from the recording without
+    touching the network, optionally after the recorded latency, so a
+    full-scale run can be repeated locally at realistic timing. Requests
+    match on their messages, sampling parameters and response format plus
+    the executor's model (not the deployment a router picked); identical
+    requests are replayed in recording order, the last one repeating. Safe
+    to share between threads and event loops.
+
+    Prompts embed the participant profiles, so a run only replays if it
+    regenerates the recorded profiles: the recording run's profile seed is
+    saved in a header line and read back as `profile_seed`. A recording run
+    that is resumed keeps the calls recorded before the interruption (see
+    resume()); a fresh recording replaces the file.
+    """
+
+    # Characters per chunk when a recording is replayed as a stream
+    STREAM_CHUNK_CHARS = 64
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = REPLAY,
+        replay_latency: bool = False,
+        sleep: Callable[[float], None] = time.sleep,
+        async_sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        """
+        Initialize Cassette
+
+        Args:
+            path: Cassette file (gzip-compressed JSON lines)
+            mode: RECORD or REPLAY (default: REPLAY)
+            replay_latency: Wait the recorded latency before each replayed response
+            sleep: Blocking sleep function (injectable for tests)
+            async_sleep: Async sleep function (injectable for tests)
+
+        Raises:
+            ValueError: If the mode is unknown
+            FileNotFoundError: If a replay cassette does not exist
+        """
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self.sleep = sleep
+        self.async_sleep = async_sleep
+        self.hits = 0
+        self.misses = 0
+        self.profile_seed: int | None = None
+        self._recorded: list[dict[str, Any]] = []
+        self._entries: dict[str, list[dict[str, Any]]] = {}
+        self._positions: dict[str, int] = {}
+        self._lock = threading.Lock()
+        if mode == REPLAY:
+            self._load()
+
+    @classmethod
+    def from_settings(
+        cls, execution_settings: dict[str, Any] | None, directory: str
+    ) -> "Cassette | None":
+        """
+        Open the cassette named in an experiment's execution_settings
+
+        Args:
+            execution_settings: Experiment execution settings dict; `cassette`
+                holds `name`, `mode` and optionally `replay_latency`
+            directory: Directory cassettes are kept in
+
+        Returns:
+            Configured Cassette, or None when no cassette is set
+
+        Raises:
+            ValueError: If the cassette name or mode is invalid
+            FileNotFoundError: If a replay cassette does not exist
+        """
+        config = (execution_settings or {}).get("cassette")
+        if not config:
+            return None
+        name = config.get("name", "")
+        if not CASSETTE_NAME_PATTERN.fullmatch(name):
+            raise ValueError(f"Invalid cassette name: {name!r}")
+        return cls(
+            os.path.join(directory, f"{name}.jsonl.gz"),
+            mode=config.get("mode", REPLAY),
+            replay_latency=config.get("replay_latency", False),
+        )
+
+    def _read(self) -> list[dict[str, Any]]:
+        """Read the header into `profile_seed` and return the recorded calls in order"""
+        entries = []
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if "meta" in entry:
+                    self.profile_seed = entry["meta"].get("profile_seed")
+                else:
+                    entries.append(entry)
+        return entries
+
+    def _load(self) -> None:
+        """Index the recorded calls by request key"""
+        for entry in self._read():
+            self._entries.setdefault(entry["key"], []).append(entry)
+
+    def resume(self) -> None:
+        """
+        Keep the calls an interrupted recording already saved (record mode only)
+
+        save() writes them back ahead of the calls recorded from now on, so
+        the cassette covers every participant of the resumed run.
+        """
+        if self.mode != RECORD or not os.path.exists(self.path):
+            return
+        earlier = self._read()
+        with self._lock:
+            self._recorded[:0] = earlier
+
+    @staticmethod
+    def request_key(kwargs: dict[str, Any], model: str) -> str:
+        """
+        Hash a completion request
+
+        Args:
+            kwargs: Keyword arguments for chat.completions.create
+            model: The executor's model
+
+        Returns:
+            Hex digest identifying the request
+        """
+        request = {k: v for k, v in kwargs.items() if k not in DELIVERY_KWARGS}
+        request["model"] = model
+        return hashlib.sha256(json.dumps(request, sort_keys=True).encode()).hexdigest()
+
+    def _next(self, key: str) -> dict[str, Any]:
+        """
+        Take the next recorded response for a request
+
+        Raises:
+            CassetteMissError: If the request was never recorded
+        """
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self.misses += 1
+                raise CassetteMissError(f"No recorded response for request {key[:12]} in {self.path}")
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            self.hits += 1
+            return entries[min(position, len(entries) - 1)]
+
+    def _record(
+        self,
+        key: str,
+        kwargs: dict[str, Any],
+        model: str,
+        content: str,
+        usage: dict[str, int] | None,
+        latency: float,
+        duration: float | None = None,
+    ) -> None:
+        """Keep one call for save()"""
+        entry = {
+            "key": key,
+            "model": model,
+            "request": {k: v for k, v in kwargs.items() if k not in DELIVERY_KWARGS},
+            "content": content,
+            "usage": usage,
+            "latency": latency,
+        }
+        if duration is not None:
+            entry["duration"] = duration
+        with self._lock:
+            self._recorded.append(entry)
+
+    @staticmethod
+    def _completion(entry: dict[str, Any]) -> ChatCompletion:
+        """Rebuild a chat completion from a recording"""
+        return ChatCompletion.model_validate({
+            "id": f"cassette-{entry['key'][:12]}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": entry["model"],
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": entry["content"]},
+            }],
+            "usage": _usage_payload(entry["usage"]) if entry["usage"] else None,
+        })
+
+    def _replay_stream(self, entry: dict[str, Any]) -> _ReplayStream:
+        """Rebuild a completion stream from a recording"""
+        content = entry["content"] or ""
+        size = self.STREAM_CHUNK_CHARS
+        base = {
+            "id": f"cassette-{entry['key'][:12]}",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": entry["model"],
+        }
+        chunks = [
+            ChatCompletionChunk.model_validate({
+                **base,
+                "choices": [{"index": 0, "delta": {"content": content[i:i + size]}, "finish_reason": None}],
+            })
+            for i in range(0, len(content), size)
+        ]
+        if entry["usage"]:
+            chunks.append(
+                ChatCompletionChunk.model_validate(
+                    {**base, "choices": [], "usage": _usage_payload(entry["usage"])}
+                )
+            )
+        interval = 0.0
+        if self.replay_latency and len(chunks) > 1:
+            # Spread the time after the first chunk evenly over the rest
+            remaining = entry.get("duration", entry["latency"]) - entry["latency"]
+            interval = max(0.0, remaining) / (len(chunks) - 1)
+        return _ReplayStream(chunks, interval, self.async_sleep)
+
+    def create(self, client: Any, kwargs: dict[str, Any], model: str) -> Any:
+        """
+        Send or replay a chat completion request
+
+        Args:
+            client: OpenAI client to record from
+            kwargs: Keyword arguments for chat.completions.create
+            model: The executor's model
+
+        Returns:
+            Chat completion
+
+        Raises:
+            CassetteMissError: If replaying a request that was never recorded
+        """
+        key = self.request_key(kwargs, model)
+        if self.mode == REPLAY:
+            entry = self._next(key)
+            if self.replay_latency:
+                self.sleep(entry["latency"])
+            return self._completion(entry)
+
+        started = time.monotonic()
+        response = client.chat.completions.create(**kwargs)
+        self._record(
+            key, kwargs, model, response.choices[0].message.content,
+            _usage_dict(response.usage), time.monotonic() - started,
+        )
+        return response
+
+    async def create_async(self, client: Any, kwargs: dict[str, Any], model: str) -> Any:
+        """
+        Async counterpart of create; streamed requests return a chunk stream
+
+        Args:
+            client: AsyncOpenAI client to record from
+            kwargs: Keyword arguments for chat.completions.create
+            model: The executor's model
+
+        Returns:
+            Chat completion, or an async chunk stream if `stream` is set
+
+        Raises:
+            CassetteMissError: If replaying a request that was never recorded
+        """
+        key = self.request_key(kwargs, model)
+        stream = kwargs.get("stream", False)
+        if self.mode == REPLAY:
+            entry = self._next(key)
+            if self.replay_latency:
+                await self.async_sleep(entry["latency"])
+            return self._replay_stream(entry) if stream else self._completion(entry)
+
+        started = time.monotonic()
+        response = await client.chat.completions.create(**kwargs)
+        latency = time.monotonic() - started
+        if not stream:
+            self._record(
+                key, kwargs, model, response.choices[0].message.content,
+                _usage_dict(response.usage), latency,
+            )
+            return response
+
+        def on_complete(content: str, usage: dict[str, int] | None) -> None:
+            self._record(key, kwargs, model, content, usage, latency, time.monotonic() - started)
+
+        return _RecordingStream(response, on_complete)
+
+    def save(self) -> int:
+        """
+        Write the recorded calls to the cassette file (record mode only)
+
+        Returns:
+            Number of calls written
+        """
+        if self.mode != RECORD:
+            return 0
+        with self._lock:
+            entries = list(self._recorded)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with gzip.open(temp_path, "wt", encoding="utf-8") as f:
+            if self.profile_seed is not None:
+                f.write(json.dumps({"meta": {"profile_seed": self.profile_seed}}) + "\n")
+            for entry in entries:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        os.replace(temp_path, self.path)
+        return len(entries)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Summarize cassette use for run metadata
+
+        Returns:
+            Dict with the mode and the recorded calls, or replay hits and misses
+        """
+        with self._lock:
+            if self.mode == RECORD:
+                return {"mode": self.mode, "recorded": len(self._recorded)}
+            return {"mode": self.mode, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,124 @@
+"""
+Resumable Run Checkpoints Kept in Experiment Metadata
+"""
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.participant import Participant as ParticipantModel
+
+
+@dataclass
+class RunCheckpoint:
+    """
+    Progress of an experiment run, committed with each batch of participants
+
+    Participants are generated from `profile_seed`, so a resumed run can
+    regenerate exactly the profiles that were not stored yet, and a batch-mode
+    run reattaches to `batch_id` instead of submitting again. Participants
+    finish out of order, so `cursor` is the end of the committed contiguous
+    prefix: every participant up to and including it is stored, while later
+    ones may or may not be. The counters cover every participant stored so
+    far, across resumes.
+    """
+
+    META_KEY = "checkpoint"
+
+    profile_seed: int
+    cursor: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    skipped: int = 0
+    total_cost: float = 0.0
+    total_tokens: int = 0
+    cache_hits: int = 0
+    cached_prompt_tokens: int = 0
+    # Includes spend on unusable answers, so a resumed run's budget starts from it
+    budget_spent: float = 0.0
+    # Batch API batch holding the remaining participants, once submitted
+    batch_id: str | None = None
+    updated_at: str | None = None
+
+    @classmethod
+    def load(cls, meta_data: dict[str, Any] | None) -> "RunCheckpoint | None":
+        """
+        Read the checkpoint from an experiment's meta_data
+
+        Args:
+            meta_data: Experiment meta_data dict
+
+        Returns:
+            RunCheckpoint, or None if the experiment has none
+        """
+        data = (meta_data or {}).get(cls.META_KEY)
+        if not data:
+            return None
+        known = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in known})
+
+    def resume(self) -> None:
+        """Prepare to continue: participants skipped by the budget are retried"""
+        self.skipped = 0
+
+    def record(self, outcome: dict[str, Any]) -> None:
+        """
+        Count a participant outcome
+
+        Args:
+            outcome: Outcome dict from the execution engine or batch executor
+        """
+        result = outcome["result"]
+        if outcome.get("skipped"):
+            self.skipped += 1
+        elif result is None:
+            self.failed += 1
+        else:
+            self.succeeded += 1
+            self.total_cost += result["cost"]
+            self.total_tokens += result["total_tokens"]
+            self.cached_prompt_tokens += result.get("cached_tokens", 0)
+            if result.get("cached"):
+                self.cache_hits += 1
+
+    def advance_cursor(self, stored: set[int]) -> None:
+        """
+        Move the cursor to the end of the stored contiguous prefix
+
+        Args:
+            stored: Numbers of the participants committed so far
+        """
+        while self.cursor + 1 in stored:
+            self.cursor += 1
+
+    def save(self, experiment: Any) -> None:
+        """
+        Write the checkpoint into an experiment's meta_data (the caller commits)
+
+        Args:
+            experiment: Experiment model instance
+        """
+        self.updated_at = datetime.utcnow().isoformat()
+        experiment.meta_data = {**experiment.meta_data, self.META_KEY: asdict(self)}
+
+
+def stored_participant_numbers(db: Session, experiment_id: int) -> set[int]:
+    """
+    Get the participant numbers an experiment already has stored
+
+    Args:
+        db: Database session
+        experiment_id: Experiment ID
+
+    Returns:
+        Set of participant numbers
+    """
+    return set(
+        db.scalars(
+            select(ParticipantModel.participant_number).where(
+                ParticipantModel.experiment_id == experiment_id
+            )
+        )
+    )
@@ -0,0 +1,91 @@
+"""
+Questionnaire Chunking Planner for Long Surveys
+"""
+from typing import Any
+
+
+# Expected answer length per question type, including its JSON wrapper
+OUTPUT_TOKENS_BY_TYPE = {
+    "likert_scale": 20,
+    "multiple_choice": 25,
+    "yes_no": 18,
+    "open_ended": 150,
+}
+DEFAULT_OUTPUT_TOKENS = 40
+
+
+def estimate_output_tokens(question: dict[str, Any]) -> int:
+    """
+    Estimate the completion tokens needed to answer a question
+
+    Args:
+        question: Question dict
+
+    Returns:
+        Estimated output tokens
+    """
+    return OUTPUT_TOKENS_BY_TYPE.get(question.get("question_type", ""), DEFAULT_OUTPUT_TOKENS)
+
+
+class ChunkPlanner:
+    """
+    Split a questionnaire into blocks that each fit one response's output budget
+
+    Questions are bin-packed first-fit decreasing by estimated answer length.
+    Each block keeps the questionnaire's original question order, and blocks
+    are ordered by their first question. A questionnaire that fits the budget
+    is returned as a single block holding the original list.
+    """
+
+    # Share of max_tokens the estimated answers may fill; the rest absorbs
+    # answers that run longer than estimated
+    OUTPUT_HEADROOM = 0.6
+
+    # Tokens for the surrounding JSON object braces
+    RESPONSE_OVERHEAD_TOKENS = 2
+
+    def __init__(self, max_tokens: int, max_questions_per_chunk: int | None = None):
+        """
+        Initialize Chunk Planner
+
+        Args:
+            max_tokens: Maximum tokens in a single response
+            max_questions_per_chunk: Optional cap on questions per block
+        """
+        self.max_tokens = max_tokens
+        self.max_questions_per_chunk = max_questions_per_chunk
+        self.budget = max(
+            1, int(max_tokens * self.OUTPUT_HEADROOM) - self.RESPONSE_OVERHEAD_TOKENS
+        )
+
+    def plan(self, questions: list[dict[str, Any]]) -> list[list[dict[str, Any]]]:
+        """
+        Bin-pack questions into blocks
+
+        Args:
+            questions: List of question dicts
+
+        Returns:
+            List of question blocks; a question larger than the budget gets a
+            block of its own
+        """
+        sizes = [estimate_output_tokens(q) for q in questions]
+        cap = self.max_questions_per_chunk
+        if sum(sizes) <= self.budget and (cap is None or len(questions) <= cap):
+            return [questions]
+
+        # First-fit decreasing over question indexes; ties keep original order
+        bins: list[list[int]] = []
+        loads: list[int] = []
+        for index in sorted(range(len(questions)), key=lambda i: -sizes[i]):
+            for b, load in enumerate(loads):
+                if load + sizes[index] <= self.budget and (cap is None or len(bins[b]) < cap):
+                    bins[b].append(index)
+                    loads[b] += sizes[index]
+                    break
+            else:
+                bins.append([index])
+                loads.append(sizes[index])
+
+        blocks = sorted(sorted(b) for b in bins)
+        return [[questions[i] for i in block] for block in blocks]
@@ -0,0 +1,242 @@
+"""
+Process-wide Pool of Reusable LLM API Clients
+"""
+import asyncio
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Coroutine, TypeVar
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+from app.config import settings
+
+T = TypeVar("T")
+
+
+class SharedEventLoop:
+    """
+    One long-lived event loop running on a daemon thread
+
+    Async HTTP connections belong to the event loop that opened them, so
+    async clients can only be reused across runs if every run executes on
+    the same loop. Runs submit their coroutine here instead of calling
+    asyncio.run().
+    """
+
+    def __init__(self):
+        """Initialize without starting the thread"""
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The running loop, started on first use"""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name="llm-event-loop", daemon=True
+                )
+                thread.start()
+                self._loop = loop
+            return self._loop
+
+    def run(self, coroutine: Coroutine[Any, Any, T]) -> T:
+        """
+        Run a coroutine on the shared loop and wait for its result
+
+        Args:
+            coroutine: Coroutine to run
+
+        Returns:
+            The coroutine's result
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+
+_shared_loop = SharedEventLoop()
+
+
+def get_shared_loop() -> SharedEventLoop:
+    """Get the process-wide event loop that pooled async clients live on"""
+    return _shared_loop
+
+
+@dataclass
+class PooledClients:
+    """Sync and async clients for one API key and server"""
+
+    client: OpenAI
+    async_client: AsyncOpenAI
+    last_used: float
+    # Executors currently holding the clients; leased clients are never evicted
+    leases: int = 0
+
+
+class ClientPool:
+    """
+    Share HTTP connection pools between executors
+
+    Clients are keyed by API-key hash and base URL, so every run against the
+    same account and server reuses warm keep-alive connections and TLS
+    sessions. Clients idle for longer than idle_timeout are closed on the
+    next lookup, unless an executor still holds a lease on them.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 200,
+        max_keepalive_connections: int = 50,
+        keepalive_expiry: float = 30.0,
+        idle_timeout: float = 600.0,
+        loop: SharedEventLoop | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize Client Pool
+
+        Args:
+            max_connections: Maximum open connections per client (default: 200)
+            max_keepalive_connections: Idle connections kept open per client (default: 50)
+            keepalive_expiry: Seconds an idle connection is kept alive (default: 30.0)
+            idle_timeout: Seconds after which an unused client is closed (default: 600.0)
+            loop: Event loop pooled async clients are used on (default: shared loop)
+            clock: Monotonic clock (injectable for tests)
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.idle_timeout = idle_timeout
+        self.loop = loop or get_shared_loop()
+        self.clock = clock
+        self._clients: dict[tuple[str, str | None], PooledClients] = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _key(api_key: str, base_url: str | None) -> tuple[str, str | None]:
+        """Build the registry key; only a hash of the API key is kept"""
+        return hashlib.sha256(api_key.encode()).hexdigest(), base_url
+
+    def get(self, api_key: str, base_url: str | None = None) -> PooledClients:
+        """
+        Get the shared clients for an API key and server, creating them if needed
+
+        Args:
+            api_key: Provider API key
+            base_url: API base URL (None for the OpenAI default)
+
+        Returns:
+            PooledClients with sync and async clients
+        """
+        now = self.clock()
+        key = self._key(api_key, base_url)
+        with self._lock:
+            self._evict_idle(now, keep=key)
+            pooled = self._clients.get(key)
+            if pooled is None:
+                # Client-side retries are disabled; the executor's retry policy owns retries
+                pooled = PooledClients(
+                    client=OpenAI(
+                        api_key=api_key,
+                        base_url=base_url,
+                        max_retries=0,
+                        http_client=DefaultHttpxClient(limits=self.limits),
+                    ),
+                    async_client=AsyncOpenAI(
+                        api_key=api_key,
+                        base_url=base_url,
+                        max_retries=0,
+                        http_client=DefaultAsyncHttpxClient(limits=self.limits),
+                    ),
+                    last_used=now,
+                )
+                self._clients[key] = pooled
+            pooled.last_used = now
+            return pooled
+
+    def acquire(self, api_key: str, base_url: str | None = None) -> PooledClients:
+        """
+        Get the shared clients and hold them until release()
+
+        Runs keep their clients for their whole duration, which can be far
+        longer than idle_timeout, so leased clients are not evicted.
+
+        Args:
+            api_key: Provider API key
+            base_url: API base URL (None for the OpenAI default)
+
+        Returns:
+            PooledClients with sync and async clients
+        """
+        with self._lock:
+            pooled = self.get(api_key, base_url)
+            pooled.leases += 1
+            return pooled
+
+    def release(self, pooled: PooledClients) -> None:
+        """
+        Return clients taken with acquire(); the idle timeout starts now
+
+        Args:
+            pooled: Clients returned by acquire()
+        """
+        with self._lock:
+            pooled.leases = max(0, pooled.leases - 1)
+            pooled.last_used = self.clock()
+
+    def _evict_idle(self, now: float, keep: tuple[str, str | None] | None = None) -> None:
+        """Close clients unused for longer than idle_timeout (caller holds the lock)"""
+        for key in [
+            k
+            for k, pooled in self._clients.items()
+            if k != keep and not pooled.leases and now - pooled.last_used > self.idle_timeout
+        ]:
+            self._close(self._clients.pop(key))
+
+    def _close(self, pooled: PooledClients) -> None:
+        """Close a client pair; the async client is closed on the loop that owns it"""
+        pooled.client.close()
+        asyncio.run_coroutine_threadsafe(pooled.async_client.close(), self.loop.loop)
+
+    def evict_idle(self) -> None:
+        """Close every client that has been idle for longer than idle_timeout"""
+        with self._lock:
+            self._evict_idle(self.clock())
+
+    def close(self) -> None:
+        """Close every pooled client"""
+        with self._lock:
+            for pooled in self._clients.values():
+                self._close(pooled)
+            self._clients.clear()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
+_client_pool: ClientPool | None = None
+_client_pool_lock = threading.Lock()
+
+
+def get_client_pool() -> ClientPool:
+    """
+    Get the process-wide client pool, configured from settings
+
+    Returns:
+        Shared ClientPool instance
+    """
+    global _client_pool
+    with _client_pool_lock:
+        if _client_pool is None:
+            _client_pool = ClientPool(
+                max_connections=settings.llm_http_max_connections,
+                max_keepalive_connections=settings.llm_http_max_keepalive_connections,
+                keepalive_expiry=settings.llm_http_keepalive_expiry,
+                idle_timeout=settings.llm_client_idle_timeout,
+            )
+        return _client_pool
@@ -0,0 +1,180 @@
+"""
+Adaptive (AIMD) Concurrency Limit for the Execution Engine
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Callable
+
+from openai import APIStatusError
+
+
+class AdaptiveConcurrency:
+    """
+    In-flight limit that follows what the provider can sustain
+
+    Works like an asyncio.Semaphore whose size changes: every healthy call
+    grows the limit by increase_step / limit (about one slot per window of
+    successes), while a 429 or a latency spike multiplies it by
+    decrease_factor. A spike is a call slower than latency_spike_ratio times
+    the moving-average latency. After a decrease, further decreases wait one
+    average round-trip so a single burst of 429s only cuts the limit once.
+    """
+
+    # meta_data key a running experiment's snapshot is committed under
+    META_KEY = "live_concurrency"
+
+    DEFAULT_MAX_LIMIT = 100
+    DEFAULT_DECREASE_FACTOR = 0.5
+    DEFAULT_LATENCY_SPIKE_RATIO = 2.0
+
+    # Weight of the newest sample in the latency average
+    SMOOTHING = 0.1
+
+    # Decrease cooldown before any latency has been observed
+    DEFAULT_COOLDOWN = 1.0
+
+    def __init__(
+        self,
+        initial: int = 10,
+        min_limit: int = 1,
+        max_limit: int = DEFAULT_MAX_LIMIT,
+        increase_step: float = 1.0,
+        decrease_factor: float = DEFAULT_DECREASE_FACTOR,
+        latency_spike_ratio: float = DEFAULT_LATENCY_SPIKE_RATIO,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize Adaptive Concurrency
+
+        Args:
+            initial: Starting limit (default: 10)
+            min_limit: Lowest limit (default: 1)
+            max_limit: Highest limit (default: 100)
+            increase_step: Slots added per window of healthy calls (default: 1.0)
+            decrease_factor: Multiplier applied on 429s and latency spikes (default: 0.5)
+            latency_spike_ratio: Latency over this multiple of the average counts
+                as a spike (default: 2.0)
+            clock: Monotonic clock function (injectable for tests)
+
+        Raises:
+            ValueError: If the bounds or decrease factor are invalid
+        """
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError(f"Invalid concurrency bounds {min_limit}-{max_limit}")
+        if not 0 < decrease_factor < 1:
+            raise ValueError(f"Decrease factor must be in (0, 1), got {decrease_factor}")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.latency_spike_ratio = latency_spike_ratio
+        self.clock = clock
+        self._limit = float(min(max(initial, min_limit), max_limit))
+        self.in_flight = 0
+        self.peak = self.limit
+        self.decreases = 0
+        self.average_latency: float | None = None
+        self._last_decrease = float("-inf")
+        self._lock = threading.Lock()
+        self._condition: asyncio.Condition | None = None
+
+    @classmethod
+    def from_settings(
+        cls, execution_settings: dict[str, Any] | None, initial: int
+    ) -> "AdaptiveConcurrency | None":
+        """
+        Build a controller from an experiment's execution_settings
+
+        Args:
+            execution_settings: Experiment execution settings dict
+            initial: Starting limit (the configured concurrency)
+
+        Returns:
+            Configured AdaptiveConcurrency, or None unless adaptive_concurrency is set
+        """
+        execution_settings = execution_settings or {}
+        if not execution_settings.get("adaptive_concurrency", False):
+            return None
+        return cls(
+            initial=initial,
+            min_limit=execution_settings.get("min_concurrency", 1),
+            max_limit=execution_settings.get("max_concurrency", cls.DEFAULT_MAX_LIMIT),
+        )
+
+    @property
+    def limit(self) -> int:
+        """Current number of slots"""
+        return int(self._limit)
+
+    def record(self, latency: float, error: Exception | None = None) -> None:
+        """
+        Adjust the limit after a call
+
+        Args:
+            latency: Seconds the call took
+            error: Exception raised by the call, or None on success
+        """
+        with self._lock:
+            if isinstance(error, APIStatusError) and error.status_code == 429:
+                self._decrease()
+                return
+            if error is not None:
+                # Other failures say nothing about how much load the provider takes
+                return
+
+            average = self.average_latency
+            self.average_latency = (
+                latency if average is None else average + self.SMOOTHING * (latency - average)
+            )
+            if average is not None and latency > self.latency_spike_ratio * average:
+                self._decrease()
+                return
+
+            self._limit = min(self.max_limit, self._limit + self.increase_step / self._limit)
+            self.peak = max(self.peak, self.limit)
+
+    def _decrease(self) -> None:
+        """Cut the limit unless it was cut within the last round-trip (caller holds the lock)"""
+        now = self.clock()
+        if now - self._last_decrease < (self.average_latency or self.DEFAULT_COOLDOWN):
+            return
+        self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+        self._last_decrease = now
+        self.decreases += 1
+
+    async def acquire(self) -> None:
+        """Wait until a slot under the current limit is free"""
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    async def release(self) -> None:
+        """Free a slot and wake waiters (the limit may have grown meanwhile)"""
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.release()
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Current state for the status endpoint and run metadata
+
+        Returns:
+            Dict with the limit, calls in flight, peak limit and decrease count
+        """
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "peak": self.peak,
+                "decreases": self.decreases,
+            }
+
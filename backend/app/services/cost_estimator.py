@@ -0,0 +1,215 @@
+"""
+Pre-flight Cost and Duration Estimator for Experiment Runs
+"""
+from functools import lru_cache
+from typing import Any
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None
+
+from app.services.chunk_planner import ChunkPlanner, estimate_output_tokens
+from app.services.llm_executor import LLMExecutor
+from app.services.prompt_template import (
+    PERSONA_FIRST,
+    QUESTIONNAIRE_FIRST,
+    CompiledPrompt,
+    render_persona,
+)
+
+
+# Chat format overhead per message and for the reply primer
+TOKENS_PER_MESSAGE = 4
+REPLY_PRIMER_TOKENS = 3
+
+# Providers only cache prompt prefixes at least this long
+MIN_CACHEABLE_PREFIX_TOKENS = 1024
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str) -> Any:
+    """
+    Load and cache the tokenizer for a model
+
+    Args:
+        model: Model name
+
+    Returns:
+        tiktoken Encoding, or None when tiktoken or its tables are unavailable
+    """
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        try:
+            return tiktoken.get_encoding("o200k_base")
+        except Exception:
+            return None
+    except Exception:
+        # Tables could not be loaded (e.g. no network to fetch them)
+        return None
+
+
+def count_tokens(text: str, model: str) -> int:
+    """
+    Count the tokens in a text for a model
+
+    Falls back to ~4 characters per token when no tokenizer is available.
+
+    Args:
+        text: Text to tokenize
+        model: Model name
+
+    Returns:
+        Token count
+    """
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+class CostEstimator:
+    """
+    Project tokens, cost and wall-clock time of a run before launching it
+
+    A small sample of prompts is rendered and tokenized locally; the shared
+    questionnaire is tokenized once per block, so the estimate does not grow
+    with the sample size.
+    """
+
+    # Rough latency model: time to first token plus generation speed
+    BASE_LATENCY_SECONDS = 0.6
+    OUTPUT_TOKENS_PER_SECOND = 60.0
+
+    def __init__(
+        self,
+        model: str = "gpt-4o",
+        max_tokens: int = 2000,
+        prompt_layout: str = PERSONA_FIRST,
+        max_questions_per_chunk: int | None = None,
+        personas_per_request: int = 1,
+        input_cost_per_1k: float | None = None,
+        output_cost_per_1k: float | None = None,
+        cached_input_cost_per_1k: float | None = None,
+    ):
+        """
+        Initialize Cost Estimator
+
+        Args:
+            model: Model name (default: gpt-4o)
+            max_tokens: Maximum tokens per response (default: 2000)
+            prompt_layout: Prompt layout the run will use
+            max_questions_per_chunk: Optional cap on questions per sub-request
+            personas_per_request: Participants packed into each request
+            input_cost_per_1k: Custom input cost per 1K tokens
+            output_cost_per_1k: Custom output cost per 1K tokens
+            cached_input_cost_per_1k: Custom cached input cost per 1K tokens
+        """
+        self.model = model
+        self.max_tokens = max_tokens
+        self.prompt_layout = prompt_layout
+        self.max_questions_per_chunk = max_questions_per_chunk
+        self.personas_per_request = max(1, personas_per_request)
+
+        pricing = LLMExecutor.DEFAULT_PRICING.get(model, {})
+        self.input_cost_per_1k = input_cost_per_1k or pricing.get("input", 0.005)
+        self.output_cost_per_1k = output_cost_per_1k or pricing.get("output", 0.005)
+        self.cached_input_cost_per_1k = cached_input_cost_per_1k or pricing.get(
+            "cached_input", self.input_cost_per_1k * LLMExecutor.DEFAULT_CACHED_INPUT_RATIO
+        )
+
+    def estimate(
+        self,
+        sample_profiles: list[dict[str, Any]],
+        questions: list[dict[str, Any]],
+        sample_size: int,
+        concurrency: int,
+        rpm_limit: int,
+        tpm_limit: int,
+        cost_multiplier: float = 1.0,
+    ) -> dict[str, Any]:
+        """
+        Estimate tokens, cost and duration for a run
+
+        Args:
+            sample_profiles: Representative participant profiles to tokenize
+            questions: List of question dicts
+            sample_size: Number of participants in the run
+            concurrency: Participants in flight at once
+            rpm_limit: Provider requests-per-minute limit
+            tpm_limit: Provider tokens-per-minute limit
+            cost_multiplier: Price factor (e.g. the batch discount)
+
+        Returns:
+            Dict of per-participant and total token, cost and duration estimates
+        """
+        personas = self.personas_per_request
+        chunks = ChunkPlanner(self.max_tokens // personas, self.max_questions_per_chunk).plan(
+            questions
+        )
+
+        # Shared text is tokenized once per block; only personas vary per participant.
+        # Packed requests carry the shared text once for several participants.
+        shared_tokens = [
+            count_tokens(LLMExecutor.SYSTEM_MESSAGE, self.model)
+            + count_tokens(CompiledPrompt(chunk, layout=self.prompt_layout).questionnaire, self.model)
+            for chunk in chunks
+        ]
+        persona_tokens = [
+            count_tokens(render_persona(profile), self.model) for profile in sample_profiles
+        ] or [0]
+        overhead = 2 * TOKENS_PER_MESSAGE + REPLY_PRIMER_TOKENS
+        average_persona = sum(persona_tokens) / len(persona_tokens)
+        input_tokens = (
+            sum(shared_tokens) + len(chunks) * (personas * average_persona + overhead)
+        ) / personas
+
+        block_output_tokens = [
+            min(personas * sum(estimate_output_tokens(q) for q in chunk) + 2, self.max_tokens)
+            for chunk in chunks
+        ]
+        output_tokens = sum(block_output_tokens) / personas
+
+        # With the prefix layout each block's questionnaire can be served from the provider cache
+        cached_tokens = 0.0
+        if self.prompt_layout == QUESTIONNAIRE_FIRST:
+            cached_tokens = sum(
+                tokens for tokens in shared_tokens if tokens >= MIN_CACHEABLE_PREFIX_TOKENS
+            ) / personas
+
+        cost_per_participant = (
+            (input_tokens - cached_tokens) * self.input_cost_per_1k
+            + cached_tokens * self.cached_input_cost_per_1k
+            + output_tokens * self.output_cost_per_1k
+        ) / 1000 * cost_multiplier
+
+        # Throughput is bounded by concurrency, request rate and token rate. Blocks of
+        # one request slot run in parallel, so latency follows the longest block.
+        latency = (
+            self.BASE_LATENCY_SECONDS + max(block_output_tokens) / self.OUTPUT_TOKENS_PER_SECOND
+        )
+        requests = len(chunks) / personas
+        tokens_per_request = (input_tokens + output_tokens) / requests
+        requests_per_second = min(
+            max(1, concurrency) * len(chunks) / latency,
+            rpm_limit / 60,
+            tpm_limit / 60 / tokens_per_request,
+        )
+
+        return {
+            "model": self.model,
+            "sample_size": sample_size,
+            "requests_per_participant": requests,
+            "input_tokens_per_participant": round(input_tokens),
+            "output_tokens_per_participant": round(output_tokens),
+            "cached_tokens_per_participant": round(cached_tokens),
+            "total_input_tokens": round(input_tokens * sample_size),
+            "total_output_tokens": round(output_tokens * sample_size),
+            "estimated_cost": cost_per_participant * sample_size,
+            "estimated_latency_seconds": latency,
+            "estimated_requests_per_second": requests_per_second,
+            "estimated_duration_seconds": sample_size * requests / requests_per_second,
+        }
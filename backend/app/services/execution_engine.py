@@ -0,0 +1,223 @@
+"""
+Concurrent Execution Engine for Participant Simulation
+"""
+import asyncio
+from functools import partial
+from typing import Any, Awaitable, Callable
+
+from app.services.budget import BudgetExceededError, BudgetGuard
+from app.services.concurrency_controller import AdaptiveConcurrency
+from app.services.llm_executor import LLMExecutor
+
+
+class ExecutionEngine:
+    """
+    Run many participant simulations concurrently with a bounded number in flight
+    """
+
+    DEFAULT_CONCURRENCY = 10
+
+    BUDGET_EXHAUSTED = "Run budget exhausted; participant not executed"
+
+    def __init__(
+        self,
+        executor: LLMExecutor,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        on_answer: Callable[[dict[str, Any], str, Any], None] | None = None,
+        personas_per_request: int = 1,
+        budget: BudgetGuard | None = None,
+        concurrency_controller: AdaptiveConcurrency | None = None,
+    ):
+        """
+        Initialize Execution Engine
+
+        Args:
+            executor: LLM executor used for each participant
+            concurrency: Maximum number of participants in flight (default: 10)
+            on_answer: Called with (profile, question_id, answer) as each streamed
+                answer completes
+            personas_per_request: Participants packed into each LLM request
+                (default: 1, no packing)
+            budget: Run budget; once it is exhausted no further participants are
+                started (default: unlimited)
+            concurrency_controller: Adaptive limit on participants (or packs) in
+                flight, replacing the fixed `concurrency` (default: fixed)
+        """
+        self.executor = executor
+        self.concurrency = max(1, int(concurrency))
+        self.on_answer = on_answer
+        self.personas_per_request = max(1, int(personas_per_request))
+        self.budget = budget
+        self.concurrency_controller = concurrency_controller
+
+    @classmethod
+    def from_settings(
+        cls, executor: LLMExecutor, execution_settings: dict[str, Any] | None
+    ) -> "ExecutionEngine":
+        """
+        Build an engine from an experiment's execution_settings
+
+        The engine stops dispatching when the executor's budget is exhausted,
+        and follows the executor's adaptive concurrency limit if it has one.
+
+        Args:
+            executor: LLM executor used for each participant
+            execution_settings: Experiment execution settings dict
+
+        Returns:
+            Configured ExecutionEngine
+        """
+        execution_settings = execution_settings or {}
+        return cls(
+            executor=executor,
+            concurrency=execution_settings.get("concurrency", cls.DEFAULT_CONCURRENCY),
+            personas_per_request=execution_settings.get("personas_per_request", 1),
+            budget=executor.budget,
+            concurrency_controller=executor.concurrency_controller,
+        )
+
+    async def _execute_one(
+        self,
+        semaphore: asyncio.Semaphore | AdaptiveConcurrency,
+        profile: dict[str, Any],
+        questions: list[dict[str, Any]],
+        emit: Callable[[dict[str, Any]], Awaitable[None]] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Execute a single participant once a concurrency slot is free
+
+        Args:
+            semaphore: Semaphore or adaptive limit bounding in-flight participants
+            profile: Participant profile dict
+            questions: List of question dicts
+            emit: Awaited with the outcome before the slot is released
+
+        Returns:
+            Outcome dict with profile, result (or None) and error (or None)
+        """
+        on_answer = partial(self.on_answer, profile) if self.on_answer else None
+
+        async with semaphore:
+            if self._budget_exhausted():
+                outcome = self._skipped(profile)
+            else:
+                try:
+                    result = await self.executor.execute_participant_async(
+                        profile, questions, on_answer=on_answer
+                    )
+                    outcome = {"profile": profile, "result": result, "error": None}
+                except BudgetExceededError:
+                    outcome = self._skipped(profile)
+                except Exception as e:
+                    outcome = {"profile": profile, "result": None, "error": str(e)}
+            if emit is not None:
+                await emit(outcome)
+            return outcome
+
+    async def _execute_pack(
+        self,
+        semaphore: asyncio.Semaphore | AdaptiveConcurrency,
+        profiles: list[dict[str, Any]],
+        questions: list[dict[str, Any]],
+        emit: Callable[[dict[str, Any]], Awaitable[None]] | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Execute a pack of participants in shared requests once a slot is free
+
+        Args:
+            semaphore: Semaphore or adaptive limit bounding in-flight requests
+            profiles: Participant profile dicts in the pack
+            questions: List of question dicts
+            emit: Awaited with each outcome before the slot is released
+
+        Returns:
+            One outcome dict per profile in the pack
+        """
+        async with semaphore:
+            if self._budget_exhausted():
+                results = [BudgetExceededError()] * len(profiles)
+            else:
+                try:
+                    results = await self.executor.execute_pack_async(profiles, questions)
+                except Exception as e:
+                    results = [e] * len(profiles)
+
+            outcomes = []
+            for profile, result in zip(profiles, results):
+                if isinstance(result, BudgetExceededError):
+                    outcomes.append(self._skipped(profile))
+                elif isinstance(result, Exception):
+                    outcomes.append({"profile": profile, "result": None, "error": str(result)})
+                else:
+                    outcomes.append({"profile": profile, "result": result, "error": None})
+            if emit is not None:
+                for outcome in outcomes:
+                    await emit(outcome)
+        return outcomes
+
+    def _budget_exhausted(self) -> bool:
+        """Whether the budget refuses further participants"""
+        return self.budget is not None and self.budget.exhausted
+
+    def _skipped(self, profile: dict[str, Any]) -> dict[str, Any]:
+        """Outcome for a participant not run because the budget ran out"""
+        return {"profile": profile, "result": None, "error": self.BUDGET_EXHAUSTED, "skipped": True}
+
+    async def stream(
+        self,
+        profiles: list[dict[str, Any]],
+        questions: list[dict[str, Any]],
+        emit: Callable[[dict[str, Any]], Awaitable[None]],
+    ) -> None:
+        """
+        Execute all participants concurrently, handing each outcome on as it completes
+
+        A participant keeps its concurrency slot until `emit` returns, so a
+        consumer that awaits a full queue in `emit` stops new dispatches.
+
+        Args:
+            profiles: Participant profile dicts
+            questions: List of question dicts
+            emit: Awaited with each outcome, in completion order
+        """
+        semaphore = self.concurrency_controller or asyncio.Semaphore(self.concurrency)
+
+        async def execute(coroutine: Awaitable[Any]) -> None:
+            # Outcomes go to emit; don't keep them all until the run ends
+            await coroutine
+
+        if self.personas_per_request > 1:
+            size = self.personas_per_request
+            packs = [profiles[i : i + size] for i in range(0, len(profiles), size)]
+            calls = [self._execute_pack(semaphore, pack, questions, emit) for pack in packs]
+        else:
+            calls = [self._execute_one(semaphore, profile, questions, emit) for profile in profiles]
+        await asyncio.gather(*(execute(call) for call in calls))
+
+    async def run(
+        self, profiles: list[dict[str, Any]], questions: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """
+        Execute all participants concurrently
+
+        Args:
+            profiles: Participant profile dicts
+            questions: List of question dicts
+
+        Returns:
+            One outcome dict per profile, in the same order as profiles.
+            Participants not started because the budget ran out are marked
+            `skipped`.
+        """
+        semaphore = self.concurrency_controller or asyncio.Semaphore(self.concurrency)
+
+        if self.personas_per_request > 1:
+            size = self.personas_per_request
+            packs = [profiles[i : i + size] for i in range(0, len(profiles), size)]
+            pack_outcomes = await asyncio.gather(
+                *(self._execute_pack(semaphore, pack, questions) for pack in packs)
+            )
+            return [outcome for outcomes in pack_outcomes for outcome in outcomes]
+
+        tasks = [self._execute_one(semaphore, profile, questions) for profile in profiles]
+        return await asyncio.gather(*tasks)
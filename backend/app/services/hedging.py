@@ -0,0 +1,143 @@
+"""
+Hedged Requests for Slow LLM Completions
+"""
+from collections import deque
+from typing import Any
+
+
+class HedgePolicy:
+    """
+    Decide when a slow completion gets a duplicate request
+
+    Latencies of recent completions are kept in a sliding window. Once a call
+    has been running longer than the configured percentile of that window, a
+    duplicate is sent and whichever answers first wins. Hedges are capped at
+    a share of all requests so a provider-wide slowdown cannot double the
+    traffic. Meant to be used from one event loop.
+    """
+
+    DEFAULT_PERCENTILE = 0.95
+    DEFAULT_MAX_HEDGE_RATIO = 0.1
+
+    # Completions observed before hedging starts
+    DEFAULT_MIN_SAMPLES = 20
+
+    # Completions kept in the latency window
+    DEFAULT_WINDOW = 200
+
+    def __init__(
+        self,
+        percentile: float = DEFAULT_PERCENTILE,
+        max_hedge_ratio: float = DEFAULT_MAX_HEDGE_RATIO,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+        window: int = DEFAULT_WINDOW,
+    ):
+        """
+        Initialize Hedge Policy
+
+        Args:
+            percentile: Latency percentile after which a call is hedged (default: 0.95)
+            max_hedge_ratio: Maximum share of requests that may be hedged (default: 0.1)
+            min_samples: Completions observed before hedging starts (default: 20)
+            window: Recent completions the percentile is computed over (default: 200)
+
+        Raises:
+            ValueError: If percentile or max_hedge_ratio is outside (0, 1]
+        """
+        if not 0 < percentile <= 1:
+            raise ValueError(f"Hedge percentile must be in (0, 1], got {percentile}")
+        if not 0 < max_hedge_ratio <= 1:
+            raise ValueError(f"Hedge ratio must be in (0, 1], got {max_hedge_ratio}")
+        self.percentile = percentile
+        self.max_hedge_ratio = max_hedge_ratio
+        self.min_samples = max(1, min_samples)
+        self._latencies: deque[float] = deque(maxlen=window)
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.loser_cost = 0.0
+
+    @classmethod
+    def from_settings(cls, execution_settings: dict[str, Any] | None) -> "HedgePolicy | None":
+        """
+        Build a policy from an experiment's execution_settings
+
+        Args:
+            execution_settings: Experiment execution settings dict
+
+        Returns:
+            Configured HedgePolicy, or None if hedge_percentile is not set
+        """
+        execution_settings = execution_settings or {}
+        percentile = execution_settings.get("hedge_percentile")
+        if percentile is None:
+            return None
+        return cls(
+            percentile=percentile,
+            max_hedge_ratio=execution_settings.get("hedge_max_ratio", cls.DEFAULT_MAX_HEDGE_RATIO),
+            min_samples=execution_settings.get("hedge_min_samples", cls.DEFAULT_MIN_SAMPLES),
+        )
+
+    def delay(self) -> float | None:
+        """
+        Seconds to wait for a call before hedging it
+
+        Returns:
+            The latency percentile of the window, or None until enough
+            completions have been observed
+        """
+        if len(self._latencies) < self.min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(self.percentile * len(ordered)))
+        return ordered[index]
+
+    def start_request(self) -> None:
+        """Count a request towards the hedge budget"""
+        self.requests += 1
+
+    def try_hedge(self) -> bool:
+        """
+        Claim a hedge if the share of hedged requests allows it
+
+        Returns:
+            True if a duplicate may be sent
+        """
+        if self.hedged + 1 > self.max_hedge_ratio * self.requests:
+            return False
+        self.hedged += 1
+        return True
+
+    def observe(self, latency: float) -> None:
+        """
+        Add a completed call's latency to the window
+
+        Args:
+            latency: Seconds the call took
+        """
+        self._latencies.append(latency)
+
+    def record_hedge(self, hedge_won: bool, loser_cost: float) -> None:
+        """
+        Record how a hedged race ended
+
+        Args:
+            hedge_won: Whether the duplicate answered first
+            loser_cost: Cost in USD charged for the losing call
+        """
+        self.hedge_wins += hedge_won
+        self.loser_cost += loser_cost
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Summarize hedging for run metadata
+
+        Returns:
+            Dict with request, hedge and win counts and the losers' cost
+        """
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "loser_cost": self.loser_cost,
+        }
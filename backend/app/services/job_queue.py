@@ -0,0 +1,275 @@
+"""
+Durable Execution Job Queue on the Database
+"""
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.execution_job import ExecutionJob
+from app.models.experiment import Experiment as ExperimentModel
+from app.services.secret_box import SecretBox
+
+
+class LeaseLostError(Exception):
+    """Raised in a run whose job lease ran out, so another worker may own it"""
+
+
+@dataclass
+class ClaimedJob:
+    """Job leased to a worker"""
+
+    id: int
+    experiment_id: int
+    payload: dict[str, Any]
+    attempt: int
+    # Set by the worker's heartbeat once the lease is lost; the run must stop
+    lease_lost: threading.Event = field(default_factory=threading.Event, compare=False)
+
+
+class JobQueue:
+    """
+    Queue of experiment runs in the `execution_jobs` table
+
+    Workers claim the oldest claimable job with SELECT ... FOR UPDATE SKIP
+    LOCKED, so any number of them can poll at once without claiming the same
+    job or waiting on each other. A claim leases the job for lease_seconds and
+    the worker extends the lease with heartbeats. A running job whose lease
+    ran out belongs to a worker that died; it is claimed again until its
+    max_attempts are used up, then it and its experiment are marked failed.
+    Lease times come from each worker's clock, so worker clocks must agree to
+    within a fraction of the lease. API keys in a payload are sealed with the
+    server's secret box while the job waits and runs, and dropped once it
+    ends.
+    """
+
+    DEFAULT_LEASE_SECONDS = 60.0
+    DEFAULT_MAX_ATTEMPTS = 3
+
+    # Payload entries sealed while the job is open and dropped once it has ended
+    SECRET_PAYLOAD_KEYS = ("api_key", "additional_api_keys")
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        clock: Callable[[], datetime] = datetime.utcnow,
+        secret_box: SecretBox | None = None,
+    ):
+        """
+        Initialize Job Queue
+
+        Args:
+            session_factory: Callable returning a new database session
+            lease_seconds: How long a claim or heartbeat keeps a job (default: 60)
+            clock: UTC wall clock function (injectable for tests)
+            secret_box: Opens sealed API keys (default: from settings)
+        """
+        self.session_factory = session_factory
+        self.lease_seconds = lease_seconds
+        self.clock = clock
+        self.secret_box = secret_box or SecretBox.from_settings(settings)
+
+    @classmethod
+    def enqueue(
+        cls,
+        db: Session,
+        experiment_id: int,
+        payload: dict[str, Any],
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        secret_box: SecretBox | None = None,
+    ) -> ExecutionJob:
+        """
+        Add a run to the queue; it is claimable once the caller commits
+
+        Args:
+            db: Database session (committed by the caller, e.g. together with the
+                experiment's status change)
+            experiment_id: Experiment to run
+            payload: Keyword arguments for execute_experiment_task besides
+                experiment_id and db; API keys are stored sealed
+            max_attempts: Claims allowed before the job is given up (default: 3)
+            secret_box: Seals the API keys (default: from settings)
+
+        Returns:
+            The new ExecutionJob
+        """
+        secret_box = secret_box or SecretBox.from_settings(settings)
+        job = ExecutionJob(
+            experiment_id=experiment_id,
+            status="queued",
+            payload=cls._convert_secrets(payload, secret_box.seal),
+            attempts=0,
+            max_attempts=max_attempts,
+        )
+        db.add(job)
+        db.flush()
+        return job
+
+    def claim(self, worker_id: str) -> ClaimedJob | None:
+        """
+        Lease the oldest queued job, or a running job whose worker died
+
+        Args:
+            worker_id: Identifier of the claiming worker
+
+        Returns:
+            ClaimedJob, or None if nothing is claimable
+        """
+        with self.session_factory() as session:
+            while True:
+                now = self.clock()
+                job = session.execute(
+                    select(ExecutionJob)
+                    .where(
+                        or_(
+                            ExecutionJob.status == "queued",
+                            and_(
+                                ExecutionJob.status == "running",
+                                ExecutionJob.lease_expires_at < now,
+                            ),
+                        )
+                    )
+                    .order_by(ExecutionJob.id)
+                    .limit(1)
+                    .with_for_update(skip_locked=True)
+                ).scalar_one_or_none()
+                if job is None:
+                    session.rollback()
+                    return None
+
+                if job.attempts >= job.max_attempts:
+                    # Every worker that took it died; stop handing it out
+                    error = f"Job abandoned after {job.attempts} attempts"
+                    self._end(job, "failed", error, now)
+                    experiment = session.get(ExperimentModel, job.experiment_id)
+                    if experiment is not None and experiment.status == "active":
+                        experiment.status = "failed"
+                        experiment.meta_data = {**experiment.meta_data, "execution_error": error}
+                    session.commit()
+                    continue
+
+                job.status = "running"
+                job.worker_id = worker_id
+                job.lease_expires_at = now + timedelta(seconds=self.lease_seconds)
+                job.attempts += 1
+                job.started_at = now
+                claimed = ClaimedJob(
+                    id=job.id,
+                    experiment_id=job.experiment_id,
+                    payload=self._convert_secrets(job.payload, self.secret_box.open),
+                    attempt=job.attempts,
+                )
+                session.commit()
+                return claimed
+
+    def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        """
+        Extend a job's lease
+
+        Args:
+            job_id: Claimed job ID
+            worker_id: Identifier of the worker holding the lease
+
+        Returns:
+            False if the worker no longer holds the job (its lease ran out and
+            another worker reclaimed it)
+        """
+        with self.session_factory() as session:
+            result = session.execute(
+                update(ExecutionJob)
+                .where(
+                    ExecutionJob.id == job_id,
+                    ExecutionJob.worker_id == worker_id,
+                    ExecutionJob.status == "running",
+                )
+                .values(lease_expires_at=self.clock() + timedelta(seconds=self.lease_seconds))
+            )
+            session.commit()
+            return result.rowcount == 1
+
+    def finish(self, job_id: int, worker_id: str, error: str | None = None) -> bool:
+        """
+        Mark a job completed, or failed with an error
+
+        Args:
+            job_id: Claimed job ID
+            worker_id: Identifier of the worker holding the lease
+            error: Why the run failed, or None if it succeeded
+
+        Returns:
+            False if the worker no longer held the job
+        """
+        with self.session_factory() as session:
+            job = session.execute(
+                select(ExecutionJob)
+                .where(
+                    ExecutionJob.id == job_id,
+                    ExecutionJob.worker_id == worker_id,
+                    ExecutionJob.status == "running",
+                )
+                .with_for_update()
+            ).scalar_one_or_none()
+            if job is None:
+                session.rollback()
+                return False
+            self._end(job, "failed" if error else "completed", error, self.clock())
+            session.commit()
+            return True
+
+    @classmethod
+    def _convert_secrets(
+        cls, payload: dict[str, Any], convert: Callable[[str], str]
+    ) -> dict[str, Any]:
+        """
+        Seal or open the API keys in a payload
+
+        Args:
+            payload: Job payload
+            convert: SecretBox.seal or SecretBox.open
+
+        Returns:
+            Copy of the payload with every API key converted
+        """
+        converted = dict(payload)
+        for key in cls.SECRET_PAYLOAD_KEYS:
+            value = converted.get(key)
+            if isinstance(value, str):
+                converted[key] = convert(value)
+            elif isinstance(value, list):
+                converted[key] = [convert(item) for item in value]
+        return converted
+
+    def _end(self, job: ExecutionJob, status: str, error: str | None, now: datetime) -> None:
+        """Close a job and drop the API keys from its payload"""
+        job.status = status
+        job.error = error
+        job.finished_at = now
+        job.lease_expires_at = None
+        job.payload = {
+            key: value for key, value in job.payload.items() if key not in self.SECRET_PAYLOAD_KEYS
+        }
+
+
+def latest_job(db: Session, experiment_id: int) -> ExecutionJob | None:
+    """
+    Get the most recent job of an experiment
+
+    Args:
+        db: Database session
+        experiment_id: Experiment ID
+
+    Returns:
+        ExecutionJob, or None if the experiment was never queued
+    """
+    return db.execute(
+        select(ExecutionJob)
+        .where(ExecutionJob.experiment_id == experiment_id)
+        .order_by(ExecutionJob.id.desc())
+        .limit(1)
+    ).scalar_one_or_none()
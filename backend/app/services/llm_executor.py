@@ -1,11 +1,32 @@
 """
 LLM Executor Service for Participant Simulation
 """
+import asyncio
 import json
 import re
-from typing import Any
+import time
+from typing import Any, Callable
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+
+from app.services.budget import BudgetExceededError, BudgetGuard
+from app.services.cassette import Cassette
+from app.services.chunk_planner import ChunkPlanner
+from app.services.client_pool import ClientPool, PooledClients
+from app.services.concurrency_controller import AdaptiveConcurrency
+from app.services.hedging import HedgePolicy
+from app.services.llm_provider import LLMProvider, get_provider
+from app.services.llm_router import LLMRouter, Route
+from app.services.prompt_template import PERSONA_FIRST, PROMPT_LAYOUTS, CompiledPrompt
+from app.services.rate_limiter import RateLimiter, Reservation
+from app.services.response_schema import (
+    ResponseValidator,
+    build_packed_response_schema,
+    json_schema_format,
+)
+from app.services.response_cache import ResponseCache
+from app.services.retry import CircuitBreaker, CircuitOpenError, RetryPolicy, get_circuit_breaker
+from app.services.stream_parser import IncrementalJSONParser, MalformedStreamError
 
 
 class LLMExecutor:
@@ -13,13 +34,25 @@ class LLMExecutor:
     Execute participant simulations using OpenAI LLM API
     """
 
-    # Default model pricing (cost per 1K tokens)
+    # Default model pricing (cost per 1K tokens); cached_input applies to
+    # prompt tokens served from the provider's prompt-prefix cache
     DEFAULT_PRICING = {
-        "gpt-4o": {"input": 0.005, "output": 0.005},
-        "gpt-4-turbo": {"input": 0.01, "output": 0.03},
-        "gpt-3.5-turbo": {"input": 0.0005, "output": 0.0015},
+        "gpt-4o": {"input": 0.005, "output": 0.005, "cached_input": 0.0025},
+        "gpt-4-turbo": {"input": 0.01, "output": 0.03, "cached_input": 0.01},
+        "gpt-3.5-turbo": {"input": 0.0005, "output": 0.0015, "cached_input": 0.0005},
     }
 
+    # Cached input price as a fraction of input price for models without explicit pricing
+    DEFAULT_CACHED_INPUT_RATIO = 0.5
+
+    # Result fields summed when merging the sub-requests of a chunked questionnaire
+    USAGE_FIELDS = ("cost", "prompt_tokens", "completion_tokens", "total_tokens", "cached_tokens")
+
+    SYSTEM_MESSAGE = (
+        "You are a realistic participant simulator for psychology research. "
+        "Respond in character based on the given profile."
+    )
+
     def __init__(
         self,
         api_key: str,
@@ -28,34 +61,183 @@ class LLMExecutor:
         max_tokens: int = 2000,
         input_cost_per_1k: float | None = None,
         output_cost_per_1k: float | None = None,
+        cached_input_cost_per_1k: float | None = None,
+        rate_limiter: RateLimiter | None = None,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        seed: int | None = None,
+        response_cache: ResponseCache | None = None,
+        cache_bypass: bool = False,
+        prompt_layout: str = PERSONA_FIRST,
+        streaming: bool = False,
+        max_questions_per_chunk: int | None = None,
+        structured_output: bool = False,
+        repair_attempts: int = 0,
+        provider: LLMProvider | None = None,
+        client_pool: ClientPool | None = None,
+        router: LLMRouter | None = None,
+        hedge_policy: HedgePolicy | None = None,
+        budget: BudgetGuard | None = None,
+        concurrency_controller: AdaptiveConcurrency | None = None,
+        cassette: Cassette | None = None,
     ):
         """
         Initialize LLM Executor
 
         Args:
-            api_key: OpenAI API key
+            api_key: Provider API key (may be empty for providers that need none)
             model: Model name (default: gpt-4o)
             temperature: Sampling temperature (default: 0.8 for realistic responses)
             max_tokens: Maximum tokens in response (default: 2000)
             input_cost_per_1k: Custom input cost per 1K tokens
             output_cost_per_1k: Custom output cost per 1K tokens
+            cached_input_cost_per_1k: Custom cost per 1K prompt tokens served from the
+                provider's prompt cache
+            rate_limiter: Shared RPM/TPM limiter to pace API calls (default: unpaced)
+            retry_policy: Retry policy for transient API errors (default: RetryPolicy())
+            circuit_breaker: Circuit breaker for the model (default: shared per-model breaker)
+            seed: Sampling seed sent to the API for reproducible completions
+            response_cache: Cache of completions keyed by prompt hash (default: no caching)
+            cache_bypass: Skip cache lookups but still store fresh completions
+            prompt_layout: PERSONA_FIRST (default) or QUESTIONNAIRE_FIRST
+            streaming: Stream completions and parse answers as they arrive
+            max_questions_per_chunk: Optional cap on questions per sub-request; long
+                questionnaires are always split so each block fits max_tokens
+            structured_output: Request schema-constrained JSON built from the questions
+                and validate answers against it
+            repair_attempts: Follow-up requests per participant that re-ask only the
+                questions left missing or invalid (default: 0, no repair)
+            provider: Chat completion backend (default: OpenAI)
+            client_pool: Shared pool to take API clients from (default: clients owned
+                by this executor). Pooled async clients must be used on the pool's
+                event loop.
+            router: Spread calls over several API keys and model deployments; each
+                route brings its own clients, rate limiter and circuit breaker
+                (default: every call uses this executor's own)
+            hedge_policy: Send a duplicate of non-streamed async calls that run
+                past a latency percentile (default: no hedging)
+            budget: Spending limit every call reserves its worst-case cost against
+                (default: unlimited)
+            concurrency_controller: Adaptive in-flight limit fed with the latency and
+                429s of every call (default: fixed concurrency)
+            cassette: Record every call to, or replay every call from, an on-disk
+                cassette (default: calls go to the provider unrecorded)
         """
-        self.api_key = api_key
+        self.provider = provider or get_provider()
+        self.api_key = self.provider.resolve_api_key(api_key)
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or get_circuit_breaker(
+            model, self.provider.base_url
+        )
+        self.seed = seed
+        self.response_cache = response_cache
+        self.cache_bypass = cache_bypass
+        if prompt_layout not in PROMPT_LAYOUTS:
+            raise ValueError(f"Unknown prompt layout: {prompt_layout}")
+        self.prompt_layout = prompt_layout
+        self.streaming = streaming
+        self.max_questions_per_chunk = max_questions_per_chunk
+        self.structured_output = structured_output
+        self.repair_attempts = repair_attempts
+        self.router = router
+        self.hedge_policy = hedge_policy
+        self.budget = budget
+        self.concurrency_controller = concurrency_controller
+        self.cassette = cassette
+        self._compiled_prompt: CompiledPrompt | None = None
+        self._compiled_chunks: tuple[list[dict[str, Any]], int, list[CompiledPrompt]] | None = None
 
         # Set pricing
         if model in self.DEFAULT_PRICING:
             self.input_cost_per_1k = input_cost_per_1k or self.DEFAULT_PRICING[model]["input"]
             self.output_cost_per_1k = output_cost_per_1k or self.DEFAULT_PRICING[model]["output"]
+            self.cached_input_cost_per_1k = (
+                cached_input_cost_per_1k or self.DEFAULT_PRICING[model]["cached_input"]
+            )
         else:
             # Use custom pricing or defaults
             self.input_cost_per_1k = input_cost_per_1k or 0.005
             self.output_cost_per_1k = output_cost_per_1k or 0.005
+            self.cached_input_cost_per_1k = (
+                cached_input_cost_per_1k
+                or self.input_cost_per_1k * self.DEFAULT_CACHED_INPUT_RATIO
+            )
+
+        # Initialize OpenAI clients (sync for single calls, async for the execution engine).
+        # Client-side retries are disabled; retry_policy owns retries.
+        self._lease: tuple[ClientPool, PooledClients] | None = None
+        if client_pool is not None:
+            pooled = client_pool.acquire(self.api_key, self.provider.base_url)
+            self._lease = (client_pool, pooled)
+            self.client = pooled.client
+            self.async_client = pooled.async_client
+        else:
+            self.client = OpenAI(
+                api_key=self.api_key, base_url=self.provider.base_url, max_retries=0
+            )
+            self.async_client = AsyncOpenAI(
+                api_key=self.api_key, base_url=self.provider.base_url, max_retries=0
+            )
+
+    def close(self) -> None:
+        """Release pooled clients so the pool may close them once idle"""
+        if self._lease is not None:
+            client_pool, pooled = self._lease
+            client_pool.release(pooled)
+            self._lease = None
+
+    def compile_prompt(self, questions: list[dict[str, Any]]) -> CompiledPrompt:
+        """
+        Get the compiled questionnaire prompt for a list of questions
+
+        The compiled prompt is reused for as long as the same questions list is
+        passed in, so the questionnaire is rendered once per experiment run.
+
+        Args:
+            questions: List of question dicts
+
+        Returns:
+            CompiledPrompt for the questions
+        """
+        compiled = self._compiled_prompt
+        if compiled is None or compiled.questions is not questions:
+            compiled = CompiledPrompt(questions, layout=self.prompt_layout)
+            self._compiled_prompt = compiled
+        return compiled
+
+    def compile_chunks(
+        self, questions: list[dict[str, Any]], personas: int = 1
+    ) -> list[CompiledPrompt]:
+        """
+        Get one compiled prompt per block of the chunked questionnaire
+
+        Questions are bin-packed by estimated answer length so that each block's
+        answers fit in max_tokens. Like compile_prompt, the plan is reused for as
+        long as the same questions list is passed in.
+
+        Args:
+            questions: List of question dicts
+            personas: Participants answering in each request; their answers share
+                the output budget
 
-        # Initialize OpenAI client
-        self.client = OpenAI(api_key=api_key)
+        Returns:
+            List of CompiledPrompt, one per sub-request
+        """
+        compiled = self._compiled_chunks
+        if compiled is None or compiled[0] is not questions or compiled[1] != personas:
+            planner = ChunkPlanner(self.max_tokens // personas, self.max_questions_per_chunk)
+            chunks = planner.plan(questions)
+            if len(chunks) == 1:
+                prompts = [self.compile_prompt(questions)]
+            else:
+                prompts = [CompiledPrompt(chunk, layout=self.prompt_layout) for chunk in chunks]
+            compiled = (questions, personas, prompts)
+            self._compiled_chunks = compiled
+        return compiled[2]
 
     def _build_prompt(self, profile: dict[str, Any], questions: list[dict[str, Any]]) -> str:
         """
@@ -68,93 +250,30 @@ class LLMExecutor:
         Returns:
             Formatted prompt string
         """
-        # Extract profile information
-        participant_number = profile.get("participant_number", "Unknown")
-        age = profile.get("age", "Unknown")
-        gender = profile.get("gender", "Unknown")
-        country = profile.get("country", "Unknown")
-        education = profile.get("education", "Unknown")
-        language = profile.get("language", "Unknown")
-        life_stage = profile.get("life_stage", "Unknown")
-
-        # Build persona description
-        persona = f"""You are simulating Participant #{participant_number}, with the following profile:
-
-- Age: {age} years old
-- Gender: {gender}
-- Country: {country}
-- Native Language: {language}
-- Education Level: {education}
-- Life Stage: {life_stage}
-
-IMPORTANT: Respond in character as this participant. Consider their age, education, cultural background, and life stage when formulating your answers. Be realistic and nuanced in your responses."""
-
-        # Build questions section
-        questions_text = "\n\nPlease answer the following questions:\n\n"
-        for q in questions:
-            question_id = q.get("question_id", "")
-            question_text = q.get("question_text", "")
-            question_type = q.get("question_type", "")
-            options = q.get("options", {})
-
-            questions_text += f"Question ID: {question_id}\n"
-            questions_text += f"{question_text}\n"
-
-            # Add options context based on question type
-            if question_type == "multiple_choice" and "choices" in options:
-                questions_text += f"Options: {', '.join(options['choices'])}\n"
-            elif question_type == "likert_scale":
-                min_val = options.get("min", 1)
-                max_val = options.get("max", 5)
-                labels = options.get("labels", [])
-                if labels:
-                    questions_text += f"Scale: {min_val} ({labels[0]}) to {max_val} ({labels[-1]})\n"
-                else:
-                    questions_text += f"Scale: {min_val} to {max_val}\n"
-            elif question_type == "yes_no":
-                questions_text += "Please respond with either 'Yes' or 'No'\n"
-            elif question_type == "open_ended":
-                questions_text += "Provide a detailed, thoughtful response\n"
-
-            questions_text += "\n"
-
-        # Build response format instructions
-        format_instructions = """
-Respond in JSON format with the following structure:
-```json
-{
-    "question_id_1": {
-        "response": "your answer here",
-        "confidence": "high|medium|low"
-    },
-    "question_id_2": {
-        "response": "your answer here",
-        "confidence": "high|medium|low"
-    }
-}
-```
-
-Make sure to include ALL questions in your response. The "response" field should contain your actual answer, and "confidence" indicates how confident you are in your answer."""
+        return self.compile_prompt(questions).render(profile)
 
-        # Combine all sections
-        prompt = f"{persona}\n{questions_text}{format_instructions}"
-
-        return prompt
-
-    def _parse_response(self, raw_response: str, question_ids: list[str]) -> dict[str, Any]:
+    def _extract_json(self, raw_response: str) -> dict[str, Any]:
         """
-        Parse LLM response into structured data
+        Extract the JSON object from an LLM response
 
         Args:
             raw_response: Raw response string from LLM
-            question_ids: List of expected question IDs
 
         Returns:
-            Parsed response dict
+            Decoded JSON object
 
         Raises:
-            ValueError: If response cannot be parsed as JSON
+            ValueError: If response cannot be parsed as a JSON object
         """
+        if self.structured_output:
+            # Schema-constrained output is bare JSON; skip the markdown extraction
+            try:
+                parsed = json.loads(raw_response)
+            except json.JSONDecodeError:
+                parsed = None
+            if isinstance(parsed, dict):
+                return parsed
+
         try:
             # Try to extract JSON from markdown code blocks
             json_match = re.search(r"```json\s*(.*?)\s*```", raw_response, re.DOTALL)
@@ -176,30 +295,886 @@ Make sure to include ALL questions in your response. The "response" field should
             if not isinstance(parsed, dict):
                 raise ValueError("Response is not a JSON object")
 
-            # Filter to only requested questions
-            filtered_responses = {
-                qid: parsed[qid] for qid in question_ids if qid in parsed
-            }
-
-            return filtered_responses
+            return parsed
 
         except (json.JSONDecodeError, ValueError) as e:
             raise ValueError(f"Failed to parse LLM response: {str(e)}")
 
-    def _calculate_cost(self, prompt_tokens: int, completion_tokens: int) -> float:
+    def _parse_response(self, raw_response: str, question_ids: list[str]) -> dict[str, Any]:
+        """
+        Parse LLM response into structured data
+
+        Args:
+            raw_response: Raw response string from LLM
+            question_ids: List of expected question IDs
+
+        Returns:
+            Parsed response dict
+
+        Raises:
+            ValueError: If response cannot be parsed as JSON
+        """
+        parsed = self._extract_json(raw_response)
+
+        # Filter to only requested questions
+        return {qid: parsed[qid] for qid in question_ids if qid in parsed}
+
+    def _parse_packed_response(
+        self, raw_response: str, profiles: list[dict[str, Any]], question_ids: list[str]
+    ) -> list[dict[str, Any] | None]:
+        """
+        Split a multi-persona response into per-participant responses
+
+        Args:
+            raw_response: Raw response keyed by participant number
+            profiles: Participant profiles packed into the request
+            question_ids: List of expected question IDs
+
+        Returns:
+            Parsed response dict per profile, or None for participants missing
+            from the response
+
+        Raises:
+            ValueError: If response cannot be parsed as JSON
+        """
+        parsed = self._extract_json(raw_response)
+
+        responses = []
+        for profile in profiles:
+            answers = parsed.get(str(profile.get("participant_number")))
+            if not isinstance(answers, dict):
+                responses.append(None)
+                continue
+            responses.append({qid: answers[qid] for qid in question_ids if qid in answers})
+        return responses
+
+    def _calculate_cost(
+        self, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0
+    ) -> float:
         """
         Calculate token cost
 
         Args:
-            prompt_tokens: Number of input tokens
+            prompt_tokens: Number of input tokens (including cached ones)
             completion_tokens: Number of output tokens
+            cached_tokens: Number of input tokens served from the provider's prompt cache
 
         Returns:
             Cost in USD
         """
-        input_cost = (prompt_tokens * self.input_cost_per_1k) / 1000
+        uncached_tokens = prompt_tokens - cached_tokens
+        input_cost = (uncached_tokens * self.input_cost_per_1k) / 1000
+        cached_input_cost = (cached_tokens * self.cached_input_cost_per_1k) / 1000
         output_cost = (completion_tokens * self.output_cost_per_1k) / 1000
-        return input_cost + output_cost
+        return input_cost + cached_input_cost + output_cost
+
+    def _usage_cost(self, usage: dict[str, int]) -> float:
+        """Cost of a usage dict (see _usage_from_response)"""
+        return self._calculate_cost(
+            usage["prompt_tokens"], usage["completion_tokens"], usage.get("cached_tokens", 0)
+        )
+
+    def _estimate_cost(self, messages: list[dict[str, str]]) -> float:
+        """
+        Estimate the worst-case cost of a call, for budget reservations
+
+        Args:
+            messages: Chat messages to send
+
+        Returns:
+            Cost in USD of the estimated prompt plus the full completion budget
+        """
+        prompt_tokens = self._estimate_tokens(messages) - self.max_tokens
+        return self._calculate_cost(prompt_tokens, self.max_tokens)
+
+    def _build_messages(self, prompt: str) -> list[dict[str, str]]:
+        """
+        Build chat messages for a prompt
+
+        Args:
+            prompt: Participant prompt from _build_prompt
+
+        Returns:
+            List of chat messages
+        """
+        return [
+            {"role": "system", "content": self.SYSTEM_MESSAGE},
+            {"role": "user", "content": prompt},
+        ]
+
+    def _estimate_tokens(self, messages: list[dict[str, str]]) -> int:
+        """
+        Estimate the tokens a call may consume, for rate-limit reservations
+
+        Uses ~4 characters per token for the prompt plus the full completion budget.
+
+        Args:
+            messages: Chat messages to send
+
+        Returns:
+            Estimated prompt + completion tokens
+        """
+        prompt_chars = sum(len(m["content"]) for m in messages)
+        return prompt_chars // 4 + self.max_tokens
+
+    @staticmethod
+    def _usage_from_response(response: Any) -> dict[str, int]:
+        """
+        Extract token usage from a chat completion
+
+        Args:
+            response: Chat completion returned by the OpenAI client
+
+        Returns:
+            Dict with prompt_tokens, completion_tokens, total_tokens and cached_tokens
+        """
+        # Providers without prompt caching omit prompt_tokens_details
+        details = getattr(response.usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", None)
+        return {
+            "prompt_tokens": response.usage.prompt_tokens,
+            "completion_tokens": response.usage.completion_tokens,
+            "total_tokens": response.usage.total_tokens,
+            "cached_tokens": cached_tokens if isinstance(cached_tokens, int) else 0,
+        }
+
+    def _build_result(
+        self,
+        raw_response: str,
+        usage: dict[str, int],
+        question_ids: list[str],
+        cached: bool = False,
+        validator: ResponseValidator | None = None,
+    ) -> dict[str, Any]:
+        """
+        Convert completion content and usage into a participant result
+
+        Args:
+            raw_response: Completion content
+            usage: Token usage dict (see _usage_from_response)
+            question_ids: List of expected question IDs
+            cached: Whether the completion was served from the response cache
+            validator: Drops answers that fail validation, listing them under
+                `invalid` in the result
+
+        Returns:
+            Participant result dict (see execute_participant)
+
+        Raises:
+            ValueError: If response parsing fails
+        """
+        responses = self._parse_response(raw_response, question_ids)
+        invalid = {}
+        if validator:
+            responses, invalid = validator.validate(responses)
+
+        result = self._result_from_responses(responses, usage, cached)
+        if invalid:
+            result["invalid"] = invalid
+        return result
+
+    def _result_from_responses(
+        self, responses: dict[str, Any], usage: dict[str, int], cached: bool = False
+    ) -> dict[str, Any]:
+        """
+        Combine parsed responses with token usage and cost
+
+        Args:
+            responses: Dict of question_id to response data
+            usage: Token usage dict (see _usage_from_response)
+            cached: Whether the completion was served from the response cache
+
+        Returns:
+            Participant result dict (see execute_participant)
+        """
+        # Cache hits are free: report no billed tokens
+        if cached:
+            return {
+                "responses": responses,
+                "cost": 0.0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "total_tokens": 0,
+                "cached_tokens": 0,
+                "cached": True,
+            }
+
+        # Calculate cost
+        cached_tokens = usage.get("cached_tokens", 0)
+        cost = self._calculate_cost(
+            usage["prompt_tokens"], usage["completion_tokens"], cached_tokens
+        )
+
+        return {
+            "responses": responses,
+            "cost": cost,
+            "prompt_tokens": usage["prompt_tokens"],
+            "completion_tokens": usage["completion_tokens"],
+            "total_tokens": usage["total_tokens"],
+            "cached_tokens": cached_tokens,
+            "cached": False,
+        }
+
+    def _cache_key(self, prompt: str) -> str:
+        """
+        Build the response cache key for a prompt
+
+        Args:
+            prompt: Participant prompt from _build_prompt
+
+        Returns:
+            Cache key
+        """
+        return ResponseCache.make_key(
+            self.model, self.temperature, self.seed, self.SYSTEM_MESSAGE, prompt
+        )
+
+    def _response_format(
+        self, compiled: CompiledPrompt, profiles: list[dict[str, Any]] | None = None
+    ) -> dict[str, Any] | None:
+        """
+        Build the structured-output response_format for a block of questions
+
+        Args:
+            compiled: Compiled prompt for one block of questions
+            profiles: Participants packed into the request, if any
+
+        Returns:
+            response_format value, or None when structured output is disabled or
+            the provider does not support it (answers are still validated)
+        """
+        if not self.structured_output or not self.provider.supports_structured_output:
+            return None
+        schema = compiled.response_schema
+        if profiles is not None:
+            schema = build_packed_response_schema(
+                schema, [p.get("participant_number") for p in profiles]
+            )
+        return json_schema_format(schema)
+
+    def _validator(self, compiled: CompiledPrompt) -> ResponseValidator | None:
+        """Get the answer validator for a block of questions when structured output is on"""
+        return compiled.validator if self.structured_output else None
+
+    def _completion_kwargs(
+        self,
+        messages: list[dict[str, str]],
+        response_format: dict[str, Any] | None = None,
+        model: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        Build keyword arguments for chat.completions.create
+
+        Args:
+            messages: Chat messages to send
+            response_format: Optional structured-output format (see _response_format)
+            model: Deployment to call (default: the executor's model)
+
+        Returns:
+            Keyword arguments dict
+        """
+        kwargs = {
+            "model": model or self.model,
+            "messages": messages,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+        }
+        if self.seed is not None and self.provider.supports_seed:
+            kwargs["seed"] = self.seed
+        if response_format is not None:
+            kwargs["response_format"] = response_format
+        return kwargs
+
+    def _choose_route(self) -> Route:
+        """
+        Pick the key and deployment for the next call
+
+        Returns:
+            Route chosen by the router, or this executor's own clients, limiter
+            and breaker when no router is configured
+        """
+        if self.router is not None:
+            return self.router.choose()
+        return Route(
+            model=self.model,
+            client=self.client,
+            async_client=self.async_client,
+            circuit_breaker=self.circuit_breaker,
+            rate_limiter=self.rate_limiter,
+        )
+
+    def _record_outcome(
+        self, route: Route, error: Exception | None, latency: float | None = None
+    ) -> bool:
+        """
+        Report a call outcome to the route's circuit breaker, the router and
+        the concurrency controller
+
+        Args:
+            route: Route the call was sent to
+            error: Exception raised by the call, or None on success
+            latency: Seconds the call took (None if it was never sent)
+
+        Returns:
+            True if the error is transient and may be retried
+        """
+        if latency is not None:
+            if self.router is not None:
+                self.router.record(route, latency, error)
+            if self.concurrency_controller is not None:
+                self.concurrency_controller.record(latency, error)
+        if error is None:
+            route.circuit_breaker.record_success()
+            return False
+        if isinstance(error, CircuitOpenError):
+            # Refused by the breaker itself: counting it as a failure would
+            # restart the cooldown and free the half-open probe slot
+            return True
+        if self.retry_policy.is_retryable(error):
+            route.circuit_breaker.record_failure()
+            return True
+        route.circuit_breaker.record_neutral()
+        return False
+
+    def _send(self, route: Route, kwargs: dict[str, Any]) -> Any:
+        """Send one completion request, through the cassette when one is set"""
+        if self.cassette is not None:
+            return self.cassette.create(route.client, kwargs, self.model)
+        return route.client.chat.completions.create(**kwargs)
+
+    async def _send_async(self, route: Route, kwargs: dict[str, Any]) -> Any:
+        """Async counterpart of _send"""
+        if self.cassette is not None:
+            return await self.cassette.create_async(route.async_client, kwargs, self.model)
+        return await route.async_client.chat.completions.create(**kwargs)
+
+    def _create_completion(
+        self, messages: list[dict[str, str]], response_format: dict[str, Any] | None = None
+    ) -> Any:
+        """
+        Call chat.completions.create with pacing, retries and circuit breaking
+
+        Each attempt picks its route afresh, so a retry after a 429 can go to
+        another key or deployment.
+
+        Args:
+            messages: Chat messages to send
+            response_format: Optional structured-output format
+
+        Returns:
+            Chat completion
+
+        Raises:
+            Exception: The last error once retries are exhausted or on a permanent error
+        """
+        attempt = 0
+        while True:
+            route = self._choose_route()
+            reservation = None
+            budget_reservation = None
+            actual_tokens = 0
+            actual_cost = 0.0
+            sent_at = None
+            try:
+                route.circuit_breaker.before_call()
+                if self.budget is not None:
+                    budget_reservation = self.budget.reserve(self._estimate_cost(messages))
+                if route.rate_limiter:
+                    reservation = route.rate_limiter.acquire(self._estimate_tokens(messages))
+                sent_at = time.monotonic()
+                response = self._send(
+                    route, self._completion_kwargs(messages, response_format, route.model)
+                )
+                actual_tokens = response.usage.total_tokens
+                actual_cost = self._usage_cost(self._usage_from_response(response))
+                self._record_outcome(route, None, time.monotonic() - sent_at)
+                return response
+            except Exception as e:
+                latency = time.monotonic() - sent_at if sent_at is not None else None
+                if (
+                    not self._record_outcome(route, e, latency)
+                    or attempt >= self.retry_policy.max_retries
+                ):
+                    raise
+                delay = self.retry_policy.delay(attempt, e)
+            finally:
+                # Return unused reserved tokens and budget
+                if reservation:
+                    route.rate_limiter.settle(reservation, actual_tokens)
+                if budget_reservation:
+                    self.budget.settle(budget_reservation, actual_cost)
+            time.sleep(delay)
+            attempt += 1
+
+    async def _create_completion_async(
+        self,
+        messages: list[dict[str, str]],
+        stream: bool = False,
+        response_format: dict[str, Any] | None = None,
+        in_flight: asyncio.Event | None = None,
+    ) -> Any:
+        """
+        Async counterpart of _create_completion
+
+        Retries only cover opening the request; a stream that breaks midway is
+        handled by the caller.
+
+        Args:
+            messages: Chat messages to send
+            stream: Request a streamed completion
+            response_format: Optional structured-output format
+            in_flight: Set while a request is on its way to the provider, so a
+                caller cancelling the call knows whether it will be billed
+
+        Returns:
+            Chat completion, or if `stream` is set a tuple of (async chunk
+            stream, function settling the rate-limit reservation with the
+            stream's total tokens once its usage is known)
+
+        Raises:
+            Exception: The last error once retries are exhausted or on a permanent error
+        """
+        attempt = 0
+        while True:
+            route = self._choose_route()
+            reservation = None
+            budget_reservation = None
+            actual_tokens = 0
+            actual_cost = 0.0
+            sent_at = None
+            settles_later = False
+            try:
+                route.circuit_breaker.before_call()
+                if self.budget is not None:
+                    budget_reservation = await self.budget.reserve_async(
+                        self._estimate_cost(messages)
+                    )
+                if route.rate_limiter:
+                    reservation = await route.rate_limiter.acquire_async(
+                        self._estimate_tokens(messages)
+                    )
+                kwargs = self._completion_kwargs(messages, response_format, route.model)
+                if stream:
+                    kwargs["stream"] = True
+                    if self.provider.supports_stream_usage:
+                        kwargs["stream_options"] = {"include_usage": True}
+                sent_at = time.monotonic()
+                if in_flight is not None:
+                    in_flight.set()
+                response = await self._send_async(route, kwargs)
+                if stream:
+                    # Streamed usage arrives at the end: the caller settles the
+                    # rate limiter with it, and corrects the budget charged here
+                    actual_cost = budget_reservation.amount if budget_reservation else 0.0
+                    settles_later = True
+                else:
+                    actual_tokens = response.usage.total_tokens
+                    actual_cost = self._usage_cost(self._usage_from_response(response))
+                # For streams this is time to first byte
+                self._record_outcome(route, None, time.monotonic() - sent_at)
+                if stream:
+                    return response, self._stream_settler(route, reservation)
+                return response
+            except asyncio.CancelledError:
+                # A hedged call lost its race; the provider still counts the
+                # tokens of a request already sent
+                route.circuit_breaker.record_neutral()
+                if sent_at is not None and reservation:
+                    actual_tokens = reservation.tokens
+                raise
+            except Exception as e:
+                if in_flight is not None:
+                    in_flight.clear()
+                latency = time.monotonic() - sent_at if sent_at is not None else None
+                if (
+                    not self._record_outcome(route, e, latency)
+                    or attempt >= self.retry_policy.max_retries
+                ):
+                    raise
+                delay = self.retry_policy.delay(attempt, e)
+            finally:
+                if reservation and not settles_later:
+                    route.rate_limiter.settle(reservation, actual_tokens)
+                if budget_reservation:
+                    self.budget.settle(budget_reservation, actual_cost)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    @staticmethod
+    def _stream_settler(route: Route, reservation: Reservation | None) -> Callable[[int], None]:
+        """
+        Build the function settling a stream's rate-limit reservation
+
+        Args:
+            route: Route the stream was opened on
+            reservation: Rate-limit reservation of the stream, if any
+
+        Returns:
+            Function taking the stream's total tokens
+        """
+
+        def settle(total_tokens: int) -> None:
+            if reservation:
+                route.rate_limiter.settle(reservation, total_tokens)
+
+        return settle
+
+    async def _hedged_completion(
+        self, messages: list[dict[str, str]], response_format: dict[str, Any] | None = None
+    ) -> tuple[Any, float]:
+        """
+        Send a non-streamed completion, racing a duplicate if it runs long
+
+        When the call outlasts the hedge policy's latency percentile and the
+        hedge budget allows, a duplicate is sent; the first successful
+        completion wins and the other call is cancelled. A cancelled call
+        reports no usage, so one whose request was already sent is charged the
+        winner's usage as an upper bound; one still waiting to be sent (on the
+        rate limiter, or between retries) costs nothing.
+
+        Args:
+            messages: Chat messages to send
+            response_format: Optional structured-output format
+
+        Returns:
+            Tuple of (winning completion, cost in USD of the losing call)
+
+        Raises:
+            Exception: The first error if every call failed
+        """
+        policy = self.hedge_policy
+        if policy is None:
+            return await self._create_completion_async(messages, response_format=response_format), 0.0
+
+        policy.start_request()
+        started = {}
+        in_flight = {}
+        pending = set()
+
+        def send() -> None:
+            sent = asyncio.Event()
+            task = asyncio.ensure_future(
+                self._create_completion_async(
+                    messages, response_format=response_format, in_flight=sent
+                )
+            )
+            started[task] = time.monotonic()
+            in_flight[task] = sent
+            pending.add(task)
+
+        send()
+        (primary,) = pending
+        try:
+            done, _ = await asyncio.wait(pending, timeout=policy.delay())
+            if done or not policy.try_hedge():
+                response = await primary
+                policy.observe(time.monotonic() - started[primary])
+                return response, 0.0
+
+            send()
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                succeeded = [task for task in done if task.exception() is None]
+                if succeeded:
+                    winner = succeeded[0]
+                    break
+                error = error or next(iter(done)).exception()
+            else:
+                raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+        response = winner.result()
+        policy.observe(time.monotonic() - started[winner])
+        (loser,) = [task for task in started if task is not winner]
+        if loser in pending and in_flight[loser].is_set():
+            loser_usage = self._usage_from_response(response)
+        elif loser in pending:
+            # Cancelled before its request was sent
+            loser_usage = None
+        elif loser.exception() is None:
+            loser_usage = self._usage_from_response(loser.result())
+        else:
+            loser_usage = None
+        loser_cost = self._usage_cost(loser_usage) if loser_usage else 0.0
+        if loser in pending and self.budget is not None:
+            # Cancelled calls settle their reservation at zero
+            self.budget.charge(loser_cost)
+        policy.record_hedge(winner is not primary, loser_cost)
+        return response, loser_cost
+
+    async def _stream_result(
+        self,
+        messages: list[dict[str, str]],
+        question_ids: list[str],
+        on_answer: Callable[[str, Any], None] | None = None,
+        response_format: dict[str, Any] | None = None,
+        validator: ResponseValidator | None = None,
+    ) -> tuple[dict[str, Any], str, dict[str, int]]:
+        """
+        Stream a completion and parse answers as soon as each one is complete
+
+        The stream is abandoned as soon as it can no longer be valid JSON. If it
+        breaks after some answers arrived, those answers are kept and the
+        result is marked partial.
+
+        Args:
+            messages: Chat messages to send
+            question_ids: List of expected question IDs
+            on_answer: Called with (question_id, answer) as each answer completes
+            response_format: Optional structured-output format
+            validator: Drops answers that fail validation before they are reported
+
+        Returns:
+            Tuple of (participant result, raw response, usage)
+
+        Raises:
+            ValueError: If no answer could be parsed
+            Exception: If the stream failed before any answer arrived
+        """
+        stream, settle_tokens = await self._create_completion_async(
+            messages, stream=True, response_format=response_format
+        )
+        parser = IncrementalJSONParser()
+        wanted = set(question_ids)
+        responses: dict[str, Any] = {}
+        invalid: dict[str, str] = {}
+        chunks: list[str] = []
+        usage = None
+        error: Exception | None = None
+
+        try:
+            async for chunk in stream:
+                if chunk.usage:
+                    usage = self._usage_from_response(chunk)
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                content = chunk.choices[0].delta.content
+                chunks.append(content)
+                for question_id, answer in parser.feed(content):
+                    if question_id not in wanted:
+                        continue
+                    problem = validator.check(question_id, answer) if validator else None
+                    if problem:
+                        invalid[question_id] = problem
+                    else:
+                        responses[question_id] = answer
+                        if on_answer:
+                            on_answer(question_id, answer)
+        except MalformedStreamError as e:
+            # Stop paying for tokens that cannot be parsed
+            error = e
+            await stream.close()
+        except Exception as e:
+            error = e
+
+        raw_response = "".join(chunks)
+        if error is None and not parser.done:
+            error = ValueError("Stream ended before the JSON object was complete")
+
+        if usage is None:
+            # The final usage chunk never arrived; estimate from the text
+            prompt_tokens = sum(len(m["content"]) for m in messages) // 4
+            completion_tokens = len(raw_response) // 4
+            usage = {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "cached_tokens": 0,
+            }
+        settle_tokens(usage["total_tokens"])
+        if self.budget is not None:
+            # The stream was charged its estimate when it opened
+            self.budget.charge(self._usage_cost(usage) - self._estimate_cost(messages))
+
+        if not responses and error is not None:
+            if isinstance(error, ValueError):
+                raise ValueError(f"Failed to parse LLM response: {str(error)}")
+            raise error
+
+        result = self._result_from_responses(responses, usage)
+        if invalid:
+            result["invalid"] = invalid
+        if error is not None:
+            result["partial"] = True
+            result["error"] = str(error)
+        return result, raw_response, usage
+
+    def _merge_chunk_outcomes(self, outcomes: list[dict[str, Any] | Exception]) -> dict[str, Any]:
+        """
+        Merge the results of a participant's sub-requests
+
+        Args:
+            outcomes: Result dict or raised exception per block, in block order
+
+        Returns:
+            Combined participant result; marked partial with the block errors if
+            some blocks failed
+
+        Raises:
+            Exception: The first block's error if every block failed
+        """
+        results = [o for o in outcomes if not isinstance(o, Exception)]
+        errors = [o for o in outcomes if isinstance(o, Exception)]
+        if not results:
+            raise errors[0]
+        if len(outcomes) == 1:
+            return results[0]
+
+        merged = {
+            "responses": {},
+            "cost": 0.0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_tokens": 0,
+            "cached_tokens": 0,
+            "cached": all(r["cached"] for r in results) and not errors,
+        }
+        messages = [str(e) for e in errors]
+        invalid = {}
+        for result in results:
+            merged["responses"].update(result["responses"])
+            for field in self.USAGE_FIELDS:
+                merged[field] += result[field]
+            if result.get("partial"):
+                messages.append(result["error"])
+            invalid.update(result.get("invalid", {}))
+
+        if invalid:
+            merged["invalid"] = invalid
+        if messages:
+            merged["partial"] = True
+            merged["error"] = "; ".join(messages)
+        return merged
+
+    def _repair_prompts(
+        self, questions: list[dict[str, Any]], result: dict[str, Any]
+    ) -> list[CompiledPrompt]:
+        """
+        Compile follow-up prompts for the questions a result is missing
+
+        The follow-up prompts are compiled on their own, leaving the experiment's
+        compiled questionnaire cached for the next participant.
+
+        Args:
+            questions: List of question dicts the participant was asked
+            result: Participant result so far
+
+        Returns:
+            One CompiledPrompt per block of missing or invalid questions (empty
+            when nothing needs repair)
+        """
+        missing = [q for q in questions if q.get("question_id") not in result["responses"]]
+        if not missing:
+            return []
+        chunks = ChunkPlanner(self.max_tokens, self.max_questions_per_chunk).plan(missing)
+        return [CompiledPrompt(chunk, layout=self.prompt_layout) for chunk in chunks]
+
+    def _apply_repair(
+        self,
+        questions: list[dict[str, Any]],
+        result: dict[str, Any],
+        prompts: list[CompiledPrompt],
+        outcomes: list[dict[str, Any] | Exception],
+    ) -> dict[str, Any]:
+        """
+        Merge follow-up answers into a participant result
+
+        Args:
+            questions: List of question dicts the participant was asked
+            result: Participant result before the follow-up
+            prompts: Follow-up prompts from _repair_prompts
+            outcomes: Result dict or raised exception per follow-up prompt
+
+        Returns:
+            Merged result listing the questions answered by the follow-up under
+            `repaired`
+        """
+        merged = self._merge_chunk_outcomes([result, *outcomes])
+        answered = merged["responses"]
+        # Keep answers in questionnaire order
+        merged["responses"] = {
+            q.get("question_id"): answered[q.get("question_id")]
+            for q in questions
+            if q.get("question_id") in answered
+        }
+        requested = [qid for compiled in prompts for qid in compiled.question_ids]
+
+        repaired = result.get("repaired", []) + [qid for qid in requested if qid in answered]
+        if repaired:
+            merged["repaired"] = repaired
+
+        invalid = {
+            qid: error for qid, error in merged.pop("invalid", {}).items() if qid not in answered
+        }
+        if invalid:
+            merged["invalid"] = invalid
+
+        if all(qid in answered for qid in requested):
+            # Every question is answered now; earlier block or stream errors no longer matter
+            merged.pop("partial", None)
+            merged.pop("error", None)
+        return merged
+
+    def _repair(
+        self, profile: dict[str, Any], questions: list[dict[str, Any]], result: dict[str, Any]
+    ) -> dict[str, Any]:
+        """
+        Re-ask the questions a participant left missing or invalid
+
+        Args:
+            profile: Participant profile dict
+            questions: List of question dicts the participant was asked
+            result: Participant result so far
+
+        Returns:
+            Participant result with the follow-up answers merged in
+        """
+        for _ in range(self.repair_attempts):
+            prompts = self._repair_prompts(questions, result)
+            if not prompts:
+                break
+            outcomes = []
+            for compiled in prompts:
+                try:
+                    outcomes.append(self._execute_compiled(profile, compiled))
+                except Exception as e:
+                    outcomes.append(e)
+            result = self._apply_repair(questions, result, prompts, outcomes)
+        return result
+
+    async def _repair_async(
+        self,
+        profile: dict[str, Any],
+        questions: list[dict[str, Any]],
+        result: dict[str, Any],
+        on_answer: Callable[[str, Any], None] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Async counterpart of _repair
+
+        Args:
+            profile: Participant profile dict
+            questions: List of question dicts the participant was asked
+            result: Participant result so far
+            on_answer: Called with (question_id, answer) as each answer completes
+                (streaming mode only)
+
+        Returns:
+            Participant result with the follow-up answers merged in
+        """
+        for _ in range(self.repair_attempts):
+            prompts = self._repair_prompts(questions, result)
+            if not prompts:
+                break
+            outcomes = await asyncio.gather(
+                *(self._execute_compiled_async(profile, compiled, on_answer) for compiled in prompts),
+                return_exceptions=True,
+            )
+            result = self._apply_repair(questions, result, prompts, outcomes)
+        return result
 
     def execute_participant(
         self, profile: dict[str, Any], questions: list[dict[str, Any]]
@@ -207,6 +1182,9 @@ Make sure to include ALL questions in your response. The "response" field should
         """
         Execute a participant simulation
 
+        Questionnaires whose answers would not fit in max_tokens are split into
+        blocks sent as separate requests, and the block results are merged.
+
         Args:
             profile: Participant profile dict
             questions: List of question dicts
@@ -218,56 +1196,352 @@ Make sure to include ALL questions in your response. The "response" field should
                 - prompt_tokens: Input token count
                 - completion_tokens: Output token count
                 - total_tokens: Total token count
+                - cached_tokens: Input tokens served from the provider's prompt cache
+                - cached: Whether the result came from the response cache
+                - partial/error: Set when some blocks of a chunked questionnaire failed
+                - invalid: Answers dropped by validation in structured-output mode,
+                  as question_id to error message
+                - repaired: Question IDs answered by follow-up requests
+
+        Raises:
+            Exception: If API call fails after retries
+            ValueError: If response parsing fails
+        """
+        outcomes = []
+        for compiled in self.compile_chunks(questions):
+            try:
+                outcomes.append(self._execute_compiled(profile, compiled))
+            except Exception as e:
+                outcomes.append(e)
+        return self._repair(profile, questions, self._merge_chunk_outcomes(outcomes))
+
+    def _execute_compiled(self, profile: dict[str, Any], compiled: CompiledPrompt) -> dict[str, Any]:
+        """
+        Execute one sub-request of a participant simulation
+
+        Args:
+            profile: Participant profile dict
+            compiled: Compiled prompt for one block of questions
+
+        Returns:
+            Participant result dict for the block's questions
 
         Raises:
-            Exception: If API call fails
+            Exception: If API call fails after retries
             ValueError: If response parsing fails
         """
         # Build prompt
-        prompt = self._build_prompt(profile, questions)
+        prompt = compiled.render(profile)
 
         # Extract question IDs
-        question_ids = [q.get("question_id") for q in questions]
+        question_ids = compiled.question_ids
+        validator = self._validator(compiled)
+
+        # Serve from the response cache when possible
+        cache_key = None
+        if self.response_cache:
+            cache_key = self._cache_key(prompt)
+            if not self.cache_bypass:
+                cached = self.response_cache.get(cache_key)
+                if cached:
+                    return self._build_result(
+                        cached["content"], cached["usage"], question_ids, cached=True,
+                        validator=validator,
+                    )
 
         try:
             # Call OpenAI API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a realistic participant simulator for psychology research. Respond in character based on the given profile.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=self.temperature,
-                max_tokens=self.max_tokens,
+            response = self._create_completion(
+                self._build_messages(prompt), self._response_format(compiled)
             )
-
-            # Extract response content
             raw_response = response.choices[0].message.content
+            usage = self._usage_from_response(response)
 
-            # Parse response
-            responses = self._parse_response(raw_response, question_ids)
+            result = self._build_result(raw_response, usage, question_ids, validator=validator)
 
-            # Extract token usage
-            prompt_tokens = response.usage.prompt_tokens
-            completion_tokens = response.usage.completion_tokens
-            total_tokens = response.usage.total_tokens
+            # Only cache completions that parsed successfully
+            if cache_key:
+                self.response_cache.set(cache_key, self.model, raw_response, usage)
 
-            # Calculate cost
-            cost = self._calculate_cost(prompt_tokens, completion_tokens)
+            return result
 
-            return {
-                "responses": responses,
-                "cost": cost,
-                "prompt_tokens": prompt_tokens,
-                "completion_tokens": completion_tokens,
-                "total_tokens": total_tokens,
-            }
+        except (ValueError, BudgetExceededError):
+            # Re-raise parsing errors and budget refusals as-is
+            raise
+        except Exception as e:
+            raise Exception(f"LLM execution failed: {str(e)}")
+
+    async def execute_participant_async(
+        self,
+        profile: dict[str, Any],
+        questions: list[dict[str, Any]],
+        on_answer: Callable[[str, Any], None] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Execute a participant simulation without blocking the event loop
+
+        Same contract as execute_participant, but uses the AsyncOpenAI client so
+        many participants can be in flight at once. In streaming mode a result
+        may carry `partial: True` and `error` when the stream broke midway.
+
+        Args:
+            profile: Participant profile dict
+            questions: List of question dicts
+            on_answer: Called with (question_id, answer) as each answer completes
+                (streaming mode only)
+
+        Returns:
+            Participant result dict (see execute_participant)
+
+        Raises:
+            Exception: If API call fails after retries
+            ValueError: If response parsing fails
+        """
+        compiled_chunks = self.compile_chunks(questions)
+        if len(compiled_chunks) == 1:
+            result = await self._execute_compiled_async(profile, compiled_chunks[0], on_answer)
+        else:
+            # Blocks of a long questionnaire run concurrently and are merged
+            outcomes = await asyncio.gather(
+                *(
+                    self._execute_compiled_async(profile, compiled, on_answer)
+                    for compiled in compiled_chunks
+                ),
+                return_exceptions=True,
+            )
+            result = self._merge_chunk_outcomes(outcomes)
+        return await self._repair_async(profile, questions, result, on_answer)
 
-        except ValueError:
-            # Re-raise ValueError as-is for response parsing errors
+    async def _execute_compiled_async(
+        self,
+        profile: dict[str, Any],
+        compiled: CompiledPrompt,
+        on_answer: Callable[[str, Any], None] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Async counterpart of _execute_compiled
+
+        Args:
+            profile: Participant profile dict
+            compiled: Compiled prompt for one block of questions
+            on_answer: Called with (question_id, answer) as each answer completes
+                (streaming mode only)
+
+        Returns:
+            Participant result dict for the block's questions
+
+        Raises:
+            Exception: If API call fails after retries
+            ValueError: If response parsing fails
+        """
+        prompt = compiled.render(profile)
+        question_ids = compiled.question_ids
+        validator = self._validator(compiled)
+
+        cache_key = None
+        if self.response_cache:
+            cache_key = self._cache_key(prompt)
+            if not self.cache_bypass:
+                # Memory hits are served inline; database lookups run off the event loop
+                cached = self.response_cache.get_memory(cache_key) or await asyncio.to_thread(
+                    self.response_cache.get_persistent, cache_key
+                )
+                if cached:
+                    return self._build_result(
+                        cached["content"], cached["usage"], question_ids, cached=True,
+                        validator=validator,
+                    )
+
+        try:
+            messages = self._build_messages(prompt)
+            response_format = self._response_format(compiled)
+            if self.streaming:
+                result, raw_response, usage = await self._stream_result(
+                    messages, question_ids, on_answer, response_format, validator
+                )
+            else:
+                response, loser_cost = await self._hedged_completion(messages, response_format)
+                raw_response = response.choices[0].message.content
+                usage = self._usage_from_response(response)
+                result = self._build_result(raw_response, usage, question_ids, validator=validator)
+                result["cost"] += loser_cost
+
+            if cache_key and not result.get("partial"):
+                await asyncio.to_thread(
+                    self.response_cache.set, cache_key, self.model, raw_response, usage
+                )
+
+            return result
+
+        except (ValueError, BudgetExceededError):
             raise
         except Exception as e:
             raise Exception(f"LLM execution failed: {str(e)}")
+
+    @staticmethod
+    def _split_usage(usage: dict[str, int], count: int) -> list[dict[str, int]]:
+        """
+        Share one request's token usage evenly among participants
+
+        Args:
+            usage: Token usage dict (see _usage_from_response)
+            count: Number of participants sharing the request
+
+        Returns:
+            One usage dict per participant; remainders go to the first participants
+        """
+        shares: list[dict[str, int]] = [{} for _ in range(count)]
+        for field, value in usage.items():
+            base, extra = divmod(value, count)
+            for index, share in enumerate(shares):
+                share[field] = base + (1 if index < extra else 0)
+        return shares
+
+    def _build_pack_results(
+        self,
+        raw_response: str,
+        usage: dict[str, int],
+        profiles: list[dict[str, Any]],
+        question_ids: list[str],
+        cached: bool = False,
+        validator: ResponseValidator | None = None,
+    ) -> list[dict[str, Any] | Exception]:
+        """
+        Convert a multi-persona completion into per-participant results
+
+        Usage and cost are shared among the participants present in the answer.
+
+        Args:
+            raw_response: Completion content keyed by participant number
+            usage: Token usage dict for the whole request
+            profiles: Participant profiles packed into the request
+            question_ids: List of expected question IDs
+            cached: Whether the completion was served from the response cache
+            validator: Drops answers that fail validation (see _build_result)
+
+        Returns:
+            Participant result dict per profile, or a ValueError for participants
+            missing from the answer
+
+        Raises:
+            ValueError: If response parsing fails
+        """
+        parsed = self._parse_packed_response(raw_response, profiles, question_ids)
+        shares = iter(self._split_usage(usage, max(1, sum(r is not None for r in parsed))))
+
+        results: list[dict[str, Any] | Exception] = []
+        for profile, responses in zip(profiles, parsed):
+            if responses is None:
+                results.append(
+                    ValueError(
+                        f"Participant #{profile.get('participant_number')} missing from packed response"
+                    )
+                )
+                continue
+
+            invalid = {}
+            if validator:
+                responses, invalid = validator.validate(responses)
+            result = self._result_from_responses(responses, next(shares), cached)
+            if invalid:
+                result["invalid"] = invalid
+            results.append(result)
+        return results
+
+    async def execute_pack_async(
+        self, profiles: list[dict[str, Any]], questions: list[dict[str, Any]]
+    ) -> list[dict[str, Any] | Exception]:
+        """
+        Execute several participants with one request per questionnaire block
+
+        The questionnaire is sent once for the whole pack and the answer, keyed
+        by participant number, is split back into per-participant results.
+        Streaming is not used for packed requests.
+
+        Args:
+            profiles: Participant profile dicts to pack into each request
+            questions: List of question dicts
+
+        Returns:
+            Participant result dict (see execute_participant) or the exception
+            that failed it, per profile in order
+        """
+        compiled_chunks = self.compile_chunks(questions, personas=len(profiles))
+        chunk_outcomes = await asyncio.gather(
+            *(self._execute_pack_compiled_async(profiles, compiled) for compiled in compiled_chunks)
+        )
+
+        results: list[dict[str, Any] | Exception] = []
+        for index in range(len(profiles)):
+            try:
+                results.append(
+                    self._merge_chunk_outcomes([outcomes[index] for outcomes in chunk_outcomes])
+                )
+            except Exception as e:
+                results.append(e)
+
+        # Participants with gaps are repaired one persona at a time
+        pending = {
+            index: self._repair_async(profile, questions, result)
+            for index, (profile, result) in enumerate(zip(profiles, results))
+            if not isinstance(result, Exception)
+        }
+        for index, result in zip(pending, await asyncio.gather(*pending.values())):
+            results[index] = result
+        return results
+
+    async def _execute_pack_compiled_async(
+        self, profiles: list[dict[str, Any]], compiled: CompiledPrompt
+    ) -> list[dict[str, Any] | Exception]:
+        """
+        Execute one packed request for one block of questions
+
+        Args:
+            profiles: Participant profile dicts packed into the request
+            compiled: Compiled prompt for one block of questions
+
+        Returns:
+            Participant result dict or exception per profile
+        """
+        prompt = compiled.render_pack(profiles)
+        question_ids = compiled.question_ids
+        validator = self._validator(compiled)
+
+        cache_key = None
+        if self.response_cache:
+            cache_key = self._cache_key(prompt)
+            if not self.cache_bypass:
+                cached = self.response_cache.get_memory(cache_key) or await asyncio.to_thread(
+                    self.response_cache.get_persistent, cache_key
+                )
+                if cached:
+                    return self._build_pack_results(
+                        cached["content"], cached["usage"], profiles, question_ids, cached=True,
+                        validator=validator,
+                    )
+
+        try:
+            response, loser_cost = await self._hedged_completion(
+                self._build_messages(prompt),
+                response_format=self._response_format(compiled, profiles),
+            )
+            raw_response = response.choices[0].message.content
+            usage = self._usage_from_response(response)
+            results = self._build_pack_results(
+                raw_response, usage, profiles, question_ids, validator=validator
+            )
+            answered = [r for r in results if not isinstance(r, Exception)]
+            for result in answered:
+                result["cost"] += loser_cost / len(answered)
+        except (ValueError, BudgetExceededError) as e:
+            return [e] * len(profiles)
+        except Exception as e:
+            return [Exception(f"LLM execution failed: {str(e)}")] * len(profiles)
+
+        # Only cache completions that answered for every participant
+        if cache_key and not any(isinstance(r, Exception) for r in results):
+            await asyncio.to_thread(
+                self.response_cache.set, cache_key, self.model, raw_response, usage
+            )
+
+        return results
@@ -0,0 +1,102 @@
+"""
+LLM Provider Backends for OpenAI-Compatible Chat Completion APIs
+"""
+from dataclasses import dataclass, replace
+
+
+@dataclass(frozen=True)
+class LLMProvider:
+    """
+    Connection details and capabilities of a chat completion backend
+
+    Every backend speaks the OpenAI chat completions protocol; providers
+    differ in where they are served and which optional request features
+    they understand, so the executor only sends what a backend supports.
+    """
+
+    name: str
+    base_url: str | None = None
+    api_key_required: bool = True
+    supports_seed: bool = True
+    supports_structured_output: bool = True
+    supports_stream_usage: bool = True
+    supports_batch: bool = True
+
+    # Sent when the backend ignores authentication but the client requires a key
+    PLACEHOLDER_API_KEY = "not-needed"
+
+    def resolve_api_key(self, api_key: str | None) -> str:
+        """
+        Get the API key to configure clients with
+
+        Args:
+            api_key: Key supplied for the run
+
+        Returns:
+            The key, or a placeholder for backends that need none
+
+        Raises:
+            ValueError: If the backend requires a key and none was given
+        """
+        if api_key:
+            return api_key
+        if self.api_key_required:
+            raise ValueError(f"Provider {self.name} requires an API key")
+        return self.PLACEHOLDER_API_KEY
+
+
+OPENAI = LLMProvider(name="openai")
+
+# Self-hosted OpenAI-compatible servers; base_url must point at the deployment
+OPENAI_COMPATIBLE = LLMProvider(
+    name="openai_compatible",
+    api_key_required=False,
+    supports_batch=False,
+)
+VLLM = LLMProvider(
+    name="vllm",
+    base_url="http://localhost:8000/v1",
+    api_key_required=False,
+    supports_batch=False,
+)
+OLLAMA = LLMProvider(
+    name="ollama",
+    base_url="http://localhost:11434/v1",
+    api_key_required=False,
+    supports_stream_usage=False,
+    supports_batch=False,
+)
+
+# Bundled synthetic backend (python -m app.stub_server)
+STUB = LLMProvider(
+    name="stub",
+    base_url="http://localhost:8001/v1",
+    api_key_required=False,
+    supports_batch=False,
+)
+
+PROVIDERS = {p.name: p for p in (OPENAI, OPENAI_COMPATIBLE, VLLM, OLLAMA, STUB)}
+
+
+def get_provider(name: str = "openai", base_url: str | None = None) -> LLMProvider:
+    """
+    Look up a provider, optionally pointing it at another server
+
+    Args:
+        name: Provider name (openai, openai_compatible, vllm, ollama or stub)
+        base_url: Override for the provider's API base URL
+
+    Returns:
+        LLMProvider
+
+    Raises:
+        ValueError: If the provider is unknown, or openai_compatible has no base_url
+    """
+    provider = PROVIDERS.get(name)
+    if provider is None:
+        raise ValueError(f"Unknown LLM provider: {name}")
+    if base_url:
+        provider = replace(provider, base_url=base_url)
+    if provider is OPENAI_COMPATIBLE:
+        raise ValueError("Provider openai_compatible requires a base_url")
+    return provider
@@ -0,0 +1,217 @@
+"""
+Weighted Routing of LLM Calls Across API Keys and Model Deployments
+"""
+import hashlib
+import random
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from openai import APIStatusError, AsyncOpenAI, OpenAI
+
+from app.services.client_pool import ClientPool, PooledClients
+from app.services.llm_provider import LLMProvider
+from app.services.rate_limiter import RateLimiter, get_rate_limiter
+from app.services.retry import CircuitBreaker, get_circuit_breaker
+
+
+@dataclass
+class Route:
+    """One API key and model deployment calls can be sent to"""
+
+    model: str
+    client: OpenAI
+    async_client: AsyncOpenAI
+    circuit_breaker: CircuitBreaker
+    rate_limiter: RateLimiter | None = None
+    key_id: str = ""
+    requests: int = 0
+    throttled: int = 0
+    # Exponentially weighted averages of call latency and of the 429 rate
+    latency: float | None = None
+    throttle_rate: float = 0.0
+
+    @property
+    def label(self) -> str:
+        """Route name safe to store (the key is identified by a hash prefix)"""
+        return f"{self.model}@{self.key_id}" if self.key_id else self.model
+
+
+class LLMRouter:
+    """
+    Spread calls over several API keys and equivalent model deployments
+
+    Each call goes to a route picked at random with probability proportional
+    to its score: the share of its rate-limit budget still available, scaled
+    down by its recent 429 rate and by how much slower it has been than the
+    fastest route. Routes whose circuit is open are skipped. Routes with no
+    latency samples yet count as fast, so every route gets tried.
+    """
+
+    # Weight of the newest sample in the latency and 429-rate averages
+    SMOOTHING = 0.2
+
+    # Floor on headroom so a drained route keeps a small share of traffic
+    MIN_HEADROOM = 0.01
+
+    def __init__(
+        self,
+        routes: list[Route],
+        smoothing: float = SMOOTHING,
+        rand: Callable[[], float] = random.random,
+    ):
+        """
+        Initialize LLM Router
+
+        Args:
+            routes: Routes to balance between (at least one)
+            smoothing: Weight of the newest sample in the moving averages (default: 0.2)
+            rand: Random source in [0, 1) (injectable for tests)
+
+        Raises:
+            ValueError: If no routes are given
+        """
+        if not routes:
+            raise ValueError("LLMRouter needs at least one route")
+        self.routes = routes
+        self.smoothing = smoothing
+        self.rand = rand
+        self._lock = threading.Lock()
+        self._leases: list[tuple[ClientPool, PooledClients]] = []
+
+    @classmethod
+    def build(
+        cls,
+        api_keys: list[str],
+        models: list[str],
+        provider: LLMProvider,
+        rpm: int,
+        tpm: int,
+        client_pool: ClientPool | None = None,
+    ) -> "LLMRouter":
+        """
+        Build one route per API key and model deployment
+
+        Every route gets the shared rate limiter and circuit breaker for its
+        key and model, so routed and unrouted runs pace each other.
+
+        Args:
+            api_keys: API keys to spread calls over
+            models: Equivalent model deployments to spread calls over
+            provider: Chat completion backend the keys belong to
+            rpm: Requests-per-minute limit of each key and model
+            tpm: Tokens-per-minute limit of each key and model
+            client_pool: Shared pool to take API clients from (default: new clients)
+
+        Returns:
+            Configured LLMRouter
+        """
+        routes = []
+        leases = []
+        for api_key in dict.fromkeys(api_keys):
+            api_key = provider.resolve_api_key(api_key)
+            if client_pool is not None:
+                pooled = client_pool.acquire(api_key, provider.base_url)
+                leases.append((client_pool, pooled))
+                client, async_client = pooled.client, pooled.async_client
+            else:
+                client = OpenAI(api_key=api_key, base_url=provider.base_url, max_retries=0)
+                async_client = AsyncOpenAI(
+                    api_key=api_key, base_url=provider.base_url, max_retries=0
+                )
+            key_id = "key-" + hashlib.sha256(api_key.encode()).hexdigest()[:8]
+            for model in dict.fromkeys(models):
+                routes.append(
+                    Route(
+                        model=model,
+                        client=client,
+                        async_client=async_client,
+                        circuit_breaker=get_circuit_breaker(model, provider.base_url, api_key),
+                        rate_limiter=get_rate_limiter(model, api_key, rpm, tpm, provider.base_url),
+                        key_id=key_id,
+                    )
+                )
+        router = cls(routes)
+        router._leases = leases
+        return router
+
+    def close(self) -> None:
+        """Release pooled clients so the pool may close them once idle"""
+        for client_pool, pooled in self._leases:
+            client_pool.release(pooled)
+        self._leases = []
+
+    def _score(self, route: Route, fastest: float | None) -> float:
+        """Relative share of traffic a route should get now (caller holds the lock)"""
+        if route.circuit_breaker.is_open:
+            return 0.0
+        headroom = route.rate_limiter.available_fraction() if route.rate_limiter else 1.0
+        score = max(headroom, self.MIN_HEADROOM) * (1.0 - route.throttle_rate)
+        if fastest and route.latency:
+            score *= fastest / route.latency
+        return score
+
+    def choose(self) -> Route:
+        """
+        Pick the route for the next call
+
+        Returns:
+            Selected Route (if every circuit is open, the least throttled route,
+            whose breaker will refuse the call)
+        """
+        with self._lock:
+            latencies = [r.latency for r in self.routes if r.latency]
+            fastest = min(latencies) if latencies else None
+            scores = [self._score(route, fastest) for route in self.routes]
+            total = sum(scores)
+            if total <= 0:
+                return min(self.routes, key=lambda r: r.throttle_rate)
+
+            target = self.rand() * total
+            for route, score in zip(self.routes, scores):
+                target -= score
+                if target < 0:
+                    return route
+            return self.routes[-1]
+
+    def record(self, route: Route, latency: float, error: Exception | None = None) -> None:
+        """
+        Update a route's health after a call
+
+        Args:
+            route: Route the call was sent to
+            latency: Seconds the call took
+            error: Exception raised by the call, or None on success
+        """
+        throttled = isinstance(error, APIStatusError) and error.status_code == 429
+        with self._lock:
+            route.requests += 1
+            route.throttled += throttled
+            route.throttle_rate += self.smoothing * (float(throttled) - route.throttle_rate)
+            if error is None:
+                if route.latency is None:
+                    route.latency = latency
+                else:
+                    route.latency += self.smoothing * (latency - route.latency)
+
+    def stats(self) -> list[dict[str, Any]]:
+        """
+        Summarize traffic per route for run metadata
+
+        Returns:
+            One dict per route with its label, request and 429 counts and
+            average latency
+        """
+        with self._lock:
+            return [
+                {
+                    "route": route.label,
+                    "requests": route.requests,
+                    "throttled": route.throttled,
+                    "latency_seconds": round(route.latency, 3) if route.latency else None,
+                }
+                for route in self.routes
+            ]
+
+    def __len__(self) -> int:
+        return len(self.routes)
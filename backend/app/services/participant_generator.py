@@ -56,6 +56,7 @@ class ParticipantGenerator:
         gender_weights: list[float] | None = None,
         countries: list[str] | None = None,
         education_levels: list[str] | None = None,
+        seed: int | None = None,
     ):
         """
         Initialize the participant generator with demographic constraints
@@ -67,6 +68,8 @@ class ParticipantGenerator:
             gender_weights: Weights for gender distribution (default: balanced)
             countries: List of countries to sample from (default: all)
             education_levels: List of education levels (default: all)
+            seed: Makes every profile a function of the seed and its participant
+                number, so any subset can be regenerated (default: unseeded)
         """
         self.age_min = age_min
         self.age_max = age_max
@@ -74,6 +77,8 @@ class ParticipantGenerator:
         self.gender_weights = gender_weights or self.DEFAULT_GENDER_WEIGHTS
         self.countries = countries or self.DEFAULT_COUNTRIES
         self.education_levels = education_levels or self.EDUCATION_LEVELS
+        self.seed = seed
+        self._random = random.Random()
 
     def generate(self, count: int = 1) -> list[dict]:
         """
@@ -93,6 +98,27 @@ class ParticipantGenerator:
 
         return profiles
 
+    def generate_numbers(self, participant_numbers: list[int]) -> list[dict]:
+        """
+        Generate the profiles of specific participants
+
+        With a seed, each profile is identical to the one generate() produces
+        for the same participant number.
+
+        Args:
+            participant_numbers: Participant numbers to generate
+
+        Returns:
+            List of participant profile dictionaries, in the given order
+        """
+        return [self._generate_profile(participant_number=n) for n in participant_numbers]
+
+    def _rng(self, participant_number: int) -> random.Random:
+        """Random source for one profile: seeded per participant, else shared"""
+        if self.seed is None:
+            return self._random
+        return random.Random(f"{self.seed}-{participant_number}")
+
     def _generate_profile(self, participant_number: int) -> dict:
         """
         Generate a single participant profile
@@ -103,17 +129,19 @@ class ParticipantGenerator:
         Returns:
             Dictionary with participant profile data
         """
+        rng = self._rng(participant_number)
+
         # Generate age
-        age = random.randint(self.age_min, self.age_max)
+        age = rng.randint(self.age_min, self.age_max)
 
         # Generate gender with weights
-        gender = random.choices(self.genders, weights=self.gender_weights, k=1)[0]
+        gender = rng.choices(self.genders, weights=self.gender_weights, k=1)[0]
 
         # Generate country
-        country = random.choice(self.countries)
+        country = rng.choice(self.countries)
 
         # Generate education (age-appropriate)
-        education = self._generate_education(age)
+        education = self._generate_education(age, rng)
 
         # Infer language from country
         language = self.COUNTRY_LANGUAGE_MAP.get(country, "English")
@@ -131,12 +159,13 @@ class ParticipantGenerator:
             "life_stage": life_stage,
         }
 
-    def _generate_education(self, age: int) -> str:
+    def _generate_education(self, age: int, rng: random.Random) -> str:
         """
         Generate age-appropriate education level
 
         Args:
             age: Participant age
+            rng: Random source for the profile
 
         Returns:
             Education level string
@@ -150,7 +179,7 @@ class ParticipantGenerator:
             # Fallback to high school if nothing is appropriate
             return "high_school"
 
-        return random.choice(appropriate_education)
+        return rng.choice(appropriate_education)
 
     def _is_education_age_appropriate(self, education: str, age: int) -> bool:
         """
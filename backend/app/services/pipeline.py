@@ -0,0 +1,193 @@
+"""
+Pipelined Execution with a Dedicated Database Writer
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+from app.services.bulk_writer import BulkWriter
+from app.services.client_pool import SharedEventLoop
+
+Outcome = dict[str, Any]
+Emit = Callable[[Outcome], Awaitable[None]]
+
+# Marks the end of the queue
+_DONE = object()
+
+
+class ExecutionPipeline:
+    """
+    Overlap LLM calls with database writes through a bounded queue
+
+    Dispatchers (the execution engine's concurrent participant calls, which
+    also parse, validate and repair each answer) put finished outcomes on a
+    bounded queue on the shared event loop. The calling thread is the single
+    writer: it drains the queue into a BulkWriter and commits every
+    `commit_every` participants, while the dispatchers keep calling the API.
+    When the queue is full a dispatcher waits before releasing its slot, so
+    a slow database holds back new LLM calls instead of outcomes piling up in
+    memory.
+    """
+
+    DEFAULT_QUEUE_SIZE = 256
+
+    def __init__(
+        self,
+        writer: BulkWriter,
+        loop: SharedEventLoop,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        commit_every: int = 100,
+    ):
+        """
+        Initialize Execution Pipeline
+
+        Args:
+            writer: Bulk writer for the run's participants and responses
+            loop: Shared event loop the dispatchers run on
+            queue_size: Outcomes waiting for the writer before dispatch pauses
+                (default: 256)
+            commit_every: Participants written between commits (default: 100)
+        """
+        self.writer = writer
+        self.loop = loop
+        self.queue_size = max(1, int(queue_size))
+        self.commit_every = max(1, int(commit_every))
+        self.writer_idle_seconds = 0.0
+
+    @classmethod
+    def from_settings(
+        cls,
+        writer: BulkWriter,
+        loop: SharedEventLoop,
+        execution_settings: dict[str, Any] | None,
+        commit_every: int,
+    ) -> "ExecutionPipeline":
+        """
+        Build a pipeline from an experiment's execution_settings
+
+        Args:
+            writer: Bulk writer for the run's participants and responses
+            loop: Shared event loop the dispatchers run on
+            execution_settings: Experiment execution settings dict
+            commit_every: Participants written between commits
+
+        Returns:
+            Configured ExecutionPipeline
+        """
+        execution_settings = execution_settings or {}
+        return cls(
+            writer,
+            loop,
+            queue_size=execution_settings.get("pipeline_queue_size", cls.DEFAULT_QUEUE_SIZE),
+            commit_every=commit_every,
+        )
+
+    def run(
+        self,
+        dispatch: Callable[[Emit], Awaitable[None]],
+        on_outcome: Callable[[Outcome], None],
+        on_commit: Callable[[], None],
+    ) -> None:
+        """
+        Run the pipeline until every dispatched outcome is written and committed
+
+        Args:
+            dispatch: Coroutine function producing the run's outcomes; it awaits
+                the emit function it is given with each outcome
+            on_outcome: Called on the writer thread with each outcome once it
+                is buffered
+            on_commit: Called on the writer thread after each flush; saves
+                progress and commits
+
+        Raises:
+            Exception: The first error from dispatching or writing. Outcomes
+                emitted before a dispatch error are still committed; a write
+                error cancels the dispatch.
+        """
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        produced = asyncio.run_coroutine_threadsafe(
+            self._produce(dispatch, queue), self.loop.loop
+        )
+        try:
+            self._write(queue, on_outcome, on_commit)
+        except BaseException:
+            produced.cancel()
+            raise
+        produced.result()
+
+    async def _produce(
+        self, dispatch: Callable[[Emit], Awaitable[None]], queue: asyncio.Queue
+    ) -> None:
+        """
+        Dispatch all outcomes, then tell the writer the run is over
+
+        Args:
+            dispatch: Coroutine function producing the run's outcomes
+            queue: Queue from the dispatchers to the writer
+        """
+        try:
+            await dispatch(queue.put)
+        finally:
+            # A cancelled pipeline has no writer left to tell
+            if not asyncio.current_task().cancelling():
+                await queue.put(_DONE)
+
+    async def _take(self, queue: asyncio.Queue) -> list[Any]:
+        """
+        Wait for at least one item, then take whatever else is queued up to a batch
+
+        Args:
+            queue: Queue from the dispatchers to the writer
+
+        Returns:
+            Queued items, in order
+        """
+        items = [await queue.get()]
+        while len(items) < self.writer.batch_size and not queue.empty():
+            items.append(queue.get_nowait())
+        return items
+
+    def _write(
+        self,
+        queue: asyncio.Queue,
+        on_outcome: Callable[[Outcome], None],
+        on_commit: Callable[[], None],
+    ) -> None:
+        """
+        Drain the queue into the database until the dispatchers finish
+
+        Args:
+            queue: Queue from the dispatchers to the writer
+            on_outcome: Called with each outcome once it is buffered
+            on_commit: Called after each flush to save progress and commit
+        """
+        uncommitted = 0
+        while True:
+            started = time.monotonic()
+            items = asyncio.run_coroutine_threadsafe(self._take(queue), self.loop.loop).result()
+            self.writer_idle_seconds += time.monotonic() - started
+
+            for item in items:
+                if item is _DONE:
+                    self.writer.flush()
+                    on_commit()
+                    return
+                self.writer.add(item)
+                on_outcome(item)
+                uncommitted += 1
+                if uncommitted >= self.commit_every:
+                    self.writer.flush()
+                    on_commit()
+                    uncommitted = 0
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Summarize the pipeline for run metadata
+
+        Returns:
+            Dict with queue size and seconds the writer waited for outcomes
+        """
+        return {
+            "queue_size": self.queue_size,
+            "writer_idle_seconds": self.writer_idle_seconds,
+        }
@@ -0,0 +1,230 @@
+"""
+Compiled Prompt Templates for Participant Simulation
+"""
+from functools import cached_property
+from typing import Any
+
+from app.services.response_schema import ResponseValidator, build_response_schema
+
+
+PERSONA_TEMPLATE = """You are simulating Participant #{participant_number}, with the following profile:
+
+- Age: {age} years old
+- Gender: {gender}
+- Country: {country}
+- Native Language: {language}
+- Education Level: {education}
+- Life Stage: {life_stage}
+
+IMPORTANT: Respond in character as this participant. Consider their age, education, cultural background, and life stage when formulating your answers. Be realistic and nuanced in your responses."""
+
+PERSONA_FIELDS = (
+    "participant_number",
+    "age",
+    "gender",
+    "country",
+    "education",
+    "language",
+    "life_stage",
+)
+
+FORMAT_INSTRUCTIONS = """
+Respond in JSON format with the following structure:
+```json
+{
+    "question_id_1": {
+        "response": "your answer here",
+        "confidence": "high|medium|low"
+    },
+    "question_id_2": {
+        "response": "your answer here",
+        "confidence": "high|medium|low"
+    }
+}
+```
+
+Make sure to include ALL questions in your response. The "response" field should contain your actual answer, and "confidence" indicates how confident you are in your answer."""
+
+PACKED_PREAMBLE = (
+    "You are simulating {count} different participants, each described after the "
+    "questionnaire below. Answer every question separately for each participant, "
+    "staying in character for each one."
+)
+
+PACKED_FORMAT_INSTRUCTIONS = """
+Respond in JSON format with one entry per participant, keyed by participant number:
+```json
+{
+    "1": {
+        "question_id_1": {
+            "response": "participant 1's answer here",
+            "confidence": "high|medium|low"
+        }
+    },
+    "2": {
+        "question_id_1": {
+            "response": "participant 2's answer here",
+            "confidence": "high|medium|low"
+        }
+    }
+}
+```
+
+Make sure to include ALL participants and ALL questions for each participant."""
+
+PACKED_PERSONA_SEPARATOR = "\n\n---\n\n"
+
+
+# Prompt layouts: persona before the questionnaire (original), or the static
+# questionnaire first so providers can reuse a cached prompt prefix
+PERSONA_FIRST = "persona_first"
+QUESTIONNAIRE_FIRST = "questionnaire_first"
+PROMPT_LAYOUTS = (PERSONA_FIRST, QUESTIONNAIRE_FIRST)
+
+QUESTIONNAIRE_FIRST_PREAMBLE = (
+    "You will answer the questionnaire below as the participant described at the "
+    "end of this message."
+)
+
+
+def render_persona(profile: dict[str, Any]) -> str:
+    """
+    Render the persona description for a participant
+
+    Args:
+        profile: Participant profile dict
+
+    Returns:
+        Persona description string
+    """
+    return PERSONA_TEMPLATE.format_map(
+        {field: profile.get(field, "Unknown") for field in PERSONA_FIELDS}
+    )
+
+
+def render_question(question: dict[str, Any]) -> str:
+    """
+    Render a single question with its answer options
+
+    Args:
+        question: Question dict
+
+    Returns:
+        Question block string, ending with a blank line
+    """
+    question_type = question.get("question_type", "")
+    options = question.get("options", {})
+
+    lines = [
+        f"Question ID: {question.get('question_id', '')}",
+        question.get("question_text", ""),
+    ]
+
+    # Add options context based on question type
+    if question_type == "multiple_choice" and "choices" in options:
+        lines.append(f"Options: {', '.join(options['choices'])}")
+    elif question_type == "likert_scale":
+        min_val = options.get("min", 1)
+        max_val = options.get("max", 5)
+        labels = options.get("labels", [])
+        if labels:
+            lines.append(f"Scale: {min_val} ({labels[0]}) to {max_val} ({labels[-1]})")
+        else:
+            lines.append(f"Scale: {min_val} to {max_val}")
+    elif question_type == "yes_no":
+        lines.append("Please respond with either 'Yes' or 'No'")
+    elif question_type == "open_ended":
+        lines.append("Provide a detailed, thoughtful response")
+
+    return "\n".join(lines) + "\n\n"
+
+
+def render_questions(questions: list[dict[str, Any]]) -> str:
+    """
+    Render the questions section of the prompt
+
+    Args:
+        questions: List of question dicts
+
+    Returns:
+        Questions section string
+    """
+    return "\n\nPlease answer the following questions:\n\n" + "".join(
+        render_question(q) for q in questions
+    )
+
+
+class CompiledPrompt:
+    """
+    Experiment-level prompt with the questionnaire rendered once
+
+    The questions section and format instructions are identical for every
+    participant, so they are rendered at construction and only the persona
+    is formatted per participant. With the questionnaire_first layout the
+    shared text forms a stable prefix that provider prompt caching can reuse.
+    """
+
+    def __init__(self, questions: list[dict[str, Any]], layout: str = PERSONA_FIRST):
+        """
+        Compile the shared questionnaire section
+
+        Args:
+            questions: List of question dicts
+            layout: PERSONA_FIRST (default) or QUESTIONNAIRE_FIRST
+
+        Raises:
+            ValueError: If the layout is unknown
+        """
+        if layout not in PROMPT_LAYOUTS:
+            raise ValueError(f"Unknown prompt layout: {layout}")
+
+        self.questions = questions
+        self.layout = layout
+        self.question_ids = [q.get("question_id") for q in questions]
+        self.questions_section = render_questions(questions)
+        self.questionnaire = f"{self.questions_section}{FORMAT_INSTRUCTIONS}"
+        if layout == QUESTIONNAIRE_FIRST:
+            self.prefix = f"{QUESTIONNAIRE_FIRST_PREAMBLE}{self.questionnaire}\n\n"
+
+    @cached_property
+    def response_schema(self) -> dict[str, Any]:
+        """JSON schema of the answers to this block of questions"""
+        return build_response_schema(self.questions)
+
+    @cached_property
+    def validator(self) -> ResponseValidator:
+        """Precompiled validator for the answers to this block of questions"""
+        return ResponseValidator(self.questions)
+
+    def render(self, profile: dict[str, Any]) -> str:
+        """
+        Render the full prompt for a participant
+
+        Args:
+            profile: Participant profile dict
+
+        Returns:
+            Formatted prompt string
+        """
+        if self.layout == QUESTIONNAIRE_FIRST:
+            return f"{self.prefix}{render_persona(profile)}"
+        return f"{render_persona(profile)}\n{self.questionnaire}"
+
+    def render_pack(self, profiles: list[dict[str, Any]]) -> str:
+        """
+        Render one prompt that asks for the answers of several participants
+
+        The questionnaire appears once, followed by every persona; answers are
+        requested as a JSON object keyed by participant number.
+
+        Args:
+            profiles: Participant profile dicts
+
+        Returns:
+            Formatted prompt string
+        """
+        personas = PACKED_PERSONA_SEPARATOR.join(render_persona(p) for p in profiles)
+        return (
+            f"{PACKED_PREAMBLE.format(count=len(profiles))}"
+            f"{self.questions_section}{PACKED_FORMAT_INSTRUCTIONS}\n\n{personas}"
+        )
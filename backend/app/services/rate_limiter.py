@@ -0,0 +1,239 @@
+"""
+Process-wide Rate Limiter for LLM API calls
+"""
+import asyncio
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at a fixed rate
+
+    The bucket may go negative when a settlement reports more usage than was
+    reserved; later callers then wait until the debt is refilled.
+    """
+
+    def __init__(
+        self,
+        capacity: float,
+        refill_per_second: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize Token Bucket
+
+        Args:
+            capacity: Maximum number of tokens the bucket can hold
+            refill_per_second: Tokens added per second
+            clock: Monotonic clock function (injectable for tests)
+        """
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.clock = clock
+        self.tokens = capacity
+        self.updated_at = clock()
+
+    def _refill(self) -> None:
+        """Add tokens accrued since the last update"""
+        now = self.clock()
+        elapsed = max(0.0, now - self.updated_at)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """
+        Seconds until `amount` tokens are available
+
+        Requests larger than the capacity only wait for a full bucket.
+
+        Args:
+            amount: Number of tokens needed
+
+        Returns:
+            Seconds to wait (0 if available now)
+        """
+        self._refill()
+        needed = min(amount, self.capacity)
+        if self.tokens >= needed:
+            return 0.0
+        return (needed - self.tokens) / self.refill_per_second
+
+    def consume(self, amount: float) -> None:
+        """Remove tokens from the bucket (may go negative)"""
+        self._refill()
+        self.tokens -= amount
+
+    def credit(self, amount: float) -> None:
+        """Return tokens to the bucket, capped at capacity"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def fill_ratio(self) -> float:
+        """Fraction of the capacity available now (0 when in debt)"""
+        self._refill()
+        return max(0.0, self.tokens / self.capacity)
+
+
+@dataclass
+class Reservation:
+    """Tokens reserved ahead of an API call, settled once usage is known"""
+
+    tokens: int
+
+
+class RateLimiter:
+    """
+    Pace requests under a requests-per-minute and tokens-per-minute ceiling
+
+    Each call reserves one request and an estimated token count before it is
+    sent, then settles the reservation against the real usage afterwards.
+    Safe to share between threads and event loops.
+    """
+
+    # Fraction of the provider limit we aim for, leaving room for clock skew
+    DEFAULT_HEADROOM = 0.95
+
+    def __init__(
+        self,
+        rpm: int,
+        tpm: int,
+        headroom: float = DEFAULT_HEADROOM,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize Rate Limiter
+
+        Args:
+            rpm: Provider requests-per-minute limit
+            tpm: Provider tokens-per-minute limit
+            headroom: Fraction of the limits to use (default: 0.95)
+            clock: Monotonic clock function (injectable for tests)
+        """
+        self.clock = clock
+        self.headroom = headroom
+        self._lock = threading.Lock()
+        self.set_limits(rpm, tpm)
+
+    def set_limits(self, rpm: int, tpm: int) -> None:
+        """
+        Replace the request and token limits
+
+        Args:
+            rpm: Provider requests-per-minute limit
+            tpm: Provider tokens-per-minute limit
+        """
+        rpm_capacity = max(1.0, rpm * self.headroom)
+        tpm_capacity = max(1.0, tpm * self.headroom)
+        with self._lock:
+            self.rpm = rpm
+            self.tpm = tpm
+            self.requests = TokenBucket(rpm_capacity, rpm_capacity / 60, self.clock)
+            self.tokens = TokenBucket(tpm_capacity, tpm_capacity / 60, self.clock)
+
+    def _try_reserve(self, tokens: int) -> float:
+        """
+        Reserve one request and `tokens` tokens if both are available
+
+        Args:
+            tokens: Estimated tokens for the call
+
+        Returns:
+            0 if reserved, otherwise seconds to wait before trying again
+        """
+        with self._lock:
+            wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+            if wait == 0:
+                self.requests.consume(1)
+                self.tokens.consume(tokens)
+            return wait
+
+    def acquire(self, tokens: int) -> Reservation:
+        """
+        Block until a call with `tokens` estimated tokens may be sent
+
+        Args:
+            tokens: Estimated prompt + completion tokens
+
+        Returns:
+            Reservation to pass to settle()
+        """
+        while (wait := self._try_reserve(tokens)) > 0:
+            time.sleep(wait)
+        return Reservation(tokens=tokens)
+
+    async def acquire_async(self, tokens: int) -> Reservation:
+        """
+        Wait without blocking the event loop until a call may be sent
+
+        Args:
+            tokens: Estimated prompt + completion tokens
+
+        Returns:
+            Reservation to pass to settle()
+        """
+        while (wait := self._try_reserve(tokens)) > 0:
+            await asyncio.sleep(wait)
+        return Reservation(tokens=tokens)
+
+    def available_fraction(self) -> float:
+        """
+        Fraction of the request and token budgets available right now
+
+        Returns:
+            The smaller of the two fill ratios, between 0 and 1
+        """
+        with self._lock:
+            return min(self.requests.fill_ratio(), self.tokens.fill_ratio())
+
+    def settle(self, reservation: Reservation, actual_tokens: int) -> None:
+        """
+        Reconcile a reservation with the tokens the provider actually billed
+
+        Args:
+            reservation: Reservation returned by acquire()/acquire_async()
+            actual_tokens: Total tokens reported in the response usage
+        """
+        difference = reservation.tokens - actual_tokens
+        with self._lock:
+            if difference > 0:
+                self.tokens.credit(difference)
+            elif difference < 0:
+                self.tokens.consume(-difference)
+
+
+_limiters: dict[tuple[str, str, str | None], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(
+    model: str, api_key: str, rpm: int, tpm: int, base_url: str | None = None
+) -> RateLimiter:
+    """
+    Get the process-wide rate limiter for a model, API key and server
+
+    All executors using the same model and key share one limiter, so
+    concurrent experiments are paced together instead of competing.
+
+    Args:
+        model: Model name
+        api_key: Provider API key (only its hash is kept)
+        rpm: Provider requests-per-minute limit
+        tpm: Provider tokens-per-minute limit
+        base_url: API base URL of the provider (None for the OpenAI default)
+
+    Returns:
+        Shared RateLimiter instance
+    """
+    key = (model, hashlib.sha256(api_key.encode()).hexdigest(), base_url)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = RateLimiter(rpm=rpm, tpm=tpm)
+            _limiters[key] = limiter
+        elif (limiter.rpm, limiter.tpm) != (rpm, tpm):
+            limiter.set_limits(rpm, tpm)
+        return limiter
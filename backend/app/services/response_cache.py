@@ -0,0 +1,254 @@
+"""
+Two-tier LLM Response Cache (in-process LRU + database table)
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.llm_cache import LLMCacheEntry
+
+
+class ResponseCache:
+    """
+    Content-addressed cache of LLM completions
+
+    Lookups hit an in-process LRU first and fall back to the persistent
+    `llm_response_cache` table. Entries expire after `ttl_seconds`, and the
+    persistent tier is trimmed to `max_persistent_entries` by least recent access.
+    """
+
+    # Run size-based eviction of the persistent tier every N writes
+    EVICT_EVERY = 500
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] | None = None,
+        max_memory_entries: int = 1024,
+        ttl_seconds: float | None = None,
+        max_persistent_entries: int | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Initialize Response Cache
+
+        Args:
+            session_factory: Callable returning a new database session; None keeps the
+                cache in memory only
+            max_memory_entries: Maximum entries in the in-process LRU (default: 1024)
+            ttl_seconds: Entry lifetime in seconds (default: never expire)
+            max_persistent_entries: Maximum rows kept in the database (default: unbounded)
+            clock: Wall clock function (injectable for tests)
+        """
+        self.session_factory = session_factory
+        self.max_memory_entries = max_memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_persistent_entries = max_persistent_entries
+        self.clock = clock
+        self._memory: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    @staticmethod
+    def make_key(
+        model: str,
+        temperature: float,
+        seed: int | None,
+        system_message: str,
+        prompt: str,
+    ) -> str:
+        """
+        Build a cache key from everything that determines the completion
+
+        Args:
+            model: Model name
+            temperature: Sampling temperature
+            seed: Sampling seed (None if unset)
+            system_message: System message content
+            prompt: User prompt from _build_prompt
+
+        Returns:
+            SHA-256 hex digest
+        """
+        payload = json.dumps(
+            [model, temperature, seed, system_message, prompt], ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _is_expired(self, created_at: float) -> bool:
+        """Check whether an entry created at `created_at` has outlived the TTL"""
+        return self.ttl_seconds is not None and self.clock() - created_at > self.ttl_seconds
+
+    def _remember(self, key: str, created_at: float, entry: dict[str, Any]) -> None:
+        """Insert an entry into the LRU, evicting the least recently used"""
+        with self._lock:
+            self._memory[key] = (created_at, entry)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def get_memory(self, key: str) -> dict[str, Any] | None:
+        """
+        Look up an entry in the in-process tier only
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Entry dict with content and usage, or None on a miss
+        """
+        with self._lock:
+            item = self._memory.get(key)
+            if item is None:
+                return None
+            created_at, entry = item
+            if self._is_expired(created_at):
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return entry
+
+    def get_persistent(self, key: str) -> dict[str, Any] | None:
+        """
+        Look up an entry in the database tier and promote it to memory
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Entry dict with content and usage, or None on a miss
+        """
+        if self.session_factory is None:
+            return None
+
+        with self.session_factory() as session:
+            row = session.get(LLMCacheEntry, key)
+            if row is None:
+                return None
+
+            created_at = row.created_at.replace(tzinfo=timezone.utc).timestamp()
+            if self._is_expired(created_at):
+                session.delete(row)
+                session.commit()
+                return None
+
+            row.hit_count += 1
+            row.last_accessed_at = datetime.utcnow()
+            entry = {"content": row.content, "usage": dict(row.usage)}
+            session.commit()
+
+        self._remember(key, created_at, entry)
+        return entry
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """
+        Look up an entry in memory, then in the database
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Entry dict with content and usage, or None on a miss
+        """
+        return self.get_memory(key) or self.get_persistent(key)
+
+    def set(self, key: str, model: str, content: str, usage: dict[str, Any]) -> None:
+        """
+        Store a completion in both tiers
+
+        Args:
+            key: Cache key from make_key
+            model: Model name
+            content: Completion content
+            usage: Token usage dict
+        """
+        entry = {"content": content, "usage": usage}
+        self._remember(key, self.clock(), entry)
+
+        if self.session_factory is None:
+            return
+
+        now = datetime.utcnow()
+        with self.session_factory() as session:
+            session.merge(
+                LLMCacheEntry(
+                    cache_key=key,
+                    model=model,
+                    content=content,
+                    usage=usage,
+                    hit_count=0,
+                    created_at=now,
+                    last_accessed_at=now,
+                )
+            )
+            session.commit()
+
+        with self._lock:
+            self._writes += 1
+            evict = self._writes % self.EVICT_EVERY == 0
+        if evict:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove expired rows and trim the database tier to its size limit
+
+        Returns:
+            Number of rows deleted
+        """
+        if self.session_factory is None:
+            return 0
+
+        deleted = 0
+        with self.session_factory() as session:
+            if self.ttl_seconds is not None:
+                cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+                result = session.execute(
+                    delete(LLMCacheEntry).where(LLMCacheEntry.created_at < cutoff)
+                )
+                deleted += result.rowcount or 0
+
+            if self.max_persistent_entries is not None:
+                keep = (
+                    select(LLMCacheEntry.cache_key)
+                    .order_by(LLMCacheEntry.last_accessed_at.desc())
+                    .limit(self.max_persistent_entries)
+                )
+                result = session.execute(
+                    delete(LLMCacheEntry).where(LLMCacheEntry.cache_key.not_in(keep))
+                )
+                deleted += result.rowcount or 0
+
+            session.commit()
+        return deleted
+
+
+_cache: ResponseCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Get the process-wide response cache backed by the application database
+
+    Returns:
+        Shared ResponseCache instance
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(
+                session_factory=SessionLocal,
+                max_memory_entries=settings.llm_cache_memory_entries,
+                ttl_seconds=settings.llm_cache_ttl_seconds,
+                max_persistent_entries=settings.llm_cache_max_entries,
+            )
+        return _cache
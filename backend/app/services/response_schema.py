@@ -0,0 +1,221 @@
+"""
+JSON Schemas and Precompiled Validators for Structured LLM Responses
+"""
+from typing import Any, Callable
+
+
+CONFIDENCE_LEVELS = ("high", "medium", "low")
+YES_NO_CHOICES = ("Yes", "No")
+
+# Likert scales up to this many points are sent as an explicit enum. Strict
+# structured output rejects minimum/maximum, so wider scales are only typed
+# as integers and ResponseValidator checks their range after parsing.
+MAX_ENUM_SCALE_POINTS = 101
+
+SCHEMA_NAME = "participant_responses"
+
+
+def answer_schema(question: dict[str, Any]) -> dict[str, Any]:
+    """
+    Build the JSON schema for one question's answer object
+
+    Args:
+        question: Question dict
+
+    Returns:
+        JSON schema for {"response": ..., "confidence": ...}
+    """
+    question_type = question.get("question_type", "")
+    options = question.get("options", {})
+
+    if question_type == "multiple_choice" and options.get("choices"):
+        response = {"type": "string", "enum": list(options["choices"])}
+    elif question_type == "likert_scale":
+        min_val = int(options.get("min", 1))
+        max_val = int(options.get("max", 5))
+        if max_val - min_val < MAX_ENUM_SCALE_POINTS:
+            response = {"type": "integer", "enum": list(range(min_val, max_val + 1))}
+        else:
+            response = {"type": "integer"}
+    elif question_type == "yes_no":
+        response = {"type": "string", "enum": list(YES_NO_CHOICES)}
+    else:
+        response = {"type": "string"}
+
+    return {
+        "type": "object",
+        "properties": {
+            "response": response,
+            "confidence": {"type": "string", "enum": list(CONFIDENCE_LEVELS)},
+        },
+        "required": ["response", "confidence"],
+        "additionalProperties": False,
+    }
+
+
+def build_response_schema(questions: list[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Build the JSON schema for a participant's answers to a questionnaire
+
+    Args:
+        questions: List of question dicts
+
+    Returns:
+        JSON schema of an object keyed by question ID
+    """
+    return {
+        "type": "object",
+        "properties": {q.get("question_id"): answer_schema(q) for q in questions},
+        "required": [q.get("question_id") for q in questions],
+        "additionalProperties": False,
+    }
+
+
+def build_packed_response_schema(
+    response_schema: dict[str, Any], participant_numbers: list[Any]
+) -> dict[str, Any]:
+    """
+    Build the JSON schema for several participants' answers in one response
+
+    Args:
+        response_schema: Single-participant schema from build_response_schema
+        participant_numbers: Participant numbers packed into the request
+
+    Returns:
+        JSON schema of an object keyed by participant number
+    """
+    keys = [str(number) for number in participant_numbers]
+    return {
+        "type": "object",
+        "properties": {key: response_schema for key in keys},
+        "required": keys,
+        "additionalProperties": False,
+    }
+
+
+def json_schema_format(schema: dict[str, Any]) -> dict[str, Any]:
+    """
+    Wrap a schema as a strict response_format for chat.completions.create
+
+    Args:
+        schema: JSON schema
+
+    Returns:
+        response_format parameter value
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": SCHEMA_NAME, "strict": True, "schema": schema},
+    }
+
+
+class ResponseValidator:
+    """
+    Validate parsed answers against a questionnaire
+
+    One check per question is compiled at construction, so validating a
+    participant is a dict lookup and a cheap predicate per answer. Checks
+    accept the looser forms free-text JSON tends to use (numeric strings on
+    scales, any casing of Yes/No) as well as schema-constrained output.
+    """
+
+    def __init__(self, questions: list[dict[str, Any]]):
+        """
+        Compile the answer checks for a questionnaire
+
+        Args:
+            questions: List of question dicts
+        """
+        self._checks = {q.get("question_id"): self._compile(q) for q in questions}
+
+    @staticmethod
+    def _compile(question: dict[str, Any]) -> Callable[[Any], str | None]:
+        """
+        Build the check for one question's response value
+
+        Args:
+            question: Question dict
+
+        Returns:
+            Function returning an error message, or None if the value is valid
+        """
+        question_type = question.get("question_type", "")
+        options = question.get("options", {})
+
+        if question_type == "multiple_choice" and options.get("choices"):
+            choices = frozenset(options["choices"])
+
+            def check(value: Any) -> str | None:
+                return None if value in choices else f"{value!r} is not one of the choices"
+
+        elif question_type == "likert_scale":
+            min_val = int(options.get("min", 1))
+            max_val = int(options.get("max", 5))
+
+            def check(value: Any) -> str | None:
+                try:
+                    number = float(value)
+                except (TypeError, ValueError):
+                    return f"{value!r} is not a number"
+                if isinstance(value, bool) or not number.is_integer():
+                    return f"{value!r} is not a whole scale point"
+                if not min_val <= number <= max_val:
+                    return f"{value!r} is outside {min_val}-{max_val}"
+                return None
+
+        elif question_type == "yes_no":
+
+            def check(value: Any) -> str | None:
+                if isinstance(value, str) and value.strip().lower() in ("yes", "no"):
+                    return None
+                return f"{value!r} is not Yes or No"
+
+        else:
+
+            def check(value: Any) -> str | None:
+                if isinstance(value, str) and value.strip():
+                    return None
+                return "empty response"
+
+        return check
+
+    def check(self, question_id: str, answer: Any) -> str | None:
+        """
+        Validate one answer
+
+        Args:
+            question_id: Question ID
+            answer: Answer object ({"response": ..., "confidence": ...})
+
+        Returns:
+            Error message, or None if the answer is valid
+        """
+        value_check = self._checks.get(question_id)
+        if value_check is None:
+            return "unknown question"
+        if not isinstance(answer, dict) or "response" not in answer:
+            return "answer has no response field"
+        confidence = answer.get("confidence")
+        if confidence is not None and confidence not in CONFIDENCE_LEVELS:
+            return f"invalid confidence {confidence!r}"
+        return value_check(answer["response"])
+
+    def validate(self, responses: dict[str, Any]) -> tuple[dict[str, Any], dict[str, str]]:
+        """
+        Split answers into valid and invalid ones
+
+        Args:
+            responses: Dict of question_id to answer object
+
+        Returns:
+            Tuple of (valid answers, dict of question_id to error message)
+        """
+        valid = {}
+        invalid = {}
+        for question_id, answer in responses.items():
+            error = self.check(question_id, answer)
+            if error is None:
+                valid[question_id] = answer
+            else:
+                invalid[question_id] = error
+        return valid, invalid
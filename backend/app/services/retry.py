@@ -0,0 +1,263 @@
+"""
+Retry Policy and Circuit Breaker for LLM API calls
+"""
+import hashlib
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable
+
+from openai import APIConnectionError, APIStatusError, APITimeoutError
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the model's circuit is open"""
+
+    def __init__(self, model: str, retry_after: float):
+        super().__init__(f"Circuit open for model {model}; retry in {retry_after:.1f}s")
+        self.model = model
+        self.retry_after = retry_after
+
+
+class RetryPolicy:
+    """
+    Decide which API errors are transient and how long to wait before retrying
+
+    Rate limits (429), server errors (5xx), timeouts and connection errors are
+    retried with exponential backoff and full jitter. A `retry-after` header
+    from the provider takes precedence over the computed delay.
+    """
+
+    RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+    def __init__(
+        self,
+        max_retries: int = 4,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        rand: Callable[[], float] = random.random,
+    ):
+        """
+        Initialize Retry Policy
+
+        Args:
+            max_retries: Retries after the first attempt (default: 4)
+            base_delay: Backoff delay for the first retry in seconds (default: 1.0)
+            max_delay: Upper bound for any single delay in seconds (default: 60.0)
+            rand: Random source in [0, 1) used for jitter (injectable for tests)
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rand = rand
+
+    @classmethod
+    def from_settings(cls, execution_settings: dict[str, Any] | None) -> "RetryPolicy":
+        """
+        Build a policy from an experiment's execution_settings
+
+        Args:
+            execution_settings: Experiment execution settings dict
+
+        Returns:
+            Configured RetryPolicy
+        """
+        execution_settings = execution_settings or {}
+        return cls(
+            max_retries=execution_settings.get("max_retries", 4),
+            base_delay=execution_settings.get("retry_base_delay", 1.0),
+            max_delay=execution_settings.get("retry_max_delay", 60.0),
+        )
+
+    def is_retryable(self, error: Exception) -> bool:
+        """
+        Check whether an error is transient
+
+        Args:
+            error: Exception raised by the API call
+
+        Returns:
+            True if the call should be retried
+        """
+        if isinstance(error, (CircuitOpenError, APITimeoutError, APIConnectionError)):
+            return True
+        if isinstance(error, APIStatusError):
+            return error.status_code in self.RETRYABLE_STATUS_CODES or error.status_code >= 500
+        return False
+
+    def retry_after(self, error: Exception) -> float | None:
+        """
+        Extract the server-requested delay from an error, if any
+
+        Supports `retry-after-ms`, and `retry-after` as seconds or an HTTP date.
+
+        Args:
+            error: Exception raised by the API call
+
+        Returns:
+            Delay in seconds, or None if the server did not specify one
+        """
+        if isinstance(error, CircuitOpenError):
+            return error.retry_after
+
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None)
+        if not headers:
+            return None
+
+        retry_after_ms = headers.get("retry-after-ms")
+        if retry_after_ms:
+            try:
+                return float(retry_after_ms) / 1000
+            except ValueError:
+                pass
+
+        retry_after = headers.get("retry-after")
+        if not retry_after:
+            return None
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def delay(self, attempt: int, error: Exception) -> float:
+        """
+        Compute the delay before the next attempt
+
+        Args:
+            attempt: Zero-based index of the attempt that just failed
+            error: Exception raised by that attempt
+
+        Returns:
+            Seconds to wait, capped at max_delay
+        """
+        retry_after = self.retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        backoff = min(self.max_delay, self.base_delay * (2**attempt))
+        return self.rand() * backoff
+
+
+class CircuitBreaker:
+    """
+    Stop sending requests to a model whose endpoint keeps failing
+
+    After `failure_threshold` consecutive transient failures the circuit opens
+    and calls are refused for `recovery_timeout` seconds. Then one probe call is
+    let through (half-open): success closes the circuit, failure reopens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        model: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize Circuit Breaker
+
+        Args:
+            model: Model name (used in error messages)
+            failure_threshold: Consecutive failures that open the circuit (default: 5)
+            recovery_timeout: Seconds the circuit stays open (default: 30.0)
+            clock: Monotonic clock function (injectable for tests)
+        """
+        self.model = model
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """Whether calls are currently being refused"""
+        with self._lock:
+            return (
+                self.state == self.OPEN
+                and self.clock() < self.opened_at + self.recovery_timeout
+            )
+
+    def before_call(self) -> None:
+        """
+        Check that a call may be sent
+
+        Raises:
+            CircuitOpenError: If the circuit is open or a probe is already in flight
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+
+            remaining = self.opened_at + self.recovery_timeout - self.clock()
+            if self.state == self.OPEN and remaining <= 0:
+                self.state = self.HALF_OPEN
+
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+
+            raise CircuitOpenError(self.model, max(remaining, 1.0))
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful call"""
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a transient failure, opening the circuit at the threshold"""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = self.clock()
+            self._probe_in_flight = False
+
+    def record_neutral(self) -> None:
+        """Release a probe slot after a call that says nothing about endpoint health"""
+        with self._lock:
+            self._probe_in_flight = False
+
+
+_breakers: dict[tuple[str, str | None, str | None], CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(
+    model: str, base_url: str | None = None, api_key: str | None = None
+) -> CircuitBreaker:
+    """
+    Get the process-wide circuit breaker for a model on a server
+
+    Args:
+        model: Model name
+        base_url: API base URL of the provider (None for the OpenAI default)
+        api_key: Give each API key its own breaker, so one throttled key does
+            not stop calls on the others (only its hash is kept)
+
+    Returns:
+        Shared CircuitBreaker instance
+    """
+    key_hash = hashlib.sha256(api_key.encode()).hexdigest() if api_key else None
+    key = (model, base_url, key_hash)
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(model)
+            _breakers[key] = breaker
+        return breaker
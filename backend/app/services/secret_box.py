@@ -0,0 +1,120 @@
+"""
+Authenticated Encryption of Secrets Kept in the Database
+"""
+import base64
+import hashlib
+import hmac
+import os
+
+from app.config import Settings
+
+
+class SecretBoxError(ValueError):
+    """Raised when a sealed value was tampered with or sealed under another secret"""
+
+
+class SecretBox:
+    """
+    Seal short secrets such as API keys with a server-side secret
+
+    Encrypt-then-MAC with the standard library only: HMAC-SHA256 of a random
+    nonce and a block counter is the keystream, and an HMAC-SHA256 tag over
+    the nonce and ciphertext authenticates it. The encryption and MAC keys
+    are derived separately from the secret. Every process that opens a value
+    needs the secret it was sealed with.
+    """
+
+    NONCE_BYTES = 16
+    TAG_BYTES = 32
+
+    def __init__(self, secret: str):
+        """
+        Initialize Secret Box
+
+        Args:
+            secret: Server-side secret shared by every process using the box
+
+        Raises:
+            ValueError: If the secret is empty
+        """
+        if not secret:
+            raise ValueError("Secret box needs a non-empty secret")
+        key = hashlib.sha256(secret.encode("utf-8")).digest()
+        self._encryption_key = hmac.new(key, b"encrypt", hashlib.sha256).digest()
+        self._mac_key = hmac.new(key, b"authenticate", hashlib.sha256).digest()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "SecretBox":
+        """
+        Build a box from the application settings
+
+        Args:
+            settings: Application settings
+
+        Returns:
+            SecretBox keyed by job_secret_key, or by the database credentials
+            when no job secret is configured
+        """
+        return cls(settings.job_secret_key or settings.database_url)
+
+    def _keystream(self, nonce: bytes, length: int) -> bytes:
+        """Generate `length` keystream bytes for a nonce"""
+        blocks = (length + 31) // 32
+        return b"".join(
+            hmac.new(
+                self._encryption_key, nonce + counter.to_bytes(8, "big"), hashlib.sha256
+            ).digest()
+            for counter in range(blocks)
+        )[:length]
+
+    def _tag(self, nonce: bytes, ciphertext: bytes) -> bytes:
+        """Authenticate a nonce and ciphertext"""
+        return hmac.new(self._mac_key, nonce + ciphertext, hashlib.sha256).digest()
+
+    def seal(self, value: str) -> str:
+        """
+        Encrypt and authenticate a secret
+
+        Args:
+            value: Secret to seal
+
+        Returns:
+            URL-safe base64 token holding the nonce, ciphertext and tag
+        """
+        plaintext = value.encode("utf-8")
+        nonce = os.urandom(self.NONCE_BYTES)
+        ciphertext = bytes(
+            a ^ b for a, b in zip(plaintext, self._keystream(nonce, len(plaintext)))
+        )
+        token = nonce + ciphertext + self._tag(nonce, ciphertext)
+        return base64.urlsafe_b64encode(token).decode("ascii")
+
+    def open(self, token: str) -> str:
+        """
+        Verify and decrypt a sealed secret
+
+        Args:
+            token: Token returned by seal()
+
+        Returns:
+            The original secret
+
+        Raises:
+            SecretBoxError: If the token is malformed, was tampered with or was
+                sealed under another secret
+        """
+        try:
+            raw = base64.urlsafe_b64decode(token.encode("ascii"))
+        except (ValueError, UnicodeEncodeError) as e:
+            raise SecretBoxError("Sealed secret is not valid base64") from e
+        if len(raw) < self.NONCE_BYTES + self.TAG_BYTES:
+            raise SecretBoxError("Sealed secret is truncated")
+
+        nonce = raw[: self.NONCE_BYTES]
+        ciphertext = raw[self.NONCE_BYTES : -self.TAG_BYTES]
+        if not hmac.compare_digest(raw[-self.TAG_BYTES :], self._tag(nonce, ciphertext)):
+            raise SecretBoxError("Sealed secret failed authentication")
+        plaintext = bytes(
+            a ^ b for a, b in zip(ciphertext, self._keystream(nonce, len(ciphertext)))
+        )
+        return plaintext.decode("utf-8")
@@ -0,0 +1,566 @@
+"""
+Multi-Stage Execution Strategies as Per-Participant DAGs of LLM Calls
+
+Strategy A (simple persona) is the executor's single-shot prompt. The other
+strategies from the design doc run as small DAGs per participant:
+
+- B, recall: recall relevant life experiences, then answer with them in mind
+- C, multi_agent: draft a perspective, have a second agent critique it for
+  authenticity, then answer taking the critique into account
+- D, validation: answer, re-ask a sample of closed questions in an
+  independent call, and flag inconsistent or low-confidence answers
+"""
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Union
+
+from app.services.budget import BudgetExceededError
+from app.services.chunk_planner import ChunkPlanner
+from app.services.llm_executor import LLMExecutor
+from app.services.prompt_template import CompiledPrompt, render_persona
+
+
+RECALL_PROMPT = """{persona}
+
+Before answering a questionnaire on the topics below, recall two or three specific experiences from your own life that relate to them. Describe each briefly, in the first person, as this participant would remember it.
+
+Topics:
+{topics}"""
+
+RECALL_CONTEXT = """Earlier, you recalled these experiences from your life:
+
+{recall}
+
+Consider how those experiences shaped your perspective, then answer as yourself.
+
+"""
+
+PERSPECTIVE_PROMPT = """{persona}
+
+In one short first-person paragraph, describe your outlook on the topics below: what you believe, what you have lived through, and how you tend to feel about them.
+
+Topics:
+{topics}"""
+
+CRITIQUE_PROMPT = """You review simulated research participants for authenticity. The simulator was given this profile:
+
+{persona}
+
+The simulated participant wrote this about themselves:
+
+{perspective}
+
+Point out anything unrealistic or stereotyped for someone with this profile, and say what a more authentic perspective would include. Be brief."""
+
+MULTI_AGENT_CONTEXT = """A first draft of your perspective was:
+
+{perspective}
+
+A reviewer commented on its authenticity:
+
+{critique}
+
+Taking the review into account, answer as this participant.
+
+"""
+
+# Question types re-asked by the validation strategy
+CLOSED_QUESTION_TYPES = ("likert_scale", "multiple_choice", "yes_no")
+
+# Scale answers further apart than this many points count as inconsistent
+SCALE_TOLERANCE = 1
+
+
+@dataclass(frozen=True)
+class TextStage:
+    """LLM call producing a free-text artifact for later stages"""
+
+    name: str
+    template: str
+    depends_on: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class AnswerStage:
+    """LLM calls answering the questionnaire, one per chunk"""
+
+    name: str
+    depends_on: tuple[str, ...] = ()
+    # Prepended to the questionnaire prompt, formatted with dependency artifacts
+    context: str = ""
+    # Answer only this share of the closed questions (validation duplicates)
+    duplicate_ratio: float | None = None
+
+
+@dataclass(frozen=True)
+class ConsistencyStage:
+    """Compare two answer stages without calling the LLM"""
+
+    name: str
+    depends_on: tuple[str, str]
+
+
+StrategyStage = Union[TextStage, AnswerStage, ConsistencyStage]
+
+
+@dataclass(frozen=True)
+class Strategy:
+    """
+    A named DAG of stages; the answer stage's result is the participant result
+
+    Stages are listed in dependency order.
+    """
+
+    name: str
+    stages: tuple[StrategyStage, ...]
+    answer_stage: str = "answer"
+
+    def __post_init__(self):
+        seen = set()
+        for stage in self.stages:
+            unknown = [name for name in stage.depends_on if name not in seen]
+            if unknown:
+                raise ValueError(f"Stage {stage.name} depends on later or unknown stages {unknown}")
+            seen.add(stage.name)
+        if self.answer_stage not in seen:
+            raise ValueError(f"Strategy {self.name} has no stage {self.answer_stage}")
+
+
+SIMPLE = "simple"
+
+RECALL = Strategy(
+    name="recall",
+    stages=(
+        TextStage("recall", RECALL_PROMPT),
+        AnswerStage("answer", depends_on=("recall",), context=RECALL_CONTEXT),
+    ),
+)
+MULTI_AGENT = Strategy(
+    name="multi_agent",
+    stages=(
+        TextStage("perspective", PERSPECTIVE_PROMPT),
+        TextStage("critique", CRITIQUE_PROMPT, depends_on=("perspective",)),
+        AnswerStage("answer", depends_on=("perspective", "critique"), context=MULTI_AGENT_CONTEXT),
+    ),
+)
+VALIDATION = Strategy(
+    name="validation",
+    stages=(
+        AnswerStage("answer"),
+        AnswerStage("duplicate", duplicate_ratio=0.2),
+        ConsistencyStage("consistency", depends_on=("answer", "duplicate")),
+    ),
+)
+
+STRATEGIES = {s.name: s for s in (RECALL, MULTI_AGENT, VALIDATION)}
+
+
+def get_strategy(name: str = SIMPLE) -> Strategy | None:
+    """
+    Look up an execution strategy
+
+    Args:
+        name: simple, recall, multi_agent or validation
+
+    Returns:
+        Strategy, or None for the single-shot simple strategy
+
+    Raises:
+        ValueError: If the strategy is unknown
+    """
+    if name == SIMPLE:
+        return None
+    strategy = STRATEGIES.get(name)
+    if strategy is None:
+        raise ValueError(f"Unknown execution strategy: {name}")
+    return strategy
+
+
+@dataclass
+class StageOutput:
+    """Artifact of a stage and what producing it cost"""
+
+    artifact: Any
+    stats: dict[str, Any]
+
+
+def _empty_stats() -> dict[str, Any]:
+    return {
+        "calls": 0,
+        "cost": 0.0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "total_tokens": 0,
+        "cached_tokens": 0,
+        "cached": False,
+        "latency_seconds": 0.0,
+    }
+
+
+class StrategyExecutor:
+    """
+    Run a multi-stage strategy for each participant
+
+    Every stage is started as a task that waits for the stages it depends
+    on, so independent stages run concurrently, and under the execution
+    engine the stages of different participants overlap. Calls go through
+    the wrapped LLMExecutor (pacing, retries, routing, budget) and every
+    stage's completion is kept in its response cache, so intermediate
+    artifacts are reused across runs. Results carry per-stage tokens, cost
+    and latency under `stages`; their usage fields cover all stages.
+    """
+
+    def __init__(self, executor: LLMExecutor, strategy: Strategy):
+        """
+        Initialize Strategy Executor
+
+        Args:
+            executor: Executor that sends the calls
+            strategy: Strategy to run
+        """
+        self.executor = executor
+        self.strategy = strategy
+
+    @property
+    def budget(self):
+        """The wrapped executor's budget (read by the execution engine)"""
+        return self.executor.budget
+
+    @property
+    def concurrency_controller(self):
+        """The wrapped executor's concurrency controller (read by the execution engine)"""
+        return self.executor.concurrency_controller
+
+    async def execute_participant_async(
+        self,
+        profile: dict[str, Any],
+        questions: list[dict[str, Any]],
+        on_answer: Any = None,
+    ) -> dict[str, Any]:
+        """
+        Run every stage of the strategy for one participant
+
+        Args:
+            profile: Participant profile dict
+            questions: List of question dicts
+            on_answer: Ignored; strategies do not stream
+
+        Returns:
+            The answer stage's participant result with usage summed over all
+            stages, per-stage stats under `stages`, and for the validation
+            strategy `inconsistent` and `low_confidence`
+
+        Raises:
+            BudgetExceededError: If the budget refused a call
+            Exception: If a stage failed
+        """
+        tasks: dict[str, asyncio.Task] = {}
+        for stage in self.strategy.stages:
+            tasks[stage.name] = asyncio.ensure_future(
+                self._run_stage(stage, profile, questions, tasks)
+            )
+        try:
+            outcomes = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        finally:
+            for task in tasks.values():
+                task.cancel()
+        # Dependents re-raise their dependency's error, so the first in stage order is the cause
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                raise outcome
+
+        outputs = dict(zip(tasks, outcomes))
+        result = dict(outputs[self.strategy.answer_stage].artifact)
+        for field in self.executor.USAGE_FIELDS:
+            result[field] = sum(output.stats[field] for output in outputs.values())
+        result["cached"] = all(
+            output.stats["cached"] for output in outputs.values() if output.stats["calls"]
+        )
+        result["stages"] = {name: output.stats for name, output in outputs.items()}
+        for output in outputs.values():
+            if isinstance(output.artifact, dict) and "inconsistent" in output.artifact:
+                result.update(output.artifact)
+        return result
+
+    async def _run_stage(
+        self,
+        stage: StrategyStage,
+        profile: dict[str, Any],
+        questions: list[dict[str, Any]],
+        tasks: dict[str, asyncio.Task],
+    ) -> StageOutput:
+        """
+        Wait for a stage's dependencies, then run it
+
+        Args:
+            stage: Stage to run
+            profile: Participant profile dict
+            questions: List of question dicts
+            tasks: Tasks of the earlier stages, by name
+
+        Returns:
+            StageOutput
+
+        Raises:
+            BudgetExceededError: If the budget refused a call
+            Exception: If the stage or a dependency failed
+        """
+        inputs = {name: await tasks[name] for name in stage.depends_on}
+        started = time.monotonic()
+        try:
+            if isinstance(stage, TextStage):
+                output = await self._run_text(stage, profile, questions, inputs)
+            elif isinstance(stage, AnswerStage):
+                output = await self._run_answer(stage, profile, questions, inputs)
+            else:
+                output = self._run_consistency(stage, questions, inputs)
+        except (ValueError, BudgetExceededError):
+            raise
+        except Exception as e:
+            raise Exception(f"Stage {stage.name} failed: {str(e)}")
+        output.stats["latency_seconds"] = time.monotonic() - started
+        return output
+
+    async def _complete(
+        self, user_content: str, response_format: dict[str, Any] | None = None
+    ) -> tuple[str, dict[str, int], bool, str | None]:
+        """
+        Get a completion, from the response cache when possible
+
+        Args:
+            user_content: User message to send
+            response_format: Optional structured-output format
+
+        Returns:
+            Tuple of (content, usage, whether it was cached, cache key to
+            store a fresh completion under or None)
+        """
+        executor = self.executor
+        cache_key = None
+        if executor.response_cache:
+            cache_key = executor._cache_key(user_content)
+            if not executor.cache_bypass:
+                cached = executor.response_cache.get_memory(cache_key) or await asyncio.to_thread(
+                    executor.response_cache.get_persistent, cache_key
+                )
+                if cached:
+                    return cached["content"], cached["usage"], True, None
+
+        response = await executor._create_completion_async(
+            executor._build_messages(user_content), response_format=response_format
+        )
+        return (
+            response.choices[0].message.content,
+            executor._usage_from_response(response),
+            False,
+            cache_key,
+        )
+
+    async def _store(self, cache_key: str | None, content: str, usage: dict[str, int]) -> None:
+        """Cache a fresh completion once it has proven usable"""
+        if cache_key:
+            await asyncio.to_thread(
+                self.executor.response_cache.set, cache_key, self.executor.model, content, usage
+            )
+
+    @staticmethod
+    def _topics(questions: list[dict[str, Any]]) -> str:
+        """List the question texts for recall and perspective prompts"""
+        return "\n".join(f"- {q.get('question_text', '')}" for q in questions)
+
+    async def _run_text(
+        self,
+        stage: TextStage,
+        profile: dict[str, Any],
+        questions: list[dict[str, Any]],
+        inputs: dict[str, StageOutput],
+    ) -> StageOutput:
+        """
+        Produce a free-text artifact
+
+        Raises:
+            ValueError: If the completion is empty
+        """
+        prompt = stage.template.format(
+            persona=render_persona(profile),
+            topics=self._topics(questions),
+            **{name: output.artifact for name, output in inputs.items()},
+        )
+        content, usage, cached, cache_key = await self._complete(prompt)
+        if not content or not content.strip():
+            raise ValueError(f"Stage {stage.name} returned no text")
+        await self._store(cache_key, content, usage)
+
+        stats = _empty_stats()
+        stats["calls"] = 1
+        stats["cached"] = cached
+        if not cached:
+            stats["cost"] = self.executor._usage_cost(usage)
+            for field in ("prompt_tokens", "completion_tokens", "total_tokens", "cached_tokens"):
+                stats[field] = usage.get(field, 0)
+        return StageOutput(artifact=content.strip(), stats=stats)
+
+    def _duplicate_sample(
+        self, stage: AnswerStage, profile: dict[str, Any], questions: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """
+        Pick the closed questions to re-ask, the same ones on every run
+
+        Args:
+            stage: Answer stage with a duplicate_ratio
+            profile: Participant profile dict (seeds the choice)
+            questions: List of question dicts
+
+        Returns:
+            Sampled questions in questionnaire order
+        """
+        closed = [q for q in questions if q.get("question_type") in CLOSED_QUESTION_TYPES]
+        if not closed:
+            return []
+        count = max(1, round(stage.duplicate_ratio * len(closed)))
+        rng = random.Random(f"{self.strategy.name}-{profile.get('participant_number')}")
+        chosen = {id(q) for q in rng.sample(closed, min(count, len(closed)))}
+        return [q for q in closed if id(q) in chosen]
+
+    async def _run_answer(
+        self,
+        stage: AnswerStage,
+        profile: dict[str, Any],
+        questions: list[dict[str, Any]],
+        inputs: dict[str, StageOutput],
+    ) -> StageOutput:
+        """
+        Answer the questionnaire (or a duplicate sample of it), chunk by chunk
+
+        Raises:
+            ValueError: If no chunk's response could be parsed
+            Exception: If every chunk's call failed
+        """
+        executor = self.executor
+        if stage.duplicate_ratio is not None:
+            sample = self._duplicate_sample(stage, profile, questions)
+            if not sample:
+                return StageOutput(artifact={"responses": {}}, stats=_empty_stats())
+            chunks = ChunkPlanner(executor.max_tokens, executor.max_questions_per_chunk).plan(sample)
+            prompts = [CompiledPrompt(chunk, layout=executor.prompt_layout) for chunk in chunks]
+        else:
+            prompts = executor.compile_chunks(questions)
+
+        context = stage.context.format(
+            **{name: output.artifact for name, output in inputs.items()}
+        )
+        outcomes = await asyncio.gather(
+            *(self._answer_chunk(compiled, profile, context) for compiled in prompts),
+            return_exceptions=True,
+        )
+        budget_errors = [o for o in outcomes if isinstance(o, BudgetExceededError)]
+        if len(budget_errors) == len(outcomes):
+            raise budget_errors[0]
+        result = executor._merge_chunk_outcomes(list(outcomes))
+
+        stats = _empty_stats()
+        stats["calls"] = len(prompts)
+        stats["cached"] = result["cached"]
+        for field in executor.USAGE_FIELDS:
+            stats[field] = result[field]
+        return StageOutput(artifact=result, stats=stats)
+
+    async def _answer_chunk(
+        self, compiled: CompiledPrompt, profile: dict[str, Any], context: str
+    ) -> dict[str, Any]:
+        """
+        Answer one block of questions
+
+        Args:
+            compiled: Compiled prompt for the block
+            profile: Participant profile dict
+            context: Text from earlier stages to put before the questionnaire
+
+        Returns:
+            Participant result dict for the block
+        """
+        executor = self.executor
+        validator = executor._validator(compiled)
+        content, usage, cached, cache_key = await self._complete(
+            context + compiled.render(profile), executor._response_format(compiled)
+        )
+        result = executor._build_result(
+            content, usage, compiled.question_ids, cached=cached, validator=validator
+        )
+        await self._store(cache_key, content, usage)
+        return result
+
+    @staticmethod
+    def _consistent(question: dict[str, Any], first: Any, second: Any) -> bool:
+        """Whether two answers to the same question agree"""
+        if question.get("question_type") == "likert_scale":
+            try:
+                return abs(float(first) - float(second)) <= SCALE_TOLERANCE
+            except (TypeError, ValueError):
+                pass
+        return str(first).strip().lower() == str(second).strip().lower()
+
+    def _run_consistency(
+        self,
+        stage: ConsistencyStage,
+        questions: list[dict[str, Any]],
+        inputs: dict[str, StageOutput],
+    ) -> StageOutput:
+        """
+        Flag answers that changed when re-asked, and low-confidence answers
+
+        Returns:
+            StageOutput whose artifact has `inconsistent` (question_id to both
+            answers) and `low_confidence` (question IDs)
+        """
+        first_name, second_name = stage.depends_on
+        first = inputs[first_name].artifact["responses"]
+        second = inputs[second_name].artifact["responses"]
+        by_id = {q.get("question_id"): q for q in questions}
+
+        inconsistent = {}
+        for question_id, repeat in second.items():
+            answer = first.get(question_id)
+            if not isinstance(answer, dict) or not isinstance(repeat, dict):
+                continue
+            if not self._consistent(by_id.get(question_id, {}), answer.get("response"), repeat.get("response")):
+                inconsistent[question_id] = {
+                    "first": answer.get("response"),
+                    "second": repeat.get("response"),
+                }
+        low_confidence = [
+            question_id
+            for question_id, answer in first.items()
+            if isinstance(answer, dict) and answer.get("confidence") == "low"
+        ]
+        return StageOutput(
+            artifact={"inconsistent": inconsistent, "low_confidence": low_confidence},
+            stats=_empty_stats(),
+        )
+
+
+def summarize_stages(results: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    """
+    Total the per-stage stats of a run's participant results
+
+    Args:
+        results: Participant results from StrategyExecutor
+
+    Returns:
+        Per stage: calls, tokens, cost and mean latency per participant
+    """
+    summary: dict[str, dict[str, Any]] = {}
+    for result in results:
+        for name, stats in result.get("stages", {}).items():
+            totals = summary.setdefault(
+                name,
+                {"participants": 0, "calls": 0, "total_tokens": 0, "cost": 0.0, "latency_seconds": 0.0},
+            )
+            totals["participants"] += 1
+            for field in ("calls", "total_tokens", "cost", "latency_seconds"):
+                totals[field] += stats[field]
+    for totals in summary.values():
+        totals["mean_latency_seconds"] = totals.pop("latency_seconds") / totals["participants"]
+    return summary
@@ -0,0 +1,143 @@
+"""
+Incremental JSON Parser for Streamed LLM Responses
+"""
+import json
+from typing import Any
+
+
+class MalformedStreamError(ValueError):
+    """Raised as soon as a streamed response can no longer be a JSON object"""
+
+
+class IncrementalJSONParser:
+    """
+    Parse a top-level JSON object as it arrives in chunks
+
+    Each call to feed() returns the top-level members whose values became
+    complete, so answers can be used before the whole response has streamed.
+    A short preamble such as "```json" is tolerated before the opening brace.
+    """
+
+    # Non-whitespace characters allowed before the opening brace
+    MAX_PREAMBLE = 200
+
+    PREAMBLE = "preamble"
+    EXPECT_KEY = "expect_key"
+    IN_KEY = "in_key"
+    EXPECT_COLON = "expect_colon"
+    EXPECT_VALUE = "expect_value"
+    IN_VALUE = "in_value"
+    DONE = "done"
+
+    def __init__(self):
+        """Initialize an empty parser"""
+        self.buffer = ""
+        self.position = 0
+        self.state = self.PREAMBLE
+        self.preamble_chars = 0
+        self.key: str | None = None
+        self.token_start = 0
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    @property
+    def done(self) -> bool:
+        """Whether the closing brace of the top-level object has been seen"""
+        return self.state == self.DONE
+
+    @property
+    def started(self) -> bool:
+        """Whether the opening brace of the top-level object has been seen"""
+        return self.state != self.PREAMBLE
+
+    def _fail(self, message: str) -> None:
+        """Raise a MalformedStreamError pointing at the current position"""
+        raise MalformedStreamError(f"{message} at offset {self.position}")
+
+    def feed(self, text: str) -> list[tuple[str, Any]]:
+        """
+        Consume the next chunk of the response
+
+        Args:
+            text: Newly received content
+
+        Returns:
+            List of (key, value) pairs completed by this chunk
+
+        Raises:
+            MalformedStreamError: If the content cannot be a JSON object
+        """
+        self.buffer += text
+        completed = []
+
+        while self.position < len(self.buffer) and self.state != self.DONE:
+            char = self.buffer[self.position]
+
+            if self.state == self.PREAMBLE:
+                if char == "{":
+                    self.state = self.EXPECT_KEY
+                elif not char.isspace():
+                    self.preamble_chars += 1
+                    if self.preamble_chars > self.MAX_PREAMBLE:
+                        self._fail("No JSON object found")
+
+            elif self.state == self.EXPECT_KEY:
+                if char == '"':
+                    self.state = self.IN_KEY
+                    self.token_start = self.position
+                elif char == "}":
+                    self.state = self.DONE
+                elif not char.isspace():
+                    self._fail(f"Expected object key, got {char!r}")
+
+            elif self.state == self.IN_KEY:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.key = json.loads(self.buffer[self.token_start : self.position + 1])
+                    self.state = self.EXPECT_COLON
+
+            elif self.state == self.EXPECT_COLON:
+                if char == ":":
+                    self.state = self.EXPECT_VALUE
+                elif not char.isspace():
+                    self._fail(f"Expected ':', got {char!r}")
+
+            elif self.state == self.EXPECT_VALUE:
+                if not char.isspace():
+                    self.state = self.IN_VALUE
+                    self.token_start = self.position
+                    self.depth = 0
+                    self.in_string = False
+                    # Re-scan this character as part of the value
+                    continue
+
+            elif self.state == self.IN_VALUE:
+                if self.in_string:
+                    if self.escaped:
+                        self.escaped = False
+                    elif char == "\\":
+                        self.escaped = True
+                    elif char == '"':
+                        self.in_string = False
+                elif char == '"':
+                    self.in_string = True
+                elif char in "{[":
+                    self.depth += 1
+                elif char in "}]" and self.depth > 0:
+                    self.depth -= 1
+                elif self.depth == 0 and char in ",}":
+                    value_text = self.buffer[self.token_start : self.position]
+                    try:
+                        value = json.loads(value_text)
+                    except json.JSONDecodeError as e:
+                        self._fail(f"Invalid value for {self.key!r}: {e.msg}")
+                    completed.append((self.key, value))
+                    self.state = self.EXPECT_KEY if char == "," else self.DONE
+
+            self.position += 1
+
+        return completed
@@ -0,0 +1,292 @@
+"""
+Local OpenAI-Compatible Stub LLM Server for Load Testing
+
+Serves synthetic participant answers on /v1/chat/completions with
+configurable latency, error rate and 429 bursts, so the execution pipeline
+can be exercised end to end without a real provider:
+
+    python -m app.stub_server --port 8001 --latency 0.3 --error-rate 0.01
+
+and run experiments with execution_settings {"provider": "stub"}.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+QUESTION_BLOCK = re.compile(r"Question ID: (\S+)\n(.*?)(?=\n\nQuestion ID: |\n\n\n|\Z)", re.DOTALL)
+SCALE_LINE = re.compile(r"Scale: (-?\d+)(?: \([^)]*\))? to (-?\d+)")
+PARTICIPANT_NUMBER = re.compile(r"Participant #(\d+)")
+PACKED_MARKER = "keyed by participant number"
+
+CONFIDENCE_LEVELS = ("high", "medium", "low")
+OPEN_ENDED_ANSWERS = (
+    "I think it depends on the situation, but mostly I try to stay positive.",
+    "Honestly, it has been a mixed experience for me lately.",
+    "I have not thought about it much, but I would say it matters to me.",
+)
+
+# Characters per streamed content chunk
+STREAM_CHUNK_CHARS = 16
+
+
+@dataclass
+class StubConfig:
+    """Behaviour of the stub server"""
+
+    latency: float = 0.05
+    latency_jitter: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_every: int = 0
+    rate_limit_burst: int = 0
+    retry_after: float = 1.0
+    seed: int | None = None
+
+
+class SyntheticAnswers:
+    """Generate answers that satisfy a response schema or a rendered questionnaire"""
+
+    def __init__(self, rng: random.Random):
+        """
+        Initialize the generator
+
+        Args:
+            rng: Random number generator
+        """
+        self.rng = rng
+
+    def from_schema(self, schema: dict[str, Any], hint: Any = None) -> Any:
+        """
+        Build a value satisfying a JSON schema
+
+        Args:
+            schema: JSON schema (object, enum, integer and string are supported)
+            hint: Answers from from_prompt() in the same nesting; strict schemas
+                carry no bounds for wide scales, so their integers come from
+                the scale rendered in the prompt
+
+        Returns:
+            Generated value
+        """
+        if "enum" in schema:
+            return self.rng.choice(schema["enum"])
+        if schema.get("type") == "object":
+            hints = hint if isinstance(hint, dict) else {}
+            return {
+                key: self.from_schema(sub_schema, hints.get(key))
+                for key, sub_schema in schema.get("properties", {}).items()
+            }
+        if schema.get("type") == "integer":
+            if "minimum" not in schema and isinstance(hint, int) and not isinstance(hint, bool):
+                return hint
+            return self.rng.randint(schema.get("minimum", 1), schema.get("maximum", 5))
+        return self.rng.choice(OPEN_ENDED_ANSWERS)
+
+    def answer_question(self, block: str) -> dict[str, Any]:
+        """
+        Answer one rendered question block
+
+        Args:
+            block: Question text and its options line
+
+        Returns:
+            Answer object with response and confidence
+        """
+        scale = SCALE_LINE.search(block)
+        if scale:
+            response: Any = self.rng.randint(int(scale.group(1)), int(scale.group(2)))
+        elif "Options: " in block:
+            options = block.split("Options: ", 1)[1].splitlines()[0]
+            response = self.rng.choice([o.strip() for o in options.split(",")])
+        elif "'Yes' or 'No'" in block:
+            response = self.rng.choice(("Yes", "No"))
+        else:
+            response = self.rng.choice(OPEN_ENDED_ANSWERS)
+        return {"response": response, "confidence": self.rng.choice(CONFIDENCE_LEVELS)}
+
+    def from_prompt(self, prompt: str) -> dict[str, Any]:
+        """
+        Answer every question in a participant or multi-persona prompt
+
+        Args:
+            prompt: Rendered user prompt
+
+        Returns:
+            Answers keyed by question ID, or by participant number for packed prompts
+        """
+        questions = QUESTION_BLOCK.findall(prompt)
+        if PACKED_MARKER in prompt:
+            tail = prompt.rsplit("```", 1)[-1]
+            return {
+                number: {qid: self.answer_question(block) for qid, block in questions}
+                for number in PARTICIPANT_NUMBER.findall(tail)
+            }
+        return {qid: self.answer_question(block) for qid, block in questions}
+
+
+def _error(status_code: int, message: str, error_type: str, headers: dict | None = None):
+    """Build an OpenAI-style error response"""
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": {"message": message, "type": error_type, "code": None}},
+        headers=headers,
+    )
+
+
+def create_stub_app(config: StubConfig | None = None) -> FastAPI:
+    """
+    Create the stub server application
+
+    Args:
+        config: Server behaviour (default: StubConfig())
+
+    Returns:
+        FastAPI application
+    """
+    config = config or StubConfig()
+    rng = random.Random(config.seed)
+    answers = SyntheticAnswers(rng)
+    app = FastAPI(title="Stub LLM Server")
+    app.state.config = config
+    app.state.request_count = 0
+
+    @app.get("/v1/models")
+    def list_models():
+        """List the single stub model"""
+        return {"object": "list", "data": [{"id": "stub", "object": "model", "owned_by": "stub"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        """Answer a chat completion request with synthetic participant data"""
+        body = await request.json()
+        app.state.request_count += 1
+        count = app.state.request_count
+
+        # Every rate_limit_every requests, the next rate_limit_burst are throttled
+        if config.rate_limit_every and config.rate_limit_burst:
+            if (count - 1) % config.rate_limit_every < config.rate_limit_burst:
+                return _error(
+                    429,
+                    "Rate limit reached (stub burst)",
+                    "rate_limit_exceeded",
+                    headers={"retry-after": str(config.retry_after)},
+                )
+
+        await asyncio.sleep(config.latency + rng.uniform(0, config.latency_jitter))
+
+        if config.error_rate and rng.random() < config.error_rate:
+            return _error(500, "Injected stub failure", "server_error")
+
+        prompt = body["messages"][-1]["content"]
+        response_format = body.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            content = json.dumps(
+                answers.from_schema(
+                    response_format["json_schema"]["schema"], answers.from_prompt(prompt)
+                )
+            )
+        else:
+            content = json.dumps(answers.from_prompt(prompt))
+
+        prompt_chars = sum(len(m.get("content") or "") for m in body["messages"])
+        usage = {
+            "prompt_tokens": prompt_chars // 4,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": prompt_chars // 4 + len(content) // 4,
+        }
+        completion_id = f"chatcmpl-stub-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        model = body.get("model", "stub")
+
+        if body.get("stream"):
+            include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+            return StreamingResponse(
+                _stream(completion_id, created, model, content, usage if include_usage else None),
+                media_type="text/event-stream",
+            )
+
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": usage,
+        }
+
+    return app
+
+
+async def _stream(
+    completion_id: str, created: int, model: str, content: str, usage: dict[str, int] | None
+):
+    """Yield a completion as server-sent chat.completion.chunk events"""
+
+    def event(choices: list[dict[str, Any]], chunk_usage: dict[str, int] | None = None) -> str:
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": choices,
+            "usage": chunk_usage,
+        }
+        return f"data: {json.dumps(chunk)}\n\n"
+
+    for start in range(0, len(content), STREAM_CHUNK_CHARS):
+        piece = content[start : start + STREAM_CHUNK_CHARS]
+        yield event([{"index": 0, "delta": {"content": piece}, "finish_reason": None}])
+        await asyncio.sleep(0)
+    yield event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+    if usage:
+        yield event([], usage)
+    yield "data: [DONE]\n\n"
+
+
+def main() -> None:
+    """Run the stub server from the command line"""
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.05, help="Base seconds per request")
+    parser.add_argument("--latency-jitter", type=float, default=0.0, help="Extra random seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of 500 responses")
+    parser.add_argument(
+        "--rate-limit-every", type=int, default=0, help="Start a 429 burst every N requests"
+    )
+    parser.add_argument("--rate-limit-burst", type=int, default=0, help="429s per burst")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="retry-after seconds")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = StubConfig(
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        rate_limit_every=args.rate_limit_every,
+        rate_limit_burst=args.rate_limit_burst,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    uvicorn.run(create_stub_app(config), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Execution Worker Pool
+
+Runs queued experiment executions outside the API process, so runs survive
+API restarts and execution capacity scales separately from the API tier:
+
+    python -m app.worker --processes 4
+
+Each process polls the execution_jobs table, runs one experiment at a time
+and heartbeats its lease meanwhile. SIGINT/SIGTERM let the current run
+finish before the process exits. Rate limiters are per process, so the
+configured RPM/TPM limits apply to each worker process separately.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+import uuid
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.experiment import Experiment as ExperimentModel
+from app.services.job_queue import ClaimedJob, JobQueue
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """Claim and run execution jobs one at a time"""
+
+    DEFAULT_POLL_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        worker_id: str | None = None,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        heartbeat_interval: float | None = None,
+        execute: Callable[[ClaimedJob], str | None] | None = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        """
+        Initialize Worker
+
+        Args:
+            queue: Job queue to claim from
+            worker_id: Identifier recorded on claimed jobs (default: host, pid
+                and a random suffix)
+            poll_interval: Seconds to wait when the queue is empty (default: 1.0)
+            heartbeat_interval: Seconds between lease extensions (default: a
+                third of the lease)
+            execute: Runs a job and returns an error message or None (default:
+                execute_experiment_task)
+            session_factory: Callable returning a new database session
+        """
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval or queue.lease_seconds / 3
+        self.execute = execute or self._execute
+        self.session_factory = session_factory
+        self.jobs_run = 0
+        self.leases_lost = 0
+        self._stopping = threading.Event()
+
+    def stop(self) -> None:
+        """Stop claiming jobs; a job in progress still finishes"""
+        self._stopping.set()
+
+    def run(self) -> None:
+        """Claim and run jobs until stopped"""
+        while not self._stopping.is_set():
+            if not self.run_once():
+                self._stopping.wait(self.poll_interval)
+
+    def run_once(self) -> bool:
+        """
+        Claim and run one job
+
+        Returns:
+            False if there was no job to claim
+        """
+        job = self.queue.claim(self.worker_id)
+        if job is None:
+            return False
+
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job, done), daemon=True)
+        heartbeat.start()
+        try:
+            error = self.execute(job)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        finally:
+            done.set()
+            heartbeat.join()
+
+        if not self.queue.finish(job.id, self.worker_id, error):
+            self.leases_lost += 1
+        self.jobs_run += 1
+        return True
+
+    def _heartbeat(self, job: ClaimedJob, done: threading.Event) -> None:
+        """
+        Extend the job's lease until the run ends or the lease is lost
+
+        A lost lease sets job.lease_lost so the run stops before another
+        worker's run of the same job writes alongside it. Failed heartbeats
+        are retried until the lease would have run out.
+        """
+        extended_at = time.monotonic()
+        while not done.wait(self.heartbeat_interval):
+            try:
+                if not self.queue.heartbeat(job.id, self.worker_id):
+                    job.lease_lost.set()
+                    return
+                extended_at = time.monotonic()
+            except Exception:
+                logger.exception("Heartbeat for job %s failed", job.id)
+                if time.monotonic() - extended_at >= self.queue.lease_seconds:
+                    job.lease_lost.set()
+                    return
+
+    def _execute(self, job: ClaimedJob) -> str | None:
+        """
+        Run an experiment with execute_experiment_task
+
+        Args:
+            job: Claimed job
+
+        Returns:
+            The run's error message, or None if it completed
+        """
+        from app.api.v1.execution import execute_experiment_task
+
+        db = self.session_factory()
+        try:
+            execute_experiment_task(
+                experiment_id=job.experiment_id, db=db, lease_lost=job.lease_lost, **job.payload
+            )
+            experiment = db.get(ExperimentModel, job.experiment_id)
+            if experiment is None:
+                return "Experiment no longer exists"
+            if experiment.status == "failed":
+                return experiment.meta_data.get("execution_error", "Execution failed")
+            return None
+        finally:
+            db.close()
+
+
+def run_worker(poll_interval: float, lease_seconds: float) -> None:
+    """
+    Run one worker in this process until SIGINT or SIGTERM
+
+    Args:
+        poll_interval: Seconds to wait when the queue is empty
+        lease_seconds: Job lease length
+    """
+    worker = Worker(JobQueue(lease_seconds=lease_seconds), poll_interval=poll_interval)
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: worker.stop())
+    worker.run()
+
+
+def main() -> None:
+    """Run the worker pool from the command line"""
+    parser = argparse.ArgumentParser(description="Experiment execution worker pool")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes to run")
+    parser.add_argument(
+        "--poll-interval", type=float, default=Worker.DEFAULT_POLL_INTERVAL,
+        help="Seconds between polls of an empty queue",
+    )
+    parser.add_argument(
+        "--lease-seconds", type=float, default=JobQueue.DEFAULT_LEASE_SECONDS,
+        help="Seconds a job stays leased without a heartbeat",
+    )
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        run_worker(args.poll_interval, args.lease_seconds)
+        return
+
+    # Spawned children open their own database connections
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=run_worker, args=(args.poll_interval, args.lease_seconds))
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+
+    def forward(signum, frame):
+        for process in processes:
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, forward)
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
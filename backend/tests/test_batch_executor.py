@@ -0,0 +1,236 @@
+"""
+Tests for the offline Batch API Executor
+"""
+import json
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.batch_executor import BatchExecutor
+from app.services.llm_executor import LLMExecutor
+
+
+QUESTIONS = [
+    {
+        "question_id": "q1",
+        "question_text": "Rate your stress",
+        "question_type": "likert_scale",
+        "options": {"min": 1, "max": 5},
+    },
+    {
+        "question_id": "q2",
+        "question_text": "Do you exercise?",
+        "question_type": "yes_no",
+        "options": {},
+    },
+]
+
+
+class StubBatchClient:
+    """
+    Local stand-in for the provider's files and batches endpoints
+
+    Batches move through validating -> in_progress -> finalizing -> completed,
+    one step per retrieve call. On completion each input line gets a synthetic
+    chat completion answering every "Question ID:" in its prompt, except
+    custom IDs listed in `fail_ids`, which go to the error file.
+    """
+
+    LIFECYCLE = ["validating", "in_progress", "finalizing", "completed"]
+
+    def __init__(self, fail_ids=(), final_status="completed"):
+        self.fail_ids = set(fail_ids)
+        self.final_status = final_status
+        self.stored_files = {}
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch)
+        self.files = SimpleNamespace(create=self._create_file, content=self._file_content)
+        self._batches = {}
+        self.retrieve_calls = 0
+
+    def _create_file(self, file, purpose):
+        assert purpose == "batch"
+        file_id = f"file-{len(self.stored_files) + 1}"
+        self.stored_files[file_id] = file[1].decode("utf-8")
+        return SimpleNamespace(id=file_id)
+
+    def _file_content(self, file_id):
+        return SimpleNamespace(text=self.stored_files[file_id])
+
+    def _create_batch(self, input_file_id, endpoint, completion_window):
+        batch_id = f"batch-{len(self._batches) + 1}"
+        self._batches[batch_id] = {"input_file_id": input_file_id, "step": 0}
+        return self._batch_object(batch_id)
+
+    def _retrieve_batch(self, batch_id):
+        self.retrieve_calls += 1
+        state = self._batches[batch_id]
+        state["step"] = min(state["step"] + 1, len(self.LIFECYCLE) - 1)
+        if self.LIFECYCLE[state["step"]] == "completed" and "output_file_id" not in state:
+            self._finish(batch_id)
+        return self._batch_object(batch_id)
+
+    def _finish(self, batch_id):
+        state = self._batches[batch_id]
+        outputs, errors = [], []
+        for line in self.stored_files[state["input_file_id"]].splitlines():
+            request = json.loads(line)
+            custom_id = request["custom_id"]
+            if custom_id in self.fail_ids:
+                errors.append({
+                    "id": f"req-{custom_id}",
+                    "custom_id": custom_id,
+                    "response": {"status_code": 500, "body": {"error": {"message": "server error"}}},
+                    "error": None,
+                })
+                continue
+            prompt = request["body"]["messages"][-1]["content"]
+            answers = {
+                qid: {"response": "3", "confidence": "high"}
+                for qid in re.findall(r"Question ID: (\S+)", prompt)
+            }
+            outputs.append({
+                "id": f"req-{custom_id}",
+                "custom_id": custom_id,
+                "response": {
+                    "status_code": 200,
+                    "body": {
+                        "id": f"chatcmpl-{custom_id}",
+                        "object": "chat.completion",
+                        "created": 0,
+                        "model": request["body"]["model"],
+                        "choices": [{
+                            "index": 0,
+                            "finish_reason": "stop",
+                            "message": {"role": "assistant", "content": json.dumps(answers)},
+                        }],
+                        "usage": {"prompt_tokens": 1000, "completion_tokens": 100, "total_tokens": 1100},
+                    },
+                },
+                "error": None,
+            })
+        state["output_file_id"] = self._store("\n".join(json.dumps(o) for o in outputs))
+        state["error_file_id"] = self._store("\n".join(json.dumps(e) for e in errors)) if errors else None
+
+    def _store(self, text):
+        file_id = f"file-{len(self.stored_files) + 1}"
+        self.stored_files[file_id] = text
+        return file_id
+
+    def _batch_object(self, batch_id):
+        state = self._batches[batch_id]
+        status = self.LIFECYCLE[state["step"]]
+        if status == "completed":
+            status = self.final_status
+        return SimpleNamespace(
+            id=batch_id,
+            status=status,
+            errors=None,
+            output_file_id=state.get("output_file_id"),
+            error_file_id=state.get("error_file_id"),
+        )
+
+
+def make_profiles(count):
+    """Build minimal participant profiles"""
+    return [{"participant_number": i + 1, "age": 30} for i in range(count)]
+
+
+class TestBuildBatchFile:
+    """Tests for BatchExecutor.build_batch_file"""
+
+    def test_one_request_per_participant(self):
+        """Test that each participant becomes one JSONL chat completion request"""
+        executor = LLMExecutor(api_key="test-key", max_tokens=400)
+        batch = BatchExecutor(executor, client=StubBatchClient())
+
+        lines = batch.build_batch_file(make_profiles(3), QUESTIONS).decode().splitlines()
+
+        assert len(lines) == 3
+        request = json.loads(lines[1])
+        assert request["custom_id"] == "participant-2"
+        assert request["url"] == "/v1/chat/completions"
+        assert request["body"]["model"] == "gpt-4o"
+        assert request["body"]["max_tokens"] == 400
+        assert "Participant #2" in request["body"]["messages"][-1]["content"]
+
+
+class TestRun:
+    """Tests for the full batch lifecycle"""
+
+    def test_run_ingests_output_file(self):
+        """Test that a completed batch yields one parsed result per participant"""
+        client = StubBatchClient()
+        executor = LLMExecutor(api_key="test-key")
+        batch = BatchExecutor(executor, poll_interval=0, client=client, sleep=lambda s: None)
+
+        outcomes = batch.run(make_profiles(4), QUESTIONS)
+
+        assert batch.batch_id == "batch-1"
+        assert client.retrieve_calls == 3
+        assert [o["profile"]["participant_number"] for o in outcomes] == [1, 2, 3, 4]
+        assert all(o["error"] is None for o in outcomes)
+        assert outcomes[0]["result"]["responses"]["q2"]["response"] == "3"
+        assert outcomes[0]["result"]["total_tokens"] == 1100
+
+    def test_batch_results_are_discounted(self):
+        """Test that batch results are priced at the batch discount"""
+        executor = LLMExecutor(api_key="test-key")
+        batch = BatchExecutor(executor, client=StubBatchClient(), sleep=lambda s: None)
+
+        outcome = batch.run(make_profiles(1), QUESTIONS)[0]
+
+        assert outcome["result"]["cost"] == pytest.approx(
+            executor._calculate_cost(1000, 100) * BatchExecutor.BATCH_DISCOUNT
+        )
+
+    def test_failed_requests_are_reported_per_participant(self):
+        """Test that error file lines fail only their participant"""
+        client = StubBatchClient(fail_ids={"participant-2"})
+        batch = BatchExecutor(LLMExecutor(api_key="test-key"), client=client, sleep=lambda s: None)
+
+        outcomes = batch.run(make_profiles(3), QUESTIONS)
+
+        assert outcomes[0]["result"] is not None
+        assert outcomes[1]["result"] is None
+        assert "server error" in outcomes[1]["error"]
+        assert outcomes[2]["result"] is not None
+
+    def test_chunked_questionnaire_is_merged(self):
+        """Test that blocks of a chunked questionnaire are submitted separately and merged"""
+        client = StubBatchClient()
+        executor = LLMExecutor(api_key="test-key", max_questions_per_chunk=1)
+        batch = BatchExecutor(executor, client=client, sleep=lambda s: None)
+
+        lines = batch.build_batch_file(make_profiles(2), QUESTIONS).decode().splitlines()
+        outcomes = batch.run(make_profiles(2), QUESTIONS)
+
+        assert [json.loads(line)["custom_id"] for line in lines] == [
+            "participant-1-chunk-0",
+            "participant-1-chunk-1",
+            "participant-2-chunk-0",
+            "participant-2-chunk-1",
+        ]
+        assert set(outcomes[1]["result"]["responses"]) == {"q1", "q2"}
+        assert outcomes[1]["result"]["total_tokens"] == 2200
+
+    def test_failed_batch_raises(self):
+        """Test that a batch rejected by the provider fails the run"""
+        client = StubBatchClient(final_status="failed")
+        batch = BatchExecutor(LLMExecutor(api_key="test-key"), client=client, sleep=lambda s: None)
+
+        with pytest.raises(Exception) as exc_info:
+            batch.run(make_profiles(1), QUESTIONS)
+
+        assert "failed" in str(exc_info.value)
+
+    def test_wait_times_out(self):
+        """Test that polling gives up after the timeout"""
+        client = StubBatchClient()
+        client.LIFECYCLE = ["validating", "in_progress"]
+        batch = BatchExecutor(
+            LLMExecutor(api_key="test-key"), timeout=0, client=client, sleep=lambda s: None
+        )
+
+        with pytest.raises(TimeoutError):
+            batch.run(make_profiles(1), QUESTIONS)
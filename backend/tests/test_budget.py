@@ -0,0 +1,219 @@
+"""
+Tests for the per-run budget guard
+"""
+import asyncio
+import threading
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from app.services.budget import BudgetExceededError, BudgetGuard
+from app.services.execution_engine import ExecutionEngine
+from app.services.llm_executor import LLMExecutor
+from app.services.retry import CircuitBreaker, RetryPolicy
+
+
+def completion(prompt_tokens=100, completion_tokens=20):
+    response = Mock()
+    response.choices = [Mock(message=Mock(content='{"q1": {"response": "4"}}'))]
+    response.usage = Mock(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        total_tokens=prompt_tokens + completion_tokens,
+        prompt_tokens_details=None,
+    )
+    return response
+
+
+QUESTIONS = [{"question_id": "q1"}]
+
+
+class TestBudgetGuard:
+    """Tests for BudgetGuard"""
+
+    def test_reserve_and_settle(self):
+        """Test that a settled reservation is replaced by the actual cost"""
+        budget = BudgetGuard(1.0)
+
+        reservation = budget.reserve(0.4)
+        assert budget.remaining == pytest.approx(0.6)
+
+        budget.settle(reservation, 0.1)
+        assert budget.spent == pytest.approx(0.1)
+        assert budget.reserved == 0
+        assert budget.remaining == pytest.approx(0.9)
+
+    def test_settled_spend_exhausts_the_budget(self):
+        """Test that a call that could take settled spend over the limit is refused for good"""
+        budget = BudgetGuard(1.0)
+        budget.charge(0.6)
+
+        with pytest.raises(BudgetExceededError):
+            budget.reserve(0.6)
+        assert budget.exhausted
+
+    def test_outstanding_reservations_wait_for_settlement(self):
+        """Test that a call that only collides with in-flight reservations waits for them"""
+        budget = BudgetGuard(1.0)
+        first = budget.reserve(0.6)
+        reserved = []
+        waiter = threading.Thread(target=lambda: reserved.append(budget.reserve(0.6)))
+        waiter.start()
+
+        waiter.join(timeout=0.1)
+        assert waiter.is_alive()
+
+        budget.settle(first, 0.1)
+        waiter.join(timeout=1)
+        assert len(reserved) == 1
+        assert not budget.exhausted
+
+    async def test_overlapping_reservations_under_the_limit(self):
+        """Test that many worst-case reservations in flight do not end the run early"""
+        budget = BudgetGuard(1.0)
+
+        async def call():
+            reservation = await budget.reserve_async(0.1)
+            await asyncio.sleep(0.001)
+            budget.settle(reservation, 0.001)
+
+        await asyncio.wait_for(asyncio.gather(*(call() for _ in range(300))), timeout=5)
+
+        assert not budget.exhausted
+        assert budget.spent == pytest.approx(0.3)
+        assert budget.reserved == pytest.approx(0.0)
+
+    def test_charge_records_unreserved_spend(self):
+        """Test that charges add to spend directly"""
+        budget = BudgetGuard(1.0)
+        budget.charge(0.25)
+        budget.charge(-0.05)
+
+        assert budget.spent == pytest.approx(0.2)
+
+    def test_rejects_negative_limit(self):
+        """Test that a negative budget is rejected"""
+        with pytest.raises(ValueError):
+            BudgetGuard(-1)
+
+
+@patch('app.services.llm_executor.AsyncOpenAI')
+@patch('app.services.llm_executor.OpenAI')
+class TestExecutorBudget:
+    """Tests for budget reservations in LLMExecutor"""
+
+    @staticmethod
+    def executor(budget, **kwargs):
+        return LLMExecutor(
+            api_key="test-key",
+            max_tokens=100,
+            input_cost_per_1k=0.01,
+            output_cost_per_1k=0.01,
+            retry_policy=RetryPolicy(max_retries=0),
+            circuit_breaker=CircuitBreaker("gpt-4o"),
+            budget=budget,
+            **kwargs,
+        )
+
+    def test_spend_is_reconciled_with_usage(self, mock_openai, mock_async_openai):
+        """Test that the reservation is settled at the reported usage cost"""
+        mock_openai.return_value.chat.completions.create.return_value = completion(100, 20)
+        budget = BudgetGuard(1.0)
+        executor = self.executor(budget)
+
+        result = executor.execute_participant({"participant_number": 1}, QUESTIONS)
+
+        assert budget.spent == pytest.approx(result["cost"])
+        assert budget.spent == pytest.approx(0.0012)
+        assert budget.reserved == 0
+
+    def test_call_over_budget_is_not_sent(self, mock_openai, mock_async_openai):
+        """Test that a call whose worst case exceeds the budget is refused"""
+        create = mock_openai.return_value.chat.completions.create
+        budget = BudgetGuard(0.0001)
+        executor = self.executor(budget)
+
+        with pytest.raises(BudgetExceededError):
+            executor.execute_participant({"participant_number": 1}, QUESTIONS)
+
+        create.assert_not_called()
+        assert budget.exhausted
+
+    def test_failed_call_costs_nothing(self, mock_openai, mock_async_openai):
+        """Test that an errored call releases its reservation"""
+        mock_openai.return_value.chat.completions.create.side_effect = Exception("boom")
+        budget = BudgetGuard(1.0)
+        executor = self.executor(budget)
+
+        with pytest.raises(Exception):
+            executor.execute_participant({"participant_number": 1}, QUESTIONS)
+
+        assert budget.spent == 0
+        assert budget.reserved == 0
+
+    async def test_stream_is_charged_actual_usage(self, mock_openai, mock_async_openai):
+        """Test that a stream's estimate is corrected once its usage arrives"""
+
+        async def stream():
+            yield Mock(usage=None, choices=[Mock(delta=Mock(content='{"q1": {"response": "4"}}'))])
+            yield Mock(
+                usage=Mock(prompt_tokens=100, completion_tokens=20, total_tokens=120,
+                           prompt_tokens_details=None),
+                choices=[],
+            )
+
+        mock_async_openai.return_value.chat.completions.create = AsyncMock(return_value=stream())
+        budget = BudgetGuard(1.0)
+        executor = self.executor(budget, streaming=True)
+
+        result = await executor.execute_participant_async({"participant_number": 1}, QUESTIONS)
+
+        assert budget.spent == pytest.approx(result["cost"])
+        assert budget.reserved == 0
+
+
+class TestEngineBudget:
+    """Tests for stopping dispatch when the budget runs out"""
+
+    async def test_dispatch_stops_once_exhausted(self):
+        """Test that participants after the budget ran out are skipped"""
+        budget = BudgetGuard(1.0)
+        executor = Mock()
+        calls = []
+
+        async def execute(profile, questions, on_answer=None):
+            calls.append(profile["participant_number"])
+            budget.settle(budget.reserve(0.45), 0.45)
+            return {"responses": {}, "cost": 0.45, "total_tokens": 0}
+
+        executor.execute_participant_async = execute
+        engine = ExecutionEngine(executor, concurrency=1, budget=budget)
+
+        outcomes = await engine.run([{"participant_number": i} for i in range(1, 6)], QUESTIONS)
+
+        # The third participant is refused; the rest are never started
+        assert calls == [1, 2, 3]
+        assert outcomes[1]["result"] is not None
+        assert [o.get("skipped", False) for o in outcomes] == [False, False, True, True, True]
+        assert outcomes[3]["error"] == ExecutionEngine.BUDGET_EXHAUSTED
+
+    async def test_packed_members_refused_by_budget_are_skipped(self):
+        """Test that budget refusals inside a pack are reported as skipped"""
+        executor = Mock()
+        executor.execute_pack_async = AsyncMock(
+            return_value=[BudgetExceededError(1.0, 1.0, 0.1)] * 2
+        )
+        engine = ExecutionEngine(executor, personas_per_request=2, budget=BudgetGuard(1.0))
+
+        outcomes = await engine.run([{"participant_number": 1}, {"participant_number": 2}], QUESTIONS)
+
+        assert all(o["skipped"] for o in outcomes)
+
+    def test_from_settings_uses_executor_budget(self):
+        """Test that the engine shares the executor's budget"""
+        executor = Mock()
+        executor.budget = BudgetGuard(5.0)
+
+        engine = ExecutionEngine.from_settings(executor, {})
+
+        assert engine.budget is executor.budget
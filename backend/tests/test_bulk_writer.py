@@ -0,0 +1,166 @@
+"""
+Tests for batched participant and response writes
+"""
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models.experiment import Experiment
+from app.models.participant import Participant
+from app.models.response import Response
+from app.services.bulk_writer import BulkWriter, participant_rows
+
+
+QUESTION_IDS = ["q1", "q2"]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def engine():
+    """In-memory SQLite engine with the result tables"""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(
+        engine, tables=[Experiment.__table__, Participant.__table__, Response.__table__]
+    )
+    with sessionmaker(bind=engine)() as session:
+        session.add(Experiment(id=1, name="Test"))
+        session.commit()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def succeeded(number, answers=("q1", "q2")):
+    return {
+        "profile": {"participant_number": number, "age": 30},
+        "result": {"responses": {qid: {"response": f"{number}-{qid}"} for qid in answers}},
+        "error": None,
+    }
+
+
+class TestParticipantRows:
+    """Tests for participant_rows"""
+
+    def test_flags_missing_questions(self):
+        """Test that unanswered questions are flagged on the participant"""
+        participant, responses = participant_rows(1, succeeded(1, answers=("q1",)), QUESTION_IDS, {})
+
+        assert participant["validation_flags"] == {"missing_questions": ["q2"]}
+        assert [r["question_id"] for r in responses] == ["q1"]
+
+    def test_failed_participant_has_no_responses(self):
+        """Test that a failed participant is stored with its error only"""
+        outcome = {"profile": {"participant_number": 1}, "result": None, "error": "boom"}
+
+        participant, responses = participant_rows(1, outcome, QUESTION_IDS, {})
+
+        assert participant["validation_flags"] == {"execution_failed": True, "error": "boom"}
+        assert responses == []
+
+    def test_skipped_participant_is_not_stored(self):
+        """Test that budget-skipped participants produce no rows"""
+        outcome = {"profile": {"participant_number": 1}, "result": None, "error": "x", "skipped": True}
+
+        assert participant_rows(1, outcome, QUESTION_IDS, {}) is None
+
+
+class TestBulkWriter:
+    """Tests for BulkWriter"""
+
+    def test_responses_link_to_their_participants(self, db):
+        """Test that returned IDs attach each response to the right participant"""
+        writer = BulkWriter(db, 1, QUESTION_IDS, {"model": "gpt-4o"}, batch_size=10)
+        for number in range(1, 6):
+            writer.add(succeeded(number))
+        writer.flush()
+        db.commit()
+
+        for participant in db.query(Participant).all():
+            responses = db.query(Response).filter(Response.participant_id == participant.id).all()
+            assert sorted(r.coded_response["response"] for r in responses) == [
+                f"{participant.participant_number}-q1", f"{participant.participant_number}-q2"
+            ]
+            assert responses[0].meta_data == {"model": "gpt-4o"}
+
+    def test_batch_uses_two_statements(self, db, engine):
+        """Test that a flush does not issue a statement per row"""
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        writer = BulkWriter(db, 1, QUESTION_IDS, batch_size=100)
+        for number in range(1, 21):
+            writer.add(succeeded(number))
+
+        writer.flush()
+
+        inserts = [s for s in statements if s.startswith("INSERT")]
+        assert len(inserts) == 2
+        assert db.query(Response).count() == 40
+
+    def test_flushes_when_batch_is_full(self, db):
+        """Test that reaching batch_size writes the buffer"""
+        writer = BulkWriter(db, 1, QUESTION_IDS, batch_size=3)
+        for number in range(1, 5):
+            writer.add(succeeded(number))
+
+        assert writer.flushes == 1
+        assert writer.pending == 1
+
+    def test_flushes_after_interval(self, db):
+        """Test that a partial batch is written once the interval passes"""
+        clock = FakeClock()
+        writer = BulkWriter(db, 1, QUESTION_IDS, batch_size=100, flush_interval=1.0, clock=clock)
+        writer.add(succeeded(1))
+        assert writer.pending == 1
+
+        clock.now += 1.5
+        writer.add(succeeded(2))
+
+        assert writer.pending == 0
+        assert writer.stats()["rows_written"] == 6
+
+    def test_flush_does_not_commit(self, db, engine):
+        """Test that the caller decides when written rows are committed"""
+        writer = BulkWriter(db, 1, QUESTION_IDS)
+        writer.add(succeeded(1))
+        writer.flush()
+
+        db.rollback()
+
+        assert db.query(Participant).count() == 0
+
+    def test_participant_numbers_are_unique(self, db):
+        """Test that a second write of the same participant is rejected"""
+        writer = BulkWriter(db, 1, QUESTION_IDS)
+        writer.add(succeeded(1))
+        writer.flush()
+        writer.add(succeeded(1))
+
+        with pytest.raises(IntegrityError):
+            writer.flush()
+
+    def test_from_settings(self, db):
+        """Test that batch size and interval come from execution settings"""
+        writer = BulkWriter.from_settings(
+            db, 1, QUESTION_IDS, {}, {"write_batch_size": 50, "write_flush_interval": 0.5}
+        )
+
+        assert writer.batch_size == 50
+        assert writer.flush_interval == 0.5
@@ -0,0 +1,296 @@
+"""
+Tests for record/replay cassettes of LLM calls
+"""
+import gzip
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.v1.execution import execute_experiment_task
+from app.config import settings
+from app.database import Base
+from app.models.experiment import Experiment
+from app.models.participant import Participant
+from app.models.response import Response
+from app.services.bulk_writer import BulkWriter
+from app.services.cassette import RECORD, REPLAY, Cassette
+from app.services.checkpoint import RunCheckpoint
+from app.services.llm_executor import LLMExecutor
+from app.services.retry import CircuitBreaker, RetryPolicy
+
+
+QUESTIONS = [{"question_id": "q1"}]
+CONTENT = '{"q1": {"response": "4"}}'
+
+
+def completion(content=CONTENT):
+    response = Mock()
+    response.choices = [Mock(message=Mock(content=content))]
+    response.usage = Mock(
+        prompt_tokens=100, completion_tokens=20, total_tokens=120, prompt_tokens_details=None
+    )
+    return response
+
+
+def executor(cassette, **kwargs):
+    return LLMExecutor(
+        api_key="test-key",
+        retry_policy=RetryPolicy(max_retries=0),
+        circuit_breaker=CircuitBreaker("gpt-4o"),
+        cassette=cassette,
+        **kwargs,
+    )
+
+
+@patch('app.services.llm_executor.AsyncOpenAI')
+@patch('app.services.llm_executor.OpenAI')
+class TestCassette:
+    """Tests for recording and replaying executor calls"""
+
+    def test_record_then_replay(self, mock_openai, mock_async_openai, tmp_path):
+        """Test that a replayed run returns the recorded answers without calling the API"""
+        path = str(tmp_path / "run.jsonl.gz")
+        create = mock_openai.return_value.chat.completions.create
+        create.return_value = completion()
+        recorder = Cassette(path, mode=RECORD)
+        recorded = executor(recorder).execute_participant({"participant_number": 1}, QUESTIONS)
+        assert recorder.save() == 1
+
+        create.reset_mock()
+        player = Cassette(path, mode=REPLAY)
+        replayed = executor(player).execute_participant({"participant_number": 1}, QUESTIONS)
+
+        create.assert_not_called()
+        assert replayed["responses"] == recorded["responses"]
+        assert replayed["total_tokens"] == 120
+        assert player.stats() == {"mode": REPLAY, "hits": 1, "misses": 0}
+
+    def test_unrecorded_request_fails(self, mock_openai, mock_async_openai, tmp_path):
+        """Test that replay never falls through to the network"""
+        path = str(tmp_path / "run.jsonl.gz")
+        mock_openai.return_value.chat.completions.create.return_value = completion()
+        recorder = Cassette(path, mode=RECORD)
+        executor(recorder).execute_participant({"participant_number": 1}, QUESTIONS)
+        recorder.save()
+
+        player = Cassette(path, mode=REPLAY)
+        with pytest.raises(Exception, match="No recorded response"):
+            executor(player).execute_participant({"participant_number": 2}, QUESTIONS)
+        assert player.misses == 1
+
+    async def test_replays_original_latency(self, mock_openai, mock_async_openai, tmp_path):
+        """Test that replay can wait the recorded latency"""
+        path = str(tmp_path / "run.jsonl.gz")
+        mock_async_openai.return_value.chat.completions.create = AsyncMock(return_value=completion())
+        recorder = Cassette(path, mode=RECORD)
+        await executor(recorder).execute_participant_async({"participant_number": 1}, QUESTIONS)
+        recorder.save()
+
+        sleeps = []
+
+        async def fake_sleep(seconds):
+            sleeps.append(seconds)
+
+        player = Cassette(path, mode=REPLAY, replay_latency=True, async_sleep=fake_sleep)
+        await executor(player).execute_participant_async({"participant_number": 1}, QUESTIONS)
+
+        assert len(sleeps) == 1
+        assert sleeps[0] >= 0
+
+    async def test_stream_record_and_replay(self, mock_openai, mock_async_openai, tmp_path):
+        """Test that streamed calls are recorded whole and replayed as a stream"""
+        path = str(tmp_path / "run.jsonl.gz")
+
+        async def stream():
+            for piece in ('{"q1": {"resp', 'onse": "4"}}'):
+                yield Mock(usage=None, choices=[Mock(delta=Mock(content=piece))])
+            yield Mock(
+                usage=Mock(prompt_tokens=100, completion_tokens=20, total_tokens=120,
+                           prompt_tokens_details=None),
+                choices=[],
+            )
+
+        mock_async_openai.return_value.chat.completions.create = AsyncMock(return_value=stream())
+        recorder = Cassette(path, mode=RECORD)
+        await executor(recorder, streaming=True).execute_participant_async(
+            {"participant_number": 1}, QUESTIONS
+        )
+        recorder.save()
+
+        answers = []
+        player = Cassette(path, mode=REPLAY)
+        result = await executor(player, streaming=True).execute_participant_async(
+            {"participant_number": 1}, QUESTIONS, on_answer=lambda qid, answer: answers.append(qid)
+        )
+
+        assert answers == ["q1"]
+        assert result["responses"]["q1"]["response"] == "4"
+        assert result["total_tokens"] == 120
+
+    def test_identical_requests_replay_in_order(self, mock_openai, mock_async_openai, tmp_path):
+        """Test that repeated requests get their recorded responses in turn"""
+        path = str(tmp_path / "run.jsonl.gz")
+        mock_openai.return_value.chat.completions.create.side_effect = [
+            completion('{"q1": {"response": "1"}}'),
+            completion('{"q1": {"response": "2"}}'),
+        ]
+        recorder = Cassette(path, mode=RECORD)
+        recording = executor(recorder)
+        for _ in range(2):
+            recording.execute_participant({"participant_number": 1}, QUESTIONS)
+        recorder.save()
+
+        replaying = executor(Cassette(path, mode=REPLAY))
+        replayed = [
+            replaying.execute_participant({"participant_number": 1}, QUESTIONS)["responses"]["q1"]["response"]
+            for _ in range(3)
+        ]
+
+        assert replayed == ["1", "2", "2"]
+
+
+class TestCassetteSettings:
+    """Tests for opening cassettes from execution settings"""
+
+    def test_no_cassette_by_default(self, tmp_path):
+        """Test that cassettes are opt-in"""
+        assert Cassette.from_settings({}, str(tmp_path)) is None
+
+    def test_name_cannot_leave_directory(self, tmp_path):
+        """Test that cassette names are plain file names"""
+        with pytest.raises(ValueError):
+            Cassette.from_settings({"cassette": {"name": "../secrets", "mode": RECORD}}, str(tmp_path))
+
+    def test_record_settings(self, tmp_path):
+        """Test that a record cassette is placed in the cassette directory"""
+        cassette = Cassette.from_settings(
+            {"cassette": {"name": "baseline", "mode": RECORD}}, str(tmp_path)
+        )
+
+        assert cassette.path == str(tmp_path / "baseline.jsonl.gz")
+        assert cassette.save() == 0
+
+    def test_recording_is_compact_json_lines(self, tmp_path):
+        """Test that each call is one compressed JSON line with usage and latency"""
+        cassette = Cassette(str(tmp_path / "run.jsonl.gz"), mode=RECORD)
+        client = Mock()
+        client.chat.completions.create.return_value = completion()
+        cassette.create(client, {"model": "gpt-4o", "messages": [{"role": "user", "content": "hi"}]}, "gpt-4o")
+        cassette.save()
+
+        with gzip.open(cassette.path, "rt") as f:
+            (entry,) = [json.loads(line) for line in f]
+        assert entry["request"] == {"messages": [{"role": "user", "content": "hi"}]}
+        assert entry["usage"]["total_tokens"] == 120
+        assert entry["latency"] >= 0
+
+
+@pytest.fixture
+def db():
+    """In-memory SQLite session with the execution tables"""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(
+        engine, tables=[Experiment.__table__, Participant.__table__, Response.__table__]
+    )
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+class TestCassetteRuns:
+    """Tests for recording and replaying whole experiment runs"""
+
+    @staticmethod
+    def profiles(db):
+        return [p.profile for p in db.query(Participant).order_by(Participant.participant_number)]
+
+    @staticmethod
+    def run(db, mode, create, start_over=True):
+        experiment = db.get(Experiment, 1)
+        experiment.status = "active"
+        experiment.execution_settings = {
+            "use_cache": False, "checkpoint_every": 2, "cassette": {"name": "survey", "mode": mode}
+        }
+        if start_over:
+            # Start over the way /execute does
+            db.query(Participant).delete()
+            experiment.meta_data = {}
+        db.commit()
+
+        with patch("app.services.client_pool.AsyncOpenAI") as mock_async_openai:
+            mock_async_openai.return_value.chat.completions.create = create
+            execute_experiment_task(
+                experiment_id=1, api_key="cassette-run-key", model="gpt-4o",
+                temperature=0.8, max_tokens=100, db=db,
+            )
+        return db.get(Experiment, 1)
+
+    @staticmethod
+    def add_experiment(db):
+        db.add(Experiment(
+            id=1,
+            name="Test",
+            sample_config={"sample_size": 5},
+            experiment_config={"questions": [{"question_id": "q1", "question_text": "Rate it"}]},
+            meta_data={},
+        ))
+        db.commit()
+
+    def test_recorded_run_replays_offline(self, db, tmp_path):
+        """Test that a replayed run regenerates the recorded personas and never calls the API"""
+        self.add_experiment(db)
+        create = AsyncMock(return_value=completion())
+
+        with patch.object(settings, "llm_cassette_dir", str(tmp_path)):
+            recorded = self.run(db, RECORD, create)
+            recorded_seed = RunCheckpoint.load(recorded.meta_data).profile_seed
+            recorded_profiles = self.profiles(db)
+            assert create.await_count == 5
+
+            create.reset_mock()
+            replayed = self.run(db, REPLAY, create)
+
+        create.assert_not_awaited()
+        assert replayed.status == "completed"
+        assert replayed.meta_data["execution"]["cassette"] == {"mode": REPLAY, "hits": 5, "misses": 0}
+        assert RunCheckpoint.load(replayed.meta_data).profile_seed == recorded_seed
+        assert self.profiles(db) == recorded_profiles
+
+    def test_resumed_recording_keeps_earlier_calls(self, db, tmp_path):
+        """Test that a recording interrupted and resumed replays every participant"""
+        self.add_experiment(db)
+        create = AsyncMock(return_value=completion())
+        flush = BulkWriter.flush
+        flushes = []
+
+        def crash_on_second_flush(writer):
+            if writer.pending:
+                flushes.append(1)
+                if len(flushes) == 2:
+                    raise RuntimeError("database went away")
+            return flush(writer)
+
+        with patch.object(settings, "llm_cassette_dir", str(tmp_path)):
+            with patch.object(BulkWriter, "flush", crash_on_second_flush):
+                interrupted = self.run(db, RECORD, create)
+            assert interrupted.status == "failed"
+            assert len(self.profiles(db)) == 2
+
+            resumed = self.run(db, RECORD, create, start_over=False)
+            assert resumed.status == "completed"
+            recorded_profiles = self.profiles(db)
+
+            create.reset_mock()
+            replayed = self.run(db, REPLAY, create)
+
+        create.assert_not_awaited()
+        assert replayed.meta_data["execution"]["cassette"]["misses"] == 0
+        assert replayed.meta_data["execution"]["succeeded"] == 5
+        assert self.profiles(db) == recorded_profiles
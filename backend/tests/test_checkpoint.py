@@ -0,0 +1,266 @@
+"""
+Tests for checkpointed, resumable execution
+"""
+import threading
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.v1.execution import execute_experiment_task, get_execution_status
+from app.database import Base
+from app.models.execution_job import ExecutionJob
+from app.models.experiment import Experiment
+from app.models.participant import Participant
+from app.models.response import Response
+from app.services.batch_executor import BatchExecutor
+from app.services.bulk_writer import BulkWriter
+from app.services.checkpoint import RunCheckpoint, stored_participant_numbers
+from app.services.concurrency_controller import AdaptiveConcurrency
+from app.services.job_queue import LeaseLostError
+from app.services.participant_generator import ParticipantGenerator
+from tests.test_batch_executor import StubBatchClient
+
+
+QUESTIONS = [{"question_id": "q1", "question_text": "How are you?", "question_type": "open_ended"}]
+
+
+@pytest.fixture
+def db():
+    """In-memory SQLite session with the execution tables"""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(
+        engine,
+        tables=[
+            Experiment.__table__, Participant.__table__, Response.__table__, ExecutionJob.__table__
+        ],
+    )
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+class FlakyWriter:
+    """Counts LLM calls and makes the listed database flushes crash"""
+
+    def __init__(self, fail_on=()):
+        self.calls = 0
+        self.flushes = 0
+        self.fail_on = set(fail_on)
+
+    async def answer(self, executor, profile, questions, on_answer=None):
+        self.calls += 1
+        return {
+            "responses": {"q1": {"response": f"I am #{profile['participant_number']}"}},
+            "cost": 0.01,
+            "prompt_tokens": 10,
+            "completion_tokens": 5,
+            "total_tokens": 15,
+            "cached_tokens": 0,
+            "cached": False,
+        }
+
+    def wrap_flush(self, flush):
+        def wrapped(writer):
+            if writer.pending:
+                self.flushes += 1
+                if self.flushes in self.fail_on:
+                    raise RuntimeError("database went away")
+            return flush(writer)
+
+        return wrapped
+
+
+def run_task(db, flaky, lease_lost=None):
+    async def answer(executor, profile, questions, on_answer=None):
+        return await flaky.answer(executor, profile, questions, on_answer)
+
+    with patch("app.services.llm_executor.LLMExecutor.execute_participant_async", answer), \
+            patch("app.services.bulk_writer.BulkWriter.flush", flaky.wrap_flush(BulkWriter.flush)):
+        execute_experiment_task(
+            experiment_id=1, api_key="test-key", model="gpt-4o",
+            temperature=0.8, max_tokens=100, db=db, lease_lost=lease_lost,
+        )
+
+
+class TestRunCheckpoint:
+    """Tests for RunCheckpoint"""
+
+    def test_round_trip_through_meta_data(self):
+        """Test that a saved checkpoint loads back unchanged"""
+        experiment = Experiment(name="Test", meta_data={"other": 1})
+        checkpoint = RunCheckpoint(profile_seed=7, cursor=100, succeeded=98, failed=2)
+
+        checkpoint.save(experiment)
+        loaded = RunCheckpoint.load(experiment.meta_data)
+
+        assert loaded == checkpoint
+        assert experiment.meta_data["other"] == 1
+        assert RunCheckpoint.load({}) is None
+
+    def test_record_counts_outcomes(self):
+        """Test that outcomes update the run totals"""
+        checkpoint = RunCheckpoint(profile_seed=1)
+        checkpoint.record({"result": {"cost": 0.5, "total_tokens": 10, "cached": True}})
+        checkpoint.record({"result": None, "error": "boom"})
+        checkpoint.record({"result": None, "error": "budget", "skipped": True})
+
+        assert (checkpoint.succeeded, checkpoint.failed, checkpoint.skipped) == (1, 1, 1)
+        assert checkpoint.total_cost == 0.5
+        assert checkpoint.cache_hits == 1
+
+        checkpoint.resume()
+        assert checkpoint.skipped == 0
+
+    def test_cursor_stops_at_the_first_gap(self):
+        """Test that the cursor only covers a contiguous prefix of stored participants"""
+        checkpoint = RunCheckpoint(profile_seed=1)
+
+        checkpoint.advance_cursor({1, 2, 4, 5})
+        assert checkpoint.cursor == 2
+
+        checkpoint.advance_cursor({1, 2, 3, 4, 5})
+        assert checkpoint.cursor == 5
+
+    def test_seeded_profiles_regenerate_individually(self):
+        """Test that any subset of seeded profiles can be regenerated"""
+        generator = ParticipantGenerator(seed=42)
+        everyone = generator.generate(count=10)
+
+        assert ParticipantGenerator(seed=42).generate_numbers([3, 9]) == [everyone[2], everyone[8]]
+        assert ParticipantGenerator(seed=43).generate(count=10) != everyone
+
+
+class TestResumableExecution:
+    """Tests for periodic commits and resuming in execute_experiment_task"""
+
+    @staticmethod
+    def add_experiment(db, sample_size=5, **settings):
+        db.add(Experiment(
+            id=1,
+            name="Test",
+            status="active",
+            sample_config={"sample_size": sample_size},
+            experiment_config={"questions": QUESTIONS},
+            execution_settings={"checkpoint_every": 2, "use_cache": False, **settings},
+            meta_data={},
+        ))
+        db.commit()
+
+    def test_crash_keeps_committed_participants(self, db):
+        """Test that participants committed before a crash survive it"""
+        self.add_experiment(db)
+
+        run_task(db, FlakyWriter(fail_on={2}))
+
+        experiment = db.get(Experiment, 1)
+        assert experiment.status == "failed"
+        assert stored_participant_numbers(db, 1) == {1, 2}
+        checkpoint = RunCheckpoint.load(experiment.meta_data)
+        assert checkpoint.cursor == 2
+        assert checkpoint.succeeded == 2
+
+    def test_resume_runs_only_missing_participants(self, db):
+        """Test that a rerun skips stored participants and regenerates the rest"""
+        self.add_experiment(db)
+        run_task(db, FlakyWriter(fail_on={2}))
+        seed = RunCheckpoint.load(db.get(Experiment, 1).meta_data).profile_seed
+
+        flaky = FlakyWriter()
+        run_task(db, flaky)
+
+        experiment = db.get(Experiment, 1)
+        assert experiment.status == "completed"
+        assert flaky.calls == 3
+        assert stored_participant_numbers(db, 1) == {1, 2, 3, 4, 5}
+        assert experiment.meta_data["execution"]["succeeded"] == 5
+        assert experiment.meta_data["execution"]["resumed_participants"] == 2
+
+        expected = {p["participant_number"]: p for p in ParticipantGenerator(seed=seed).generate(count=5)}
+        for participant in db.query(Participant).all():
+            assert participant.profile == expected[participant.participant_number]
+
+    def test_lost_lease_stops_without_writing(self, db):
+        """Test that a run whose lease is lost commits nothing and leaves the status alone"""
+        self.add_experiment(db)
+        lease_lost = threading.Event()
+        lease_lost.set()
+
+        with pytest.raises(LeaseLostError):
+            run_task(db, FlakyWriter(), lease_lost=lease_lost)
+
+        experiment = db.get(Experiment, 1)
+        assert experiment.status == "active"
+        assert stored_participant_numbers(db, 1) == set()
+
+    def test_live_concurrency_is_committed_for_the_status_endpoint(self, db):
+        """Test that an adaptive run's window reaches the API through meta_data"""
+        self.add_experiment(db, adaptive_concurrency=True)
+
+        run_task(db, FlakyWriter(fail_on={2}))
+
+        experiment = db.get(Experiment, 1)
+        live = experiment.meta_data[AdaptiveConcurrency.META_KEY]
+        assert live["limit"] >= 1
+
+        # As the API process sees it while the run is still going
+        experiment.status = "active"
+        db.commit()
+        assert get_execution_status(experiment_id=1, db=db)["concurrency"] == live
+
+    def test_resumed_batch_run_reattaches_to_its_batch(self, db):
+        """Test that a batch run interrupted while waiting collects the same batch on resume"""
+        self.add_experiment(db, mode="batch", batch_poll_interval=0)
+        client = StubBatchClient()
+
+        def run():
+            with patch("app.services.client_pool.OpenAI", return_value=client):
+                execute_experiment_task(
+                    experiment_id=1, api_key="batch-resume-key", model="gpt-4o",
+                    temperature=0.8, max_tokens=100, db=db,
+                )
+
+        # The worker dies while the batch is still running
+        with patch.object(BatchExecutor, "wait", side_effect=TimeoutError("still running")):
+            run()
+        experiment = db.get(Experiment, 1)
+        assert experiment.status == "failed"
+        assert RunCheckpoint.load(experiment.meta_data).batch_id == "batch-1"
+
+        run()
+
+        experiment = db.get(Experiment, 1)
+        assert experiment.status == "completed"
+        assert len(client._batches) == 1
+        assert experiment.meta_data["execution"]["batch_id"] == "batch-1"
+        assert stored_participant_numbers(db, 1) == {1, 2, 3, 4, 5}
+
+    def test_resume_after_failed_batch_submits_a_new_one(self, db):
+        """Test that a batch that ended failed is forgotten so a resume can start over"""
+        self.add_experiment(db, mode="batch", batch_poll_interval=0)
+        client = StubBatchClient(final_status="failed")
+
+        def run():
+            with patch("app.services.client_pool.OpenAI", return_value=client):
+                execute_experiment_task(
+                    experiment_id=1, api_key="batch-failed-key", model="gpt-4o",
+                    temperature=0.8, max_tokens=100, db=db,
+                )
+
+        run()
+        experiment = db.get(Experiment, 1)
+        assert experiment.status == "failed"
+        assert RunCheckpoint.load(experiment.meta_data).batch_id is None
+
+        client.final_status = "completed"
+        run()
+
+        experiment = db.get(Experiment, 1)
+        assert experiment.status == "completed"
+        assert experiment.meta_data["execution"]["batch_id"] == "batch-2"
+        assert stored_participant_numbers(db, 1) == {1, 2, 3, 4, 5}
@@ -0,0 +1,88 @@
+"""
+Tests for the questionnaire Chunk Planner
+"""
+from app.services.chunk_planner import (
+    DEFAULT_OUTPUT_TOKENS,
+    ChunkPlanner,
+    estimate_output_tokens,
+)
+
+
+def make_question(question_id, question_type):
+    return {
+        "question_id": question_id,
+        "question_text": f"Question {question_id}",
+        "question_type": question_type,
+        "options": {},
+    }
+
+
+class TestEstimateOutputTokens:
+    """Tests for estimate_output_tokens"""
+
+    def test_output_tokens_by_type(self):
+        """Test that open-ended questions need more output than scales"""
+        assert estimate_output_tokens(make_question("q1", "open_ended")) > estimate_output_tokens(
+            make_question("q2", "likert_scale")
+        )
+        assert estimate_output_tokens({"question_type": "unknown"}) == DEFAULT_OUTPUT_TOKENS
+
+
+class TestChunkPlanner:
+    """Tests for ChunkPlanner.plan"""
+
+    def test_short_questionnaire_is_one_block(self):
+        """Test that a questionnaire within budget is returned unchanged"""
+        questions = [make_question(f"q{i}", "likert_scale") for i in range(5)]
+
+        chunks = ChunkPlanner(max_tokens=2000).plan(questions)
+
+        assert len(chunks) == 1
+        assert chunks[0] is questions
+
+    def test_blocks_fit_budget_and_cover_all_questions(self):
+        """Test that every question lands in exactly one block within budget"""
+        questions = [
+            make_question(f"q{i}", "open_ended" if i % 3 == 0 else "likert_scale")
+            for i in range(40)
+        ]
+        planner = ChunkPlanner(max_tokens=500)
+
+        chunks = planner.plan(questions)
+
+        assert len(chunks) > 1
+        flattened = [q["question_id"] for chunk in chunks for q in chunk]
+        assert sorted(flattened) == sorted(q["question_id"] for q in questions)
+        for chunk in chunks:
+            assert sum(estimate_output_tokens(q) for q in chunk) <= planner.budget
+
+    def test_blocks_keep_question_order(self):
+        """Test that questions keep their original order within and across blocks"""
+        questions = [
+            make_question(f"q{i}", "open_ended" if i % 2 else "yes_no") for i in range(20)
+        ]
+        position = {q["question_id"]: i for i, q in enumerate(questions)}
+
+        chunks = ChunkPlanner(max_tokens=400).plan(questions)
+
+        for chunk in chunks:
+            indexes = [position[q["question_id"]] for q in chunk]
+            assert indexes == sorted(indexes)
+        firsts = [position[chunk[0]["question_id"]] for chunk in chunks]
+        assert firsts == sorted(firsts)
+
+    def test_oversized_question_gets_own_block(self):
+        """Test that a question larger than the budget is still planned"""
+        questions = [make_question("q1", "open_ended"), make_question("q2", "yes_no")]
+
+        chunks = ChunkPlanner(max_tokens=100).plan(questions)
+
+        assert [[q["question_id"] for q in chunk] for chunk in chunks] == [["q1"], ["q2"]]
+
+    def test_max_questions_per_chunk(self):
+        """Test that the optional question cap splits short questionnaires too"""
+        questions = [make_question(f"q{i}", "yes_no") for i in range(10)]
+
+        chunks = ChunkPlanner(max_tokens=2000, max_questions_per_chunk=4).plan(questions)
+
+        assert [len(chunk) for chunk in chunks] == [4, 4, 2]
@@ -0,0 +1,112 @@
+"""
+Tests for the pooled LLM client registry and shared event loop
+"""
+import asyncio
+
+from app.services.client_pool import ClientPool, SharedEventLoop
+from app.services.llm_executor import LLMExecutor
+from app.services.llm_provider import get_provider
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestClientPool:
+    """Tests for ClientPool"""
+
+    def test_same_key_and_server_share_clients(self):
+        """Test that lookups for the same key and base URL reuse the clients"""
+        pool = ClientPool()
+
+        first = pool.get("key-a")
+        second = pool.get("key-a")
+
+        assert first is second
+        assert len(pool) == 1
+
+    def test_different_keys_or_servers_get_separate_clients(self):
+        """Test that clients are keyed by API key and base URL"""
+        pool = ClientPool()
+
+        default = pool.get("key-a")
+        other_key = pool.get("key-b")
+        other_server = pool.get("key-a", "http://localhost:8001/v1")
+
+        assert len({id(default), id(other_key), id(other_server)}) == 3
+        assert str(other_server.async_client.base_url).startswith("http://localhost:8001/v1")
+
+    def test_connection_limits_are_applied(self):
+        """Test that pooled clients use the tuned connection limits"""
+        pool = ClientPool(max_connections=7, max_keepalive_connections=3, keepalive_expiry=5)
+
+        pooled = pool.get("key-a")
+
+        pool_limits = pooled.client._client._transport._pool
+        assert pool_limits._max_connections == 7
+        assert pool_limits._max_keepalive_connections == 3
+        assert pool_limits._keepalive_expiry == 5
+
+    def test_idle_clients_are_evicted(self):
+        """Test that clients unused past idle_timeout are closed on the next lookup"""
+        clock = FakeClock()
+        pool = ClientPool(idle_timeout=60, clock=clock)
+        stale = pool.get("key-a")
+        pool.get("key-b")
+
+        clock.now = 30
+        pool.get("key-b")
+        clock.now = 80
+        pool.get("key-b")
+
+        assert len(pool) == 1
+        assert stale.client.is_closed()
+        assert pool.get("key-a") is not stale
+
+    def test_leased_clients_outlive_idle_timeout(self):
+        """Test that a run longer than idle_timeout keeps its clients open"""
+        clock = FakeClock()
+        pool = ClientPool(idle_timeout=60, clock=clock)
+        provider = get_provider("stub")
+        executor = LLMExecutor(api_key="", provider=provider, client_pool=pool)
+
+        # Another run looks up its clients long after this one started
+        clock.now = 600
+        pool.get("key-b")
+
+        assert not executor.client.is_closed()
+
+        executor.close()
+        clock.now = 700
+        pool.get("key-b")
+
+        assert executor.client.is_closed()
+
+    def test_executor_takes_clients_from_pool(self):
+        """Test that executors built with the pool share its clients"""
+        pool = ClientPool()
+        provider = get_provider("stub")
+
+        first = LLMExecutor(api_key="", provider=provider, client_pool=pool)
+        second = LLMExecutor(api_key="", provider=provider, client_pool=pool)
+
+        assert first.async_client is second.async_client
+        assert first.client is second.client
+
+
+class TestSharedEventLoop:
+    """Tests for SharedEventLoop"""
+
+    def test_runs_coroutines_on_one_loop(self):
+        """Test that successive runs execute on the same background loop"""
+        shared = SharedEventLoop()
+
+        async def current_loop():
+            await asyncio.sleep(0)
+            return asyncio.get_running_loop()
+
+        assert shared.run(current_loop()) is shared.run(current_loop())
@@ -0,0 +1,185 @@
+"""
+Tests for the adaptive (AIMD) concurrency controller
+"""
+import asyncio
+from unittest.mock import Mock, patch
+
+import httpx
+import pytest
+from openai import RateLimitError
+
+from app.services.concurrency_controller import AdaptiveConcurrency
+from app.services.execution_engine import ExecutionEngine
+from app.services.llm_executor import LLMExecutor
+from app.services.retry import CircuitBreaker, RetryPolicy
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def rate_limit_error():
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    return RateLimitError(
+        "Rate limit exceeded", response=httpx.Response(429, request=request), body=None
+    )
+
+
+class TestAdaptiveConcurrency:
+    """Tests for AdaptiveConcurrency limit adjustments"""
+
+    def test_healthy_calls_grow_limit_additively(self):
+        """Test that a window of successes adds about one slot"""
+        controller = AdaptiveConcurrency(initial=4)
+        for _ in range(4):
+            controller.record(1.0)
+
+        assert controller.limit == 4
+        controller.record(1.0)
+        assert controller.limit == 5
+
+    def test_limit_is_capped(self):
+        """Test that the limit never exceeds max_limit"""
+        controller = AdaptiveConcurrency(initial=4, max_limit=5)
+        for _ in range(100):
+            controller.record(1.0)
+
+        assert controller.limit == 5
+        assert controller.peak == 5
+
+    def test_429_halves_limit(self):
+        """Test that throttling cuts the limit multiplicatively"""
+        controller = AdaptiveConcurrency(initial=20)
+
+        controller.record(0.5, rate_limit_error())
+
+        assert controller.limit == 10
+        assert controller.decreases == 1
+
+    def test_burst_of_429s_cuts_once_per_round_trip(self):
+        """Test that decreases are spaced by the average latency"""
+        clock = FakeClock()
+        controller = AdaptiveConcurrency(initial=20, clock=clock)
+        controller.record(1.0)
+
+        controller.record(1.0, rate_limit_error())
+        controller.record(1.0, rate_limit_error())
+        assert controller.limit == 10
+
+        clock.now += 1.5
+        controller.record(1.0, rate_limit_error())
+        assert controller.limit == 5
+
+    def test_latency_spike_cuts_limit(self):
+        """Test that a call far slower than average counts as congestion"""
+        controller = AdaptiveConcurrency(initial=20)
+        controller.record(1.0)
+
+        controller.record(5.0)
+
+        assert controller.limit == 10
+
+    def test_limit_never_drops_below_minimum(self):
+        """Test that decreases stop at min_limit"""
+        clock = FakeClock()
+        controller = AdaptiveConcurrency(initial=4, min_limit=2, clock=clock)
+        for _ in range(5):
+            clock.now += 10
+            controller.record(1.0, rate_limit_error())
+
+        assert controller.limit == 2
+
+    def test_other_errors_are_neutral(self):
+        """Test that non-429 errors neither grow nor cut the limit"""
+        controller = AdaptiveConcurrency(initial=4)
+
+        controller.record(1.0, ValueError("bad"))
+
+        assert controller.limit == 4
+        assert controller.average_latency is None
+
+    def test_from_settings(self):
+        """Test that the controller is opt-in"""
+        assert AdaptiveConcurrency.from_settings({}, initial=10) is None
+
+        controller = AdaptiveConcurrency.from_settings(
+            {"adaptive_concurrency": True, "max_concurrency": 40}, initial=10
+        )
+        assert controller.limit == 10
+        assert controller.max_limit == 40
+
+
+class TestAdaptiveEngine:
+    """Tests for the engine running under an adaptive limit"""
+
+    async def test_in_flight_follows_limit(self):
+        """Test that the engine never exceeds the current window"""
+        controller = AdaptiveConcurrency(initial=3, max_limit=3)
+        executor = Mock()
+        in_flight = 0
+        peak = 0
+
+        async def execute(profile, questions, on_answer=None):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"responses": {}}
+
+        executor.execute_participant_async = execute
+        engine = ExecutionEngine(executor, concurrency=50, concurrency_controller=controller)
+
+        await engine.run([{"participant_number": i} for i in range(12)], [])
+
+        assert peak == 3
+        assert controller.in_flight == 0
+
+    async def test_growing_limit_admits_more(self):
+        """Test that healthy calls widen the window during a run"""
+        controller = AdaptiveConcurrency(initial=1, max_limit=8)
+        executor = Mock()
+        peak = 0
+
+        async def execute(profile, questions, on_answer=None):
+            nonlocal peak
+            peak = max(peak, controller.in_flight)
+            await asyncio.sleep(0.001)
+            controller.record(0.001)
+            return {"responses": {}}
+
+        executor.execute_participant_async = execute
+        engine = ExecutionEngine(executor, concurrency_controller=controller)
+
+        await engine.run([{"participant_number": i} for i in range(40)], [])
+
+        assert peak > 1
+
+    @patch('app.services.llm_executor.OpenAI')
+    def test_executor_reports_throttling(self, mock_openai):
+        """Test that 429s seen by the executor shrink the window"""
+        response = Mock()
+        response.choices = [Mock(message=Mock(content='{"q1": {"response": "4"}}'))]
+        response.usage = Mock(prompt_tokens=10, completion_tokens=5, total_tokens=15)
+        mock_openai.return_value.chat.completions.create.side_effect = [rate_limit_error(), response]
+        controller = AdaptiveConcurrency(initial=8)
+        executor = LLMExecutor(
+            api_key="test-key",
+            retry_policy=RetryPolicy(base_delay=0),
+            circuit_breaker=CircuitBreaker("gpt-4o"),
+            concurrency_controller=controller,
+        )
+
+        executor.execute_participant({"participant_number": 1}, [{"question_id": "q1"}])
+
+        assert controller.decreases == 1
+        assert controller.limit == 4
+
+    def test_invalid_bounds_rejected(self):
+        """Test that inconsistent bounds are rejected"""
+        with pytest.raises(ValueError):
+            AdaptiveConcurrency(min_limit=5, max_limit=2)
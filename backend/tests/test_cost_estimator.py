@@ -0,0 +1,121 @@
+"""
+Tests for the pre-flight Cost Estimator
+"""
+from unittest.mock import patch
+
+import pytest
+
+from app.services import cost_estimator
+from app.services.cost_estimator import CostEstimator, count_tokens
+
+
+QUESTIONS = [
+    {
+        "question_id": "q1",
+        "question_text": "Rate your stress",
+        "question_type": "likert_scale",
+        "options": {"min": 1, "max": 5},
+    },
+    {
+        "question_id": "q2",
+        "question_text": "Describe your week",
+        "question_type": "open_ended",
+        "options": {},
+    },
+]
+
+PROFILES = [{"participant_number": i + 1, "age": 30 + i} for i in range(5)]
+
+
+@pytest.fixture(autouse=True)
+def heuristic_tokenizer():
+    """Use the character heuristic so tests do not depend on tokenizer downloads"""
+    with patch.object(cost_estimator, "_get_encoding", return_value=None):
+        yield
+
+
+class TestTokenCounting:
+    """Tests for count_tokens"""
+
+    def test_heuristic_without_tokenizer(self):
+        """Test the ~4 characters per token fallback"""
+        assert count_tokens("a" * 400, "gpt-4o") == 101
+
+
+class TestCostEstimator:
+    """Tests for CostEstimator.estimate"""
+
+    def estimate(self, **overrides):
+        estimator = CostEstimator(model=overrides.pop("model", "gpt-4o"), **overrides.pop("init", {}))
+        params = {
+            "sample_profiles": PROFILES,
+            "questions": QUESTIONS,
+            "sample_size": 1000,
+            "concurrency": 10,
+            "rpm_limit": 500,
+            "tpm_limit": 1_000_000,
+        }
+        params.update(overrides)
+        return estimator.estimate(**params)
+
+    def test_totals_scale_with_sample_size(self):
+        """Test that totals are per-participant estimates times sample size"""
+        estimate = self.estimate()
+
+        assert estimate["total_output_tokens"] == estimate["output_tokens_per_participant"] * 1000
+        assert estimate["total_input_tokens"] == pytest.approx(
+            estimate["input_tokens_per_participant"] * 1000, rel=0.01
+        )
+        assert estimate["estimated_cost"] > 0
+
+    def test_output_capped_by_max_tokens(self):
+        """Test that output estimates never exceed max_tokens"""
+        estimate = self.estimate(questions=QUESTIONS[1:], init={"max_tokens": 50})
+
+        assert estimate["output_tokens_per_participant"] == 50
+
+    def test_long_questionnaire_is_chunked(self):
+        """Test that a questionnaire overflowing max_tokens is priced as several requests"""
+        estimate = self.estimate(questions=QUESTIONS * 20, init={"max_tokens": 500})
+
+        assert estimate["requests_per_participant"] > 1
+        assert estimate["output_tokens_per_participant"] > 500
+
+    def test_duration_bounded_by_rate_limits(self):
+        """Test that the tightest of concurrency, RPM and TPM sets the throughput"""
+        unconstrained = self.estimate(concurrency=1000, rpm_limit=100000)
+        rpm_bound = self.estimate(concurrency=1000, rpm_limit=60)
+
+        assert rpm_bound["estimated_requests_per_second"] == pytest.approx(1.0)
+        assert rpm_bound["estimated_duration_seconds"] == pytest.approx(1000)
+        assert unconstrained["estimated_duration_seconds"] < rpm_bound["estimated_duration_seconds"]
+
+    def test_cost_multiplier(self):
+        """Test that the batch discount scales the cost"""
+        full = self.estimate()
+        discounted = self.estimate(cost_multiplier=0.5)
+
+        assert discounted["estimated_cost"] == pytest.approx(full["estimated_cost"] / 2)
+
+    def test_prefix_layout_prices_cached_questionnaire(self):
+        """Test that a long shared prefix is priced at the cached rate"""
+        long_questions = QUESTIONS * 100
+
+        persona_first = self.estimate(questions=long_questions, init={"max_tokens": 16000})
+        prefix_first = self.estimate(
+            questions=long_questions,
+            init={"max_tokens": 16000, "prompt_layout": "questionnaire_first"},
+        )
+
+        assert persona_first["cached_tokens_per_participant"] == 0
+        assert prefix_first["cached_tokens_per_participant"] > 1024
+        assert prefix_first["estimated_cost"] < persona_first["estimated_cost"]
+
+    def test_persona_packing_shares_questionnaire(self):
+        """Test that packing personas cuts input tokens and requests per participant"""
+        single = self.estimate()
+        packed = self.estimate(init={"personas_per_request": 5})
+
+        assert packed["requests_per_participant"] == pytest.approx(0.2)
+        assert packed["input_tokens_per_participant"] < single["input_tokens_per_participant"]
+        assert packed["estimated_cost"] < single["estimated_cost"]
@@ -0,0 +1,211 @@
+"""
+Tests for the concurrent Execution Engine
+"""
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from app.services.execution_engine import ExecutionEngine
+
+
+def make_profiles(count):
+    """Build minimal participant profiles"""
+    return [{"participant_number": i + 1} for i in range(count)]
+
+
+QUESTIONS = [
+    {
+        "question_id": "q1",
+        "question_text": "Rate your stress",
+        "question_type": "likert_scale",
+        "options": {"min": 1, "max": 5},
+    }
+]
+
+
+class TestExecutionEngine:
+    """Tests for ExecutionEngine.run"""
+
+    async def test_run_returns_outcomes_in_profile_order(self):
+        """Test that outcomes keep profile order regardless of completion order"""
+        executor = Mock()
+
+        async def execute(profile, questions, on_answer=None):
+            # Later participants finish first
+            await asyncio.sleep(0.01 * (5 - profile["participant_number"]))
+            return {"responses": {}, "cost": 0.0, "total_tokens": profile["participant_number"]}
+
+        executor.execute_participant_async = execute
+
+        engine = ExecutionEngine(executor, concurrency=5)
+        outcomes = await engine.run(make_profiles(5), QUESTIONS)
+
+        assert [o["profile"]["participant_number"] for o in outcomes] == [1, 2, 3, 4, 5]
+        assert [o["result"]["total_tokens"] for o in outcomes] == [1, 2, 3, 4, 5]
+        assert all(o["error"] is None for o in outcomes)
+
+    async def test_run_respects_concurrency_limit(self):
+        """Test that no more than `concurrency` participants are in flight"""
+        executor = Mock()
+        in_flight = 0
+        peak = 0
+
+        async def execute(profile, questions, on_answer=None):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"responses": {}, "cost": 0.0, "total_tokens": 0}
+
+        executor.execute_participant_async = execute
+
+        engine = ExecutionEngine(executor, concurrency=3)
+        await engine.run(make_profiles(12), QUESTIONS)
+
+        assert peak == 3
+
+    async def test_run_captures_failures(self):
+        """Test that a failing participant does not abort the run"""
+        executor = Mock()
+        executor.execute_participant_async = AsyncMock(
+            side_effect=[
+                {"responses": {"q1": {"response": "3"}}, "cost": 0.01, "total_tokens": 10},
+                Exception("LLM execution failed: boom"),
+            ]
+        )
+
+        engine = ExecutionEngine(executor, concurrency=1)
+        outcomes = await engine.run(make_profiles(2), QUESTIONS)
+
+        assert outcomes[0]["result"]["responses"]["q1"]["response"] == "3"
+        assert outcomes[1]["result"] is None
+        assert "boom" in outcomes[1]["error"]
+
+
+    async def test_on_answer_receives_profile(self):
+        """Test that streamed answers are reported with their participant"""
+        executor = Mock()
+
+        async def execute(profile, questions, on_answer=None):
+            on_answer("q1", {"response": str(profile["participant_number"])})
+            return {"responses": {}, "cost": 0.0, "total_tokens": 0}
+
+        executor.execute_participant_async = execute
+        answers = []
+
+        engine = ExecutionEngine(
+            executor,
+            concurrency=2,
+            on_answer=lambda profile, qid, answer: answers.append(
+                (profile["participant_number"], qid, answer["response"])
+            ),
+        )
+        await engine.run(make_profiles(2), QUESTIONS)
+
+        assert sorted(answers) == [(1, "q1", "1"), (2, "q1", "2")]
+
+
+class TestStream:
+    """Tests for ExecutionEngine.stream"""
+
+    async def test_stream_emits_in_completion_order(self):
+        """Test that each outcome is handed on as soon as it completes"""
+        executor = Mock()
+
+        async def execute(profile, questions, on_answer=None):
+            await asyncio.sleep(0.01 * (4 - profile["participant_number"]))
+            return {"responses": {}, "cost": 0.0, "total_tokens": 0}
+
+        executor.execute_participant_async = execute
+        emitted = []
+
+        async def emit(outcome):
+            emitted.append(outcome["profile"]["participant_number"])
+
+        await ExecutionEngine(executor, concurrency=3).stream(make_profiles(3), QUESTIONS, emit)
+
+        assert emitted == [3, 2, 1]
+
+    async def test_blocked_emit_holds_back_dispatch(self):
+        """Test that a consumer that stops accepting outcomes stops new calls"""
+        executor = Mock()
+        executor.execute_participant_async = AsyncMock(
+            return_value={"responses": {}, "cost": 0.0, "total_tokens": 0}
+        )
+        queue = asyncio.Queue(maxsize=1)
+        engine = ExecutionEngine(executor, concurrency=2)
+
+        task = asyncio.create_task(engine.stream(make_profiles(10), QUESTIONS, queue.put))
+        await asyncio.sleep(0.05)
+
+        # One outcome queued and two slots blocked on the full queue
+        assert executor.execute_participant_async.await_count == 3
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+
+class TestPersonaPacking:
+    """Tests for running several participants per request"""
+
+    async def test_profiles_are_packed(self):
+        """Test that profiles are sent in packs and outcomes stay in order"""
+        executor = Mock()
+        packs = []
+
+        async def execute_pack(profiles, questions):
+            packs.append([p["participant_number"] for p in profiles])
+            return [
+                ValueError("missing") if p["participant_number"] == 4 else {"responses": {}}
+                for p in profiles
+            ]
+
+        executor.execute_pack_async = execute_pack
+
+        engine = ExecutionEngine(executor, concurrency=2, personas_per_request=3)
+        outcomes = await engine.run(make_profiles(7), QUESTIONS)
+
+        assert sorted(packs) == [[1, 2, 3], [4, 5, 6], [7]]
+        assert [o["profile"]["participant_number"] for o in outcomes] == list(range(1, 8))
+        assert outcomes[3]["error"] == "missing"
+        assert outcomes[4]["result"] == {"responses": {}}
+
+    async def test_pack_failure_fails_every_member(self):
+        """Test that an exception from a pack is reported for each of its participants"""
+        executor = Mock()
+        executor.execute_pack_async = AsyncMock(side_effect=Exception("boom"))
+
+        engine = ExecutionEngine(executor, personas_per_request=2)
+        outcomes = await engine.run(make_profiles(2), QUESTIONS)
+
+        assert [o["error"] for o in outcomes] == ["boom", "boom"]
+
+
+class TestFromSettings:
+    """Tests for ExecutionEngine.from_settings"""
+
+    def test_default_concurrency(self):
+        """Test default concurrency when settings are empty"""
+        engine = ExecutionEngine.from_settings(Mock(), {})
+
+        assert engine.concurrency == ExecutionEngine.DEFAULT_CONCURRENCY
+
+    def test_concurrency_from_settings(self):
+        """Test concurrency read from execution_settings"""
+        engine = ExecutionEngine.from_settings(Mock(), {"concurrency": 50})
+
+        assert engine.concurrency == 50
+
+    def test_concurrency_is_at_least_one(self):
+        """Test invalid concurrency is clamped to one"""
+        engine = ExecutionEngine.from_settings(Mock(), {"concurrency": 0})
+
+        assert engine.concurrency == 1
+
+    def test_personas_per_request_from_settings(self):
+        """Test persona packing read from execution_settings"""
+        engine = ExecutionEngine.from_settings(Mock(), {"personas_per_request": 5})
+
+        assert engine.personas_per_request == 5
@@ -0,0 +1,228 @@
+"""
+Tests for hedged LLM requests
+"""
+import asyncio
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.services.hedging import HedgePolicy
+from app.services.llm_executor import LLMExecutor
+from app.services.retry import CircuitBreaker, RetryPolicy
+
+
+def completion(answer="4", prompt_tokens=1000, completion_tokens=1000):
+    response = Mock()
+    response.choices = [Mock(message=Mock(content=f'{{"q1": {{"response": "{answer}"}}}}'))]
+    response.usage = Mock(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        total_tokens=prompt_tokens + completion_tokens,
+        prompt_tokens_details=None,
+    )
+    return response
+
+
+def scripted_calls(*calls):
+    """Build an async create() whose n-th call sleeps and then returns or raises"""
+    script = iter(calls)
+
+    async def create(**kwargs):
+        delay, outcome = next(script)
+        await asyncio.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return create
+
+
+def warmed_policy(latency=0.01, **kwargs):
+    policy = HedgePolicy(min_samples=5, **kwargs)
+    for _ in range(5):
+        policy.observe(latency)
+    return policy
+
+
+class TestHedgePolicy:
+    """Tests for HedgePolicy"""
+
+    def test_no_delay_until_enough_samples(self):
+        """Test that hedging waits for a latency baseline"""
+        policy = HedgePolicy(min_samples=3)
+        policy.observe(1.0)
+        policy.observe(2.0)
+
+        assert policy.delay() is None
+
+        policy.observe(3.0)
+        assert policy.delay() is not None
+
+    def test_delay_is_latency_percentile(self):
+        """Test that the hedge delay follows the configured percentile"""
+        policy = HedgePolicy(percentile=0.9, min_samples=1)
+        for latency in range(1, 101):
+            policy.observe(latency / 100)
+
+        assert policy.delay() == pytest.approx(0.91)
+
+    def test_window_forgets_old_latencies(self):
+        """Test that only recent latencies count"""
+        policy = HedgePolicy(percentile=1.0, min_samples=1, window=3)
+        for latency in (10.0, 1.0, 1.0, 1.0):
+            policy.observe(latency)
+
+        assert policy.delay() == 1.0
+
+    def test_hedge_share_is_capped(self):
+        """Test that at most max_hedge_ratio of requests are hedged"""
+        policy = HedgePolicy(max_hedge_ratio=0.1)
+        granted = 0
+        for _ in range(100):
+            policy.start_request()
+            granted += policy.try_hedge()
+
+        assert granted == 10
+
+    def test_from_settings(self):
+        """Test that hedging is off unless a percentile is configured"""
+        assert HedgePolicy.from_settings({}) is None
+
+        policy = HedgePolicy.from_settings({"hedge_percentile": 0.99, "hedge_max_ratio": 0.05})
+        assert policy.percentile == 0.99
+        assert policy.max_hedge_ratio == 0.05
+
+    def test_rejects_invalid_percentile(self):
+        """Test that percentiles outside (0, 1] are rejected"""
+        with pytest.raises(ValueError):
+            HedgePolicy(percentile=95)
+
+
+@patch('app.services.llm_executor.AsyncOpenAI')
+class TestHedgedExecution:
+    """Tests for hedged calls in LLMExecutor"""
+
+    @staticmethod
+    def executor(mock_async_openai, create, policy):
+        client = Mock()
+        client.chat.completions.create = create
+        mock_async_openai.return_value = client
+        return LLMExecutor(
+            api_key="test-key",
+            model="gpt-4o",
+            retry_policy=RetryPolicy(max_retries=0),
+            circuit_breaker=CircuitBreaker("gpt-4o"),
+            hedge_policy=policy,
+        )
+
+    async def test_fast_call_is_not_hedged(self, mock_async_openai):
+        """Test that calls finishing before the percentile send no duplicate"""
+        policy = warmed_policy(latency=1.0)
+        executor = self.executor(mock_async_openai, scripted_calls((0, completion())), policy)
+
+        result = await executor.execute_participant_async({"participant_number": 1}, [{"question_id": "q1"}])
+
+        assert result["responses"]["q1"]["response"] == "4"
+        assert policy.stats() == {"requests": 1, "hedged": 0, "hedge_wins": 0, "loser_cost": 0.0}
+
+    async def test_slow_call_is_won_by_hedge(self, mock_async_openai):
+        """Test that a stuck call is overtaken and its estimated cost charged"""
+        policy = warmed_policy(max_hedge_ratio=1.0)
+        executor = self.executor(
+            mock_async_openai,
+            scripted_calls((10, completion("stuck")), (0, completion("hedge"))),
+            policy,
+        )
+
+        result = await asyncio.wait_for(
+            executor.execute_participant_async({"participant_number": 1}, [{"question_id": "q1"}]),
+            timeout=2,
+        )
+
+        single_cost = executor._calculate_cost(1000, 1000)
+        assert result["responses"]["q1"]["response"] == "hedge"
+        assert result["cost"] == pytest.approx(2 * single_cost)
+        assert policy.hedge_wins == 1
+        assert policy.loser_cost == pytest.approx(single_cost)
+
+    async def test_hedge_waits_for_other_call_after_failure(self, mock_async_openai):
+        """Test that a failed duplicate does not fail the participant"""
+        policy = warmed_policy(max_hedge_ratio=1.0)
+        executor = self.executor(
+            mock_async_openai,
+            scripted_calls((0.1, completion("primary")), (0, ValueError("boom"))),
+            policy,
+        )
+
+        result = await executor.execute_participant_async({"participant_number": 1}, [{"question_id": "q1"}])
+
+        assert result["responses"]["q1"]["response"] == "primary"
+        assert result["cost"] == pytest.approx(executor._calculate_cost(1000, 1000))
+        assert policy.hedge_wins == 0
+
+    async def test_hedge_cap_blocks_duplicates(self, mock_async_openai):
+        """Test that the hedge budget is respected"""
+        policy = warmed_policy(max_hedge_ratio=0.5)
+        create = Mock(side_effect=scripted_calls((0.05, completion())))
+        executor = self.executor(mock_async_openai, create, policy)
+
+        await executor.execute_participant_async({"participant_number": 1}, [{"question_id": "q1"}])
+
+        assert create.call_count == 1
+        assert policy.hedged == 0
+
+    async def test_loser_is_cancelled(self, mock_async_openai):
+        """Test that the losing call is cancelled and releases its circuit probe"""
+        cancelled = asyncio.Event()
+
+        async def create(**kwargs):
+            if create.calls == 0:
+                create.calls += 1
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+            return completion()
+
+        create.calls = 0
+        policy = warmed_policy(max_hedge_ratio=1.0)
+        executor = self.executor(mock_async_openai, create, policy)
+
+        await executor.execute_participant_async({"participant_number": 1}, [{"question_id": "q1"}])
+
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        assert executor.circuit_breaker.failures == 0
+
+    async def test_unsent_hedge_is_not_charged(self, mock_async_openai):
+        """Test that a duplicate cancelled while waiting to be sent costs nothing"""
+
+        class GatedLimiter:
+            """Lets the first call through and holds the rest"""
+
+            def __init__(self):
+                self.calls = 0
+
+            async def acquire_async(self, tokens):
+                self.calls += 1
+                if self.calls > 1:
+                    await asyncio.sleep(10)
+                return Mock(tokens=tokens)
+
+            def settle(self, reservation, tokens):
+                pass
+
+        policy = warmed_policy(max_hedge_ratio=1.0)
+        create = Mock(side_effect=scripted_calls((0.1, completion("primary"))))
+        executor = self.executor(mock_async_openai, create, policy)
+        executor.rate_limiter = GatedLimiter()
+
+        result = await asyncio.wait_for(
+            executor.execute_participant_async({"participant_number": 1}, [{"question_id": "q1"}]),
+            timeout=2,
+        )
+
+        assert create.call_count == 1
+        assert policy.hedged == 1
+        assert result["cost"] == pytest.approx(executor._calculate_cost(1000, 1000))
+        assert policy.loser_cost == 0.0
@@ -0,0 +1,160 @@
+"""
+Tests for the database-backed execution job queue
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models.execution_job import ExecutionJob
+from app.models.experiment import Experiment
+from app.services.job_queue import JobQueue, latest_job
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = datetime(2026, 1, 1)
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def session_factory():
+    """In-memory SQLite sessions (SQLite ignores FOR UPDATE SKIP LOCKED)"""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine, tables=[Experiment.__table__, ExecutionJob.__table__])
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def queue_job(session_factory, **kwargs):
+    with session_factory() as session:
+        experiment = Experiment(name="Test", status="active", meta_data={})
+        session.add(experiment)
+        session.flush()
+        job = JobQueue.enqueue(
+            session, experiment.id, {"api_key": "sk-test", "model": "gpt-4o"}, **kwargs
+        )
+        session.commit()
+        return experiment.id, job.id
+
+
+class TestJobQueue:
+    """Tests for JobQueue"""
+
+    def test_claim_leases_oldest_job(self, session_factory):
+        """Test that claims take queued jobs in order"""
+        clock = FakeClock()
+        queue = JobQueue(session_factory, lease_seconds=30, clock=clock)
+        _, first = queue_job(session_factory)
+        _, second = queue_job(session_factory)
+
+        claimed = queue.claim("worker-1")
+
+        assert claimed.id == first
+        assert claimed.payload["model"] == "gpt-4o"
+        assert claimed.attempt == 1
+        with session_factory() as session:
+            job = session.get(ExecutionJob, first)
+            assert job.status == "running"
+            assert job.worker_id == "worker-1"
+            assert job.lease_expires_at == clock.now + timedelta(seconds=30)
+        assert queue.claim("worker-2").id == second
+        assert queue.claim("worker-3") is None
+
+    def test_heartbeat_extends_lease(self, session_factory):
+        """Test that a heartbeat keeps a running job from being reclaimed"""
+        clock = FakeClock()
+        queue = JobQueue(session_factory, lease_seconds=30, clock=clock)
+        queue_job(session_factory)
+        job = queue.claim("worker-1")
+
+        clock.now += timedelta(seconds=20)
+        assert queue.heartbeat(job.id, "worker-1")
+        clock.now += timedelta(seconds=20)
+
+        assert queue.claim("worker-2") is None
+
+    def test_expired_lease_is_reclaimed(self, session_factory):
+        """Test that a dead worker's job goes to another worker"""
+        clock = FakeClock()
+        queue = JobQueue(session_factory, lease_seconds=30, clock=clock)
+        queue_job(session_factory)
+        job = queue.claim("worker-1")
+
+        clock.now += timedelta(seconds=31)
+        reclaimed = queue.claim("worker-2")
+
+        assert reclaimed.id == job.id
+        assert reclaimed.attempt == 2
+        # The dead worker can no longer touch the job
+        assert not queue.heartbeat(job.id, "worker-1")
+        assert not queue.finish(job.id, "worker-1")
+
+    def test_job_given_up_after_max_attempts(self, session_factory):
+        """Test that a job that keeps losing its worker fails its experiment"""
+        clock = FakeClock()
+        queue = JobQueue(session_factory, lease_seconds=30, clock=clock)
+        experiment_id, job_id = queue_job(session_factory, max_attempts=2)
+        for _ in range(2):
+            queue.claim("worker")
+            clock.now += timedelta(seconds=31)
+
+        assert queue.claim("worker") is None
+        with session_factory() as session:
+            assert session.get(ExecutionJob, job_id).status == "failed"
+            experiment = session.get(Experiment, experiment_id)
+            assert experiment.status == "failed"
+            assert "abandoned" in experiment.meta_data["execution_error"]
+
+    def test_api_keys_are_stored_sealed(self, session_factory):
+        """Test that queued jobs hold no plaintext keys and claims get them back"""
+        queue = JobQueue(session_factory)
+        with session_factory() as session:
+            experiment = Experiment(name="Test", status="active", meta_data={})
+            session.add(experiment)
+            session.flush()
+            JobQueue.enqueue(
+                session,
+                experiment.id,
+                {"api_key": "sk-main", "additional_api_keys": ["sk-extra"], "model": "gpt-4o"},
+            )
+            session.commit()
+
+        with session_factory() as session:
+            stored = session.query(ExecutionJob).one().payload
+        assert "sk-main" not in str(stored) and "sk-extra" not in str(stored)
+        assert stored["model"] == "gpt-4o"
+
+        job = queue.claim("worker-1")
+        assert job.payload["api_key"] == "sk-main"
+        assert job.payload["additional_api_keys"] == ["sk-extra"]
+
+    def test_finish_drops_api_keys(self, session_factory):
+        """Test that finished jobs keep no credentials"""
+        queue = JobQueue(session_factory)
+        queue_job(session_factory)
+        job = queue.claim("worker-1")
+
+        assert queue.finish(job.id, "worker-1", error="boom")
+
+        with session_factory() as session:
+            row = session.get(ExecutionJob, job.id)
+            assert row.status == "failed"
+            assert row.error == "boom"
+            assert "api_key" not in row.payload
+            assert row.lease_expires_at is None
+
+    def test_latest_job(self, session_factory):
+        """Test looking up an experiment's most recent job"""
+        experiment_id, job_id = queue_job(session_factory)
+
+        with session_factory() as session:
+            assert latest_job(session, experiment_id).id == job_id
+            assert latest_job(session, experiment_id + 1) is None
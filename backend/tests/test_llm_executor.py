@@ -1,10 +1,19 @@
 """
 Tests for LLM Executor Service
 """
+import asyncio
+import json
+import re
+
+import httpx
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
+from openai import RateLimitError
 
 from app.services.llm_executor import LLMExecutor
+from app.services.rate_limiter import RateLimiter
+from app.services.response_cache import ResponseCache
+from app.services.retry import CircuitBreaker, RetryPolicy
 
 
 class TestBuildPrompt:
@@ -166,6 +175,19 @@ class TestBuildPrompt:
         assert "Describe your experience" in prompt
 
 
+    def test_compiled_prompt_reused_for_same_questions(self):
+        """Test that the questionnaire is compiled once per questions list"""
+        executor = LLMExecutor(api_key="test-key")
+        questions = [{"question_id": "q1", "question_text": "Test question"}]
+
+        first = executor.compile_prompt(questions)
+        executor._build_prompt({"participant_number": 1}, questions)
+        executor._build_prompt({"participant_number": 2}, questions)
+
+        assert executor.compile_prompt(questions) is first
+        assert executor.compile_prompt(list(questions)) is not first
+
+
 class TestParseResponse:
     """Tests for _parse_response method"""
 
@@ -305,6 +327,22 @@ class TestCalculateCost:
         assert abs(cost - expected_cost) < 0.0001
 
 
+    def test_calculate_cost_with_cached_prompt_tokens(self):
+        """Test that cached prompt tokens are billed at the cached input rate"""
+        executor = LLMExecutor(api_key="test-key", model="gpt-4o")
+
+        cost = executor._calculate_cost(2000, 100, cached_tokens=1500)
+
+        expected_cost = (500 * 0.005 + 1500 * 0.0025 + 100 * 0.005) / 1000
+        assert abs(cost - expected_cost) < 0.000001
+
+    def test_cached_input_defaults_to_half_input_for_custom_models(self):
+        """Test default cached pricing for models without explicit pricing"""
+        executor = LLMExecutor(api_key="test-key", model="custom-model", input_cost_per_1k=0.01)
+
+        assert executor.cached_input_cost_per_1k == 0.005
+
+
 class TestExecuteParticipant:
     """Tests for execute_participant method"""
 
@@ -487,6 +525,808 @@ class TestExecuteParticipant:
         assert "Failed to parse LLM response" in str(exc_info.value)
 
 
+class TestPromptCaching:
+    """Tests for provider prompt-prefix caching support"""
+
+    @patch('app.services.llm_executor.OpenAI')
+    def test_cached_tokens_are_captured(self, mock_openai):
+        """Test that usage.prompt_tokens_details.cached_tokens reduces the cost"""
+        mock_client = Mock()
+        mock_openai.return_value = mock_client
+
+        mock_response = Mock()
+        mock_response.choices = [Mock(message=Mock(content='{"q1": {"response": "4"}}'))]
+        mock_response.usage = Mock(
+            prompt_tokens=2000,
+            completion_tokens=100,
+            total_tokens=2100,
+            prompt_tokens_details=Mock(cached_tokens=1024),
+        )
+        mock_client.chat.completions.create.return_value = mock_response
+
+        executor = LLMExecutor(api_key="test-key", prompt_layout="questionnaire_first")
+        result = executor.execute_participant({"participant_number": 1}, [{"question_id": "q1"}])
+
+        assert result["cached_tokens"] == 1024
+        assert result["cost"] == pytest.approx(executor._calculate_cost(2000, 100, 1024))
+        assert result["cost"] < executor._calculate_cost(2000, 100)
+
+    def test_questionnaire_first_layout_puts_persona_last(self):
+        """Test that the questionnaire precedes the persona in the prefix layout"""
+        executor = LLMExecutor(api_key="test-key", prompt_layout="questionnaire_first")
+
+        prompt = executor._build_prompt(
+            {"participant_number": 3}, [{"question_id": "q1", "question_text": "Test question"}]
+        )
+
+        assert prompt.index("Test question") < prompt.index("Participant #3")
+
+    def test_unknown_layout_rejected(self):
+        """Test that an unknown prompt layout fails at construction"""
+        with pytest.raises(ValueError):
+            LLMExecutor(api_key="test-key", prompt_layout="sideways")
+
+
+class TestExecuteParticipantAsync:
+    """Tests for execute_participant_async method"""
+
+    @patch('app.services.llm_executor.AsyncOpenAI')
+    async def test_execute_participant_async_success(self, mock_async_openai):
+        """Test successful async participant execution"""
+        mock_client = Mock()
+        mock_async_openai.return_value = mock_client
+
+        mock_response = Mock()
+        mock_response.choices = [Mock(message=Mock(content='{"q1": {"response": "4"}}'))]
+        mock_response.usage = Mock(prompt_tokens=400, completion_tokens=80, total_tokens=480)
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
+
+        executor = LLMExecutor(api_key="test-key", temperature=0.7, max_tokens=300)
+
+        profile = {"participant_number": 1, "age": 30, "gender": "female"}
+        questions = [
+            {
+                "question_id": "q1",
+                "question_text": "Rate your stress",
+                "question_type": "likert_scale",
+                "options": {"min": 1, "max": 5}
+            }
+        ]
+
+        result = await executor.execute_participant_async(profile, questions)
+
+        call_args = mock_client.chat.completions.create.call_args
+        assert call_args.kwargs["temperature"] == 0.7
+        assert call_args.kwargs["max_tokens"] == 300
+        assert result["responses"]["q1"]["response"] == "4"
+        assert result["total_tokens"] == 480
+
+    @patch('app.services.llm_executor.AsyncOpenAI')
+    async def test_execute_participant_async_api_error(self, mock_async_openai):
+        """Test handling of API errors in async execution"""
+        mock_client = Mock()
+        mock_async_openai.return_value = mock_client
+        mock_client.chat.completions.create = AsyncMock(side_effect=Exception("API Error"))
+
+        executor = LLMExecutor(api_key="test-key")
+
+        with pytest.raises(Exception) as exc_info:
+            await executor.execute_participant_async({"participant_number": 1}, [])
+
+        assert "LLM execution failed" in str(exc_info.value)
+
+
+class FakeStream:
+    """Async iterator over streamed chat completion chunks"""
+
+    def __init__(self, pieces, usage=None, fail_after=None):
+        self.chunks = [
+            Mock(choices=[Mock(delta=Mock(content=piece))], usage=None) for piece in pieces
+        ]
+        if usage:
+            self.chunks.append(Mock(choices=[], usage=usage))
+        self.fail_after = fail_after
+        self.closed = False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for index, chunk in enumerate(self.chunks):
+            if self.fail_after is not None and index == self.fail_after:
+                raise Exception("Connection reset")
+            yield chunk
+
+    async def close(self):
+        self.closed = True
+
+
+class TestStreaming:
+    """Tests for streaming execution"""
+
+    PIECES = ['```json\n{"q1": {"resp', 'onse": "4"}, "q2": ', '{"response": "Yes"}}\n```']
+    QUESTIONS = [{"question_id": "q1"}, {"question_id": "q2"}]
+
+    @patch('app.services.llm_executor.AsyncOpenAI')
+    async def test_streamed_answers_are_emitted_incrementally(self, mock_async_openai):
+        """Test that each answer is reported as soon as it is complete"""
+        mock_client = Mock()
+        mock_async_openai.return_value = mock_client
+        usage = Mock(prompt_tokens=300, completion_tokens=40, total_tokens=340)
+        mock_client.chat.completions.create = AsyncMock(return_value=FakeStream(self.PIECES, usage))
+
+        executor = LLMExecutor(api_key="test-key", streaming=True)
+        answers = []
+        result = await executor.execute_participant_async(
+            {"participant_number": 1}, self.QUESTIONS, on_answer=lambda q, a: answers.append(q)
+        )
+
+        assert answers == ["q1", "q2"]
+        assert result["responses"]["q2"]["response"] == "Yes"
+        assert result["total_tokens"] == 340
+        assert "partial" not in result
+        call_kwargs = mock_client.chat.completions.create.call_args.kwargs
+        assert call_kwargs["stream"] is True
+        assert call_kwargs["stream_options"] == {"include_usage": True}
+
+    @patch('app.services.llm_executor.AsyncOpenAI')
+    async def test_broken_stream_keeps_received_answers(self, mock_async_openai):
+        """Test that a stream failing midway yields a partial result"""
+        mock_client = Mock()
+        mock_async_openai.return_value = mock_client
+        mock_client.chat.completions.create = AsyncMock(
+            return_value=FakeStream(self.PIECES, fail_after=2)
+        )
+
+        executor = LLMExecutor(api_key="test-key", streaming=True)
+        result = await executor.execute_participant_async({"participant_number": 1}, self.QUESTIONS)
+
+        assert result["partial"] is True
+        assert "Connection reset" in result["error"]
+        assert list(result["responses"]) == ["q1"]
+        assert result["total_tokens"] > 0
+
+    @patch('app.services.llm_executor.AsyncOpenAI')
+    async def test_malformed_stream_aborts_early(self, mock_async_openai):
+        """Test that a stream that cannot be JSON is closed and fails the participant"""
+        mock_client = Mock()
+        mock_async_openai.return_value = mock_client
+        stream = FakeStream(["{q1: ", "never read"])
+        mock_client.chat.completions.create = AsyncMock(return_value=stream)
+
+        executor = LLMExecutor(api_key="test-key", streaming=True)
+
+        with pytest.raises(ValueError) as exc_info:
+            await executor.execute_participant_async({"participant_number": 1}, self.QUESTIONS)
+
+        assert "Failed to parse LLM response" in str(exc_info.value)
+        assert stream.closed
+
+    @patch('app.services.llm_executor.AsyncOpenAI')
+    async def test_stream_settles_rate_limit_with_usage(self, mock_async_openai):
+        """Test that a streamed call takes its real tokens from the TPM budget, not max_tokens"""
+        mock_client = Mock()
+        mock_async_openai.return_value = mock_client
+        usage = Mock(prompt_tokens=300, completion_tokens=40, total_tokens=340)
+        mock_client.chat.completions.create = AsyncMock(return_value=FakeStream(self.PIECES, usage))
+        # A frozen clock, so the bucket does not refill during the call
+        rate_limiter = RateLimiter(rpm=1000, tpm=100000, headroom=1.0, clock=lambda: 0.0)
+
+        executor = LLMExecutor(
+            api_key="test-key", max_tokens=4000, streaming=True, rate_limiter=rate_limiter
+        )
+        await executor.execute_participant_async({"participant_number": 1}, self.QUESTIONS)
+
+        assert rate_limiter.tokens.tokens == pytest.approx(100000 - 340)
+
+
+class TestRateLimiting:
+    """Tests for rate limiter integration"""
+
+    @patch('app.services.llm_executor.OpenAI')
+    def test_execute_participant_settles_reservation(self, mock_openai):
+        """Test that the reservation is settled with the real usage"""
+        mock_client = Mock()
+        mock_openai.return_value = mock_client
+
+        mock_response = Mock()
+        mock_response.choices = [Mock(message=Mock(content='{"q1": {"response": "4"}}'))]
+        mock_response.usage = Mock(prompt_tokens=400, completion_tokens=80, total_tokens=480)
+        mock_client.chat.completions.create.return_value = mock_response
+
+        rate_limiter = Mock()
+        rate_limiter.acquire.return_value = "reservation"
+
+        executor = LLMExecutor(api_key="test-key", max_tokens=500, rate_limiter=rate_limiter)
+        executor.execute_participant({"participant_number": 1}, [{"question_id": "q1"}])
+
+        estimate = rate_limiter.acquire.call_args.args[0]
+        assert estimate > 500
+        rate_limiter.settle.assert_called_once_with("reservation", 480)
+
+    @patch('app.services.llm_executor.OpenAI')
+    def test_failed_call_releases_reservation(self, mock_openai):
+        """Test that a failed call settles with zero usage"""
+        mock_client = Mock()
+        mock_openai.return_value = mock_client
+        mock_client.chat.completions.create.side_effect = Exception("API Error")
+
+        rate_limiter = Mock()
+        rate_limiter.acquire.return_value = "reservation"
+
+        executor = LLMExecutor(api_key="test-key", rate_limiter=rate_limiter)
+
+        with pytest.raises(Exception):
+            executor.execute_participant({"participant_number": 1}, [{"question_id": "q1"}])
+
+        rate_limiter.settle.assert_called_once_with("reservation", 0)
+
+
+class TestRetries:
+    """Tests for retry and circuit breaker integration"""
+
+    @staticmethod
+    def rate_limit_error():
+        request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+        return RateLimitError(
+            "Rate limit exceeded", response=httpx.Response(429, request=request), body=None
+        )
+
+    @staticmethod
+    def ok_response():
+        response = Mock()
+        response.choices = [Mock(message=Mock(content='{"q1": {"response": "4"}}'))]
+        response.usage = Mock(prompt_tokens=400, completion_tokens=80, total_tokens=480)
+        return response
+
+    @patch('app.services.llm_executor.OpenAI')
+    def test_transient_error_is_retried(self, mock_openai):
+        """Test that a 429 is retried and the participant succeeds"""
+        mock_client = Mock()
+        mock_openai.return_value = mock_client
+        mock_client.chat.completions.create.side_effect = [
+            self.rate_limit_error(),
+            self.ok_response(),
+        ]
+
+        executor = LLMExecutor(
+            api_key="test-key",
+            retry_policy=RetryPolicy(base_delay=0),
+            circuit_breaker=CircuitBreaker("gpt-4o"),
+        )
+        result = executor.execute_participant({"participant_number": 1}, [{"question_id": "q1"}])
+
+        assert mock_client.chat.completions.create.call_count == 2
+        assert result["responses"]["q1"]["response"] == "4"
+
+    @patch('app.services.llm_executor.OpenAI')
+    def test_retries_are_bounded(self, mock_openai):
+        """Test that retries stop after max_retries"""
+        mock_client = Mock()
+        mock_openai.return_value = mock_client
+        mock_client.chat.completions.create.side_effect = self.rate_limit_error()
+
+        executor = LLMExecutor(
+            api_key="test-key",
+            retry_policy=RetryPolicy(max_retries=2, base_delay=0),
+            circuit_breaker=CircuitBreaker("gpt-4o", failure_threshold=10),
+        )
+
+        with pytest.raises(Exception) as exc_info:
+            executor.execute_participant({"participant_number": 1}, [{"question_id": "q1"}])
+
+        assert mock_client.chat.completions.create.call_count == 3
+        assert "LLM execution failed" in str(exc_info.value)
+
+    @patch('app.services.llm_executor.AsyncOpenAI')
+    async def test_async_transient_error_is_retried(self, mock_async_openai):
+        """Test that async execution retries transient errors"""
+        mock_client = Mock()
+        mock_async_openai.return_value = mock_client
+        mock_client.chat.completions.create = AsyncMock(
+            side_effect=[self.rate_limit_error(), self.ok_response()]
+        )
+
+        executor = LLMExecutor(
+            api_key="test-key",
+            retry_policy=RetryPolicy(base_delay=0),
+            circuit_breaker=CircuitBreaker("gpt-4o"),
+        )
+        result = await executor.execute_participant_async(
+            {"participant_number": 1}, [{"question_id": "q1"}]
+        )
+
+        assert mock_client.chat.completions.create.await_count == 2
+        assert result["responses"]["q1"]["response"] == "4"
+
+    @patch('app.services.llm_executor.OpenAI')
+    def test_open_circuit_stops_calls(self, mock_openai):
+        """Test that an open circuit prevents further API calls"""
+        mock_client = Mock()
+        mock_openai.return_value = mock_client
+        mock_client.chat.completions.create.side_effect = self.rate_limit_error()
+
+        breaker = CircuitBreaker("gpt-4o", failure_threshold=1, recovery_timeout=60)
+        executor = LLMExecutor(
+            api_key="test-key",
+            retry_policy=RetryPolicy(max_retries=0),
+            circuit_breaker=breaker,
+        )
+
+        with pytest.raises(Exception):
+            executor.execute_participant({"participant_number": 1}, [{"question_id": "q1"}])
+        with pytest.raises(Exception) as exc_info:
+            executor.execute_participant({"participant_number": 2}, [{"question_id": "q1"}])
+
+        assert mock_client.chat.completions.create.call_count == 1
+        assert "Circuit open" in str(exc_info.value)
+
+    @patch('app.services.llm_executor.OpenAI')
+    def test_refused_calls_do_not_extend_cooldown(self, mock_openai):
+        """Test that calls refused during the cooldown let the circuit half-open on time"""
+        mock_client = Mock()
+        mock_openai.return_value = mock_client
+        mock_client.chat.completions.create.side_effect = [
+            self.rate_limit_error(),
+            self.ok_response(),
+        ]
+
+        now = [0.0]
+        breaker = CircuitBreaker(
+            "gpt-4o", failure_threshold=1, recovery_timeout=30, clock=lambda: now[0]
+        )
+        executor = LLMExecutor(
+            api_key="test-key",
+            retry_policy=RetryPolicy(max_retries=0),
+            circuit_breaker=breaker,
+        )
+        questions = [{"question_id": "q1"}]
+
+        with pytest.raises(Exception):
+            executor.execute_participant({"participant_number": 1}, questions)
+        # Steady traffic while the circuit is open
+        for number in range(2, 4):
+            now[0] += 10
+            with pytest.raises(Exception, match="Circuit open"):
+                executor.execute_participant({"participant_number": number}, questions)
+
+        assert breaker.opened_at == 0.0
+        now[0] += 10
+        result = executor.execute_participant({"participant_number": 4}, questions)
+
+        assert result["responses"]["q1"]["response"] == "4"
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+class TestResponseCaching:
+    """Tests for response cache integration"""
+
+    @staticmethod
+    def ok_response():
+        response = Mock()
+        response.choices = [Mock(message=Mock(content='{"q1": {"response": "4"}}'))]
+        response.usage = Mock(prompt_tokens=400, completion_tokens=80, total_tokens=480)
+        return response
+
+    @patch('app.services.llm_executor.OpenAI')
+    def test_repeat_call_is_served_from_cache(self, mock_openai):
+        """Test that an identical prompt is only sent once and costs nothing the second time"""
+        mock_client = Mock()
+        mock_openai.return_value = mock_client
+        mock_client.chat.completions.create.return_value = self.ok_response()
+
+        executor = LLMExecutor(api_key="test-key", response_cache=ResponseCache())
+        profile = {"participant_number": 1}
+        questions = [{"question_id": "q1"}]
+
+        first = executor.execute_participant(profile, questions)
+        second = executor.execute_participant(profile, questions)
+
+        assert mock_client.chat.completions.create.call_count == 1
+        assert first["cached"] is False
+        assert second["cached"] is True
+        assert second["cost"] == 0.0
+        assert second["responses"] == first["responses"]
+
+    @patch('app.services.llm_executor.OpenAI')
+    def test_cache_bypass_calls_api(self, mock_openai):
+        """Test that bypass skips lookups but refreshes the cache"""
+        mock_client = Mock()
+        mock_openai.return_value = mock_client
+        mock_client.chat.completions.create.return_value = self.ok_response()
+
+        cache = ResponseCache()
+        executor = LLMExecutor(api_key="test-key", response_cache=cache, cache_bypass=True)
+        profile = {"participant_number": 1}
+        questions = [{"question_id": "q1"}]
+
+        executor.execute_participant(profile, questions)
+        result = executor.execute_participant(profile, questions)
+
+        assert mock_client.chat.completions.create.call_count == 2
+        assert result["cached"] is False
+        assert cache.get(executor._cache_key(executor._build_prompt(profile, questions)))
+
+    @patch('app.services.llm_executor.OpenAI')
+    def test_unparseable_response_is_not_cached(self, mock_openai):
+        """Test that parse failures are not cached"""
+        mock_client = Mock()
+        mock_openai.return_value = mock_client
+        bad_response = self.ok_response()
+        bad_response.choices = [Mock(message=Mock(content="not json"))]
+        mock_client.chat.completions.create.return_value = bad_response
+
+        cache = ResponseCache()
+        executor = LLMExecutor(api_key="test-key", response_cache=cache)
+
+        with pytest.raises(ValueError):
+            executor.execute_participant({"participant_number": 1}, [{"question_id": "q1"}])
+
+        assert len(cache._memory) == 0
+
+    @patch('app.services.llm_executor.AsyncOpenAI')
+    async def test_async_repeat_call_is_served_from_cache(self, mock_async_openai):
+        """Test caching on the async path"""
+        mock_client = Mock()
+        mock_async_openai.return_value = mock_client
+        mock_client.chat.completions.create = AsyncMock(return_value=self.ok_response())
+
+        executor = LLMExecutor(api_key="test-key", seed=7, response_cache=ResponseCache())
+        profile = {"participant_number": 1}
+        questions = [{"question_id": "q1"}]
+
+        await executor.execute_participant_async(profile, questions)
+        second = await executor.execute_participant_async(profile, questions)
+
+        assert mock_client.chat.completions.create.await_count == 1
+        assert mock_client.chat.completions.create.call_args.kwargs["seed"] == 7
+        assert second["cached"] is True
+
+
+class TestChunking:
+    """Tests for splitting long questionnaires into concurrent sub-requests"""
+
+    QUESTIONS = [
+        {
+            "question_id": f"q{i}",
+            "question_text": f"Describe experience {i}",
+            "question_type": "open_ended",
+            "options": {},
+        }
+        for i in range(12)
+    ]
+
+    @staticmethod
+    def answer_prompt(fail_question=None):
+        """Build a fake create() that answers every question in the prompt"""
+
+        async def create(**kwargs):
+            prompt = kwargs["messages"][-1]["content"]
+            question_ids = re.findall(r"Question ID: (\S+)", prompt)
+            if fail_question in question_ids:
+                raise ValueError("bad request")
+            response = Mock()
+            response.choices = [Mock(message=Mock(content=json.dumps(
+                {qid: {"response": f"answer {qid}"} for qid in question_ids}
+            )))]
+            response.usage = Mock(prompt_tokens=100, completion_tokens=50, total_tokens=150)
+            return response
+
+        return create
+
+    @patch('app.services.llm_executor.AsyncOpenAI')
+    async def test_long_questionnaire_is_split_and_merged(self, mock_async_openai):
+        """Test that blocks are sent separately and merged per participant"""
+        mock_client = Mock()
+        mock_async_openai.return_value = mock_client
+        mock_client.chat.completions.create = AsyncMock(side_effect=self.answer_prompt())
+
+        executor = LLMExecutor(api_key="test-key", max_tokens=500)
+        chunks = executor.compile_chunks(self.QUESTIONS)
+
+        result = await executor.execute_participant_async({"participant_number": 1}, self.QUESTIONS)
+
+        assert len(chunks) > 1
+        assert mock_client.chat.completions.create.await_count == len(chunks)
+        assert list(result["responses"]) == [q["question_id"] for q in self.QUESTIONS]
+        assert result["total_tokens"] == 150 * len(chunks)
+        assert "partial" not in result
+
+    @patch('app.services.llm_executor.AsyncOpenAI')
+    async def test_failed_block_marks_result_partial(self, mock_async_openai):
+        """Test that one failing block keeps the other blocks' answers"""
+        mock_client = Mock()
+        mock_async_openai.return_value = mock_client
+        mock_client.chat.completions.create = AsyncMock(side_effect=self.answer_prompt("q0"))
+
+        executor = LLMExecutor(api_key="test-key", max_tokens=500)
+
+        result = await executor.execute_participant_async({"participant_number": 1}, self.QUESTIONS)
+
+        assert result["partial"] is True
+        assert "bad request" in result["error"]
+        assert "q0" not in result["responses"]
+        assert "q11" in result["responses"]
+
+    @patch('app.services.llm_executor.OpenAI')
+    def test_sync_execution_chunks(self, mock_openai):
+        """Test that the sync path sends one request per block"""
+        mock_client = Mock()
+        mock_openai.return_value = mock_client
+        create = self.answer_prompt()
+        mock_client.chat.completions.create = Mock(
+            side_effect=lambda **kwargs: asyncio.run(create(**kwargs))
+        )
+
+        executor = LLMExecutor(api_key="test-key", max_tokens=2000, max_questions_per_chunk=5)
+
+        result = executor.execute_participant({"participant_number": 1}, self.QUESTIONS)
+
+        assert mock_client.chat.completions.create.call_count == 3
+        assert len(result["responses"]) == 12
+
+    def test_short_questionnaire_is_not_split(self):
+        """Test that a questionnaire within budget keeps its single compiled prompt"""
+        executor = LLMExecutor(api_key="test-key")
+        questions = self.QUESTIONS[:2]
+
+        assert executor.compile_chunks(questions) == [executor.compile_prompt(questions)]
+
+
+class TestPersonaPacking:
+    """Tests for multi-persona requests"""
+
+    QUESTIONS = [
+        {
+            "question_id": "q1",
+            "question_text": "Rate your stress",
+            "question_type": "likert_scale",
+            "options": {"min": 1, "max": 5},
+        },
+        {
+            "question_id": "q2",
+            "question_text": "Do you exercise?",
+            "question_type": "yes_no",
+            "options": {},
+        },
+    ]
+
+    PROFILES = [{"participant_number": n} for n in (1, 2, 3)]
+
+    @staticmethod
+    def mock_client(mock_async_openai, content):
+        mock_client = Mock()
+        mock_async_openai.return_value = mock_client
+        mock_response = Mock()
+        mock_response.choices = [Mock(message=Mock(content=content))]
+        mock_response.usage = Mock(prompt_tokens=301, completion_tokens=90, total_tokens=391)
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
+        return mock_client
+
+    @patch('app.services.llm_executor.AsyncOpenAI')
+    async def test_one_request_split_per_participant(self, mock_async_openai):
+        """Test that one packed answer becomes one result per participant"""
+        content = json.dumps({
+            str(n): {"q1": {"response": str(n)}, "q2": {"response": "Yes"}} for n in (1, 2, 3)
+        })
+        mock_client = self.mock_client(mock_async_openai, content)
+        executor = LLMExecutor(api_key="test-key")
+
+        results = await executor.execute_pack_async(self.PROFILES, self.QUESTIONS)
+
+        assert mock_client.chat.completions.create.await_count == 1
+        prompt = mock_client.chat.completions.create.call_args.kwargs["messages"][-1]["content"]
+        assert prompt.count("Question ID: q1") == 1
+        assert [r["responses"]["q1"]["response"] for r in results] == ["1", "2", "3"]
+        assert [r["prompt_tokens"] for r in results] == [101, 100, 100]
+        assert sum(r["cost"] for r in results) == pytest.approx(executor._calculate_cost(301, 90))
+
+    @patch('app.services.llm_executor.AsyncOpenAI')
+    async def test_missing_participant_fails_alone(self, mock_async_openai):
+        """Test that a participant absent from the answer gets an error"""
+        content = json.dumps({"1": {"q1": {"response": "2"}}, "3": {"q1": {"response": "4"}}})
+        self.mock_client(mock_async_openai, content)
+        executor = LLMExecutor(api_key="test-key")
+
+        results = await executor.execute_pack_async(self.PROFILES, self.QUESTIONS)
+
+        assert results[0]["responses"]["q1"]["response"] == "2"
+        assert isinstance(results[1], ValueError)
+        assert "Participant #2" in str(results[1])
+        assert results[2]["responses"]["q1"]["response"] == "4"
+
+    @patch('app.services.llm_executor.AsyncOpenAI')
+    async def test_unparseable_answer_fails_whole_pack(self, mock_async_openai):
+        """Test that a malformed packed answer fails every participant in it"""
+        self.mock_client(mock_async_openai, "not json")
+        executor = LLMExecutor(api_key="test-key")
+
+        results = await executor.execute_pack_async(self.PROFILES, self.QUESTIONS)
+
+        assert all(isinstance(r, ValueError) for r in results)
+
+    def test_output_budget_is_shared(self):
+        """Test that packed participants share the output budget when chunking"""
+        executor = LLMExecutor(api_key="test-key", max_tokens=300)
+        questions = self.QUESTIONS * 4
+
+        assert len(executor.compile_chunks(questions)) == 1
+        assert len(executor.compile_chunks(questions, personas=3)) > 1
+
+
+class TestStructuredOutput:
+    """Tests for schema-constrained output"""
+
+    QUESTIONS = [
+        {
+            "question_id": "q1",
+            "question_text": "Rate your stress",
+            "question_type": "likert_scale",
+            "options": {"min": 1, "max": 5},
+        },
+        {
+            "question_id": "q2",
+            "question_text": "Do you exercise?",
+            "question_type": "yes_no",
+            "options": {},
+        },
+    ]
+
+    @patch('app.services.llm_executor.AsyncOpenAI')
+    async def test_schema_is_requested_and_answers_validated(self, mock_async_openai):
+        """Test that the JSON schema is sent and invalid answers are dropped"""
+        mock_client = Mock()
+        mock_async_openai.return_value = mock_client
+        mock_response = Mock()
+        mock_response.choices = [Mock(message=Mock(content=json.dumps({
+            "q1": {"response": 7, "confidence": "high"},
+            "q2": {"response": "Yes", "confidence": "high"},
+        })))]
+        mock_response.usage = Mock(prompt_tokens=100, completion_tokens=20, total_tokens=120)
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
+
+        executor = LLMExecutor(api_key="test-key", structured_output=True)
+        result = await executor.execute_participant_async({"participant_number": 1}, self.QUESTIONS)
+
+        response_format = mock_client.chat.completions.create.call_args.kwargs["response_format"]
+        schema = response_format["json_schema"]["schema"]
+        assert schema["required"] == ["q1", "q2"]
+        assert list(result["responses"]) == ["q2"]
+        assert "outside 1-5" in result["invalid"]["q1"]
+
+    def test_disabled_by_default(self):
+        """Test that no response_format is sent unless structured output is on"""
+        executor = LLMExecutor(api_key="test-key")
+        compiled = executor.compile_prompt(self.QUESTIONS)
+
+        assert "response_format" not in executor._completion_kwargs([], executor._response_format(compiled))
+        assert executor._validator(compiled) is None
+
+    def test_bare_json_skips_markdown_extraction(self):
+        """Test that structured responses parse as bare JSON"""
+        executor = LLMExecutor(api_key="test-key", structured_output=True)
+
+        parsed = executor._parse_response('{"q1": {"response": "a ```b``` c"}}', ["q1"])
+
+        assert parsed["q1"]["response"] == "a ```b``` c"
+
+
+class TestRepair:
+    """Tests for re-asking missing or invalid answers"""
+
+    QUESTIONS = [
+        {
+            "question_id": f"q{i}",
+            "question_text": f"Rate item {i}",
+            "question_type": "likert_scale",
+            "options": {"min": 1, "max": 5},
+        }
+        for i in range(1, 5)
+    ]
+
+    @staticmethod
+    def answer_prompt(skip=(), bad=()):
+        """Build a fake create() that skips or garbles some questions on the first request"""
+        calls = []
+
+        async def create(**kwargs):
+            prompt = kwargs["messages"][-1]["content"]
+            question_ids = re.findall(r"Question ID: (\S+)", prompt)
+            first = not calls
+            calls.append(question_ids)
+            answers = {}
+            for qid in question_ids:
+                if first and qid in skip:
+                    continue
+                answers[qid] = {"response": 9 if first and qid in bad else 3, "confidence": "high"}
+            response = Mock()
+            response.choices = [Mock(message=Mock(content=json.dumps(answers)))]
+            response.usage = Mock(prompt_tokens=100, completion_tokens=10, total_tokens=110)
+            return response
+
+        return create, calls
+
+    @patch('app.services.llm_executor.AsyncOpenAI')
+    async def test_only_missing_and_invalid_questions_are_reasked(self, mock_async_openai):
+        """Test that the follow-up carries only the gaps and its answers are merged"""
+        mock_client = Mock()
+        mock_async_openai.return_value = mock_client
+        create, calls = self.answer_prompt(skip={"q2"}, bad={"q4"})
+        mock_client.chat.completions.create = AsyncMock(side_effect=create)
+
+        executor = LLMExecutor(api_key="test-key", structured_output=True, repair_attempts=1)
+        result = await executor.execute_participant_async({"participant_number": 1}, self.QUESTIONS)
+
+        assert calls == [["q1", "q2", "q3", "q4"], ["q2", "q4"]]
+        follow_up = mock_client.chat.completions.create.call_args.kwargs["messages"][-1]["content"]
+        assert "Participant #1" in follow_up
+        assert list(result["responses"]) == ["q1", "q2", "q3", "q4"]
+        assert result["repaired"] == ["q2", "q4"]
+        assert "invalid" not in result
+        assert result["total_tokens"] == 220
+
+    @patch('app.services.llm_executor.OpenAI')
+    def test_sync_repair(self, mock_openai):
+        """Test that the sync path repairs missing answers too"""
+        mock_client = Mock()
+        mock_openai.return_value = mock_client
+        create, calls = self.answer_prompt(skip={"q3"})
+        mock_client.chat.completions.create = Mock(
+            side_effect=lambda **kwargs: asyncio.run(create(**kwargs))
+        )
+
+        executor = LLMExecutor(api_key="test-key", repair_attempts=2)
+        result = executor.execute_participant({"participant_number": 1}, self.QUESTIONS)
+
+        assert calls[1] == ["q3"]
+        assert len(calls) == 2
+        assert result["repaired"] == ["q3"]
+
+    @patch('app.services.llm_executor.AsyncOpenAI')
+    async def test_no_repair_by_default(self, mock_async_openai):
+        """Test that gaps are left alone unless repair is enabled"""
+        mock_client = Mock()
+        mock_async_openai.return_value = mock_client
+        create, calls = self.answer_prompt(skip={"q2"})
+        mock_client.chat.completions.create = AsyncMock(side_effect=create)
+
+        executor = LLMExecutor(api_key="test-key")
+        result = await executor.execute_participant_async({"participant_number": 1}, self.QUESTIONS)
+
+        assert len(calls) == 1
+        assert "q2" not in result["responses"]
+
+    @patch('app.services.llm_executor.AsyncOpenAI')
+    async def test_failed_repair_keeps_original_answers(self, mock_async_openai):
+        """Test that a failing follow-up leaves the first answers intact"""
+        mock_client = Mock()
+        mock_async_openai.return_value = mock_client
+        create, calls = self.answer_prompt(skip={"q2"})
+
+        async def create_then_fail(**kwargs):
+            if calls:
+                raise ValueError("bad request")
+            return await create(**kwargs)
+
+        mock_client.chat.completions.create = AsyncMock(side_effect=create_then_fail)
+
+        executor = LLMExecutor(api_key="test-key", repair_attempts=1)
+        result = await executor.execute_participant_async({"participant_number": 1}, self.QUESTIONS)
+
+        assert set(result["responses"]) == {"q1", "q3", "q4"}
+        assert result["partial"] is True
+        assert "repaired" not in result
+
+    def test_repair_does_not_evict_compiled_questionnaire(self):
+        """Test that follow-up prompts leave the compiled questionnaire cached"""
+        executor = LLMExecutor(api_key="test-key", repair_attempts=1)
+        compiled = executor.compile_prompt(self.QUESTIONS)
+
+        executor._repair_prompts(self.QUESTIONS, {"responses": {}})
+
+        assert executor.compile_prompt(self.QUESTIONS) is compiled
+
+
 class TestLLMExecutorInitialization:
     """Tests for LLMExecutor initialization"""
 
@@ -0,0 +1,78 @@
+"""
+Tests for LLM provider backends
+"""
+import pytest
+
+from app.services.llm_executor import LLMExecutor
+from app.services.llm_provider import LLMProvider, get_provider
+
+
+class TestGetProvider:
+    """Tests for get_provider"""
+
+    def test_default_is_openai(self):
+        """Test that OpenAI is the default provider"""
+        provider = get_provider()
+
+        assert provider.name == "openai"
+        assert provider.base_url is None
+
+    def test_base_url_override(self):
+        """Test pointing a provider at another server"""
+        provider = get_provider("vllm", base_url="http://gpu-box:8000/v1")
+
+        assert provider.base_url == "http://gpu-box:8000/v1"
+        assert provider.supports_batch is False
+
+    def test_openai_compatible_needs_base_url(self):
+        """Test that a generic compatible server must be given a URL"""
+        with pytest.raises(ValueError):
+            get_provider("openai_compatible")
+
+        assert get_provider("openai_compatible", "http://x/v1").base_url == "http://x/v1"
+
+    def test_unknown_provider(self):
+        """Test that an unknown provider is rejected"""
+        with pytest.raises(ValueError):
+            get_provider("carrier-pigeon")
+
+
+class TestResolveApiKey:
+    """Tests for LLMProvider.resolve_api_key"""
+
+    def test_placeholder_for_keyless_servers(self):
+        """Test that servers without auth get a placeholder key"""
+        assert get_provider("stub").resolve_api_key("") == LLMProvider.PLACEHOLDER_API_KEY
+
+    def test_openai_requires_key(self):
+        """Test that OpenAI needs a real key"""
+        with pytest.raises(ValueError):
+            get_provider().resolve_api_key("")
+
+
+class TestExecutorCapabilities:
+    """Tests for request features gated on provider capabilities"""
+
+    def test_clients_use_base_url(self):
+        """Test that executor clients target the provider's server"""
+        executor = LLMExecutor(api_key="", provider=get_provider("ollama"))
+
+        assert str(executor.async_client.base_url).startswith("http://localhost:11434/v1")
+
+    def test_unsupported_features_are_not_sent(self):
+        """Test that seed and response_format are omitted where unsupported"""
+        provider = LLMProvider(
+            name="minimal",
+            base_url="http://x/v1",
+            api_key_required=False,
+            supports_seed=False,
+            supports_structured_output=False,
+        )
+        executor = LLMExecutor(api_key="", provider=provider, seed=3, structured_output=True)
+        compiled = executor.compile_prompt([{"question_id": "q1", "question_type": "yes_no"}])
+
+        kwargs = executor._completion_kwargs([], executor._response_format(compiled))
+
+        assert "seed" not in kwargs
+        assert "response_format" not in kwargs
+        assert executor._validator(compiled) is not None
@@ -0,0 +1,207 @@
+"""
+Tests for weighted routing across API keys and model deployments
+"""
+from unittest.mock import Mock
+
+import httpx
+import pytest
+from openai import RateLimitError
+
+from app.services.llm_executor import LLMExecutor
+from app.services.llm_provider import get_provider
+from app.services.llm_router import LLMRouter, Route
+from app.services.rate_limiter import RateLimiter
+from app.services.retry import CircuitBreaker, RetryPolicy
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_route(model="gpt-4o", key_id="", rate_limiter=None, circuit_breaker=None):
+    return Route(
+        model=model,
+        client=Mock(),
+        async_client=Mock(),
+        circuit_breaker=circuit_breaker or CircuitBreaker(model),
+        rate_limiter=rate_limiter,
+        key_id=key_id,
+    )
+
+
+def rate_limit_error():
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    return RateLimitError(
+        "Rate limit exceeded", response=httpx.Response(429, request=request), body=None
+    )
+
+
+def ok_response():
+    response = Mock()
+    response.choices = [Mock(message=Mock(content='{"q1": {"response": "4"}}'))]
+    response.usage = Mock(prompt_tokens=400, completion_tokens=80, total_tokens=480)
+    return response
+
+
+def share(router, route, draws=1000):
+    """Fraction of evenly spaced draws that pick a route"""
+    picks = 0
+    for i in range(draws):
+        router.rand = lambda: i / draws
+        picks += router.choose() is route
+    return picks / draws
+
+
+class TestRouteSelection:
+    """Tests for LLMRouter.choose"""
+
+    def test_requires_routes(self):
+        """Test that an empty route list is rejected"""
+        with pytest.raises(ValueError):
+            LLMRouter([])
+
+    def test_healthy_routes_share_traffic_evenly(self):
+        """Test that identical routes receive equal shares"""
+        first, second = make_route(key_id="key-a"), make_route(key_id="key-b")
+        router = LLMRouter([first, second])
+
+        assert share(router, first) == pytest.approx(0.5, abs=0.01)
+
+    def test_traffic_follows_remaining_headroom(self):
+        """Test that a route with a drained budget gets less traffic"""
+        clock = FakeClock()
+        drained = RateLimiter(rpm=60, tpm=100_000, clock=clock)
+        fresh = RateLimiter(rpm=60, tpm=100_000, clock=clock)
+        for _ in range(43):
+            drained.acquire(1)
+        busy = make_route(key_id="key-a", rate_limiter=drained)
+        idle = make_route(key_id="key-b", rate_limiter=fresh)
+        router = LLMRouter([busy, idle])
+
+        assert drained.available_fraction() == pytest.approx(0.25, abs=0.01)
+        assert share(router, busy) == pytest.approx(0.2, abs=0.02)
+
+    def test_throttled_route_is_down_weighted(self):
+        """Test that 429s shift traffic away from a route"""
+        throttled, healthy = make_route(key_id="key-a"), make_route(key_id="key-b")
+        router = LLMRouter([throttled, healthy], smoothing=0.5)
+
+        router.record(throttled, 0.1, rate_limit_error())
+        router.record(healthy, 0.1)
+
+        assert throttled.throttle_rate == pytest.approx(0.5)
+        assert share(router, throttled) == pytest.approx(1 / 3, abs=0.01)
+
+    def test_slow_route_is_down_weighted(self):
+        """Test that traffic is weighted by relative latency"""
+        slow, fast = make_route(model="a"), make_route(model="b")
+        router = LLMRouter([slow, fast])
+
+        router.record(slow, 3.0)
+        router.record(fast, 1.0)
+
+        assert share(router, slow) == pytest.approx(0.25, abs=0.01)
+
+    def test_untried_route_counts_as_fast(self):
+        """Test that a route without latency samples is not starved"""
+        tried, untried = make_route(model="a"), make_route(model="b")
+        router = LLMRouter([tried, untried])
+
+        router.record(tried, 5.0)
+
+        assert share(router, untried) == pytest.approx(0.5, abs=0.01)
+
+    def test_open_circuit_is_skipped(self):
+        """Test that routes with an open circuit get no traffic"""
+        breaker = CircuitBreaker("gpt-4o", failure_threshold=1, recovery_timeout=60)
+        breaker.record_failure()
+        broken = make_route(key_id="key-a", circuit_breaker=breaker)
+        working = make_route(key_id="key-b")
+        router = LLMRouter([broken, working])
+
+        assert share(router, broken) == 0
+
+    def test_stats_identify_keys_by_hash(self):
+        """Test that run stats never contain API keys"""
+        router = LLMRouter.build(
+            ["sk-secret-1", "sk-secret-2"], ["gpt-4o", "gpt-4o-2024"], get_provider(), 500, 100_000
+        )
+        router.record(router.routes[0], 0.5)
+
+        stats = router.stats()
+
+        assert len(stats) == 4
+        assert stats[0]["requests"] == 1
+        assert stats[0]["latency_seconds"] == 0.5
+        assert all("sk-secret" not in entry["route"] for entry in stats)
+        assert stats[0]["route"].startswith("gpt-4o@key-")
+
+    def test_build_dedupes_keys_and_models(self):
+        """Test that repeated keys or deployments do not add routes"""
+        router = LLMRouter.build(["k1", "k1", "k2"], ["gpt-4o", "gpt-4o"], get_provider(), 500, 100_000)
+
+        assert len(router) == 2
+        assert router.routes[0].rate_limiter is not router.routes[1].rate_limiter
+        assert router.routes[0].circuit_breaker is not router.routes[1].circuit_breaker
+
+
+class TestExecutorRouting:
+    """Tests for routed calls in LLMExecutor"""
+
+    def test_calls_use_the_chosen_route(self):
+        """Test that the route's client and model are used"""
+        route = make_route(model="gpt-4o-eu")
+        route.client.chat.completions.create.return_value = ok_response()
+        executor = LLMExecutor(api_key="test-key", router=LLMRouter([route]))
+
+        result = executor.execute_participant({"participant_number": 1}, [{"question_id": "q1"}])
+
+        assert result["responses"]["q1"]["response"] == "4"
+        assert route.client.chat.completions.create.call_args.kwargs["model"] == "gpt-4o-eu"
+        assert route.requests == 1
+        assert route.latency is not None
+
+    def test_retry_after_429_moves_to_another_key(self):
+        """Test that a throttled attempt is retried on the other route"""
+        throttled, healthy = make_route(key_id="key-a"), make_route(key_id="key-b")
+        throttled.client.chat.completions.create.side_effect = rate_limit_error()
+        healthy.client.chat.completions.create.return_value = ok_response()
+        # First draw picks the first route, later draws the last
+        draws = iter([0.0, 0.99])
+        router = LLMRouter([throttled, healthy], rand=lambda: next(draws))
+        executor = LLMExecutor(
+            api_key="test-key", retry_policy=RetryPolicy(base_delay=0), router=router
+        )
+
+        result = executor.execute_participant({"participant_number": 1}, [{"question_id": "q1"}])
+
+        assert result["responses"]["q1"]["response"] == "4"
+        assert throttled.throttled == 1
+        assert healthy.requests == 1
+        assert throttled.circuit_breaker.failures == 1
+        assert healthy.circuit_breaker.failures == 0
+
+    async def test_async_calls_settle_the_route_limiter(self):
+        """Test that async calls reserve and settle on the route's limiter"""
+        limiter = Mock()
+        limiter.available_fraction.return_value = 1.0
+        limiter.acquire_async = Mock(side_effect=lambda tokens: _reservation())
+        route = make_route(rate_limiter=limiter)
+        route.async_client.chat.completions.create = Mock(side_effect=lambda **_: _completion())
+        executor = LLMExecutor(api_key="test-key", router=LLMRouter([route]))
+
+        await executor.execute_participant_async({"participant_number": 1}, [{"question_id": "q1"}])
+
+        limiter.settle.assert_called_once_with("reservation", 480)
+
+
+async def _reservation():
+    return "reservation"
+
+
+async def _completion():
+    return ok_response()
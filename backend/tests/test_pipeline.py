@@ -0,0 +1,143 @@
+"""
+Tests for the staged execution pipeline
+"""
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models.experiment import Experiment
+from app.models.participant import Participant
+from app.models.response import Response
+from app.services.bulk_writer import BulkWriter
+from app.services.client_pool import SharedEventLoop
+from app.services.pipeline import ExecutionPipeline
+
+
+QUESTION_IDS = ["q1"]
+
+
+@pytest.fixture
+def db():
+    """In-memory SQLite session with the result tables"""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(
+        engine, tables=[Experiment.__table__, Participant.__table__, Response.__table__]
+    )
+    session = sessionmaker(bind=engine)()
+    session.add(Experiment(id=1, name="Test"))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def loop():
+    """A shared event loop of the tests' own"""
+    shared = SharedEventLoop()
+    yield shared
+    shared.loop.call_soon_threadsafe(shared.loop.stop)
+
+
+def outcome(number):
+    return {
+        "profile": {"participant_number": number},
+        "result": {"responses": {"q1": {"response": str(number)}}},
+        "error": None,
+    }
+
+
+def dispatch_numbers(count, fail_after=None):
+    async def dispatch(emit):
+        for number in range(1, count + 1):
+            if number == fail_after:
+                raise RuntimeError("API down")
+            await emit(outcome(number))
+
+    return dispatch
+
+
+class TestExecutionPipeline:
+    """Tests for ExecutionPipeline"""
+
+    def test_writes_and_commits_every_outcome(self, db, loop):
+        """Test that all outcomes are stored, committed every commit_every"""
+        pipeline = ExecutionPipeline(BulkWriter(db, 1, QUESTION_IDS), loop, commit_every=4)
+        seen, commits = [], []
+
+        pipeline.run(dispatch_numbers(10), seen.append, lambda: commits.append(db.commit()))
+
+        assert sorted(o["profile"]["participant_number"] for o in seen) == list(range(1, 11))
+        assert len(commits) == 3  # after 4, after 8, and the final 2
+        assert db.query(Response).count() == 10
+
+    def test_full_queues_hold_back_dispatch(self, db, loop):
+        """Test that a slow writer stops dispatchers from running ahead"""
+        emitted = []
+
+        async def dispatch(emit):
+            for number in range(1, 101):
+                await emit(outcome(number))
+                emitted.append(number)
+
+        ahead = []
+
+        def slow_writer(outcome):
+            if not ahead:
+                time.sleep(0.2)
+                ahead.append(len(emitted))
+
+        writer = BulkWriter(db, 1, QUESTION_IDS, batch_size=1)
+        pipeline = ExecutionPipeline(writer, loop, queue_size=1)
+        pipeline.run(dispatch, slow_writer, db.commit)
+
+        # One outcome being written, one queued and one waiting to be queued
+        assert ahead[0] <= 3
+        assert len(emitted) == 100
+
+    def test_dispatch_error_keeps_written_outcomes(self, db, loop):
+        """Test that a dispatch failure surfaces after earlier outcomes are committed"""
+        pipeline = ExecutionPipeline(BulkWriter(db, 1, QUESTION_IDS), loop, commit_every=100)
+
+        with pytest.raises(RuntimeError, match="API down"):
+            pipeline.run(dispatch_numbers(10, fail_after=6), lambda outcome: None, db.commit)
+
+        db.rollback()
+        assert db.query(Participant).count() == 5
+
+    def test_write_error_stops_dispatch(self, db, loop):
+        """Test that a writer failure cancels the dispatch"""
+        stopped = threading.Event()
+
+        async def dispatch(emit):
+            try:
+                for number in range(1, 1001):
+                    await emit(outcome(number))
+            finally:
+                stopped.set()
+
+        def on_outcome(outcome):
+            raise RuntimeError("database went away")
+
+        pipeline = ExecutionPipeline(BulkWriter(db, 1, QUESTION_IDS), loop, queue_size=2)
+
+        with pytest.raises(RuntimeError, match="database went away"):
+            pipeline.run(dispatch, on_outcome, db.commit)
+
+        assert stopped.wait(timeout=1)
+
+    def test_from_settings(self, db, loop):
+        """Test that the queue size comes from execution settings"""
+        pipeline = ExecutionPipeline.from_settings(
+            BulkWriter(db, 1, QUESTION_IDS), loop, {"pipeline_queue_size": 10}, commit_every=50
+        )
+
+        assert (pipeline.queue_size, pipeline.commit_every) == (10, 50)
+
@@ -0,0 +1,115 @@
+"""
+Tests for compiled prompt templates
+"""
+import pytest
+
+from app.services.prompt_template import (
+    QUESTIONNAIRE_FIRST,
+    CompiledPrompt,
+    render_persona,
+    render_question,
+)
+
+
+QUESTIONS = [
+    {
+        "question_id": "q1",
+        "question_text": "Rate your agreement",
+        "question_type": "likert_scale",
+        "options": {"min": 1, "max": 7, "labels": ["Disagree", "Agree"]},
+    },
+    {
+        "question_id": "q2",
+        "question_text": "Pick one",
+        "question_type": "multiple_choice",
+        "options": {"choices": ["A", "B"]},
+    },
+]
+
+
+class TestRenderPersona:
+    """Tests for render_persona"""
+
+    def test_fills_profile_fields(self):
+        """Test that profile fields are spliced into the persona"""
+        persona = render_persona({"participant_number": 7, "age": 41, "country": "France"})
+
+        assert "Participant #7" in persona
+        assert "41 years old" in persona
+        assert "France" in persona
+
+    def test_missing_fields_default_to_unknown(self):
+        """Test that missing profile fields render as Unknown"""
+        persona = render_persona({})
+
+        assert "Participant #Unknown" in persona
+        assert "Gender: Unknown" in persona
+
+
+class TestRenderQuestion:
+    """Tests for render_question"""
+
+    def test_likert_with_labels(self):
+        """Test likert scale rendering with end labels"""
+        text = render_question(QUESTIONS[0])
+
+        assert text == "Question ID: q1\nRate your agreement\nScale: 1 (Disagree) to 7 (Agree)\n\n"
+
+    def test_multiple_choice(self):
+        """Test multiple choice rendering"""
+        assert "Options: A, B\n" in render_question(QUESTIONS[1])
+
+
+class TestCompiledPrompt:
+    """Tests for CompiledPrompt"""
+
+    def test_questionnaire_rendered_once(self):
+        """Test that the questionnaire is shared across participants"""
+        compiled = CompiledPrompt(QUESTIONS)
+
+        first = compiled.render({"participant_number": 1})
+        second = compiled.render({"participant_number": 2})
+
+        assert first.endswith(compiled.questionnaire)
+        assert second.endswith(compiled.questionnaire)
+        assert first != second
+
+    def test_question_ids(self):
+        """Test that question IDs are precomputed"""
+        assert CompiledPrompt(QUESTIONS).question_ids == ["q1", "q2"]
+
+
+class TestQuestionnaireFirstLayout:
+    """Tests for the prefix-cache friendly layout"""
+
+    def test_persona_comes_last(self):
+        """Test that the shared questionnaire is a common prefix across participants"""
+        compiled = CompiledPrompt(QUESTIONS, layout=QUESTIONNAIRE_FIRST)
+
+        first = compiled.render({"participant_number": 1})
+        second = compiled.render({"participant_number": 2})
+
+        assert first.startswith(compiled.prefix)
+        assert second.startswith(compiled.prefix)
+        assert first.index("Question ID: q1") < first.index("Participant #1")
+
+    def test_unknown_layout_raises(self):
+        """Test that an unknown layout is rejected"""
+        with pytest.raises(ValueError):
+            CompiledPrompt(QUESTIONS, layout="sideways")
+
+
+class TestPackedPrompt:
+    """Tests for multi-persona prompts"""
+
+    def test_questionnaire_once_and_every_persona(self):
+        """Test that a packed prompt carries the questionnaire once and all personas"""
+        compiled = CompiledPrompt(QUESTIONS)
+
+        prompt = compiled.render_pack([{"participant_number": 3}, {"participant_number": 4}])
+
+        assert prompt.count("Question ID: q1") == 1
+        assert "Participant #3" in prompt
+        assert "Participant #4" in prompt
+        assert "keyed by participant number" in prompt
+        assert prompt.index("Question ID: q1") < prompt.index("Participant #3")
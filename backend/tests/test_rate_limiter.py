@@ -0,0 +1,137 @@
+"""
+Tests for the process-wide Rate Limiter
+"""
+import pytest
+
+from app.services.rate_limiter import RateLimiter, TokenBucket, get_rate_limiter
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class TestTokenBucket:
+    """Tests for TokenBucket"""
+
+    def test_starts_full(self):
+        """Test that a new bucket has its full capacity available"""
+        bucket = TokenBucket(capacity=60, refill_per_second=1, clock=FakeClock())
+
+        assert bucket.wait_time(60) == 0
+
+    def test_wait_time_after_consume(self):
+        """Test wait time reflects the refill rate"""
+        clock = FakeClock()
+        bucket = TokenBucket(capacity=60, refill_per_second=1, clock=clock)
+
+        bucket.consume(60)
+
+        assert bucket.wait_time(10) == pytest.approx(10)
+        clock.advance(10)
+        assert bucket.wait_time(10) == 0
+
+    def test_oversized_request_waits_for_full_bucket(self):
+        """Test that requests above capacity are not blocked forever"""
+        clock = FakeClock()
+        bucket = TokenBucket(capacity=100, refill_per_second=10, clock=clock)
+
+        bucket.consume(50)
+
+        assert bucket.wait_time(500) == pytest.approx(5)
+
+    def test_credit_is_capped_at_capacity(self):
+        """Test that refunds never exceed capacity"""
+        bucket = TokenBucket(capacity=10, refill_per_second=1, clock=FakeClock())
+
+        bucket.credit(100)
+
+        assert bucket.tokens == 10
+
+
+class TestRateLimiter:
+    """Tests for RateLimiter reservations"""
+
+    def test_acquire_reserves_request_and_tokens(self):
+        """Test that acquire consumes one request and the estimated tokens"""
+        limiter = RateLimiter(rpm=100, tpm=10000, headroom=1.0, clock=FakeClock())
+
+        reservation = limiter.acquire(1000)
+
+        assert reservation.tokens == 1000
+        assert limiter.requests.tokens == pytest.approx(99)
+        assert limiter.tokens.tokens == pytest.approx(9000)
+
+    def test_settle_refunds_overestimate(self):
+        """Test that unused reserved tokens are returned"""
+        limiter = RateLimiter(rpm=100, tpm=10000, headroom=1.0, clock=FakeClock())
+
+        reservation = limiter.acquire(1000)
+        limiter.settle(reservation, 400)
+
+        assert limiter.tokens.tokens == pytest.approx(9600)
+
+    def test_settle_charges_underestimate(self):
+        """Test that usage above the estimate is charged"""
+        limiter = RateLimiter(rpm=100, tpm=10000, headroom=1.0, clock=FakeClock())
+
+        reservation = limiter.acquire(1000)
+        limiter.settle(reservation, 1500)
+
+        assert limiter.tokens.tokens == pytest.approx(8500)
+
+    def test_request_limit_blocks_until_refill(self):
+        """Test that the RPM bucket is enforced"""
+        clock = FakeClock()
+        limiter = RateLimiter(rpm=60, tpm=1000000, headroom=1.0, clock=clock)
+
+        for _ in range(60):
+            assert limiter._try_reserve(1) == 0
+
+        assert limiter._try_reserve(1) == pytest.approx(1)
+        clock.advance(1)
+        assert limiter._try_reserve(1) == 0
+
+    async def test_acquire_async_waits_for_tokens(self):
+        """Test that async acquire waits for the token bucket to refill"""
+        limiter = RateLimiter(rpm=1000, tpm=60000, headroom=1.0)
+        limiter.tokens.consume(60000)
+
+        # 1000 tokens/second refill, so 50 tokens take ~50ms
+        reservation = await limiter.acquire_async(50)
+
+        assert reservation.tokens == 50
+
+
+class TestGetRateLimiter:
+    """Tests for the process-wide limiter registry"""
+
+    def test_same_model_and_key_share_limiter(self):
+        """Test that executors with the same model and key share one limiter"""
+        first = get_rate_limiter("gpt-4o", "shared-key", rpm=500, tpm=30000)
+        second = get_rate_limiter("gpt-4o", "shared-key", rpm=500, tpm=30000)
+
+        assert first is second
+
+    def test_different_keys_get_separate_limiters(self):
+        """Test that limits are tracked per API key"""
+        first = get_rate_limiter("gpt-4o", "key-a", rpm=500, tpm=30000)
+        second = get_rate_limiter("gpt-4o", "key-b", rpm=500, tpm=30000)
+
+        assert first is not second
+
+    def test_changed_limits_are_applied(self):
+        """Test that new limits replace the old ones"""
+        limiter = get_rate_limiter("gpt-4o-mini", "key-c", rpm=500, tpm=30000)
+        get_rate_limiter("gpt-4o-mini", "key-c", rpm=1000, tpm=60000)
+
+        assert limiter.rpm == 1000
+        assert limiter.tpm == 60000
@@ -0,0 +1,102 @@
+"""
+Tests for the two-tier LLM Response Cache
+"""
+from sqlalchemy.orm import sessionmaker
+
+from app.services.response_cache import ResponseCache
+
+
+USAGE = {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120}
+
+
+class FakeClock:
+    """Manually advanced wall clock"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMakeKey:
+    """Tests for ResponseCache.make_key"""
+
+    def test_same_inputs_same_key(self):
+        """Test that keys are deterministic"""
+        first = ResponseCache.make_key("gpt-4o", 0.8, None, "system", "prompt")
+        second = ResponseCache.make_key("gpt-4o", 0.8, None, "system", "prompt")
+
+        assert first == second
+        assert len(first) == 64
+
+    def test_every_component_changes_key(self):
+        """Test that model, temperature, seed, system message and prompt all matter"""
+        base = ResponseCache.make_key("gpt-4o", 0.8, None, "system", "prompt")
+
+        assert ResponseCache.make_key("gpt-4-turbo", 0.8, None, "system", "prompt") != base
+        assert ResponseCache.make_key("gpt-4o", 0.7, None, "system", "prompt") != base
+        assert ResponseCache.make_key("gpt-4o", 0.8, 42, "system", "prompt") != base
+        assert ResponseCache.make_key("gpt-4o", 0.8, None, "other", "prompt") != base
+        assert ResponseCache.make_key("gpt-4o", 0.8, None, "system", "other") != base
+
+
+class TestMemoryTier:
+    """Tests for the in-process LRU tier"""
+
+    def test_set_then_get(self):
+        """Test that stored entries are returned"""
+        cache = ResponseCache()
+
+        cache.set("k1", "gpt-4o", '{"q1": {}}', USAGE)
+
+        assert cache.get("k1") == {"content": '{"q1": {}}', "usage": USAGE}
+        assert cache.get("missing") is None
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first"""
+        cache = ResponseCache(max_memory_entries=2)
+
+        cache.set("k1", "gpt-4o", "a", USAGE)
+        cache.set("k2", "gpt-4o", "b", USAGE)
+        cache.get("k1")
+        cache.set("k3", "gpt-4o", "c", USAGE)
+
+        assert cache.get("k1") is not None
+        assert cache.get("k2") is None
+        assert cache.get("k3") is not None
+
+    def test_ttl_expiry(self):
+        """Test that entries expire after the TTL"""
+        clock = FakeClock()
+        cache = ResponseCache(ttl_seconds=60, clock=clock)
+
+        cache.set("k1", "gpt-4o", "a", USAGE)
+        clock.now += 61
+
+        assert cache.get("k1") is None
+
+
+def test_persistent_tier_survives_new_process(db_session):
+    """Test that entries written to the database are found by a fresh cache"""
+    session_factory = sessionmaker(bind=db_session.get_bind())
+
+    writer = ResponseCache(session_factory=session_factory)
+    writer.set("k1", "gpt-4o", '{"q1": {}}', USAGE)
+
+    reader = ResponseCache(session_factory=session_factory)
+
+    assert reader.get_memory("k1") is None
+    assert reader.get("k1") == {"content": '{"q1": {}}', "usage": USAGE}
+    assert reader.get_memory("k1") is not None
+
+
+def test_persistent_tier_size_eviction(db_session):
+    """Test that evict trims the table to max_persistent_entries"""
+    session_factory = sessionmaker(bind=db_session.get_bind())
+    cache = ResponseCache(session_factory=session_factory, max_persistent_entries=2)
+
+    for i in range(5):
+        cache.set(f"k{i}", "gpt-4o", "a", USAGE)
+
+    assert cache.evict() == 3
@@ -0,0 +1,122 @@
+"""
+Tests for structured-output schemas and the precompiled response validator
+"""
+from app.services.response_schema import (
+    ResponseValidator,
+    build_packed_response_schema,
+    build_response_schema,
+    json_schema_format,
+)
+
+
+QUESTIONS = [
+    {
+        "question_id": "q1",
+        "question_text": "Rate your stress",
+        "question_type": "likert_scale",
+        "options": {"min": 1, "max": 5},
+    },
+    {
+        "question_id": "q2",
+        "question_text": "Pick one",
+        "question_type": "multiple_choice",
+        "options": {"choices": ["Red", "Blue"]},
+    },
+    {
+        "question_id": "q3",
+        "question_text": "Do you exercise?",
+        "question_type": "yes_no",
+        "options": {},
+    },
+    {
+        "question_id": "q4",
+        "question_text": "Describe your week",
+        "question_type": "open_ended",
+        "options": {},
+    },
+]
+
+
+class TestBuildResponseSchema:
+    """Tests for schema generation"""
+
+    def test_allowed_values_per_question(self):
+        """Test that choices and scale points become enums"""
+        schema = build_response_schema(QUESTIONS)
+        properties = schema["properties"]
+
+        assert schema["required"] == ["q1", "q2", "q3", "q4"]
+        assert schema["additionalProperties"] is False
+        assert properties["q1"]["properties"]["response"]["enum"] == [1, 2, 3, 4, 5]
+        assert properties["q2"]["properties"]["response"]["enum"] == ["Red", "Blue"]
+        assert properties["q3"]["properties"]["response"]["enum"] == ["Yes", "No"]
+        assert properties["q4"]["properties"]["response"] == {"type": "string"}
+
+    def test_wide_scale_is_checked_after_parsing(self):
+        """Test that very wide scales send no bounds, which strict mode rejects"""
+        questions = [
+            {"question_id": "q1", "question_type": "likert_scale", "options": {"min": 0, "max": 1000}}
+        ]
+        schema = build_response_schema(questions)
+
+        response = schema["properties"]["q1"]["properties"]["response"]
+        assert response == {"type": "integer"}
+        validator = ResponseValidator(questions)
+        assert validator.check("q1", {"response": 1000}) is None
+        assert "outside 0-1000" in validator.check("q1", {"response": 1001})
+
+    def test_packed_schema_keyed_by_participant(self):
+        """Test that packed schemas nest the questionnaire schema per participant"""
+        schema = build_response_schema(QUESTIONS)
+
+        packed = build_packed_response_schema(schema, [1, 2])
+
+        assert packed["required"] == ["1", "2"]
+        assert packed["properties"]["2"] is schema
+
+    def test_strict_response_format(self):
+        """Test the response_format wrapper"""
+        response_format = json_schema_format({"type": "object"})
+
+        assert response_format["type"] == "json_schema"
+        assert response_format["json_schema"]["strict"] is True
+
+
+class TestResponseValidator:
+    """Tests for ResponseValidator"""
+
+    def test_valid_answers(self):
+        """Test that schema-conforming and loosely formatted answers pass"""
+        validator = ResponseValidator(QUESTIONS)
+
+        valid, invalid = validator.validate({
+            "q1": {"response": "4", "confidence": "high"},
+            "q2": {"response": "Blue", "confidence": "low"},
+            "q3": {"response": "yes"},
+            "q4": {"response": "Busy", "confidence": "medium"},
+        })
+
+        assert invalid == {}
+        assert set(valid) == {"q1", "q2", "q3", "q4"}
+
+    def test_invalid_answers(self):
+        """Test that out-of-range, off-list and malformed answers are rejected"""
+        validator = ResponseValidator(QUESTIONS)
+
+        valid, invalid = validator.validate({
+            "q1": {"response": 9, "confidence": "high"},
+            "q2": {"response": "Green", "confidence": "high"},
+            "q3": "Yes",
+            "q4": {"response": "  ", "confidence": "high"},
+        })
+
+        assert valid == {}
+        assert set(invalid) == {"q1", "q2", "q3", "q4"}
+        assert "outside 1-5" in invalid["q1"]
+
+    def test_invalid_confidence(self):
+        """Test that an unknown confidence level is rejected"""
+        validator = ResponseValidator(QUESTIONS)
+
+        assert validator.check("q4", {"response": "Fine", "confidence": "certain"})
+        assert validator.check("q1", {"response": 2.5, "confidence": "high"})
@@ -0,0 +1,149 @@
+"""
+Tests for Retry Policy and Circuit Breaker
+"""
+import httpx
+import pytest
+from openai import APIConnectionError, APITimeoutError, BadRequestError, InternalServerError, RateLimitError
+
+from app.services.retry import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+
+REQUEST = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+
+def status_error(error_class, status_code, headers=None):
+    """Build an OpenAI status error with the given headers"""
+    response = httpx.Response(status_code, request=REQUEST, headers=headers or {})
+    return error_class("error", response=response, body=None)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRetryPolicyClassification:
+    """Tests for RetryPolicy.is_retryable"""
+
+    def test_rate_limit_is_retryable(self):
+        """Test that 429 errors are retried"""
+        assert RetryPolicy().is_retryable(status_error(RateLimitError, 429))
+
+    def test_server_error_is_retryable(self):
+        """Test that 5xx errors are retried"""
+        assert RetryPolicy().is_retryable(status_error(InternalServerError, 503))
+
+    def test_timeout_and_connection_errors_are_retryable(self):
+        """Test that network-level failures are retried"""
+        policy = RetryPolicy()
+
+        assert policy.is_retryable(APITimeoutError(request=REQUEST))
+        assert policy.is_retryable(APIConnectionError(request=REQUEST))
+
+    def test_bad_request_is_not_retryable(self):
+        """Test that 4xx client errors fail immediately"""
+        assert not RetryPolicy().is_retryable(status_error(BadRequestError, 400))
+
+    def test_generic_exception_is_not_retryable(self):
+        """Test that unknown errors fail immediately"""
+        assert not RetryPolicy().is_retryable(Exception("boom"))
+
+
+class TestRetryPolicyDelay:
+    """Tests for RetryPolicy.delay"""
+
+    def test_exponential_backoff_with_full_jitter(self):
+        """Test that the delay is a jittered fraction of the exponential backoff"""
+        policy = RetryPolicy(base_delay=1.0, max_delay=60.0, rand=lambda: 0.5)
+        error = status_error(InternalServerError, 500)
+
+        assert policy.delay(0, error) == pytest.approx(0.5)
+        assert policy.delay(3, error) == pytest.approx(4.0)
+
+    def test_backoff_is_capped(self):
+        """Test that the delay never exceeds max_delay"""
+        policy = RetryPolicy(base_delay=1.0, max_delay=10.0, rand=lambda: 0.999)
+
+        assert policy.delay(20, status_error(InternalServerError, 500)) < 10.0
+
+    def test_retry_after_header_is_honored(self):
+        """Test that retry-after seconds override the backoff"""
+        policy = RetryPolicy(rand=lambda: 0.0)
+        error = status_error(RateLimitError, 429, {"retry-after": "7"})
+
+        assert policy.delay(0, error) == 7.0
+
+    def test_retry_after_ms_header_is_honored(self):
+        """Test that retry-after-ms takes precedence"""
+        policy = RetryPolicy(rand=lambda: 0.0)
+        error = status_error(RateLimitError, 429, {"retry-after-ms": "1500", "retry-after": "7"})
+
+        assert policy.delay(0, error) == 1.5
+
+    def test_from_settings(self):
+        """Test building a policy from execution_settings"""
+        policy = RetryPolicy.from_settings({"max_retries": 2, "retry_base_delay": 0.5})
+
+        assert policy.max_retries == 2
+        assert policy.base_delay == 0.5
+
+
+class TestCircuitBreaker:
+    """Tests for CircuitBreaker"""
+
+    def test_opens_after_threshold(self):
+        """Test that consecutive failures open the circuit"""
+        breaker = CircuitBreaker("gpt-4o", failure_threshold=3, clock=FakeClock())
+
+        for _ in range(3):
+            breaker.before_call()
+            breaker.record_failure()
+
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+    def test_success_resets_failures(self):
+        """Test that a success resets the consecutive failure count"""
+        breaker = CircuitBreaker("gpt-4o", failure_threshold=2, clock=FakeClock())
+
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        breaker.before_call()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_allows_single_probe(self):
+        """Test that only one probe is let through after the recovery timeout"""
+        clock = FakeClock()
+        breaker = CircuitBreaker("gpt-4o", failure_threshold=1, recovery_timeout=30, clock=clock)
+        breaker.record_failure()
+
+        clock.now = 31
+        breaker.before_call()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_probe_reopens(self):
+        """Test that a failing probe reopens the circuit"""
+        clock = FakeClock()
+        breaker = CircuitBreaker("gpt-4o", failure_threshold=1, recovery_timeout=30, clock=clock)
+        breaker.record_failure()
+
+        clock.now = 31
+        breaker.before_call()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
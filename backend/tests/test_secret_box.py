@@ -0,0 +1,41 @@
+"""
+Tests for sealing secrets kept in the database
+"""
+import pytest
+
+from app.services.secret_box import SecretBox, SecretBoxError
+
+
+class TestSecretBox:
+    """Tests for SecretBox"""
+
+    def test_round_trip(self):
+        """Test that a sealed secret opens to the original and hides it"""
+        box = SecretBox("server-secret")
+
+        token = box.seal("sk-live-key")
+
+        assert "sk-live-key" not in token
+        assert box.open(token) == "sk-live-key"
+        assert box.seal("sk-live-key") != token
+
+    def test_tampered_token_is_rejected(self):
+        """Test that a modified ciphertext fails authentication"""
+        box = SecretBox("server-secret")
+        token = box.seal("sk-live-key")
+        flipped = token[:30] + ("A" if token[30] != "A" else "B") + token[31:]
+
+        with pytest.raises(SecretBoxError):
+            box.open(flipped)
+
+    def test_other_secret_cannot_open(self):
+        """Test that only the sealing secret opens a token"""
+        token = SecretBox("server-secret").seal("sk-live-key")
+
+        with pytest.raises(SecretBoxError):
+            SecretBox("another-secret").open(token)
+
+    def test_rejects_empty_secret(self):
+        """Test that an empty secret is refused"""
+        with pytest.raises(ValueError):
+            SecretBox("")
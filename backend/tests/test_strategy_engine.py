@@ -0,0 +1,225 @@
+"""
+Tests for multi-stage execution strategies
+"""
+import asyncio
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.services.budget import BudgetExceededError, BudgetGuard
+from app.services.execution_engine import ExecutionEngine
+from app.services.llm_executor import LLMExecutor
+from app.services.response_cache import ResponseCache
+from app.services.retry import CircuitBreaker, RetryPolicy
+from app.services.strategy_engine import (
+    MULTI_AGENT,
+    RECALL,
+    VALIDATION,
+    AnswerStage,
+    Strategy,
+    StrategyExecutor,
+    TextStage,
+    get_strategy,
+    summarize_stages,
+)
+
+
+QUESTIONS = [
+    {"question_id": "q1", "question_text": "How satisfied are you with your job?",
+     "question_type": "likert_scale", "options": {"scale_min": 1, "scale_max": 7}},
+    {"question_id": "q2", "question_text": "Describe your commute.", "question_type": "open_ended"},
+]
+PROFILE = {"participant_number": 1, "age": 34, "gender": "female"}
+
+
+def completion(content, prompt_tokens=100, completion_tokens=20):
+    response = Mock()
+    response.choices = [Mock(message=Mock(content=content))]
+    response.usage = Mock(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        total_tokens=prompt_tokens + completion_tokens,
+        prompt_tokens_details=None,
+    )
+    return response
+
+
+def answers(q1="5", confidence="high"):
+    return json.dumps({
+        "q1": {"response": q1, "confidence": confidence},
+        "q2": {"response": "By bus", "confidence": "high"},
+    })
+
+
+class FakeLLM:
+    """Async create() that answers by prompt content and records prompts"""
+
+    def __init__(self, duplicate_answer="5", delay=0.0, fail_on=None):
+        self.prompts = []
+        self.duplicate_answer = duplicate_answer
+        self.delay = delay
+        self.fail_on = fail_on
+
+    async def create(self, **kwargs):
+        prompt = kwargs["messages"][-1]["content"]
+        self.prompts.append(prompt)
+        await asyncio.sleep(self.delay)
+        if self.fail_on and self.fail_on in prompt:
+            raise Exception("upstream error")
+        if "recall two or three" in prompt:
+            return completion("I remember my first job at a bakery.")
+        if "describe your outlook" in prompt:
+            return completion("I value stability.")
+        if "review simulated research participants" in prompt:
+            return completion("Too generic.")
+        if "How satisfied" in prompt and "Describe your commute" not in prompt:
+            return completion(json.dumps({"q1": {"response": self.duplicate_answer}}))
+        return completion(answers())
+
+
+@patch('app.services.llm_executor.OpenAI')
+@patch('app.services.llm_executor.AsyncOpenAI')
+class TestStrategyExecutor:
+    """Tests for StrategyExecutor"""
+
+    @staticmethod
+    def executor(mock_async_openai, llm, **kwargs):
+        mock_async_openai.return_value.chat.completions.create = llm.create
+        return LLMExecutor(
+            api_key="test-key",
+            input_cost_per_1k=0.01,
+            output_cost_per_1k=0.01,
+            retry_policy=RetryPolicy(max_retries=0),
+            circuit_breaker=CircuitBreaker("gpt-4o"),
+            **kwargs,
+        )
+
+    async def test_recall_feeds_answer_stage(self, mock_async_openai, mock_openai):
+        """Test that the recalled experiences are part of the answer prompt"""
+        llm = FakeLLM()
+        strategy_executor = StrategyExecutor(self.executor(mock_async_openai, llm), RECALL)
+
+        result = await strategy_executor.execute_participant_async(PROFILE, QUESTIONS)
+
+        assert len(llm.prompts) == 2
+        assert "I remember my first job at a bakery." in llm.prompts[1]
+        assert result["responses"]["q1"]["response"] == "5"
+
+    async def test_usage_covers_every_stage(self, mock_async_openai, mock_openai):
+        """Test that tokens and cost are recorded per stage and in total"""
+        llm = FakeLLM()
+        strategy_executor = StrategyExecutor(self.executor(mock_async_openai, llm), MULTI_AGENT)
+
+        result = await strategy_executor.execute_participant_async(PROFILE, QUESTIONS)
+
+        assert set(result["stages"]) == {"perspective", "critique", "answer"}
+        assert result["total_tokens"] == 3 * 120
+        assert result["cost"] == pytest.approx(sum(s["cost"] for s in result["stages"].values()))
+        assert "Too generic." in llm.prompts[2]
+        assert all(s["latency_seconds"] >= 0 for s in result["stages"].values())
+
+    async def test_independent_stages_run_concurrently(self, mock_async_openai, mock_openai):
+        """Test that the validation answer and duplicate are in flight together"""
+        llm = FakeLLM(delay=0.05)
+        strategy_executor = StrategyExecutor(self.executor(mock_async_openai, llm), VALIDATION)
+
+        started = asyncio.get_running_loop().time()
+        await strategy_executor.execute_participant_async(PROFILE, QUESTIONS)
+        elapsed = asyncio.get_running_loop().time() - started
+
+        assert len(llm.prompts) == 2
+        assert elapsed < 0.09
+
+    async def test_validation_flags_inconsistent_answers(self, mock_async_openai, mock_openai):
+        """Test that re-asked scale answers more than a point apart are flagged"""
+        llm = FakeLLM(duplicate_answer="2")
+        strategy_executor = StrategyExecutor(self.executor(mock_async_openai, llm), VALIDATION)
+
+        result = await strategy_executor.execute_participant_async(PROFILE, QUESTIONS)
+
+        assert result["inconsistent"] == {"q1": {"first": "5", "second": "2"}}
+        assert result["low_confidence"] == []
+        assert result["stages"]["duplicate"]["calls"] == 1
+        # The duplicate's answers never replace the participant's own
+        assert result["responses"]["q1"]["response"] == "5"
+
+    async def test_validation_tolerates_neighbouring_scale_points(self, mock_async_openai, mock_openai):
+        """Test that a one-point difference on a scale is consistent"""
+        llm = FakeLLM(duplicate_answer="4")
+        strategy_executor = StrategyExecutor(self.executor(mock_async_openai, llm), VALIDATION)
+
+        result = await strategy_executor.execute_participant_async(PROFILE, QUESTIONS)
+
+        assert result["inconsistent"] == {}
+
+    async def test_intermediate_artifacts_are_cached(self, mock_async_openai, mock_openai):
+        """Test that a rerun is served entirely from the response cache"""
+        llm = FakeLLM()
+        executor = self.executor(mock_async_openai, llm, response_cache=ResponseCache())
+        strategy_executor = StrategyExecutor(executor, RECALL)
+
+        await strategy_executor.execute_participant_async(PROFILE, QUESTIONS)
+        result = await strategy_executor.execute_participant_async(PROFILE, QUESTIONS)
+
+        assert len(llm.prompts) == 2
+        assert result["cached"]
+        assert result["cost"] == 0
+        assert all(s["cached"] for s in result["stages"].values())
+
+    async def test_failed_stage_fails_participant(self, mock_async_openai, mock_openai):
+        """Test that a dependency's error is reported without running dependents"""
+        llm = FakeLLM(fail_on="recall two or three")
+        strategy_executor = StrategyExecutor(self.executor(mock_async_openai, llm), RECALL)
+
+        with pytest.raises(Exception, match="Stage recall failed"):
+            await strategy_executor.execute_participant_async(PROFILE, QUESTIONS)
+
+        assert len(llm.prompts) == 1
+
+    async def test_budget_refusal_propagates(self, mock_async_openai, mock_openai):
+        """Test that a budget refusal reaches the engine unwrapped"""
+        llm = FakeLLM()
+        executor = self.executor(mock_async_openai, llm, budget=BudgetGuard(0.0))
+        strategy_executor = StrategyExecutor(executor, RECALL)
+
+        with pytest.raises(BudgetExceededError):
+            await strategy_executor.execute_participant_async(PROFILE, QUESTIONS)
+
+    async def test_engine_runs_strategy(self, mock_async_openai, mock_openai):
+        """Test that the execution engine drives a strategy like an executor"""
+        llm = FakeLLM()
+        strategy_executor = StrategyExecutor(self.executor(mock_async_openai, llm), RECALL)
+        engine = ExecutionEngine.from_settings(strategy_executor, {})
+
+        outcomes = await engine.run(
+            [{"participant_number": i} for i in range(1, 4)], QUESTIONS
+        )
+
+        assert all(o["result"] is not None for o in outcomes)
+        summary = summarize_stages([o["result"] for o in outcomes])
+        assert summary["recall"]["participants"] == 3
+        assert summary["answer"]["calls"] == 3
+
+
+class TestStrategies:
+    """Tests for strategy definitions"""
+
+    def test_get_strategy(self):
+        """Test strategy lookup by name"""
+        assert get_strategy("simple") is None
+        assert get_strategy("multi_agent") is MULTI_AGENT
+
+        with pytest.raises(ValueError):
+            get_strategy("unknown")
+
+    def test_stages_must_follow_dependencies(self):
+        """Test that a stage cannot depend on a later stage"""
+        with pytest.raises(ValueError):
+            Strategy(
+                name="broken",
+                stages=(
+                    AnswerStage("answer", depends_on=("recall",)),
+                    TextStage("recall", "{persona}"),
+                ),
+            )
@@ -0,0 +1,79 @@
+"""
+Tests for the incremental JSON parser
+"""
+import json
+
+import pytest
+
+from app.services.stream_parser import IncrementalJSONParser, MalformedStreamError
+
+
+DOCUMENT = {
+    "q1": {"response": "7", "confidence": "high"},
+    "q2": {"response": "A \"quoted\" answer, with {braces}", "confidence": "low"},
+    "q3": ["nested", {"list": [1, 2]}],
+    "q4": 5,
+}
+
+
+def feed_in_chunks(parser, text, size):
+    """Feed text in fixed-size chunks and collect completed members"""
+    completed = []
+    for i in range(0, len(text), size):
+        completed.extend(parser.feed(text[i : i + size]))
+    return completed
+
+
+class TestIncrementalJSONParser:
+    """Tests for IncrementalJSONParser.feed"""
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 17, 10000])
+    def test_members_match_json_loads(self, chunk_size):
+        """Test that any chunking yields the same members as json.loads"""
+        parser = IncrementalJSONParser()
+
+        completed = feed_in_chunks(parser, json.dumps(DOCUMENT, indent=2), chunk_size)
+
+        assert dict(completed) == DOCUMENT
+        assert parser.done
+
+    def test_members_are_emitted_as_soon_as_complete(self):
+        """Test that a member is returned before the object closes"""
+        parser = IncrementalJSONParser()
+
+        assert parser.feed('{"q1": {"response": "7"}') == []
+        assert parser.feed(', "q2"') == [("q1", {"response": "7"})]
+        assert not parser.done
+
+    def test_markdown_fence_is_tolerated(self):
+        """Test that a ```json fence before the object is skipped"""
+        parser = IncrementalJSONParser()
+
+        completed = parser.feed('```json\n{"q1": {"response": "Yes"}}\n```')
+
+        assert completed == [("q1", {"response": "Yes"})]
+        assert parser.done
+
+    def test_prose_without_object_is_malformed(self):
+        """Test that a long preamble with no JSON object aborts"""
+        parser = IncrementalJSONParser()
+
+        with pytest.raises(MalformedStreamError):
+            parser.feed("I am sorry, but " * 50)
+
+    def test_invalid_value_is_malformed(self):
+        """Test that an unparseable value aborts immediately"""
+        parser = IncrementalJSONParser()
+
+        completed = parser.feed('{"q1": {"response": "ok"}, ')
+        with pytest.raises(MalformedStreamError):
+            parser.feed('"q2": maybe,')
+
+        assert completed == [("q1", {"response": "ok"})]
+
+    def test_unquoted_key_is_malformed(self):
+        """Test that a non-string key aborts immediately"""
+        parser = IncrementalJSONParser()
+
+        with pytest.raises(MalformedStreamError):
+            parser.feed("{q1: 1}")
@@ -0,0 +1,195 @@
+"""
+Tests for the local OpenAI-compatible stub LLM server
+"""
+import httpx
+from fastapi.testclient import TestClient
+from openai import AsyncOpenAI
+
+from app.services.llm_executor import LLMExecutor
+from app.services.llm_provider import get_provider
+from app.services.prompt_template import CompiledPrompt
+from app.services.response_schema import ResponseValidator, json_schema_format
+from app.services.retry import CircuitBreaker, RetryPolicy
+from app.stub_server import StubConfig, create_stub_app
+
+
+QUESTIONS = [
+    {
+        "question_id": "q1",
+        "question_text": "Rate your stress",
+        "question_type": "likert_scale",
+        "options": {"min": 1, "max": 7, "labels": ["Low", "High"]},
+    },
+    {
+        "question_id": "q2",
+        "question_text": "Pick one",
+        "question_type": "multiple_choice",
+        "options": {"choices": ["Red", "Blue"]},
+    },
+    {
+        "question_id": "q3",
+        "question_text": "Do you exercise?",
+        "question_type": "yes_no",
+        "options": {},
+    },
+    {
+        "question_id": "q4",
+        "question_text": "Describe your week",
+        "question_type": "open_ended",
+        "options": {},
+    },
+]
+
+
+def completion_request(prompt, **extra):
+    return {
+        "model": "stub",
+        "messages": [{"role": "system", "content": "sys"}, {"role": "user", "content": prompt}],
+        **extra,
+    }
+
+
+def make_client(**config):
+    return TestClient(create_stub_app(StubConfig(latency=0, seed=1, **config)))
+
+
+class TestSyntheticAnswers:
+    """Tests for answer generation"""
+
+    def test_answers_rendered_questionnaire(self):
+        """Test that answers parsed from the prompt pass validation"""
+        client = make_client()
+        prompt = CompiledPrompt(QUESTIONS).render({"participant_number": 1})
+
+        response = client.post("/v1/chat/completions", json=completion_request(prompt))
+
+        body = response.json()
+        executor = LLMExecutor(api_key="test-key")
+        answers = executor._parse_response(
+            body["choices"][0]["message"]["content"], ["q1", "q2", "q3", "q4"]
+        )
+        valid, invalid = ResponseValidator(QUESTIONS).validate(answers)
+        assert invalid == {}
+        assert len(valid) == 4
+        assert body["usage"]["total_tokens"] > 0
+
+    def test_answers_packed_prompt(self):
+        """Test that packed prompts are answered per participant number"""
+        client = make_client()
+        prompt = CompiledPrompt(QUESTIONS).render_pack(
+            [{"participant_number": 4}, {"participant_number": 5}]
+        )
+
+        response = client.post("/v1/chat/completions", json=completion_request(prompt))
+
+        content = response.json()["choices"][0]["message"]["content"]
+        assert set(LLMExecutor(api_key="test-key")._extract_json(content)) == {"4", "5"}
+
+    def test_answers_follow_response_schema(self):
+        """Test that schema-constrained requests get schema-valid answers"""
+        client = make_client()
+        compiled = CompiledPrompt(QUESTIONS)
+
+        response = client.post(
+            "/v1/chat/completions",
+            json=completion_request(
+                "anything", response_format=json_schema_format(compiled.response_schema)
+            ),
+        )
+
+        content = response.json()["choices"][0]["message"]["content"]
+        answers = LLMExecutor(api_key="test-key")._extract_json(content)
+        assert compiled.validator.validate(answers)[1] == {}
+
+    def test_wide_scale_answers_stay_in_range(self):
+        """Test that scales sent without schema bounds are answered from the prompt's scale"""
+        client = make_client()
+        compiled = CompiledPrompt([{
+            "question_id": "q1",
+            "question_text": "How many minutes?",
+            "question_type": "likert_scale",
+            "options": {"min": 200, "max": 400},
+        }])
+        assert "minimum" not in str(compiled.response_schema)
+
+        for number in range(1, 11):
+            response = client.post(
+                "/v1/chat/completions",
+                json=completion_request(
+                    compiled.render({"participant_number": number}),
+                    response_format=json_schema_format(compiled.response_schema),
+                ),
+            )
+            content = response.json()["choices"][0]["message"]["content"]
+            answers = LLMExecutor(api_key="test-key")._extract_json(content)
+            assert compiled.validator.validate(answers)[1] == {}
+
+
+class TestFaultInjection:
+    """Tests for configurable failures"""
+
+    def test_rate_limit_bursts(self):
+        """Test that bursts of 429s carry retry-after"""
+        client = make_client(rate_limit_every=3, rate_limit_burst=1, retry_after=2)
+        prompt = CompiledPrompt(QUESTIONS).render({"participant_number": 1})
+
+        statuses = [
+            client.post("/v1/chat/completions", json=completion_request(prompt)) for _ in range(6)
+        ]
+
+        assert [r.status_code for r in statuses] == [429, 200, 200, 429, 200, 200]
+        assert statuses[0].headers["retry-after"] == "2"
+
+    def test_error_rate(self):
+        """Test that injected failures return 500"""
+        client = make_client(error_rate=1.0)
+
+        response = client.post("/v1/chat/completions", json=completion_request("hi"))
+
+        assert response.status_code == 500
+
+
+class TestExecutorAgainstStub:
+    """End-to-end tests of LLMExecutor against the stub"""
+
+    def make_executor(self, app, **kwargs):
+        provider = get_provider("stub", base_url="http://stub/v1")
+        executor = LLMExecutor(
+            api_key="",
+            provider=provider,
+            retry_policy=RetryPolicy(max_retries=3, base_delay=0, max_delay=0),
+            circuit_breaker=CircuitBreaker("stub"),
+            **kwargs,
+        )
+        executor.async_client = AsyncOpenAI(
+            api_key=executor.api_key,
+            base_url=provider.base_url,
+            max_retries=0,
+            http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=app)),
+        )
+        return executor
+
+    async def test_structured_execution_recovers_from_429(self):
+        """Test a structured run that retries through a 429 burst"""
+        app = create_stub_app(StubConfig(latency=0, seed=2, rate_limit_every=10, rate_limit_burst=1))
+        executor = self.make_executor(app, structured_output=True)
+
+        result = await executor.execute_participant_async({"participant_number": 1}, QUESTIONS)
+
+        assert list(result["responses"]) == ["q1", "q2", "q3", "q4"]
+        assert "invalid" not in result
+        assert app.state.request_count == 2
+
+    async def test_streamed_execution(self):
+        """Test that streamed stub completions are parsed incrementally"""
+        app = create_stub_app(StubConfig(latency=0, seed=3))
+        executor = self.make_executor(app, streaming=True)
+        answers = []
+
+        result = await executor.execute_participant_async(
+            {"participant_number": 1}, QUESTIONS, on_answer=lambda qid, a: answers.append(qid)
+        )
+
+        assert answers == ["q1", "q2", "q3", "q4"]
+        assert result["total_tokens"] > 0
+        assert "partial" not in result
@@ -0,0 +1,133 @@
+"""
+Tests for the execution worker
+"""
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models.execution_job import ExecutionJob
+from app.models.experiment import Experiment
+from app.services.job_queue import JobQueue
+from app.worker import Worker
+
+
+@pytest.fixture
+def session_factory():
+    """In-memory SQLite sessions shared across threads"""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine, tables=[Experiment.__table__, ExecutionJob.__table__])
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def queue_job(session_factory):
+    with session_factory() as session:
+        experiment = Experiment(name="Test", status="active", meta_data={})
+        session.add(experiment)
+        session.flush()
+        job = JobQueue.enqueue(session, experiment.id, {"api_key": "sk-test"})
+        session.commit()
+        return job.id
+
+
+class TestWorker:
+    """Tests for Worker"""
+
+    def test_runs_job_and_completes_it(self, session_factory):
+        """Test that a claimed job is executed and marked completed"""
+        job_id = queue_job(session_factory)
+        ran = []
+        worker = Worker(JobQueue(session_factory), execute=lambda job: ran.append(job.id))
+
+        assert worker.run_once()
+        assert not worker.run_once()
+
+        assert ran == [job_id]
+        with session_factory() as session:
+            assert session.get(ExecutionJob, job_id).status == "completed"
+
+    def test_failed_run_fails_job(self, session_factory):
+        """Test that an error from the run is recorded on the job"""
+        job_id = queue_job(session_factory)
+
+        def execute(job):
+            raise RuntimeError("database went away")
+
+        Worker(JobQueue(session_factory), execute=execute).run_once()
+
+        with session_factory() as session:
+            job = session.get(ExecutionJob, job_id)
+            assert job.status == "failed"
+            assert job.error == "database went away"
+
+    def test_heartbeats_while_running(self, session_factory):
+        """Test that the lease is extended during a long run"""
+        job_id = queue_job(session_factory)
+        leases = []
+
+        def execute(job):
+            for _ in range(3):
+                time.sleep(0.03)
+                with session_factory() as session:
+                    leases.append(session.get(ExecutionJob, job_id).lease_expires_at)
+
+        worker = Worker(JobQueue(session_factory), heartbeat_interval=0.01, execute=execute)
+        worker.run_once()
+
+        assert leases[-1] > leases[0]
+
+    def test_lost_lease_stops_the_run(self, session_factory):
+        """Test that the run is told to stop once another worker holds the job"""
+        job_id = queue_job(session_factory)
+        stopped = []
+
+        def execute(job):
+            with session_factory() as session:
+                session.get(ExecutionJob, job_id).worker_id = "other-worker"
+                session.commit()
+            stopped.append(job.lease_lost.wait(timeout=1))
+
+        worker = Worker(JobQueue(session_factory), heartbeat_interval=0.01, execute=execute)
+        worker.run_once()
+
+        assert stopped == [True]
+        assert worker.leases_lost == 1
+
+    def test_heartbeat_errors_are_retried(self, session_factory):
+        """Test that a failing heartbeat keeps trying until the lease would expire"""
+        queue_job(session_factory)
+        queue = JobQueue(session_factory, lease_seconds=0.2)
+        failures = []
+
+        def heartbeat(job_id, worker_id):
+            failures.append(time.monotonic())
+            raise RuntimeError("database went away")
+
+        queue.heartbeat = heartbeat
+        lost = []
+
+        def execute(job):
+            lost.append(job.lease_lost.wait(timeout=1))
+
+        Worker(queue, heartbeat_interval=0.02, execute=execute).run_once()
+
+        assert lost == [True]
+        assert len(failures) > 1
+
+    def test_stop_ends_polling(self, session_factory):
+        """Test that stop() ends the polling loop"""
+        worker = Worker(JobQueue(session_factory), poll_interval=0.01, execute=lambda job: None)
+        thread = threading.Thread(target=worker.run)
+        thread.start()
+
+        worker.stop()
+        thread.join(timeout=1)
+
+        assert not thread.is_alive()